@@ -0,0 +1,90 @@
+"""Benchmark: random request payload generation throughput.
+
+Compiles a synthetic request type with scalar, repeated, enum, map and nested
+fields, then times ``PayloadGenerator.payloads()`` at several target sizes. As a
+reference, it also times filling the same type with the fixed sample values of
+``pbreflect.mock.payloads.populate`` and calling ``SerializeToString()``.
+
+Usage:
+    python benchmarks/payloads.py [--count 100000] [--sizes 64,512,4096] [--depth 2]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from google.protobuf import message_factory
+
+from pbreflect.bench import PayloadGenerator
+from pbreflect.mock import compile_proto_dir
+from pbreflect.mock.payloads import populate
+from pbreflect.pbgen.descriptors import build_pool
+
+_PROTO = """
+syntax = "proto3";
+package bench;
+
+enum Kind { KIND_UNSPECIFIED = 0; SMALL = 1; LARGE = 2; }
+
+message Item {
+  string sku = 1;
+  int64 quantity = 2;
+  double price = 3;
+  repeated string tags = 4;
+}
+
+message Request {
+  string id = 1;
+  int32 version = 2;
+  uint64 user_id = 3;
+  sint64 delta = 4;
+  bool dry_run = 5;
+  Kind kind = 6;
+  bytes token = 7;
+  repeated int64 counters = 8;
+  repeated Item items = 9;
+  map<string, string> labels = 10;
+  Item primary = 11;
+}
+"""
+
+
+def _request_class() -> Any:
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "bench.proto").write_text(_PROTO)
+        pool = build_pool(compile_proto_dir(tmp))
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("bench.Request"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="Payloads per run")
+    parser.add_argument("--sizes", default="64,512,4096", help="Comma-separated target sizes in bytes")
+    parser.add_argument("--depth", type=int, default=2, help="Nested message depth")
+    args = parser.parse_args()
+
+    request_class = _request_class()
+
+    print(f"{args.count} payloads, depth {args.depth}:")
+    for size in map(int, args.sizes.split(",")):
+        start = time.perf_counter()
+        generator = PayloadGenerator(request_class, size=size, max_depth=args.depth, seed=0)
+        setup = time.perf_counter() - start
+        start = time.perf_counter()
+        total = sum(len(payload) for payload in generator.payloads(args.count))
+        elapsed = time.perf_counter() - start
+        print(
+            f"  size {size:6d}  {elapsed / args.count * 1e6:7.2f} us/payload  {total / args.count:8.0f} B mean"
+            f"  {total / elapsed / 1e6:6.1f} MB/s  (setup {setup * 1e3:.1f} ms)"
+        )
+
+    start = time.perf_counter()
+    total = sum(len(populate(request_class(), args.depth).SerializeToString()) for _ in range(args.count))
+    elapsed = time.perf_counter() - start
+    print(f"  populate()   {elapsed / args.count * 1e6:7.2f} us/payload  {total / args.count:8.0f} B mean")
+
+
+if __name__ == "__main__":
+    main()
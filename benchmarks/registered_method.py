@@ -0,0 +1,86 @@
+"""Benchmark: per-call overhead of grpcio's registered-method fast path.
+
+Starts a local server with an echo method and times sequential unary calls
+through multicallables created with and without ``_registered_method=True``,
+the form generated stubs use when grpcio supports it.
+
+Usage:
+    python benchmarks/registered_method.py [--calls 5000] [--rounds 5]
+"""
+
+import argparse
+import time
+from concurrent import futures
+
+import grpc
+
+from pbreflect.pbgen.plugins.pbreflect import supports_registered_method
+
+SERVICE = "bench.Echo"
+METHOD = f"/{SERVICE}/Echo"
+
+
+def _identity(payload: bytes) -> bytes:
+    return payload
+
+
+def _start_server() -> tuple[grpc.Server, int]:
+    handlers = {
+        "Echo": grpc.unary_unary_rpc_method_handler(
+            lambda request, _context: request,
+            request_deserializer=_identity,
+            response_serializer=_identity,
+        )
+    }
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    server.add_registered_method_handlers(SERVICE, handlers)
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    return server, port
+
+
+def _time_calls(call: grpc.UnaryUnaryMultiCallable, calls: int) -> float:
+    payload = b"x" * 64
+    start = time.perf_counter()
+    for _ in range(calls):
+        call(payload)
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=5000, help="Calls per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per variant; the best round is reported")
+    args = parser.parse_args()
+
+    if not supports_registered_method():
+        raise SystemExit("installed grpcio does not support _registered_method")
+
+    server, port = _start_server()
+    try:
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            variants = {
+                "unregistered": channel.unary_unary(
+                    METHOD, request_serializer=_identity, response_deserializer=_identity
+                ),
+                "registered": channel.unary_unary(
+                    METHOD, request_serializer=_identity, response_deserializer=_identity, _registered_method=True
+                ),
+            }
+            for call in variants.values():
+                _time_calls(call, 200)  # warm up the connection
+
+            best = dict.fromkeys(variants, float("inf"))
+            for _ in range(args.rounds):
+                for name, call in variants.items():
+                    best[name] = min(best[name], _time_calls(call, args.calls))
+    finally:
+        server.stop(None)
+
+    print(f"{args.calls} sequential unary calls per round, best of {args.rounds}:")
+    for name, seconds in best.items():
+        print(f"  {name:<13} {seconds * 1e6:8.1f} us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Microbenchmark: cost of constructing a generated client.
+
+Generates a pbreflect client for a synthetic service with many methods and
+compares constructing it with creating every multicallable up front, which is
+what generated stubs did before multicallables became lazy.
+
+Usage:
+    python benchmarks/stub_construction.py [--methods 200] [--number 2000]
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import grpc
+
+from pbreflect.pbgen.runner import GenerationOptions, GenerationPipeline
+
+
+def _write_proto(proto_dir: Path, methods: int) -> None:
+    rpcs = "\n".join(f"  rpc Method{i}(Request) returns (Response);" for i in range(methods))
+    (proto_dir / "bench.proto").write_text(
+        'syntax = "proto3";\n'
+        "package bench;\n"
+        "message Request { string id = 1; }\n"
+        "message Response { string id = 1; }\n"
+        f"service Bench {{\n{rpcs}\n}}\n"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--methods", type=int, default=200, help="Number of RPC methods in the service")
+    parser.add_argument("--number", type=int, default=2000, help="Constructions per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        proto_dir = root / "protos"
+        proto_dir.mkdir()
+        _write_proto(proto_dir, args.methods)
+        os.chdir(root)
+        GenerationPipeline(str(proto_dir), str(root / "bench_clients"), GenerationOptions(root_path=root)).run()
+        sys.path.insert(0, str(root))
+        module = importlib.import_module("bench_clients.bench_pb2_pbreflect")
+        messages = importlib.import_module("bench_clients.bench_pb2")
+
+        channel = grpc.insecure_channel("localhost:1")
+        paths = [f"/bench.Bench/Method{i}" for i in range(args.methods)]
+
+        def eager() -> None:
+            for path in paths:
+                channel.unary_unary(
+                    path,
+                    request_serializer=messages.Request.SerializeToString,
+                    response_deserializer=messages.Response.FromString,
+                )
+
+        def lazy() -> None:
+            module.BenchClient(channel)
+
+        def lazy_first_call_lookup() -> None:
+            module.BenchClient(channel)._stub.Method0  # noqa: B018
+
+        print(f"{args.methods} methods, {args.number} constructions per run (best of 5):")
+        for name, fn in (("eager", eager), ("lazy", lazy), ("lazy + one method", lazy_first_call_lookup)):
+            best = min(timeit.repeat(fn, number=args.number, repeat=5))
+            print(f"  {name:<18} {best / args.number * 1e6:10.2f} us per client")
+        channel.close()
+
+
+if __name__ == "__main__":
+    main()
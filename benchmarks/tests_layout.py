@@ -0,0 +1,83 @@
+"""Benchmark: pytest collection time of generated tests, per-method vs per-service layout.
+
+Generates clients and fake-backed test stubs for synthetic services in both
+``--tests-layout`` modes, then times ``pytest --collect-only`` (and, with
+``--run``, a full run against the in-process fakes) in a fresh interpreter.
+
+Usage:
+    python benchmarks/tests_layout.py [--services 5] [--methods 200] [--rounds 3] [--run]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pbreflect.pbgen.runner import GenerationOptions, GenerationPipeline
+
+
+def _write_protos(proto_dir: Path, services: int, methods: int) -> None:
+    for s in range(services):
+        rpcs = "\n".join(f"  rpc Method{i}(Request) returns (Response);" for i in range(methods))
+        (proto_dir / f"bench{s}.proto").write_text(
+            'syntax = "proto3";\n'
+            f"package bench{s};\n"
+            "message Request { string id = 1; }\n"
+            "message Response { string id = 1; }\n"
+            f"service Bench{s} {{\n{rpcs}\n}}\n"
+        )
+
+
+def _time_pytest(root: Path, tests_dir: str, args: list[str], rounds: int) -> float:
+    command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", *args, tests_dir]
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=root, check=True, capture_output=True)  # noqa: S603
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--services", type=int, default=5, help="Number of services")
+    parser.add_argument("--methods", type=int, default=200, help="RPC methods per service")
+    parser.add_argument("--rounds", type=int, default=3, help="pytest invocations per layout; the best is reported")
+    parser.add_argument("--run", action="store_true", help="Also time a full run against the in-process fakes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        proto_dir = root / "protos"
+        proto_dir.mkdir()
+        _write_protos(proto_dir, args.services, args.methods)
+        os.chdir(root)
+        for layout in ("method", "service"):
+            GenerationPipeline(
+                str(proto_dir),
+                str(root / "clients"),
+                GenerationOptions(
+                    root_path=root,
+                    gen_tests=True,
+                    tests_dir=f"tests_{layout}",
+                    tests_fakes=True,
+                    tests_layout=layout,
+                ),
+            ).run()
+
+        print(f"{args.services} services x {args.methods} methods (best of {args.rounds}):")
+        for layout in ("method", "service"):
+            tests_dir = f"tests_{layout}"
+            modules = len(list((root / tests_dir).rglob("test_*.py")))
+            collect = _time_pytest(root, tests_dir, ["--collect-only"], args.rounds)
+            line = f"  {layout:<8} {modules:6d} test modules  collect {collect:7.2f}s"
+            if args.run:
+                line += f"  run {_time_pytest(root, tests_dir, [], args.rounds):7.2f}s"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
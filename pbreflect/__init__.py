@@ -4,13 +4,16 @@ A tool for recovering Protocol Buffer (protobuf) definitions from gRPC services
 using the reflection API and generating client code.
 """
 
-from pbreflect.protorecover import (
-    GrpcReflectionClient,
-    ProtoFileBuilder,
-    ProtoRecoveryError,
-    RecoverService,
-    RecoverServiceConnectionError,
-)
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pbreflect.protorecover import (
+        GrpcReflectionClient,
+        ProtoFileBuilder,
+        ProtoRecoveryError,
+        RecoverService,
+        RecoverServiceConnectionError,
+    )
 
 __version__ = "2.0.0"
 __all__ = [
@@ -20,3 +23,12 @@ __all__ = [
     "RecoverServiceConnectionError",
     "ProtoRecoveryError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolved lazily so that `import pbreflect` (and every CLI invocation) does not pay for grpc.
+    if name in __all__:
+        import pbreflect.protorecover
+
+        return getattr(pbreflect.protorecover, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
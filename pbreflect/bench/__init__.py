@@ -0,0 +1,31 @@
+"""Load generation for any method of a reflected gRPC service (``pbreflect bench``).
+
+Methods and their message types are resolved from the server's reflection
+service into dynamic messages, so no generated code or locust file is needed.
+:class:`PayloadGenerator` builds seeded random requests of realistic size for them.
+"""
+
+from pbreflect.bench.load import BenchReport, run_bench
+from pbreflect.bench.payloads import PayloadGenerator, read_delimited, write_delimited
+from pbreflect.bench.target import (
+    BenchMethod,
+    BenchTargetError,
+    load_requests,
+    reflect_method,
+    resolve_method,
+    tls_credentials,
+)
+
+__all__ = [
+    "BenchMethod",
+    "BenchReport",
+    "BenchTargetError",
+    "PayloadGenerator",
+    "load_requests",
+    "read_delimited",
+    "reflect_method",
+    "resolve_method",
+    "run_bench",
+    "tls_credentials",
+    "write_delimited",
+]
@@ -0,0 +1,210 @@
+"""Load generation against one method, with latency percentiles and an error breakdown."""
+
+import itertools
+import math
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import grpc
+
+from pbreflect.bench.target import BenchMethod
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+@dataclass
+class BenchReport:
+    """Outcome of a benchmark run.
+
+    Attributes:
+        method: Full method path
+        elapsed: Seconds from the first scheduled call until the last call finished
+        latencies: Seconds per successful call, sorted
+        errors: Failed calls by status code name
+        rate: Requested calls per second, or None for an unthrottled run
+    """
+
+    method: str
+    elapsed: float
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+    rate: float | None = None
+
+    @property
+    def calls(self) -> int:
+        """Completed calls, failed ones included."""
+        return len(self.latencies) + self.errors.total()
+
+    @property
+    def throughput(self) -> float:
+        """Completed calls per second."""
+        return self.calls / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Nearest-rank percentile of successful call latencies.
+
+        Args:
+            q: Percentile in ``(0, 100]``
+
+        Returns:
+            Latency in seconds; 0.0 when no call succeeded
+        """
+        if not self.latencies:
+            return 0.0
+        return self.latencies[max(math.ceil(q / 100 * len(self.latencies)) - 1, 0)]
+
+    def summary(self) -> dict[str, Any]:
+        """JSON-friendly summary; latencies are in milliseconds."""
+        latencies = self.latencies
+        return {
+            "method": self.method,
+            "calls": self.calls,
+            "ok": len(latencies),
+            "errors": dict(self.errors.most_common()),
+            "elapsed_s": round(self.elapsed, 3),
+            "rate": self.rate,
+            "throughput": round(self.throughput, 1),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+                **{f"p{q:g}": round(self.percentile(q) * 1000, 3) for q in PERCENTILES},
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
+
+    def format(self) -> str:
+        """Human-readable report."""
+        summary = self.summary()
+        requested = f" (requested {self.rate:g}/s)" if self.rate else ""
+        lines = [
+            f"Method:      {self.method}",
+            f"Calls:       {summary['calls']} in {summary['elapsed_s']}s, {summary['ok']} ok",
+            f"Throughput:  {summary['throughput']} calls/s{requested}",
+            "Latency (ms):",
+            *(f"  {name:<6} {value:>10.3f}" for name, value in summary["latency_ms"].items()),
+        ]
+        if self.errors:
+            lines.append("Errors:")
+            lines.extend(f"  {code:<20} {count}" for code, count in summary["errors"].items())
+        return "\n".join(lines)
+
+
+class _Schedule:
+    """Hands out intended start times for calls until the run ends.
+
+    Unthrottled runs start each call as soon as a worker is free. With a rate,
+    call ``n`` is due at ``start + n / rate``; latency is measured from that time
+    rather than from when a worker got to it, so a server that falls behind is
+    charged for the queueing it causes instead of hiding it (coordinated omission).
+    """
+
+    def __init__(self, start: float, end: float, rate: float | None) -> None:
+        self._start = start
+        self._end = end
+        self._interval = 1 / rate if rate else 0.0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> float | None:
+        now = time.perf_counter()
+        if not self._interval:
+            return now if now < self._end else None
+        with self._lock:
+            due = self._start + self._next * self._interval
+            self._next += 1
+        if due >= self._end:
+            return None
+        if due > now:
+            time.sleep(due - now)
+        return due
+
+
+def _call(channel: grpc.Channel, method: BenchMethod, requests: Sequence[bytes]) -> Callable[[int, float | None], None]:
+    """Build a function making call ``n`` with raw bytes and draining any response stream."""
+    if method.client_streaming:
+        if method.server_streaming:
+            bidi = channel.stream_stream(method.path, request_serializer=None, response_deserializer=None)
+            return lambda n, timeout: _drain(bidi(iter(requests), timeout=timeout))
+        upload = channel.stream_unary(method.path, request_serializer=None, response_deserializer=None)
+        return lambda n, timeout: upload(iter(requests), timeout=timeout)
+    if method.server_streaming:
+        download = channel.unary_stream(method.path, request_serializer=None, response_deserializer=None)
+        return lambda n, timeout: _drain(download(requests[n % len(requests)], timeout=timeout))
+    unary = channel.unary_unary(method.path, request_serializer=None, response_deserializer=None)
+    return lambda n, timeout: unary(requests[n % len(requests)], timeout=timeout)
+
+
+def _drain(responses: Any) -> None:
+    for _ in responses:
+        pass
+
+
+def run_bench(
+    channel: grpc.Channel,
+    method: BenchMethod,
+    requests: Sequence[bytes],
+    *,
+    duration: float,
+    concurrency: int = 1,
+    rate: float | None = None,
+    timeout: float | None = None,
+) -> BenchReport:
+    """Drive load against ``method`` and measure it.
+
+    ``concurrency`` worker threads make calls back to back for ``duration``
+    seconds; with ``rate``, they share a fixed schedule of that many calls per
+    second instead (open loop), and the run falls short of the rate when every
+    worker is busy. Requests and responses stay serialized bytes, so the client
+    spends no time on protobuf encoding while measuring.
+
+    Args:
+        channel: Channel (or pool) to the server
+        method: Method to call
+        requests: Serialized requests (see :func:`~pbreflect.bench.target.load_requests`)
+        duration: Seconds to generate load for
+        concurrency: Number of calls in flight at most
+        rate: Calls per second to schedule, or None to go as fast as possible
+        timeout: Per-call deadline in seconds
+
+    Returns:
+        The report
+
+    Raises:
+        ValueError: If an argument is out of range
+    """
+    if duration <= 0 or concurrency < 1 or (rate is not None and rate <= 0) or not requests:
+        raise ValueError("duration and rate must be positive, concurrency at least 1 and requests non-empty")
+    call = _call(channel, method, requests)
+    start = time.perf_counter()
+    schedule = _Schedule(start, start + duration, rate)
+    counter = itertools.count()
+    results: list[tuple[list[float], Counter[str]]] = []
+
+    def worker() -> None:
+        latencies: list[float] = []
+        errors: Counter[str] = Counter()
+        results.append((latencies, errors))
+        while (due := schedule.take()) is not None:
+            try:
+                call(next(counter), timeout)
+            except grpc.RpcError as e:
+                code = e.code() if isinstance(e, grpc.Call) else None
+                errors[code.name if code is not None else "UNKNOWN"] += 1
+            else:
+                latencies.append(time.perf_counter() - due)
+
+    threads = [threading.Thread(target=worker, name=f"pbreflect-bench-{n}", daemon=True) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = BenchReport(method.path, time.perf_counter() - start, rate=rate)
+    for latencies, errors in results:
+        report.latencies.extend(latencies)
+        report.errors.update(errors)
+    report.latencies.sort()
+    return report
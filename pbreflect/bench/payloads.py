@@ -0,0 +1,379 @@
+"""Seeded random request payloads built from message descriptors, for load and fuzz tests."""
+
+import random
+import struct
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from google.protobuf import descriptor_pb2
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+
+from pbreflect.pbgen.field_types import INTEGER_FIELD_TYPES
+
+MAX_DEPTH = 4
+MAX_REPEATED_MESSAGES = 3
+DEFAULT_LENGTH = 8
+
+# Samples per step when calibrating to a target size; sizes are compared on a fixed seed.
+_CALIBRATION_SAMPLES = 32
+_MAX_LENGTH = 1 << 24
+
+_M = TypeVar("_M", bound=Message)
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH = 2
+_WIRE_START_GROUP = 3
+_WIRE_END_GROUP = 4
+_WIRE_FIXED32 = 5
+
+_MASK64 = (1 << 64) - 1
+
+# Random bytes become letters and digits, so strings are valid UTF-8 of their byte length.
+_ALPHANUMERIC = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+_TO_ALPHANUMERIC = bytes(_ALPHANUMERIC[i % len(_ALPHANUMERIC)] for i in range(256))
+
+# Encodes one value: (rng, length) -> wire bytes of the value, without the tag.
+_Value = Callable[[random.Random, int], bytes]
+# Appends one field: (rng, length, depth, out).
+_Writer = Callable[[random.Random, int, int, bytearray], None]
+
+
+def _varint_slow(value: int) -> bytes:
+    value &= _MASK64
+    out = bytearray()
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+_SMALL_VARINTS = tuple(_varint_slow(value) for value in range(1 << 14))
+
+
+def _below(rng: random.Random, bound: int) -> int:
+    # ``randint``/``randrange`` cost several times more, and exactness does not matter here.
+    return int(rng.random() * bound)
+
+
+def _varint(value: int) -> bytes:
+    """Encode a varint; negative values take ten bytes, as int32/int64/enum fields do on the wire."""
+    if 0 <= value < len(_SMALL_VARINTS):
+        return _SMALL_VARINTS[value]
+    return _varint_slow(value)
+
+
+def _tag(field: Any, wire_type: int) -> bytes:
+    return _varint(field.number << 3 | wire_type)
+
+
+def _integer(bits: int, signed: bool = False, zigzag: bool = False) -> _Value:
+    # Magnitudes are log-uniform: most values are small, like real ids and counters.
+    def value(rng: random.Random, length: int) -> bytes:
+        number = rng.getrandbits(_below(rng, bits + 1))
+        if signed and rng.getrandbits(1):
+            number = -number
+        if zigzag:
+            number = (number << 1) ^ (number >> 63)
+        return _varint(number)
+
+    return value
+
+
+def _enum(field: Any) -> _Value:
+    numbers = [value.number for value in field.enum_type.values]
+    return lambda rng, length: _varint(numbers[_below(rng, len(numbers))])
+
+
+def _string(rng: random.Random, length: int) -> bytes:
+    size = _below(rng, 2 * length + 1)
+    return _varint(size) + rng.randbytes(size).translate(_TO_ALPHANUMERIC)
+
+
+def _bytes(rng: random.Random, length: int) -> bytes:
+    size = _below(rng, 2 * length + 1)
+    return _varint(size) + rng.randbytes(size)
+
+
+def _integer_scalar(field_type: "descriptor_pb2.FieldDescriptorProto.Type.ValueType") -> tuple[int, _Value]:
+    # Width, signedness and encoding follow from the type name, e.g. TYPE_SINT64 or TYPE_FIXED32.
+    name = descriptor_pb2.FieldDescriptorProto.Type.Name(field_type)
+    bits = 64 if name.endswith("64") else 32
+    if "FIXED" in name:
+        return _WIRE_FIXED64 if bits == 64 else _WIRE_FIXED32, lambda rng, length: rng.randbytes(bits // 8)
+    signed = not name.startswith("TYPE_U")
+    return _WIRE_VARINT, _integer(bits - 1 if signed else bits, signed=signed, zigzag=name.startswith("TYPE_SINT"))
+
+
+_SCALARS: dict[int, tuple[int, _Value]] = {
+    **{field_type: _integer_scalar(field_type) for field_type in INTEGER_FIELD_TYPES},
+    FieldDescriptor.TYPE_BOOL: (_WIRE_VARINT, lambda rng, length: _varint(rng.getrandbits(1))),
+    FieldDescriptor.TYPE_FLOAT: (_WIRE_FIXED32, lambda rng, length: struct.pack("<f", rng.uniform(-1e6, 1e6))),
+    FieldDescriptor.TYPE_DOUBLE: (_WIRE_FIXED64, lambda rng, length: struct.pack("<d", rng.uniform(-1e9, 1e9))),
+    FieldDescriptor.TYPE_STRING: (_WIRE_LENGTH, _string),
+    FieldDescriptor.TYPE_BYTES: (_WIRE_LENGTH, _bytes),
+}
+
+# Encoded defaults, which fields without presence leave off the wire.
+_DEFAULTS = {
+    _WIRE_VARINT: b"\x00",
+    _WIRE_LENGTH: b"\x00",
+    _WIRE_FIXED32: bytes(4),
+    _WIRE_FIXED64: bytes(8),
+}
+
+
+def _repeated_count(rng: random.Random, length: int) -> int:
+    return _below(rng, 2 + length // 8)
+
+
+class _MessagePlan:
+    """Field writers of one message type, built once and reused for every payload."""
+
+    def __init__(self) -> None:
+        self.oneofs: list[int] = []
+        self.fields: list[tuple[int, int, _Writer]] = []
+
+    def write(self, rng: random.Random, length: int, depth: int, out: bytearray) -> None:
+        # Exactly one member of each oneof is set; fields go out in field number order.
+        chosen = [_below(rng, members) for members in self.oneofs]
+        for oneof, member, writer in self.fields:
+            if oneof < 0 or chosen[oneof] == member:
+                writer(rng, length, depth, out)
+
+
+class PayloadGenerator(Generic[_M]):
+    """Random but valid serialized messages of one type, reproducible from a seed.
+
+    Every field is filled: numbers with log-uniform magnitudes, strings with letters and
+    digits, enums with declared values, one member of each oneof, and repeated and map
+    fields with a few elements. String and bytes lengths are drawn around ``length`` and
+    scalar lists grow with it; nested messages stop ``max_depth`` levels down, which also
+    bounds recursive types. With ``size``, ``length`` is calibrated so the mean
+    serialized size comes close to it; sizes still vary per message, and types without
+    string, bytes or repeated fields keep their natural size.
+
+    Payloads are encoded straight to the wire format by writers built once per message
+    type, without building message objects, so millions take seconds.
+
+    Attributes:
+        message_class: Message type of the payloads
+        max_depth: Levels of nested messages filled
+        length: Mean length of strings and bytes fields
+    """
+
+    def __init__(
+        self,
+        message_class: type[_M],
+        *,
+        size: int | None = None,
+        max_depth: int = MAX_DEPTH,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the generator and build the field writers of every reachable message type.
+
+        Args:
+            message_class: Message type of the payloads
+            size: Target mean serialized size in bytes; ``length`` stays at its default when omitted
+            max_depth: Levels of nested messages to fill
+            seed: Seed of the random values; equal seeds give equal payloads
+        """
+        if max_depth < 0:
+            raise ValueError("max_depth must not be negative")
+        if size is not None and size < 0:
+            raise ValueError("size must not be negative")
+        self.message_class = message_class
+        self.max_depth = max_depth
+        self.length = DEFAULT_LENGTH
+        self._plans: dict[Any, _MessagePlan] = {}
+        self._plan = self._build(message_class.DESCRIPTOR)
+        if size is not None:
+            self.length = self._calibrate(size)
+        self._rng = random.Random(seed)
+
+    def _build(self, descriptor: Any) -> _MessagePlan:
+        plan = self._plans.get(descriptor)
+        if plan is not None:
+            return plan
+        # Registered before its fields are built, so recursive types find it.
+        plan = self._plans[descriptor] = _MessagePlan()
+        oneofs: dict[str, int] = {}
+        members: dict[str, int] = {}
+        field: Any
+        for field in sorted(descriptor.fields, key=lambda f: f.number):
+            oneof, member = -1, 0
+            if field.containing_oneof is not None:
+                name = field.containing_oneof.name
+                if name not in oneofs:
+                    oneofs[name] = len(oneofs)
+                    members[name] = 0
+                oneof, member = oneofs[name], members[name]
+                members[name] += 1
+            plan.fields.append((oneof, member, self._writer(field)))
+        plan.oneofs = list(members.values())
+        return plan
+
+    def _writer(self, field: Any) -> _Writer:
+        if field.type in (FieldDescriptor.TYPE_MESSAGE, FieldDescriptor.TYPE_GROUP):
+            return self._message_writer(field)
+        if field.type == FieldDescriptor.TYPE_ENUM:
+            wire_type, value = _WIRE_VARINT, _enum(field)
+        else:
+            wire_type, value = _SCALARS[field.type]
+
+        if field.is_packed:
+            tag = _tag(field, _WIRE_LENGTH)
+
+            def packed(rng: random.Random, length: int, depth: int, out: bytearray) -> None:
+                count = _repeated_count(rng, length)
+                if count:
+                    body = b"".join([value(rng, length) for _ in range(count)])
+                    out += tag
+                    out += _varint(len(body))
+                    out += body
+
+            return packed
+
+        tag = _tag(field, wire_type)
+        if field.is_repeated:
+
+            def repeated(rng: random.Random, length: int, depth: int, out: bytearray) -> None:
+                for _ in range(_repeated_count(rng, length)):
+                    out += tag
+                    out += value(rng, length)
+
+            return repeated
+
+        default = None if field.has_presence else _DEFAULTS[wire_type]
+
+        def singular(rng: random.Random, length: int, depth: int, out: bytearray) -> None:
+            encoded = value(rng, length)
+            if encoded != default:
+                out += tag
+                out += encoded
+
+        return singular
+
+    def _message_writer(self, field: Any) -> _Writer:
+        plan = self._build(field.message_type)
+        repeated = field.is_repeated
+
+        if field.type == FieldDescriptor.TYPE_GROUP:
+            start, end = _tag(field, _WIRE_START_GROUP), _tag(field, _WIRE_END_GROUP)
+
+            def group(rng: random.Random, length: int, depth: int, out: bytearray) -> None:
+                if depth > 0:
+                    for _ in range(_below(rng, MAX_REPEATED_MESSAGES + 1) if repeated else 1):
+                        out += start
+                        plan.write(rng, length, depth - 1, out)
+                        out += end
+
+            return group
+
+        tag = _tag(field, _WIRE_LENGTH)
+
+        def message(rng: random.Random, length: int, depth: int, out: bytearray) -> None:
+            if depth > 0:
+                for _ in range(_below(rng, MAX_REPEATED_MESSAGES + 1) if repeated else 1):
+                    nested = bytearray()
+                    plan.write(rng, length, depth - 1, nested)
+                    out += tag
+                    out += _varint(len(nested))
+                    out += nested
+
+        return message
+
+    def _encode(self, rng: random.Random, length: int) -> bytes:
+        out = bytearray()
+        self._plan.write(rng, length, self.max_depth, out)
+        return bytes(out)
+
+    def _mean_size(self, length: int) -> float:
+        rng = random.Random(0)
+        return sum(len(self._encode(rng, length)) for _ in range(_CALIBRATION_SAMPLES)) / _CALIBRATION_SAMPLES
+
+    def _calibrate(self, size: int) -> int:
+        means: dict[int, float] = {}
+
+        def mean(length: int) -> float:
+            if length not in means:
+                means[length] = self._mean_size(length)
+            return means[length]
+
+        low, high = 0, DEFAULT_LENGTH
+        # Double until the mean reaches the target, or stops growing for lack of variable-length fields.
+        while mean(high) < size and high < _MAX_LENGTH:
+            if mean(high * 2) == mean(high):
+                return high
+            low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if mean(middle) < size:
+                low = middle
+            else:
+                high = middle
+        return min((low, high), key=lambda length: abs(mean(length) - size))
+
+    def payload(self) -> bytes:
+        """Return the next serialized message."""
+        return self._encode(self._rng, self.length)
+
+    def payloads(self, count: int) -> Iterator[bytes]:
+        """Yield ``count`` serialized messages."""
+        rng, length = self._rng, self.length
+        for _ in range(count):
+            yield self._encode(rng, length)
+
+    def message(self) -> _M:
+        """Return the next message, parsed."""
+        return self.message_class.FromString(self.payload())
+
+
+def write_delimited(path: str | Path, payloads: Iterable[bytes]) -> int:
+    """Write serialized messages to a file, each prefixed with its varint length.
+
+    This is protobuf's length-delimited stream format (``writeDelimitedTo`` in Java,
+    ``SerializeDelimitedToOstream`` in C++); :func:`read_delimited` reads it back.
+
+    Args:
+        path: File to write
+        payloads: Serialized messages
+
+    Returns:
+        Number of messages written
+    """
+    count = 0
+    with open(path, "wb") as file:
+        for payload in payloads:
+            file.write(_varint(len(payload)))
+            file.write(payload)
+            count += 1
+    return count
+
+
+def read_delimited(path: str | Path) -> Iterator[bytes]:
+    """Yield the serialized messages of a file written by :func:`write_delimited`.
+
+    Raises:
+        ValueError: If the file ends inside a length prefix or a message
+    """
+    data = Path(path).read_bytes()
+    position, end = 0, len(data)
+    while position < end:
+        size = shift = 0
+        while True:
+            if position == end:
+                raise ValueError(f"{path}: truncated length prefix at byte {position}")
+            byte = data[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        if position + size > end:
+            raise ValueError(f"{path}: truncated message at byte {position}")
+        yield data[position : position + size]
+        position += size
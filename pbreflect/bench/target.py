@@ -0,0 +1,194 @@
+"""Benchmark targets: methods resolved from reflected descriptors and their request payloads."""
+
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import grpc
+from google.protobuf import descriptor_pb2, json_format, message_factory
+from google.protobuf.message import DecodeError, Message
+
+from pbreflect.bench.payloads import read_delimited
+from pbreflect.pbgen.descriptors import build_pool
+from pbreflect.protorecover.reflection_client import GrpcReflectionClient
+
+
+class BenchTargetError(ValueError):
+    """The method or its request template cannot be benchmarked."""
+
+
+@dataclass(frozen=True)
+class BenchMethod:
+    """A method resolved for benchmarking.
+
+    Attributes:
+        path: Full method path (``/package.Service/Method``)
+        request_class: Dynamic message class of the request
+        client_streaming: Whether the method takes a request stream
+        server_streaming: Whether the method returns a response stream
+    """
+
+    path: str
+    request_class: type[Message]
+    client_streaming: bool = False
+    server_streaming: bool = False
+
+
+def parse_method_name(name: str) -> tuple[str, str]:
+    """Split a method name into service and method.
+
+    Args:
+        name: ``package.Service/Method``, with or without a leading slash, or
+            ``package.Service.Method``
+
+    Returns:
+        Fully qualified service name and method name
+
+    Raises:
+        BenchTargetError: If the name has no service part
+    """
+    service, separator, method = name.lstrip("/").rpartition("/")
+    if not separator:
+        service, separator, method = name.rpartition(".")
+    if not service or not method:
+        raise BenchTargetError(f"Invalid method name '{name}'. Expected 'package.Service/Method'")
+    return service, method
+
+
+def resolve_method(files: Iterable[descriptor_pb2.FileDescriptorProto], name: str) -> BenchMethod:
+    """Find a method among file descriptors.
+
+    Args:
+        files: File descriptors covering the method's service and messages
+        name: Method name (see :func:`parse_method_name`)
+
+    Returns:
+        The resolved method
+
+    Raises:
+        BenchTargetError: If the descriptors are incomplete or the service or method does not exist
+    """
+    service_name, method_name = parse_method_name(name)
+    try:
+        pool = build_pool(files)
+    except ValueError as e:
+        raise BenchTargetError(str(e)) from e
+    try:
+        service = pool.FindServiceByName(service_name)
+    except KeyError:
+        raise BenchTargetError(f"Service '{service_name}' not found") from None
+    method = service.methods_by_name.get(method_name)
+    if method is None:
+        raise BenchTargetError(f"Method '{method_name}' not found in service '{service_name}'")
+    return BenchMethod(
+        path=f"/{service_name}/{method_name}",
+        request_class=message_factory.GetMessageClass(method.input_type),
+        client_streaming=method.client_streaming,
+        server_streaming=method.server_streaming,
+    )
+
+
+def reflect_method(channel: grpc.Channel, name: str) -> BenchMethod:
+    """Resolve a method through the server's reflection service.
+
+    Args:
+        channel: Channel to a server with reflection enabled
+        name: Method name (see :func:`parse_method_name`)
+
+    Returns:
+        The resolved method
+
+    Raises:
+        BenchTargetError: If the method cannot be resolved
+        grpc.RpcError: If the reflection call fails
+    """
+    return resolve_method(GrpcReflectionClient(channel).get_proto_descriptors().values(), name)
+
+
+def _parse(method: BenchMethod, data: Any, source: str) -> bytes:
+    if not isinstance(data, dict):
+        raise BenchTargetError(f"{source}: expected a JSON object, got {type(data).__name__}")
+    try:
+        return json_format.ParseDict(data, method.request_class()).SerializeToString()
+    except json_format.ParseError as e:
+        raise BenchTargetError(f"{source}: {e}") from e
+
+
+def _load_delimited(method: BenchMethod, path: Path) -> list[bytes]:
+    try:
+        requests = list(read_delimited(path))
+        for request in requests:
+            method.request_class.FromString(request)
+    except (OSError, ValueError, DecodeError) as e:
+        raise BenchTargetError(f"Cannot read requests from {path}: {e}") from e
+    if not requests:
+        raise BenchTargetError(f"Request file {path} has no requests")
+    return requests
+
+
+def load_requests(method: BenchMethod, template: str | Path | None = None) -> list[bytes]:
+    """Serialize the requests a benchmark sends.
+
+    Unary-request methods cycle through the requests, one per call; streaming-request
+    methods send all of them on every call. Requests are serialized once, up front,
+    so encoding does not count against the measured latency.
+
+    Args:
+        method: Resolved method
+        template: JSON file holding one request object or a list of them, a
+            ``.jsonl`` file with one request object per line (protobuf JSON mapping),
+            or a ``.bin`` file of length-delimited serialized requests (see
+            :func:`~pbreflect.bench.payloads.write_delimited`); one empty request when omitted
+
+    Returns:
+        Serialized requests, at least one
+
+    Raises:
+        BenchTargetError: If the file cannot be read or a request does not match the
+            method's request type
+    """
+    if template is None:
+        return [method.request_class().SerializeToString()]
+    path = Path(template)
+    if path.suffix == ".bin":
+        return _load_delimited(method, path)
+    try:
+        text = path.read_text(encoding="utf-8")
+        if path.suffix == ".jsonl":
+            items = [(f"{path}:{n}", json.loads(line)) for n, line in enumerate(text.splitlines(), 1) if line.strip()]
+        else:
+            data = json.loads(text)
+            items = (
+                [(f"{path}[{n}]", item) for n, item in enumerate(data)]
+                if isinstance(data, list)
+                else [(str(path), data)]
+            )
+    except (OSError, json.JSONDecodeError) as e:
+        raise BenchTargetError(f"Cannot read request template {path}: {e}") from e
+    if not items:
+        raise BenchTargetError(f"Request template {path} has no requests")
+    return [_parse(method, data, source) for source, data in items]
+
+
+def tls_credentials(
+    root_cert: Path | None = None, private_key: Path | None = None, cert_chain: Path | None = None
+) -> grpc.ChannelCredentials:
+    """Build TLS channel credentials from PEM files.
+
+    Args:
+        root_cert: CA certificates; the system roots are used when omitted
+        private_key: Client private key for mutual TLS
+        cert_chain: Client certificate chain for mutual TLS
+
+    Returns:
+        Channel credentials
+    """
+
+    def read(path: Path | None) -> bytes | None:
+        return path.read_bytes() if path is not None else None
+
+    return grpc.ssl_channel_credentials(
+        root_certificates=read(root_cert), private_key=read(private_key), certificate_chain=read(cert_chain)
+    )
@@ -0,0 +1,10 @@
+"""Generation daemon.
+
+A long-running process that keeps pbreflect's imports and Jinja2 template
+environments warm and serves ``generate``/``reflect`` requests over a Unix socket.
+"""
+
+from pbreflect.daemon.client import DaemonClient, DaemonUnavailableError
+from pbreflect.daemon.protocol import default_socket_path
+
+__all__ = ["DaemonClient", "DaemonUnavailableError", "default_socket_path"]
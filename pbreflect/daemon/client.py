@@ -0,0 +1,58 @@
+"""Thin client used by the CLI to forward requests to a running daemon."""
+
+import socket
+from pathlib import Path
+from typing import Any
+
+from pbreflect.daemon.protocol import decode, encode
+
+
+class DaemonUnavailableError(Exception):
+    """Raised when no daemon is listening on the requested socket."""
+
+
+class DaemonClient:
+    """Sends a single request per connection to ``pbreflect daemon``."""
+
+    def __init__(self, socket_path: Path, timeout: float | None = None) -> None:
+        """Initialize the client.
+
+        Args:
+            socket_path: Path to the daemon's Unix socket
+            timeout: Socket timeout in seconds, ``None`` waits indefinitely
+        """
+        self._socket_path = socket_path
+        self._timeout = timeout
+
+    def request(self, command: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Send a command and wait for its response.
+
+        Args:
+            command: Command name (``generate``, ``reflect``, ``ping`` or ``shutdown``)
+            params: Command parameters
+
+        Returns:
+            Decoded response with ``ok``, ``output`` and ``error`` keys
+
+        Raises:
+            DaemonUnavailableError: If nothing is listening on the socket
+        """
+        message = {"command": command, "cwd": str(Path.cwd()), "params": params or {}}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self._timeout)
+            try:
+                sock.connect(str(self._socket_path))
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                raise DaemonUnavailableError(f"No pbreflect daemon listening on {self._socket_path}") from e
+            sock.sendall(encode(message))
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+        if not line:
+            raise DaemonUnavailableError(f"pbreflect daemon on {self._socket_path} closed the connection")
+        return decode(line)
+
+    def is_alive(self) -> bool:
+        try:
+            return bool(self.request("ping").get("ok"))
+        except DaemonUnavailableError:
+            return False
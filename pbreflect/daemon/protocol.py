@@ -0,0 +1,42 @@
+"""Wire protocol shared by the generation daemon and its clients.
+
+Every connection carries exactly one request and one response, each encoded
+as a single line of UTF-8 JSON.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+SOCKET_ENV_VAR = "PBREFLECT_DAEMON_SOCKET"
+
+
+def default_socket_path() -> Path:
+    """Return the socket path used when none is given explicitly.
+
+    Resolution order: ``$PBREFLECT_DAEMON_SOCKET``, ``$XDG_RUNTIME_DIR/pbreflect.sock``
+    and finally a per-user socket in the system temp directory.
+    """
+    explicit = os.environ.get(SOCKET_ENV_VAR)
+    if explicit:
+        return Path(explicit)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "pbreflect.sock"
+
+    import getpass
+    import tempfile
+
+    return Path(tempfile.gettempdir()) / f"pbreflect-{getpass.getuser()}.sock"
+
+
+def encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> dict[str, Any]:
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Daemon message must be a JSON object")
+    return message
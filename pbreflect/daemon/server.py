@@ -0,0 +1,163 @@
+"""Long-running generation daemon listening on a Unix socket."""
+
+import os
+import socketserver
+import tempfile
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from pbreflect.daemon.protocol import decode, encode
+from pbreflect.log import get_logger
+from pbreflect.pbgen.descriptor_cache import MemoryDescriptorCache
+from pbreflect.pbgen.generators.factory import GeneratorType
+from pbreflect.pbgen.runner import GenerationOptions, GenerationPipeline
+from pbreflect.protorecover.recover_service import RecoverService
+
+_logger = get_logger(__name__)
+
+_Handler = Callable[[dict[str, Any], Path, MemoryDescriptorCache], list[str]]
+
+
+def _resolve(cwd: Path, value: str | None) -> str | None:
+    if value is None:
+        return None
+    return str(cwd / value)
+
+
+def _generation_options(params: dict[str, Any], cwd: Path, memory: MemoryDescriptorCache) -> GenerationOptions:
+    return GenerationOptions(
+        gen_type=GeneratorType.from_str(params.get("gen_type", GeneratorType.PBREFLECT.value)),
+        refresh=bool(params.get("refresh", False)),
+        async_mode=bool(params.get("async_mode", False)),
+        template_dir=_resolve(cwd, params.get("template_dir")),
+        gen_tests=bool(params.get("gen_tests", False)),
+        tests_dir=str(cwd / params.get("tests_dir", "tests")),
+        tests_template_dir=_resolve(cwd, params.get("tests_template_dir")),
+        tests_client_module=params.get("tests_client_module", "clients"),
+        tests_fakes=bool(params.get("tests_fakes", False)),
+        tests_layout=params.get("tests_layout", "method"),
+        lazy_init=bool(params.get("lazy_init", False)),
+        cache_methods=tuple(params.get("cache_methods", ())),
+        service_config=_resolve(cwd, params.get("service_config")),
+        raw_methods=bool(params.get("raw_methods", False)),
+        root_path=cwd,
+        descriptor_cache=bool(params.get("descriptor_cache", True)),
+        cache_dir=_resolve(cwd, params.get("cache_dir")),
+        in_process=True,
+        descriptor_memory=memory,
+    )
+
+
+def _generate(params: dict[str, Any], cwd: Path, memory: MemoryDescriptorCache) -> list[str]:
+    output_dir = str(cwd / params["output_dir"])
+    GenerationPipeline(str(cwd / params["proto_dir"]), output_dir, _generation_options(params, cwd, memory)).run()
+    return [f"Successfully generated client code in {output_dir}"]
+
+
+def _reflect(params: dict[str, Any], cwd: Path, memory: MemoryDescriptorCache) -> list[str]:
+    output_dir = cwd / params.get("output", "clients")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tls_paths = {
+        key: cwd / params[name]
+        for key, name in (
+            ("root_certificates_path", "root_cert"),
+            ("private_key_path", "private_key"),
+            ("certificate_chain_path", "cert_chain"),
+        )
+        if params.get(name)
+    }
+    use_tls = bool(params.get("use_tls", False)) or bool(tls_paths)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        with RecoverService(params["host"], tmp_path, use_tls=use_tls, **tls_paths) as service:
+            saved_files = service.recover_proto_files()
+        if not saved_files:
+            return ["No proto files were recovered"]
+        GenerationPipeline(str(tmp_path), str(output_dir), _generation_options(params, cwd, memory)).run()
+    return [
+        f"Recovered {len(saved_files)} proto files",
+        f"Successfully generated client code in {output_dir}",
+    ]
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "GenerationDaemon"
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = decode(line)
+            response = self.server.dispatch(request)
+        except Exception as e:
+            _logger.exception("Daemon request failed")
+            response = {"ok": False, "output": [], "error": str(e)}
+        self.wfile.write(encode(response))
+
+
+class GenerationDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves generation requests while keeping imports, templates and descriptors warm.
+
+    Generation runs in-process: protoc's built-in generators run through one
+    ``grpc_tools.protoc`` call per request and the pbreflect plugin is called
+    directly. Parsed descriptors stay in memory, keyed by source hashes, so
+    unchanged protos are neither recompiled nor read back from the disk cache.
+
+    Requests are accepted concurrently, but generation runs are serialized: the
+    pipeline rewrites files in place and is not safe to run in parallel.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path) -> None:
+        """Bind the daemon to a Unix socket.
+
+        Args:
+            socket_path: Path of the socket to create; a stale socket file is replaced
+        """
+        self.socket_path = socket_path
+        if socket_path.exists():
+            socket_path.unlink()
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(socket_path), _RequestHandler)
+        os.chmod(socket_path, 0o600)
+        self._lock = threading.Lock()
+        self._handlers: dict[str, _Handler] = {"generate": _generate, "reflect": _reflect}
+        self.descriptor_memory = MemoryDescriptorCache()
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "output": [], "error": None, "pid": os.getpid()}
+        if command == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True, "output": ["pbreflect daemon stopping"], "error": None}
+
+        handler = self._handlers.get(str(command))
+        if handler is None:
+            return {"ok": False, "output": [], "error": f"Unknown command: {command}"}
+
+        cwd = Path(request.get("cwd") or Path.cwd())
+        with self._lock:
+            _logger.info("Handling %s request from %s", command, cwd)
+            output = handler(request.get("params", {}), cwd, self.descriptor_memory)
+        return {"ok": True, "output": output, "error": None}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+def serve(socket_path: Path) -> None:
+    """Run the daemon in the foreground until it receives ``shutdown`` or SIGINT."""
+    with GenerationDaemon(socket_path) as daemon:
+        _logger.info("pbreflect daemon listening on %s", socket_path)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            _logger.info("pbreflect daemon interrupted")
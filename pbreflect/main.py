@@ -1,13 +1,19 @@
+"""Command-line interface.
+
+Subcommands import their heavy dependencies (grpc, protobuf, jinja2 and the
+generation pipeline) inside the command body, so ``pbreflect --help`` and
+commands that do not need them start quickly.
+"""
+
 import pathlib
-import tempfile
 from collections.abc import Callable
 from typing import Any
 
 import click
 
+from pbreflect.daemon.client import DaemonClient, DaemonUnavailableError
+from pbreflect.daemon.protocol import SOCKET_ENV_VAR, default_socket_path
 from pbreflect.pbgen.generators.factory import GeneratorType
-from pbreflect.pbgen.runner import GenerationOptions, GenerationPipeline
-from pbreflect.protorecover.recover_service import RecoverService
 
 _TLS_OPTIONS = [
     click.option("--use-tls", is_flag=True, help="Use TLS/SSL for connection"),
@@ -46,8 +52,60 @@ _GEN_OPTIONS = [
         default="clients",
         help="Python module path for generated clients used in test imports",
     ),
+    click.option(
+        "--tests-fakes", "tests_fakes",
+        is_flag=True,
+        help="Generate a fake servicer per service and run test stubs against it in-process "
+        "instead of localhost:50051",
+    ),
+    click.option(
+        "--tests-layout", "tests_layout",
+        type=click.Choice(["method", "service"]),
+        default="method",
+        help="Write one test module per method, or one parametrized module per service",
+    ),
+    click.option(
+        "--lazy-init", "lazy_init",
+        is_flag=True,
+        help="Write __init__.py files that export clients and messages lazily (PEP 562)",
+    ),
+    click.option(
+        "--cache-method", "cache_methods",
+        multiple=True,
+        metavar="PKG.SERVICE/METHOD",
+        help="Let this unary method use the client response cache (fnmatch pattern; repeatable). "
+        "Methods marked NO_SIDE_EFFECTS are always cacheable (pbreflect only)",
+    ),
+    click.option(
+        "--service-config", "service_config",
+        type=click.Path(exists=True, dir_okay=False),
+        help="gRPC service config JSON whose methodConfig entries (timeouts, retryPolicy, hedgingPolicy) "
+        "override the generated ones (pbreflect only)",
+    ),
+    click.option(
+        "--raw-methods", "raw_methods",
+        is_flag=True,
+        help="Also generate <method>_raw variants that send and return serialized bytes without "
+        "protobuf parsing, for proxies (pbreflect only)",
+    ),
+    click.option(
+        "--cache-dir", "cache_dir",
+        help="Descriptor cache directory (default: $PBREFLECT_CACHE_DIR or the user cache dir)",
+    ),
+    click.option(
+        "--no-descriptor-cache", "no_descriptor_cache",
+        is_flag=True,
+        help="Always compile proto sources instead of reusing cached descriptors",
+    ),
 ]
 
+_DAEMON_OPTION = click.option(
+    "--daemon-socket", "daemon_socket",
+    envvar=SOCKET_ENV_VAR,
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="Forward the request to a `pbreflect daemon` listening on this socket",
+)
+
 
 def _apply_decorators(decorators: list[Callable[..., Any]]) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     def decorator(f: Callable[..., Any]) -> Callable[..., Any]:
@@ -71,6 +129,48 @@ def _tls_flags(
     return use_tls
 
 
+def _descriptor_files(
+    proto_dir: str | None,
+    from_host: str | None,
+    use_tls: bool,
+    root_cert: pathlib.Path | None,
+    private_key: pathlib.Path | None,
+    cert_chain: pathlib.Path | None,
+) -> list[Any]:
+    """Compile a proto directory or reflect a server into file descriptors (``--protos``/``--from-host``)."""
+    from pbreflect.mock import compile_proto_dir
+    from pbreflect.protorecover.recover_service import RecoverService
+
+    if from_host is None:
+        return compile_proto_dir(str(proto_dir))
+    use_tls = _tls_flags(use_tls, root_cert, private_key, cert_chain)
+    with RecoverService(
+        from_host,
+        use_tls=use_tls,
+        root_certificates_path=root_cert,
+        private_key_path=private_key,
+        certificate_chain_path=cert_chain,
+    ) as service:
+        return service.get_proto_descriptors()
+
+
+def _forward_to_daemon(socket_path: pathlib.Path | None, command: str, params: dict[str, Any]) -> bool:
+    """Send a request to the daemon; returns False if it should run in-process instead."""
+    if socket_path is None:
+        return False
+    try:
+        response = DaemonClient(socket_path).request(command, params)
+    except DaemonUnavailableError as e:
+        click.echo(f"{e}; running in-process", err=True)
+        return False
+    for line in response.get("output", []):
+        click.echo(line)
+    if not response.get("ok"):
+        click.echo(f"Error: {response.get('error')}", err=True)
+        raise click.Abort()
+    return True
+
+
 @click.group()
 def cli() -> None:
     pass
@@ -89,6 +189,8 @@ def get_protos(
     cert_chain: pathlib.Path | None,
 ) -> None:
     """Recover proto files from a gRPC server using reflection."""
+    from pbreflect.protorecover.recover_service import RecoverService
+
     output_dir = pathlib.Path(output)
     output_dir.mkdir(parents=True, exist_ok=True)
     use_tls = _tls_flags(use_tls, root_cert, private_key, cert_chain)
@@ -117,6 +219,7 @@ def get_protos(
 @click.option("-p", "--proto-dir", "proto_dir", required=True, help="Directory with proto files")
 @click.option("-o", "--output-dir", "output_dir", required=True, help="Directory where to generate code")
 @_apply_decorators(_GEN_OPTIONS)
+@_DAEMON_OPTION
 def gen(
     proto_dir: str,
     output_dir: str,
@@ -128,8 +231,42 @@ def gen(
     tests_dir: str = "tests",
     tests_template_dir: str | None = None,
     tests_client_module: str = "clients",
+    tests_fakes: bool = False,
+    tests_layout: str = "method",
+    lazy_init: bool = False,
+    cache_methods: tuple[str, ...] = (),
+    service_config: str | None = None,
+    raw_methods: bool = False,
+    cache_dir: str | None = None,
+    no_descriptor_cache: bool = False,
+    daemon_socket: pathlib.Path | None = None,
 ) -> None:
     """Generate client code from local proto files."""
+    params = {
+        "proto_dir": proto_dir,
+        "output_dir": output_dir,
+        "gen_type": gen_type,
+        "refresh": refresh,
+        "async_mode": async_mode,
+        "template_dir": template_dir,
+        "gen_tests": gen_tests,
+        "tests_dir": tests_dir,
+        "tests_template_dir": tests_template_dir,
+        "tests_client_module": tests_client_module,
+        "tests_fakes": tests_fakes,
+        "tests_layout": tests_layout,
+        "lazy_init": lazy_init,
+        "cache_methods": list(cache_methods),
+        "service_config": service_config,
+        "raw_methods": raw_methods,
+        "cache_dir": cache_dir,
+        "descriptor_cache": not no_descriptor_cache,
+    }
+    if _forward_to_daemon(daemon_socket, "generate", params):
+        return
+
+    from pbreflect.pbgen.runner import GenerationOptions, GenerationPipeline
+
     GenerationPipeline(
         proto_dir,
         output_dir,
@@ -142,6 +279,14 @@ def gen(
             tests_dir=tests_dir,
             tests_template_dir=tests_template_dir,
             tests_client_module=tests_client_module,
+            tests_fakes=tests_fakes,
+            tests_layout=tests_layout,
+            lazy_init=lazy_init,
+            cache_methods=cache_methods,
+            service_config=service_config,
+            raw_methods=raw_methods,
+            descriptor_cache=not no_descriptor_cache,
+            cache_dir=cache_dir,
         ),
     ).run()
 
@@ -151,6 +296,7 @@ def gen(
 @click.option("-o", "--output", type=str, default="clients", help="Output directory")
 @_apply_decorators(_TLS_OPTIONS)
 @_apply_decorators(_GEN_OPTIONS)
+@_DAEMON_OPTION
 def generate_from_server(
     host: str,
     output: str,
@@ -166,8 +312,49 @@ def generate_from_server(
     tests_dir: str = "tests",
     tests_template_dir: str | None = None,
     tests_client_module: str = "clients",
+    tests_fakes: bool = False,
+    tests_layout: str = "method",
+    lazy_init: bool = False,
+    cache_methods: tuple[str, ...] = (),
+    service_config: str | None = None,
+    raw_methods: bool = False,
+    cache_dir: str | None = None,
+    no_descriptor_cache: bool = False,
+    daemon_socket: pathlib.Path | None = None,
 ) -> None:
     """Generate client code directly from a running gRPC server."""
+    params = {
+        "host": host,
+        "output": output,
+        "use_tls": use_tls,
+        "root_cert": str(root_cert) if root_cert else None,
+        "private_key": str(private_key) if private_key else None,
+        "cert_chain": str(cert_chain) if cert_chain else None,
+        "gen_type": gen_type,
+        "refresh": refresh,
+        "async_mode": async_mode,
+        "template_dir": template_dir,
+        "gen_tests": gen_tests,
+        "tests_dir": tests_dir,
+        "tests_template_dir": tests_template_dir,
+        "tests_client_module": tests_client_module,
+        "tests_fakes": tests_fakes,
+        "tests_layout": tests_layout,
+        "lazy_init": lazy_init,
+        "cache_methods": list(cache_methods),
+        "service_config": service_config,
+        "raw_methods": raw_methods,
+        "cache_dir": cache_dir,
+        "descriptor_cache": not no_descriptor_cache,
+    }
+    if _forward_to_daemon(daemon_socket, "reflect", params):
+        return
+
+    import tempfile
+
+    from pbreflect.pbgen.runner import GenerationOptions, GenerationPipeline
+    from pbreflect.protorecover.recover_service import RecoverService
+
     output_dir = pathlib.Path(output)
     output_dir.mkdir(parents=True, exist_ok=True)
     use_tls = _tls_flags(use_tls, root_cert, private_key, cert_chain)
@@ -207,6 +394,14 @@ def generate_from_server(
                     tests_dir=tests_dir,
                     tests_template_dir=tests_template_dir,
                     tests_client_module=tests_client_module,
+                    tests_fakes=tests_fakes,
+                    tests_layout=tests_layout,
+                    lazy_init=lazy_init,
+                    cache_methods=cache_methods,
+                    service_config=service_config,
+                    raw_methods=raw_methods,
+                    descriptor_cache=not no_descriptor_cache,
+                    cache_dir=cache_dir,
                 ),
             ).run()
             click.echo(f"Successfully generated client code in {output_dir}")
@@ -215,9 +410,235 @@ def generate_from_server(
             raise click.Abort() from e
 
 
+@click.command("bench")
+@click.option("-h", "--host", type=str, required=True, help="Destination host")
+@click.option("-m", "--method", "method_name", required=True, metavar="PKG.SERVICE/METHOD", help="Method to call")
+@click.option(
+    "-d", "--data", "data",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    help="Request template: a JSON object or list, JSONL with one request per line, or a length-delimited .bin "
+    "file from 'pbreflect payloads' (default: empty request)",
+)
+@click.option("--rate", type=click.FloatRange(min=0), default=0, help="Calls per second; 0 runs unthrottled")
+@click.option("-c", "--concurrency", type=click.IntRange(min=1), default=10, show_default=True, help="Calls in flight")
+@click.option("--duration", type=click.FloatRange(min=0, min_open=True), default=10, show_default=True, help="Seconds")
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=10,
+    show_default=True,
+    help="Per-call deadline in seconds",
+)
+@click.option(
+    "--connections",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="HTTP/2 connections to spread calls over",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+@_apply_decorators(_TLS_OPTIONS)
+def bench(
+    host: str,
+    method_name: str,
+    data: pathlib.Path | None,
+    rate: float,
+    concurrency: int,
+    duration: float,
+    timeout: float,
+    connections: int,
+    as_json: bool,
+    use_tls: bool,
+    root_cert: pathlib.Path | None,
+    private_key: pathlib.Path | None,
+    cert_chain: pathlib.Path | None,
+) -> None:
+    """Generate load against one method of a server with reflection and report latencies."""
+    import json
+
+    from pbreflect.bench import BenchTargetError, load_requests, reflect_method, run_bench, tls_credentials
+    from pbreflect.pbgen.plugins.pbreflect.runtime import connect, warm_up
+
+    use_tls = _tls_flags(use_tls, root_cert, private_key, cert_chain)
+    credentials = tls_credentials(root_cert, private_key, cert_chain) if use_tls else None
+    with connect(host, credentials=credentials, pool_size=connections) as channel:
+        try:
+            warm_up(channel, timeout=timeout)
+            method = reflect_method(channel, method_name)
+            requests = load_requests(method, data)
+        except (BenchTargetError, TimeoutError) as e:
+            click.echo(f"Error: {e}", err=True)
+            raise click.Abort() from e
+        if not as_json:
+            click.echo(f"Benchmarking {method.path} for {duration:g}s with {concurrency} concurrent calls…")
+        report = run_bench(
+            channel, method, requests, duration=duration, concurrency=concurrency, rate=rate or None, timeout=timeout
+        )
+    click.echo(json.dumps(report.summary(), indent=2) if as_json else report.format())
+
+
+@click.command("serve-mock")
+@click.option(
+    "--protos", "proto_dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory with proto files to serve",
+)
+@click.option("--from-host", "from_host", help="Serve the services a running server exposes through reflection")
+@click.option("-p", "--port", type=click.IntRange(min=0), default=50051, show_default=True, help="Port; 0 picks one")
+@click.option("--bind", default="127.0.0.1", show_default=True, help="Address to listen on")
+@click.option(
+    "-f", "--fixtures",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON fixtures keyed by PKG.SERVICE/METHOD with response(s) and per-method fault settings",
+)
+@click.option("--latency", type=click.FloatRange(min=0), default=0, help="Seconds to wait before every response")
+@click.option("--jitter", type=click.FloatRange(min=0), default=0, help="Extra random wait of up to this many seconds")
+@click.option("--error-rate", type=click.FloatRange(0, 1), default=0, help="Fraction of calls to fail")
+@click.option("--error-code", default="UNAVAILABLE", show_default=True, help="Status code of injected errors")
+@click.option("--seed", type=int, help="Seed for jitter and error injection")
+@click.option(
+    "-w", "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Server processes sharing the port via SO_REUSEPORT",
+)
+@click.option("--no-reflection", is_flag=True, help="Do not expose the reflection service")
+@_apply_decorators(_TLS_OPTIONS)
+def serve_mock(
+    proto_dir: str | None,
+    from_host: str | None,
+    port: int,
+    bind: str,
+    fixtures: str | None,
+    latency: float,
+    jitter: float,
+    error_rate: float,
+    error_code: str,
+    seed: int | None,
+    workers: int,
+    no_reflection: bool,
+    use_tls: bool,
+    root_cert: pathlib.Path | None,
+    private_key: pathlib.Path | None,
+    cert_chain: pathlib.Path | None,
+) -> None:
+    """Serve canned responses for every method of local protos or a reflected server."""
+    if (proto_dir is None) == (from_host is None):
+        raise click.UsageError("Pass exactly one of --protos and --from-host")
+
+    from pbreflect.mock import FaultProfile, load_fixtures, serve
+
+    try:
+        profile = FaultProfile().override(
+            {"latency": latency, "jitter": jitter, "error_rate": error_rate, "error_code": error_code}
+        )
+        files = _descriptor_files(proto_dir, from_host, use_tls, root_cert, private_key, cert_chain)
+        click.echo(f"Starting mock server on {bind}:{port} with {workers} worker(s); Ctrl+C to stop")
+        serve(
+            files,
+            f"{bind}:{port}",
+            workers=workers,
+            fixtures=load_fixtures(fixtures) if fixtures else None,
+            profile=profile,
+            reflection=not no_reflection,
+            seed=seed,
+        )
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort() from e
+
+
+@click.command("payloads")
+@click.option(
+    "--protos", "proto_dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory with proto files defining the method",
+)
+@click.option("--from-host", "from_host", help="Read the method from a running server through reflection")
+@click.option(
+    "-m", "--method", "method_name", required=True, metavar="PKG.SERVICE/METHOD", help="Method to build requests for"
+)
+@click.option(
+    "-o", "--output",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    required=True,
+    help="File to write length-delimited requests to; `bench --data` replays .bin files",
+)
+@click.option("-n", "--count", type=click.IntRange(min=1), default=1000, show_default=True, help="Number of requests")
+@click.option("--size", type=click.IntRange(min=0), help="Target mean serialized size in bytes")
+@click.option(
+    "--depth", type=click.IntRange(min=0), default=4, show_default=True, help="Levels of nested messages to fill"
+)
+@click.option("--seed", type=int, help="Seed; equal seeds write equal requests")
+@_apply_decorators(_TLS_OPTIONS)
+def payloads(
+    proto_dir: str | None,
+    from_host: str | None,
+    method_name: str,
+    output: pathlib.Path,
+    count: int,
+    size: int | None,
+    depth: int,
+    seed: int | None,
+    use_tls: bool,
+    root_cert: pathlib.Path | None,
+    private_key: pathlib.Path | None,
+    cert_chain: pathlib.Path | None,
+) -> None:
+    """Write random but valid requests for a method, for load and fuzz tests."""
+    if (proto_dir is None) == (from_host is None):
+        raise click.UsageError("Pass exactly one of --protos and --from-host")
+
+    from pbreflect.bench import PayloadGenerator, resolve_method, write_delimited
+
+    try:
+        files = _descriptor_files(proto_dir, from_host, use_tls, root_cert, private_key, cert_chain)
+        method = resolve_method(files, method_name)
+        generator = PayloadGenerator(method.request_class, size=size, max_depth=depth, seed=seed)
+        written = write_delimited(output, generator.payloads(count))
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise click.Abort() from e
+    click.echo(f"Wrote {written} {method.path} requests ({output.stat().st_size} bytes) to {output}")
+
+
+@click.command("daemon")
+@click.option(
+    "-s", "--socket", "socket_path",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=default_socket_path,
+    show_default="$PBREFLECT_DAEMON_SOCKET or a per-user socket",
+    help="Unix socket to listen on",
+)
+@click.option("--stop", is_flag=True, help="Stop the daemon listening on the socket")
+def daemon(socket_path: pathlib.Path, stop: bool) -> None:
+    """Run a long-lived generation daemon that keeps imports and templates warm."""
+    client = DaemonClient(socket_path, timeout=5)
+    if stop:
+        try:
+            client.request("shutdown")
+            click.echo(f"Stopped pbreflect daemon on {socket_path}")
+        except DaemonUnavailableError:
+            click.echo(f"No pbreflect daemon is listening on {socket_path}")
+        return
+    if client.is_alive():
+        click.echo(f"pbreflect daemon is already listening on {socket_path}")
+        return
+
+    from pbreflect.daemon.server import serve
+
+    click.echo(f"pbreflect daemon listening on {socket_path}")
+    serve(socket_path)
+
+
 cli.add_command(get_protos)
 cli.add_command(gen)
 cli.add_command(generate_from_server)
+cli.add_command(daemon)
+cli.add_command(bench)
+cli.add_command(serve_mock)
+cli.add_command(payloads)
 
 if __name__ == "__main__":
     cli()
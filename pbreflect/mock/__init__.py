@@ -0,0 +1,27 @@
+"""Mock gRPC server built from recovered or compiled descriptors (``pbreflect serve-mock``).
+
+Every method answers with fixture or default-populated responses, optionally
+after injected latency or with injected errors.
+"""
+
+from pbreflect.mock.payloads import populate
+from pbreflect.mock.server import (
+    FaultProfile,
+    MockMethod,
+    MockServer,
+    build_methods,
+    compile_proto_dir,
+    load_fixtures,
+    serve,
+)
+
+__all__ = [
+    "FaultProfile",
+    "MockMethod",
+    "MockServer",
+    "build_methods",
+    "compile_proto_dir",
+    "load_fixtures",
+    "populate",
+    "serve",
+]
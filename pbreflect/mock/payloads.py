@@ -0,0 +1,78 @@
+"""Default-populated messages for mock responses."""
+
+from typing import Any, TypeVar
+
+from google.protobuf.descriptor import FieldDescriptor
+from google.protobuf.message import Message
+
+from pbreflect.pbgen.field_types import INTEGER_FIELD_TYPES
+
+MAX_DEPTH = 4
+
+_M = TypeVar("_M", bound=Message)
+
+
+# Field descriptors are typed loosely: the stubs give the upb and pure-Python classes no common base.
+def _map_entry(field: Any) -> Any:
+    entry = field.message_type
+    return entry if entry is not None and entry.GetOptions().map_entry else None
+
+
+def _scalar(field: Any) -> object:
+    if field.type == FieldDescriptor.TYPE_STRING:
+        return field.name
+    if field.type == FieldDescriptor.TYPE_BYTES:
+        return field.name.encode()
+    if field.type == FieldDescriptor.TYPE_BOOL:
+        return True
+    if field.type in INTEGER_FIELD_TYPES:
+        return 1
+    if field.type == FieldDescriptor.TYPE_ENUM:
+        values = field.enum_type.values
+        return next((value.number for value in values if value.number != 0), values[0].number)
+    return 1.5
+
+
+def populate(message: _M, depth: int = MAX_DEPTH) -> _M:
+    """Fill every field of ``message`` with a sample value, in place.
+
+    Strings get the field name, numbers 1 (or 1.5), bools True and enums their
+    first non-zero value. Repeated and map fields get one element, and only the
+    first field of each oneof is set. Nested messages are filled ``depth`` levels
+    deep, which also bounds recursive types; below that they are left empty.
+
+    Args:
+        message: Message to fill
+        depth: Levels of nested messages to fill
+
+    Returns:
+        ``message``
+    """
+    filled_oneofs: set[str] = set()
+    field: Any
+    for field in message.DESCRIPTOR.fields:
+        oneof = field.containing_oneof
+        if oneof is not None:
+            if oneof.name in filled_oneofs:
+                continue
+            filled_oneofs.add(oneof.name)
+        if field.type != FieldDescriptor.TYPE_MESSAGE:
+            if field.is_repeated:
+                getattr(message, field.name).append(_scalar(field))
+            else:
+                setattr(message, field.name, _scalar(field))
+        elif (entry := _map_entry(field)) is not None:
+            key_field, value_field = entry.fields_by_name["key"], entry.fields_by_name["value"]
+            entries = getattr(message, field.name)
+            if value_field.type != FieldDescriptor.TYPE_MESSAGE:
+                entries[_scalar(key_field)] = _scalar(value_field)
+            elif depth > 0:
+                populate(entries[_scalar(key_field)], depth - 1)
+        elif field.is_repeated:
+            if depth > 0:
+                populate(getattr(message, field.name).add(), depth - 1)
+        elif depth > 0:
+            nested = getattr(message, field.name)
+            nested.SetInParent()
+            populate(nested, depth - 1)
+    return message
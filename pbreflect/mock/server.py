@@ -0,0 +1,428 @@
+"""Asyncio gRPC server answering every method of a set of file descriptors with canned responses."""
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import random
+import tempfile
+from collections.abc import AsyncIterator, Iterable, Mapping, Sequence
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+import grpc
+from google.protobuf import descriptor_pb2, json_format, message_factory
+from grpc_reflection.v1alpha import reflection
+
+from pbreflect.log import get_logger
+from pbreflect.mock.payloads import populate
+from pbreflect.pbgen.descriptors import DescriptorSetCompiler, build_pool
+from pbreflect.pbgen.errors import NoProtoFilesError
+from pbreflect.pbgen.utils.file_finder import ProtoFileFinder
+
+_logger = get_logger(__name__)
+
+DEFAULT_PORT = 50051
+
+_RESPONSE_KEYS = frozenset({"response", "responses"})
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """Latency and errors injected into mock calls.
+
+    Attributes:
+        latency: Seconds to wait before answering
+        jitter: Upper bound of an extra, uniformly random wait in seconds
+        error_rate: Fraction of calls, from 0 to 1, failed with ``error_code``
+        error_code: Status code of injected errors
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE
+
+    def __post_init__(self) -> None:
+        """Validate the ranges.
+
+        Raises:
+            ValueError: If a delay is negative or ``error_rate`` is outside ``[0, 1]``
+        """
+        if self.latency < 0 or self.jitter < 0:
+            raise ValueError("latency and jitter must not be negative")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        if self.error_code == grpc.StatusCode.OK:
+            raise ValueError("error_code must not be OK")
+
+    def override(self, values: Mapping[str, Any]) -> "FaultProfile":
+        """Return a copy with the profile keys found in ``values`` replaced.
+
+        Args:
+            values: Mapping that may hold ``latency``, ``jitter``, ``error_rate`` and
+                ``error_code`` (a status code name)
+
+        Returns:
+            The updated profile
+
+        Raises:
+            ValueError: If a value is invalid
+        """
+        changes: dict[str, Any] = {f.name: values[f.name] for f in fields(self) if f.name in values}
+        if "error_code" in changes:
+            try:
+                changes["error_code"] = grpc.StatusCode[str(changes["error_code"]).upper()]
+            except KeyError:
+                raise ValueError(f"Unknown status code {changes['error_code']!r}") from None
+        for name in ("latency", "jitter", "error_rate"):
+            if name in changes and not isinstance(changes[name], int | float):
+                raise ValueError(f"{name} must be a number, got {changes[name]!r}")
+        return FaultProfile(**{f.name: changes.get(f.name, getattr(self, f.name)) for f in fields(self)})
+
+    @property
+    def active(self) -> bool:
+        """Whether calls are delayed or failed at all."""
+        return bool(self.latency or self.jitter or self.error_rate)
+
+
+@dataclass(frozen=True)
+class MockMethod:
+    """A method the mock server answers.
+
+    Attributes:
+        path: Full method path (``/package.Service/Method``)
+        responses: Serialized responses, cycled through by unary-response calls and
+            all sent by server-streaming calls (bidi calls answer each request with the next one)
+        profile: Faults injected into its calls
+        client_streaming: Whether the method takes a request stream
+        server_streaming: Whether the method returns a response stream
+    """
+
+    path: str
+    responses: tuple[bytes, ...]
+    profile: FaultProfile = field(default_factory=FaultProfile)
+    client_streaming: bool = False
+    server_streaming: bool = False
+
+
+def load_fixtures(path: str | Path) -> dict[str, dict[str, Any]]:
+    """Read a fixture file.
+
+    The file is a JSON object keyed by method (``package.Service/Method``). Each
+    value may hold ``response`` (one response in protobuf JSON) or ``responses``
+    (a list of them) and any fault profile key (``latency``, ``jitter``,
+    ``error_rate``, ``error_code``) overriding the server-wide profile.
+
+    Args:
+        path: Fixture file
+
+    Returns:
+        Fixtures keyed by full method path
+
+    Raises:
+        ValueError: If the file cannot be read or is malformed
+    """
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read fixtures {path}: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError(f"Fixtures {path} must be a JSON object keyed by method")
+    allowed = _RESPONSE_KEYS | {f.name for f in fields(FaultProfile)}
+    fixtures: dict[str, dict[str, Any]] = {}
+    for name, fixture in data.items():
+        if not isinstance(fixture, dict) or not set(fixture) <= allowed or _RESPONSE_KEYS <= set(fixture):
+            raise ValueError(f"Fixture for {name!r} must be an object with 'response' or 'responses' and profile keys")
+        if "responses" in fixture and not isinstance(fixture["responses"], list):
+            raise ValueError(f"'responses' of {name!r} must be a list")
+        fixtures["/" + name.lstrip("/")] = fixture
+    return fixtures
+
+
+def build_methods(
+    files: Iterable[descriptor_pb2.FileDescriptorProto],
+    fixtures: Mapping[str, Mapping[str, Any]] | None = None,
+    profile: FaultProfile | None = None,
+) -> list[MockMethod]:
+    """Prepare every method of every service in ``files``.
+
+    Responses come from ``fixtures`` or are default-populated (see
+    :func:`~pbreflect.mock.payloads.populate`), and are serialized here once so
+    calls only hand out bytes.
+
+    Args:
+        files: File descriptors with their dependencies (missing well-known types are borrowed)
+        fixtures: Fixtures keyed by full method path (see :func:`load_fixtures`)
+        profile: Fault profile for methods whose fixture does not override it
+
+    Returns:
+        The methods
+
+    Raises:
+        ValueError: If descriptors are incomplete, a fixture names an unknown method
+            or a fixture response does not match the method's response type
+    """
+    files = list(files)
+    fixtures = fixtures or {}
+    profile = profile or FaultProfile()
+    pool = build_pool(files)
+    methods: list[MockMethod] = []
+    for file in files:
+        for service in file.service:
+            full_name = f"{file.package}.{service.name}" if file.package else service.name
+            for method in pool.FindServiceByName(full_name).methods:
+                path = f"/{full_name}/{method.name}"
+                fixture = fixtures.get(path, {})
+                response_class = message_factory.GetMessageClass(method.output_type)
+                try:
+                    responses = [
+                        json_format.ParseDict(data, response_class())
+                        for data in fixture.get("responses", [fixture["response"]] if "response" in fixture else [])
+                    ] or [populate(response_class())]
+                except (json_format.ParseError, TypeError) as e:
+                    raise ValueError(f"Fixture response for {path} is invalid: {e}") from e
+                methods.append(
+                    MockMethod(
+                        path=path,
+                        responses=tuple(response.SerializeToString() for response in responses),
+                        profile=profile.override(fixture),
+                        client_streaming=method.client_streaming,
+                        server_streaming=method.server_streaming,
+                    )
+                )
+    unknown = set(fixtures) - {method.path for method in methods}
+    if unknown:
+        raise ValueError(f"Fixtures name unknown methods: {', '.join(sorted(unknown))}")
+    return methods
+
+
+class _Handler:
+    """Answers the calls of one method; everything runs on the server's event loop."""
+
+    def __init__(self, method: MockMethod, rng: random.Random) -> None:
+        self._profile = method.profile
+        self._responses = method.responses
+        self._next = itertools.cycle(method.responses).__next__
+        self._rng = rng
+
+    async def _inject(self, context: grpc.aio.ServicerContext) -> None:
+        profile = self._profile
+        delay = profile.latency + (self._rng.uniform(0, profile.jitter) if profile.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if profile.error_rate and self._rng.random() < profile.error_rate:
+            await context.abort(profile.error_code, "injected by pbreflect serve-mock")
+
+    async def unary_unary(self, request: bytes, context: grpc.aio.ServicerContext) -> bytes:
+        if self._profile.active:
+            await self._inject(context)
+        return self._next()
+
+    async def unary_stream(self, request: bytes, context: grpc.aio.ServicerContext) -> AsyncIterator[bytes]:
+        if self._profile.active:
+            await self._inject(context)
+        for response in self._responses:
+            yield response
+
+    async def stream_unary(self, requests: AsyncIterator[bytes], context: grpc.aio.ServicerContext) -> bytes:
+        async for _ in requests:
+            pass
+        if self._profile.active:
+            await self._inject(context)
+        return self._next()
+
+    async def stream_stream(
+        self, requests: AsyncIterator[bytes], context: grpc.aio.ServicerContext
+    ) -> AsyncIterator[bytes]:
+        if self._profile.active:
+            await self._inject(context)
+        async for _ in requests:
+            yield self._next()
+
+
+def _generic_handlers(methods: Sequence[MockMethod], rng: random.Random) -> list[grpc.GenericRpcHandler]:
+    services: dict[str, dict[str, grpc.RpcMethodHandler]] = {}
+    for method in methods:
+        service, name = method.path[1:].rsplit("/", 1)
+        handler = _Handler(method, rng)
+        if method.client_streaming and method.server_streaming:
+            rpc = grpc.stream_stream_rpc_method_handler(handler.stream_stream)
+        elif method.client_streaming:
+            rpc = grpc.stream_unary_rpc_method_handler(handler.stream_unary)
+        elif method.server_streaming:
+            rpc = grpc.unary_stream_rpc_method_handler(handler.unary_stream)
+        else:
+            rpc = grpc.unary_unary_rpc_method_handler(handler.unary_unary)
+        services.setdefault(service, {})[name] = rpc
+    return [grpc.method_handlers_generic_handler(service, rpcs) for service, rpcs in services.items()]
+
+
+class MockServer:
+    """A ``grpc.aio`` server answering every method of a set of file descriptors.
+
+    Handlers exchange pre-serialized bytes: requests are never parsed and
+    responses are encoded once up front, so a single event loop serves tens of
+    thousands of calls per second. The reflection service is exposed as well,
+    which lets ``pbreflect reflect`` and ``pbreflect bench`` target the mock.
+    """
+
+    def __init__(
+        self,
+        files: Iterable[descriptor_pb2.FileDescriptorProto],
+        *,
+        fixtures: Mapping[str, Mapping[str, Any]] | None = None,
+        profile: FaultProfile | None = None,
+        reflection: bool = True,
+        seed: int | None = None,
+    ) -> None:
+        """Prepare the server.
+
+        Args:
+            files: File descriptors with their dependencies
+            fixtures: Fixtures keyed by full method path (see :func:`load_fixtures`)
+            profile: Fault profile for every method without its own
+            reflection: Whether to expose the reflection service
+            seed: Seed for latency jitter and error injection
+
+        Raises:
+            ValueError: If the descriptors or fixtures are invalid
+        """
+        self._files = list(files)
+        self.methods = build_methods(self._files, fixtures, profile)
+        self._reflection = reflection
+        self._rng = random.Random(seed)
+        self._server: grpc.aio.Server | None = None
+
+    async def start(self, address: str = f"127.0.0.1:{DEFAULT_PORT}", *, reuse_port: bool = False) -> int:
+        """Bind and start serving.
+
+        Args:
+            address: ``host:port`` to listen on; port 0 picks a free one
+            reuse_port: Let several processes bind the same port (``SO_REUSEPORT``)
+
+        Returns:
+            The bound port
+        """
+        server = grpc.aio.server(options=[("grpc.so_reuseport", int(reuse_port))])
+        server.add_generic_rpc_handlers(_generic_handlers(self.methods, self._rng))
+        if self._reflection:
+            services = sorted({method.path[1:].rsplit("/", 1)[0] for method in self.methods})
+            reflection.enable_server_reflection(
+                [*services, reflection.SERVICE_NAME], server, pool=build_pool(self._files)
+            )
+        port = server.add_insecure_port(address)
+        await server.start()
+        self._server = server
+        _logger.info("Mock server for %d methods listening on port %d", len(self.methods), port)
+        return port
+
+    async def stop(self, grace: float | None = None) -> None:
+        """Stop serving, letting calls in flight finish within ``grace`` seconds."""
+        if self._server is not None:
+            await self._server.stop(grace)
+            self._server = None
+
+    async def wait_for_termination(self) -> None:
+        """Block until the server stops."""
+        if self._server is not None:
+            await self._server.wait_for_termination()
+
+
+async def _serve(server: MockServer, address: str, reuse_port: bool) -> None:
+    await server.start(address, reuse_port=reuse_port)
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(None)
+
+
+def _serve_worker(descriptor_set: bytes, address: str, options: dict[str, Any]) -> None:
+    files = descriptor_pb2.FileDescriptorSet.FromString(descriptor_set).file
+    try:
+        asyncio.run(_serve(MockServer(files, **options), address, reuse_port=True))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(
+    files: Iterable[descriptor_pb2.FileDescriptorProto],
+    address: str,
+    *,
+    workers: int = 1,
+    fixtures: Mapping[str, Mapping[str, Any]] | None = None,
+    profile: FaultProfile | None = None,
+    reflection: bool = True,
+    seed: int | None = None,
+) -> None:
+    """Run mock servers until interrupted.
+
+    One event loop saturates one core. With ``workers > 1``, that many processes
+    bind the same port through ``SO_REUSEPORT`` and the kernel spreads incoming
+    connections over them (Linux only). Each connection stays with one process,
+    so clients need several connections to use every worker.
+
+    Args:
+        files: File descriptors with their dependencies
+        address: ``host:port`` to listen on; a fixed port is required with several workers
+        workers: Number of server processes
+        fixtures: Fixtures keyed by full method path (see :func:`load_fixtures`)
+        profile: Fault profile for every method without its own
+        reflection: Whether to expose the reflection service
+        seed: Seed for latency jitter and error injection; worker ``n`` uses ``seed + n``
+
+    Raises:
+        ValueError: If the descriptors or fixtures are invalid, or several workers share port 0
+    """
+    files = list(files)
+    options: dict[str, Any] = {"fixtures": fixtures, "profile": profile, "reflection": reflection}
+    server = MockServer(files, seed=seed, **options)
+    if workers == 1:
+        try:
+            asyncio.run(_serve(server, address, reuse_port=False))
+        except KeyboardInterrupt:
+            pass
+        return
+    if address.rsplit(":", 1)[-1] == "0":
+        raise ValueError("Several workers need a fixed port")
+    descriptor_set = descriptor_pb2.FileDescriptorSet(file=files).SerializeToString()
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_serve_worker,
+            args=(descriptor_set, address, {**options, "seed": None if seed is None else seed + n}),
+            name=f"pbreflect-mock-{n}",
+            daemon=True,
+        )
+        for n in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+def compile_proto_dir(proto_dir: str | Path) -> list[descriptor_pb2.FileDescriptorProto]:
+    """Compile the ``.proto`` files under a directory into file descriptors.
+
+    Args:
+        proto_dir: Directory with ``.proto`` sources, used as the import root
+
+    Returns:
+        Descriptors of every source and its imports, dependencies first
+
+    Raises:
+        NoProtoFilesError: If the directory has no ``.proto`` files
+        GenerationFailedError: If protoc rejects the sources
+    """
+    proto_files = ProtoFileFinder(str(proto_dir)).find_proto_files()
+    if not proto_files:
+        raise NoProtoFilesError(str(proto_dir))
+    with tempfile.TemporaryDirectory() as tmp:
+        compiled = DescriptorSetCompiler(str(proto_dir)).compile(proto_files, Path(tmp) / "descriptors.pb")
+    return list(compiled.descriptor_set.file)
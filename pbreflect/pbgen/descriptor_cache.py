@@ -0,0 +1,226 @@
+"""Persistent cache of compiled ``FileDescriptorProto`` entries.
+
+Entries are keyed by a hash of a proto file's bytes plus the keys of its
+transitive imports, so editing any file invalidates it and everything that
+imports it, while untouched files keep hitting the cache across runs and tools.
+"""
+
+import contextlib
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from importlib import metadata
+from pathlib import Path
+
+from google.protobuf import descriptor_pb2
+from google.protobuf.message import DecodeError
+
+from pbreflect.log import get_logger
+
+_logger = get_logger(__name__)
+
+CACHE_DIR_ENV_VAR = "PBREFLECT_CACHE_DIR"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_MEMORY_ENTRIES = 4096
+
+_ENTRY_SUFFIX = ".pb"
+_IMPORT_RE = re.compile(r'^\s*import\s+(?:public\s+|weak\s+)?"([^"]+)"\s*;', re.MULTILINE)
+
+
+def default_cache_dir() -> Path:
+    """Resolve the cache directory.
+
+    ``$PBREFLECT_CACHE_DIR`` wins; otherwise ``$XDG_CACHE_HOME/pbreflect/descriptors``,
+    falling back to ``~/.cache/pbreflect/descriptors``.
+    """
+    if env := os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pbreflect" / "descriptors"
+
+
+def _compiler_salt() -> bytes:
+    # Descriptors produced by different protoc builds may differ (e.g. editions features).
+    try:
+        version = metadata.version("grpcio-tools")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"pbreflect-descriptor-cache/2 grpcio-tools/{version}".encode()
+
+
+class SourceKeys:
+    """Computes cache keys for proto files resolved against a list of import roots."""
+
+    def __init__(self, include_paths: list[Path]) -> None:
+        """Initialize the key calculator.
+
+        Args:
+            include_paths: Import roots, searched in order like ``--proto_path``
+        """
+        self._include_paths = include_paths
+        self._salt = _compiler_salt()
+        self._keys: dict[str, str] = {}
+        self._visiting: set[str] = set()
+
+    def key(self, name: str) -> str:
+        """Return the key for the proto file importable as ``name``.
+
+        Imports that cannot be resolved contribute only their name; protoc rejects
+        such sources anyway, so they never produce a cache entry. The same goes for
+        an import that leads back to a file still being hashed: the cycle contributes
+        only that file's name, and protoc reports it when the sources are compiled.
+        """
+        if name in self._keys:
+            return self._keys[name]
+        digest = hashlib.sha256(self._salt)
+        digest.update(b"\0" + name.encode())
+        if name in self._visiting:
+            return digest.hexdigest()
+        source = self._resolve(name)
+        if source is not None:
+            data = source.read_bytes()
+            digest.update(b"\0" + data)
+            self._visiting.add(name)
+            try:
+                for dependency in sorted(set(_IMPORT_RE.findall(data.decode("utf-8", errors="replace")))):
+                    digest.update(b"\0" + self.key(dependency).encode())
+            finally:
+                self._visiting.discard(name)
+        self._keys[name] = digest.hexdigest()
+        return self._keys[name]
+
+    def _resolve(self, name: str) -> Path | None:
+        for root in self._include_paths:
+            candidate = root / name
+            if candidate.is_file():
+                return candidate
+        return None
+
+
+class MemoryDescriptorCache:
+    """In-process LRU map of cache keys to parsed descriptors.
+
+    Long-lived processes such as ``pbreflect daemon`` keep one instance for their
+    whole lifetime and hand it to every :class:`DescriptorCache`, so unchanged
+    sources are served without reading or parsing cache files.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_MEMORY_ENTRIES) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Number of descriptors kept before the least recently used is dropped
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, descriptor_pb2.FileDescriptorProto] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> descriptor_pb2.FileDescriptorProto | None:
+        """Return the descriptor stored under ``key``, or None on a miss."""
+        with self._lock:
+            descriptor = self._entries.get(key)
+            if descriptor is not None:
+                self._entries.move_to_end(key)
+            return descriptor
+
+    def put(self, key: str, descriptor: descriptor_pb2.FileDescriptorProto) -> None:
+        """Store ``descriptor`` under ``key``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = descriptor
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Return the number of stored descriptors."""
+        return len(self._entries)
+
+
+class DescriptorCache:
+    """Directory of serialized ``FileDescriptorProto`` entries with LRU eviction.
+
+    Recency is tracked through file mtimes: a hit touches the entry, and once the
+    directory grows past ``max_bytes`` the least recently used entries are removed.
+    Writes go through a temporary file and ``os.replace``, so concurrent runs never
+    observe a partial entry.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory: MemoryDescriptorCache | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Cache directory; defaults to :func:`default_cache_dir`
+            max_bytes: Size cap for all entries together
+            memory: Optional in-process layer consulted before the directory
+        """
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.memory = memory
+
+    def get(self, key: str) -> descriptor_pb2.FileDescriptorProto | None:
+        """Return the cached descriptor for ``key``, or None on a miss."""
+        if self.memory is not None and (descriptor := self.memory.get(key)) is not None:
+            return descriptor
+        descriptor = self._read(key)
+        if descriptor is not None and self.memory is not None:
+            self.memory.put(key, descriptor)
+        return descriptor
+
+    def _read(self, key: str) -> descriptor_pb2.FileDescriptorProto | None:
+        path = self._entry(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        descriptor = descriptor_pb2.FileDescriptorProto()
+        try:
+            descriptor.ParseFromString(data)
+        except DecodeError:
+            _logger.warning("Dropping corrupt descriptor cache entry %s", path)
+            path.unlink(missing_ok=True)
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return descriptor
+
+    def put(self, key: str, descriptor: descriptor_pb2.FileDescriptorProto) -> None:
+        """Store ``descriptor`` under ``key``; call :meth:`evict` after a batch of puts."""
+        if self.memory is not None:
+            self.memory.put(key, descriptor)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(descriptor.SerializeToString())
+            os.replace(tmp, self._entry(key))
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        for path in self.cache_dir.glob(f"*{_ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{_ENTRY_SUFFIX}"
@@ -0,0 +1,207 @@
+"""Compiled descriptor stage shared by every step of the generation pipeline."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from importlib import resources
+from pathlib import Path
+
+from google.protobuf import descriptor_pb2, descriptor_pool
+from grpc_tools import protoc
+
+from pbreflect.log import get_logger
+from pbreflect.pbgen.descriptor_cache import DescriptorCache, SourceKeys
+from pbreflect.pbgen.errors import GenerationFailedError
+
+_logger = get_logger(__name__)
+
+
+def _default_json_name(field_name: str) -> str:
+    """Return the JSON name protoc derives for ``field_name`` (``foo_bar`` -> ``fooBar``)."""
+    parts = field_name.split("_")
+    return parts[0] + "".join(part[:1].upper() + part[1:] for part in parts[1:])
+
+
+def _strip_default_json_names(descriptor_set: descriptor_pb2.FileDescriptorSet) -> None:
+    """Clear ``json_name`` wherever it equals the derived default.
+
+    ``--descriptor_set_out`` fills in ``json_name`` on every field, while protoc parsing
+    sources only records explicit ones. Plugins embed the descriptor they are given, so
+    without this the ``_pb2`` modules would differ from per-file compilation and clash
+    with normally generated modules in the same descriptor pool.
+    """
+
+    def strip(fields: Iterable[descriptor_pb2.FieldDescriptorProto]) -> None:
+        for field in fields:
+            if field.json_name == _default_json_name(field.name):
+                field.ClearField("json_name")
+
+    def visit(message: descriptor_pb2.DescriptorProto) -> None:
+        strip(message.field)
+        strip(message.extension)
+        for nested in message.nested_type:
+            visit(nested)
+
+    for file in descriptor_set.file:
+        strip(file.extension)
+        for message in file.message_type:
+            visit(message)
+
+
+def build_pool(files: Iterable[descriptor_pb2.FileDescriptorProto]) -> descriptor_pool.DescriptorPool:
+    """Load file descriptors into a fresh pool, dependencies first.
+
+    Dependencies missing from ``files`` are taken from the default pool, which
+    has the well-known types and every ``_pb2`` module imported so far.
+
+    Args:
+        files: File descriptors, in any order
+
+    Returns:
+        A pool containing every file
+
+    Raises:
+        ValueError: If a dependency is neither in ``files`` nor in the default pool
+    """
+    by_name = {file.name: file for file in files}
+    pool = descriptor_pool.DescriptorPool()
+    added: set[str] = set()
+
+    def add(name: str) -> None:
+        if name in added:
+            return
+        added.add(name)
+        file = by_name.get(name)
+        if file is None:
+            try:
+                known = descriptor_pool.Default().FindFileByName(name)
+            except KeyError:
+                raise ValueError(f"Descriptor for '{name}' is missing") from None
+            file = descriptor_pb2.FileDescriptorProto()
+            known.CopyToProto(file)
+        for dependency in file.dependency:
+            add(dependency)
+        pool.Add(file)
+
+    for name in by_name:
+        add(name)
+    return pool
+
+
+@dataclass(frozen=True)
+class CompiledDescriptors:
+    """A FileDescriptorSet compiled once per run, together with its on-disk copy.
+
+    Attributes:
+        descriptor_set: Parsed descriptors, including all transitive imports
+        path: Serialized set, suitable for ``protoc --descriptor_set_in``
+        proto_dir: Directory the sources were compiled from
+    """
+
+    descriptor_set: descriptor_pb2.FileDescriptorSet
+    path: Path
+    proto_dir: str
+
+    def proto_name(self, proto_file: str) -> str:
+        """Map a source path found under ``proto_dir`` to its name inside the set."""
+        return Path(proto_file).relative_to(self.proto_dir).as_posix()
+
+    def files(self, proto_files: list[str]) -> list[descriptor_pb2.FileDescriptorProto]:
+        """Return descriptors for the given source paths, in dependency order."""
+        wanted = {self.proto_name(p) for p in proto_files}
+        return [f for f in self.descriptor_set.file if f.name in wanted]
+
+
+class DescriptorSetCompiler:
+    """Runs protoc once over all sources and keeps the resulting descriptor set.
+
+    With a :class:`DescriptorCache`, the set is assembled from cached entries when
+    every requested file and its transitive imports are unchanged; otherwise protoc
+    compiles the sources and the cache is refreshed from its output.
+    """
+
+    def __init__(self, proto_dir: str, cache: DescriptorCache | None = None) -> None:
+        """Initialize the compiler.
+
+        Args:
+            proto_dir: Directory with .proto sources, used as the import root
+            cache: Optional persistent descriptor cache
+        """
+        self._proto_dir = proto_dir
+        self._cache = cache
+        self._well_known = Path(str(resources.files("grpc_tools") / "_proto"))
+
+    def compile(self, proto_files: list[str], output_path: Path) -> CompiledDescriptors:
+        """Compile ``proto_files`` into a FileDescriptorSet with all imports included.
+
+        Args:
+            proto_files: Source paths under ``proto_dir``
+            output_path: Where to write the serialized set
+
+        Returns:
+            The compiled descriptors
+
+        Raises:
+            GenerationFailedError: If protoc rejects the sources
+        """
+        names = [Path(p).relative_to(self._proto_dir).as_posix() for p in proto_files]
+        keys = SourceKeys([Path(self._proto_dir), self._well_known])
+
+        if self._cache is not None:
+            descriptor_set = self._from_cache(self._cache, names, keys)
+            if descriptor_set is not None:
+                _logger.info("Loaded descriptor set for %d proto files from cache", len(proto_files))
+                output_path.write_bytes(descriptor_set.SerializeToString())
+                return CompiledDescriptors(descriptor_set=descriptor_set, path=output_path, proto_dir=self._proto_dir)
+
+        _logger.info("Compiling descriptor set for %d proto files…", len(proto_files))
+        ret = protoc.main(
+            [
+                "grpc_tools.protoc",
+                f"--proto_path={self._proto_dir}",
+                f"--proto_path={self._well_known}",
+                f"--descriptor_set_out={output_path}",
+                "--include_imports",
+                *proto_files,
+            ]
+        )
+        if ret != 0:
+            raise GenerationFailedError(f"protoc failed to compile descriptor set (exit {ret})")
+
+        descriptor_set = descriptor_pb2.FileDescriptorSet()
+        descriptor_set.ParseFromString(output_path.read_bytes())
+        _strip_default_json_names(descriptor_set)
+        output_path.write_bytes(descriptor_set.SerializeToString())
+        if self._cache is not None:
+            self._store(self._cache, descriptor_set, keys)
+        return CompiledDescriptors(descriptor_set=descriptor_set, path=output_path, proto_dir=self._proto_dir)
+
+    @staticmethod
+    def _from_cache(
+        cache: DescriptorCache, names: list[str], keys: SourceKeys
+    ) -> descriptor_pb2.FileDescriptorSet | None:
+        """Assemble a set in dependency order from cached entries; None if any entry is missing."""
+        descriptor_set = descriptor_pb2.FileDescriptorSet()
+        visited: set[str] = set()
+
+        def visit(name: str) -> bool:
+            if name in visited:
+                return True
+            visited.add(name)
+            descriptor = cache.get(keys.key(name))
+            if descriptor is None or not all(visit(dependency) for dependency in descriptor.dependency):
+                return False
+            descriptor_set.file.append(descriptor)
+            return True
+
+        if all(visit(name) for name in names):
+            return descriptor_set
+        return None
+
+    @staticmethod
+    def _store(cache: DescriptorCache, descriptor_set: descriptor_pb2.FileDescriptorSet, keys: SourceKeys) -> None:
+        try:
+            for descriptor in descriptor_set.file:
+                cache.put(keys.key(descriptor.name), descriptor)
+            cache.evict()
+        except OSError as e:
+            _logger.warning("Could not update descriptor cache in %s: %s", cache.cache_dir, e)
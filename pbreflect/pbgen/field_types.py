@@ -0,0 +1,21 @@
+"""Groups of protobuf field types shared by code generation, the mock server and load tests."""
+
+from google.protobuf import descriptor_pb2
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+# The values match ``FieldDescriptor.TYPE_*``, so runtime descriptors can be checked too.
+INTEGER_FIELD_TYPES = frozenset(
+    {
+        _Field.TYPE_INT32,
+        _Field.TYPE_INT64,
+        _Field.TYPE_UINT32,
+        _Field.TYPE_UINT64,
+        _Field.TYPE_SINT32,
+        _Field.TYPE_SINT64,
+        _Field.TYPE_FIXED32,
+        _Field.TYPE_FIXED64,
+        _Field.TYPE_SFIXED32,
+        _Field.TYPE_SFIXED64,
+    }
+)
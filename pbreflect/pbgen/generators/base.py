@@ -3,12 +3,25 @@
 from pathlib import Path
 
 from pbreflect.log import get_logger
+from pbreflect.pbgen.descriptors import CompiledDescriptors
 from pbreflect.pbgen.errors import GenerationFailedError, NoProtoFilesError
 from pbreflect.pbgen.generators.protocols import CommandExecutor, GeneratorStrategy, ProtoFileFinder
 
 _logger = get_logger(__name__)
 
 
+def without_include_args(command_template: list[str]) -> list[str]:
+    """Drop ``-I {include}``/``--proto_path={include}`` so protoc reads a descriptor set instead of sources."""
+    result: list[str] = []
+    for arg in command_template:
+        if "{include}" in arg:
+            if result and result[-1] in ("-I", "--proto_path"):
+                result.pop()
+            continue
+        result.append(arg)
+    return result
+
+
 class ClientGenerator:
     """Runs protoc for every .proto file found by the finder, using the given strategy."""
 
@@ -16,7 +29,20 @@ class ClientGenerator:
         self._finder = proto_finder
         self._executor = command_executor
 
-    def generate(self, output_dir: str, strategy: GeneratorStrategy) -> None:
+    def generate(
+        self,
+        output_dir: str,
+        strategy: GeneratorStrategy,
+        descriptors: CompiledDescriptors | None = None,
+    ) -> None:
+        """Generate code for every proto file.
+
+        Args:
+            output_dir: Directory where generated code is written
+            strategy: Strategy providing the protoc command template
+            descriptors: Precompiled descriptor set; when given, protoc reads it via
+                ``--descriptor_set_in`` instead of parsing each source file again
+        """
         _logger.info("Starting code generation…")
         Path(output_dir).mkdir(parents=True, exist_ok=True)
 
@@ -24,11 +50,15 @@ class ClientGenerator:
         if not proto_files:
             raise NoProtoFilesError(self._finder.proto_dir)
 
+        command_template = strategy.command_template
+        if descriptors is not None:
+            command_template = [*without_include_args(command_template), f"--descriptor_set_in={descriptors.path}"]
+
         for proto_file in proto_files:
             _logger.info("Generating code for proto: %s", proto_file)
+            proto = descriptors.proto_name(proto_file) if descriptors is not None else proto_file
             command_args = [
-                arg.format(include=self._finder.proto_dir, output=output_dir, proto=proto_file)
-                for arg in strategy.command_template
+                arg.format(include=self._finder.proto_dir, output=output_dir, proto=proto) for arg in command_template
             ]
             exit_code, stderr = self._executor.execute(command_args)
             if exit_code != 0:
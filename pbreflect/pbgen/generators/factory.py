@@ -1,5 +1,6 @@
 """Factory for creating generator strategies."""
 
+from collections.abc import Sequence
 from enum import Enum
 
 from pbreflect.pbgen.generators.protocols import GeneratorStrategy
@@ -32,10 +33,19 @@ class GeneratorFactory:
         *,
         async_mode: bool = True,
         template_dir: str | None = None,
+        cache_methods: Sequence[str] = (),
+        service_config: str | None = None,
+        raw_methods: bool = False,
     ) -> GeneratorStrategy:
         match gen_type:
             case GeneratorType.PBREFLECT:
-                return PbReflectGeneratorStrategy(async_mode=async_mode, template_dir=template_dir)
+                return PbReflectGeneratorStrategy(
+                    async_mode=async_mode,
+                    template_dir=template_dir,
+                    cache_methods=cache_methods,
+                    service_config=service_config,
+                    raw_methods=raw_methods,
+                )
             case GeneratorType.DEFAULT:
                 return DefaultGeneratorStrategy()
             case GeneratorType.MYPY:
@@ -0,0 +1,136 @@
+"""Code generator that runs protoc and Python protoc plugins inside the current process."""
+
+import inspect
+from collections.abc import Callable
+from pathlib import Path
+
+from google.protobuf.compiler import plugin_pb2
+from grpc_tools import protoc
+
+from pbreflect.log import get_logger
+from pbreflect.pbgen.descriptors import CompiledDescriptors
+from pbreflect.pbgen.errors import GenerationFailedError, NoProtoFilesError
+from pbreflect.pbgen.generators.base import without_include_args
+from pbreflect.pbgen.generators.protocols import GeneratorStrategy
+
+_logger = get_logger(__name__)
+
+_Plugin = Callable[[plugin_pb2.CodeGeneratorRequest], plugin_pb2.CodeGeneratorResponse]
+
+
+def _pbreflect_plugin(request: plugin_pb2.CodeGeneratorRequest) -> plugin_pb2.CodeGeneratorResponse:
+    from pbreflect.pbgen.plugins.base import parse_plugin_parameters
+    from pbreflect.pbgen.plugins.pbreflect import PbReflectPlugin
+
+    plugin = PbReflectPlugin(template_dir=parse_plugin_parameters(request.parameter).get("t"))
+    return plugin.process_request(request)
+
+
+def _mypy_protobuf_plugin(function_name: str) -> _Plugin | None:
+    """Wrap a mypy-protobuf generator function the way its ``protoc-gen-*`` entry points call it.
+
+    Every flag argument is set when its name appears in the plugin parameter. Returns
+    None when mypy-protobuf is missing or its signature is not understood, in which
+    case protoc runs the plugin executable instead.
+    """
+    try:
+        from mypy_protobuf import main as mypy_protobuf
+    except ImportError:
+        return None
+    generate = getattr(mypy_protobuf, function_name, None)
+    if generate is None:
+        return None
+    parameters = list(inspect.signature(generate).parameters.values())[2:]
+    if not all(p.name == "grpc_type" or p.annotation in (bool, "bool") for p in parameters):
+        return None
+    flags = [p.name for p in parameters]
+
+    def run(request: plugin_pb2.CodeGeneratorRequest) -> plugin_pb2.CodeGeneratorResponse:
+        response = plugin_pb2.CodeGeneratorResponse()
+        response.supported_features |= plugin_pb2.CodeGeneratorResponse.FEATURE_PROTO3_OPTIONAL
+        args = [
+            mypy_protobuf.GRPCType.from_parameter(request.parameter)
+            if name == "grpc_type"
+            else name in request.parameter
+            for name in flags
+        ]
+        generate(mypy_protobuf.Descriptors(request), response, *args)
+        return response
+
+    return run
+
+
+def _in_process_plugin(name: str) -> _Plugin | None:
+    if name == "pbreflect":
+        return _pbreflect_plugin
+    if name == "mypy":
+        return _mypy_protobuf_plugin("generate_mypy_stubs")
+    if name == "mypy_grpc":
+        return _mypy_protobuf_plugin("generate_mypy_grpc_stubs")
+    return None
+
+
+class InProcessClientGenerator:
+    """Generates code for a compiled descriptor set without spawning a process per file.
+
+    The pbreflect and mypy-protobuf plugins are not started at all: their
+    ``CodeGeneratorRequest`` is built from the set and handled by the plugin code
+    directly, which keeps compiled templates warm in long-lived processes like
+    ``pbreflect daemon``. protoc's built-in generators (``python_out``,
+    ``grpc_python_out``) and any other plugin run through one in-process
+    ``grpc_tools.protoc`` call covering every file.
+    """
+
+    def generate(
+        self, output_dir: str, strategy: GeneratorStrategy, descriptors: CompiledDescriptors, proto_files: list[str]
+    ) -> None:
+        """Generate code for ``proto_files`` from their compiled descriptor set.
+
+        Args:
+            output_dir: Directory where generated code is written
+            strategy: Strategy providing the protoc command template
+            descriptors: Descriptor set the sources were compiled into
+            proto_files: Source paths under ``descriptors.proto_dir``
+
+        Raises:
+            NoProtoFilesError: If there are no sources
+            GenerationFailedError: If protoc or a plugin reports an error
+        """
+        names = [descriptors.proto_name(proto_file) for proto_file in proto_files]
+        if not names:
+            raise NoProtoFilesError(descriptors.proto_dir)
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        _logger.info("Generating code for %d proto files in-process…", len(names))
+
+        protoc_args: list[str] = []
+        plugins: list[tuple[str, _Plugin, str]] = []
+        for arg in without_include_args(strategy.command_template):
+            if not arg.startswith("--"):
+                continue
+            option, _, value = arg.partition("=")
+            plugin = _in_process_plugin(option.removeprefix("--").removesuffix("_out"))
+            if option.endswith("_out") and plugin is not None:
+                plugins.append((option, plugin, value.removesuffix("{output}").removesuffix(":")))
+            else:
+                protoc_args.append(arg.format(output=output_dir))
+
+        if protoc_args:
+            ret = protoc.main(["grpc_tools.protoc", f"--descriptor_set_in={descriptors.path}", *protoc_args, *names])
+            if ret != 0:
+                raise GenerationFailedError(f"protoc failed for {descriptors.proto_dir} (exit {ret})")
+        for option, plugin, parameter in plugins:
+            request = plugin_pb2.CodeGeneratorRequest(parameter=parameter, file_to_generate=names)
+            request.proto_file.extend(descriptors.descriptor_set.file)
+            response = plugin(request)
+            if response.error:
+                raise GenerationFailedError(f"{option} failed: {response.error}")
+            self._write(output_dir, response)
+
+        _logger.info("Code generation completed.")
+
+    @staticmethod
+    def _write(output_dir: str, response: plugin_pb2.CodeGeneratorResponse) -> None:
+        for out_file in response.file:
+            out_path = Path(output_dir) / out_file.name
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            out_path.write_text(out_file.content, encoding="utf-8")
@@ -1,5 +1,6 @@
 """PbReflect generator strategy."""
 
+from collections.abc import Sequence
 from typing import Optional
 
 from pbreflect.pbgen.generators.protocols import GeneratorStrategy
@@ -8,15 +9,28 @@ from pbreflect.pbgen.generators.protocols import GeneratorStrategy
 class PbReflectGeneratorStrategy(GeneratorStrategy):
     """PbReflect generator strategy."""
 
-    def __init__(self, async_mode: bool = True, template_dir: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        async_mode: bool = True,
+        template_dir: Optional[str] = None,
+        cache_methods: Sequence[str] = (),
+        service_config: Optional[str] = None,
+        raw_methods: bool = False,
+    ) -> None:
         """Initialize the PbReflect generator strategy.
 
         Args:
             async_mode: Whether to generate async client code (True) or sync client code (False)
             template_dir: Optional path to custom templates directory
+            cache_methods: ``package.Service/Method`` patterns of methods that may use the response cache
+            service_config: Path to a gRPC service config JSON overriding the generated one
+            raw_methods: Also generate ``<method>_raw`` variants working on serialized bytes
         """
         self.async_mode = async_mode
         self.template_dir = template_dir
+        self.cache_methods = tuple(cache_methods)
+        self.service_config = service_config
+        self.raw_methods = raw_methods
 
     @property
     def command_template(self) -> list[str]:
@@ -33,6 +47,15 @@ class PbReflectGeneratorStrategy(GeneratorStrategy):
         if self.template_dir:
             plugin_options.append(f"t={self.template_dir}")
 
+        if self.cache_methods:
+            plugin_options.append(f"cache_methods={'+'.join(self.cache_methods)}")
+
+        if self.service_config:
+            plugin_options.append(f"service_config={self.service_config}")
+
+        if self.raw_methods:
+            plugin_options.append("raw=true")
+
         plugin_params = ",".join(plugin_options)
         plugin_out = f"--pbreflect_out={plugin_params}:" + "{output}" if plugin_params else "--pbreflect_out={output}"
 
@@ -16,6 +16,8 @@ class PbReflectTestsGeneratorStrategy(GeneratorStrategy):
         async_mode: bool = False,
         client_module: str = "clients",
         template_dir: Optional[str] = None,
+        fakes: bool = False,
+        layout: str = "method",
     ) -> None:
         """Initialize the strategy.
 
@@ -23,10 +25,14 @@ class PbReflectTestsGeneratorStrategy(GeneratorStrategy):
             async_mode: Whether the generated clients use async mode
             client_module: Python module path where generated clients reside
             template_dir: Optional path to custom templates directory
+            fakes: Whether to generate fake servicers served in-process by the fixtures
+            layout: ``method`` for one test module per method, ``service`` for one per service
         """
         self.async_mode = async_mode
         self.client_module = client_module
         self.template_dir = template_dir
+        self.fakes = fakes
+        self.layout = layout
 
     @staticmethod
     def _find_plugin() -> str:
@@ -58,6 +64,12 @@ class PbReflectTestsGeneratorStrategy(GeneratorStrategy):
         if self.async_mode:
             plugin_options.append("async=true")
 
+        if self.fakes:
+            plugin_options.append("fakes=true")
+
+        if self.layout != "method":
+            plugin_options.append(f"layout={self.layout}")
+
         plugin_options.append(f"client_module={self.client_module}")
 
         if self.template_dir:
@@ -0,0 +1,107 @@
+"""Final package layout of generated code, computed from compiled descriptors."""
+
+import keyword
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from google.protobuf import descriptor_pb2
+
+from pbreflect.pbgen.descriptors import CompiledDescriptors
+from pbreflect.protorecover.reflection_client import GrpcReflectionClient
+
+
+def module_dir(proto_name: str) -> PurePosixPath:
+    """Return the package directory protoc's Python generator uses for ``proto_name``.
+
+    Dots in directory names become package separators, e.g. ``api.v1/users.proto``
+    lands in ``api/v1``.
+    """
+    return module_path(proto_name).parent
+
+
+def module_path(proto_name: str, suffix: str = "") -> PurePosixPath:
+    """Return the path of the generated module for ``proto_name``, without the ``.py`` extension."""
+    descriptor = descriptor_pb2.FileDescriptorProto(name=proto_name)
+    return PurePosixPath(GrpcReflectionClient.get_output_filename(descriptor, suffix=suffix))
+
+
+def _names(descriptors: Iterable[descriptor_pb2.DescriptorProto | descriptor_pb2.EnumDescriptorProto]) -> list[str]:
+    return [d.name for d in descriptors]
+
+
+@dataclass(frozen=True)
+class OutputLayout:
+    """Where every generated module ends up, known before any file is written.
+
+    Attributes:
+        output_dir: Root directory of generated code
+        files: Descriptors of the generated sources
+    """
+
+    output_dir: Path
+    files: tuple[descriptor_pb2.FileDescriptorProto, ...]
+
+    @classmethod
+    def from_descriptors(
+        cls, output_dir: str, descriptors: CompiledDescriptors, proto_files: list[str]
+    ) -> "OutputLayout":
+        """Build the layout for ``proto_files`` compiled into ``descriptors``."""
+        return cls(Path(output_dir), tuple(descriptors.files(proto_files)))
+
+    @property
+    def proto_names(self) -> tuple[str, ...]:
+        """Names of the generated sources inside the descriptor set."""
+        return tuple(f.name for f in self.files)
+
+    def package_dirs(self) -> set[Path]:
+        """Return every package directory of the generated modules, including their parents."""
+        dirs = {self.output_dir}
+        for name in self.proto_names:
+            package = self.output_dir
+            for part in module_dir(name).parts:
+                package = package / part
+                dirs.add(package)
+        return dirs
+
+    def misplaced_dirs(self) -> dict[Path, Path]:
+        """Map directories written by plugins that keep the raw proto path to their package directory.
+
+        Only sources whose directory contains a dot are affected; ``grpc_python_out``
+        writes ``api.v1/service_pb2_grpc.py`` while the module belongs in ``api/v1``.
+        """
+        result: dict[Path, Path] = {}
+        for name in self.proto_names:
+            raw_dir = PurePosixPath(name).parent
+            if "." in raw_dir.as_posix():
+                result[self.output_dir / raw_dir] = self.output_dir / module_dir(name)
+        return result
+
+    def package_exports(self, clients: tuple[str, str] | None = None) -> dict[Path, dict[str, str]]:
+        """Map every package directory to the public names its modules define.
+
+        Messages and enums come from the ``_pb2`` modules. Service clients are added
+        when ``clients`` names the module suffix and class suffix of the generated
+        client modules, e.g. ``("_pb2_pbreflect", "Client")``.
+
+        Args:
+            clients: Client module suffix and class name suffix, if clients are generated
+
+        Returns:
+            Package directory mapped to ``{name: relative module}``; packages without
+            modules of their own map to an empty dict. The first module defining a
+            name wins.
+        """
+        exports: dict[Path, dict[str, str]] = {package: {} for package in self.package_dirs()}
+        for file in self.files:
+            modules = [(module_path(file.name, "_pb2"), [*_names(file.message_type), *_names(file.enum_type)])]
+            if clients is not None and file.service:
+                module_suffix, class_suffix = clients
+                services = [f"{service.name}{class_suffix}" for service in file.service]
+                modules.append((module_path(file.name, module_suffix), services))
+            for module, symbols in modules:
+                package = exports[self.output_dir / module.parent]
+                for symbol in symbols:
+                    if not keyword.iskeyword(symbol):
+                        package.setdefault(symbol, f".{module.name}")
+        return exports
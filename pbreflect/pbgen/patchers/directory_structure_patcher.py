@@ -1,5 +1,7 @@
 """Implementation of directory structure patcher for generated files."""
 
+import contextlib
+import os
 import shutil
 from pathlib import Path
 
@@ -10,13 +12,16 @@ class DirectoryStructurePatcher:
     This class implements the CodePatcher protocol.
     """
 
-    def __init__(self, code_dir: str) -> None:
+    def __init__(self, code_dir: str, misplaced_dirs: dict[Path, Path] | None = None) -> None:
         """Initialize the directory structure patcher.
 
         Args:
             code_dir: Directory with generated code
+            misplaced_dirs: Dotted directories mapped to their package directory, as computed
+                by ``OutputLayout.misplaced_dirs``; when omitted, the whole tree is scanned
         """
         self.code_dir = Path(code_dir)
+        self.misplaced_dirs = misplaced_dirs
 
     def patch(self) -> None:
         """Apply all patches."""
@@ -24,7 +29,10 @@ class DirectoryStructurePatcher:
 
     def _patch_directory_structure(self) -> None:
         """Fix directory structure issues in generated code."""
-        self._move_dirs_with_dots()
+        if self.misplaced_dirs is None:
+            self._move_dirs_with_dots()
+        else:
+            self._move_known_dirs(self.misplaced_dirs)
 
     def _move_dirs_with_dots(self) -> None:
         """Move files from incorrectly generated directories."""
@@ -36,3 +44,16 @@ class DirectoryStructurePatcher:
                     new_path.parent.mkdir(parents=True, exist_ok=True)
                     shutil.move(file.as_posix(), new_path)
                 shutil.rmtree(str(path))
+
+    def _move_known_dirs(self, misplaced_dirs: dict[Path, Path]) -> None:
+        """Move plugin outputs from known dotted directories, then drop the directories once empty."""
+        for raw_dir, package_dir in misplaced_dirs.items():
+            if not raw_dir.is_dir():
+                continue
+            for file in raw_dir.glob("*_pb2_*"):
+                package_dir.mkdir(parents=True, exist_ok=True)
+                os.replace(file, package_dir / file.name)
+            while raw_dir != self.code_dir and "." in raw_dir.name:
+                with contextlib.suppress(OSError):
+                    raw_dir.rmdir()
+                raw_dir = raw_dir.parent
@@ -1,6 +1,7 @@
 """Implementation of init file patcher for generated directories."""
 
 import os
+from collections.abc import Iterable
 from pathlib import Path
 
 
@@ -12,13 +13,16 @@ class InitFilePatcher:
     have an __init__.py file, making them proper Python packages.
     """
 
-    def __init__(self, code_dir: str) -> None:
+    def __init__(self, code_dir: str, package_dirs: Iterable[Path] | None = None) -> None:
         """Initialize the init file patcher.
 
         Args:
             code_dir: Directory with generated code
+            package_dirs: Package directories computed up front (``OutputLayout.package_dirs``);
+                when omitted, the output tree is walked to find them
         """
         self.code_dir = Path(code_dir)
+        self.package_dirs = package_dirs
         # Get the root project directory (parent of the output directory)
         self.root_dir = self.code_dir.parent
 
@@ -32,8 +36,12 @@ class InitFilePatcher:
 
     def _add_init_files(self) -> None:
         """Add __init__.py files to all directories in the output structure."""
+        if self.package_dirs is not None:
+            self._write_init_files(set(self.package_dirs))
+            return
+
         # Get all directories in the output structure
-        all_dirs = set()
+        all_dirs: set[Path] = set()
 
         # Include the output directory itself
         all_dirs.add(self.code_dir)
@@ -50,6 +58,10 @@ class InitFilePatcher:
                 dir_path = root_path / dir_name
                 all_dirs.add(dir_path)
 
+        self._write_init_files(all_dirs)
+
+    def _write_init_files(self, all_dirs: set[Path]) -> None:
+        """Create a marker __init__.py in every directory that lacks one."""
         # Add __init__.py to each directory if it doesn't exist
         for directory in all_dirs:
             # Skip the root project directory
@@ -57,7 +69,7 @@ class InitFilePatcher:
                 continue
 
             init_file = directory / "__init__.py"
-            if not init_file.exists():
+            if not init_file.exists() and directory.is_dir():
                 # Create an empty __init__.py file
                 with open(init_file, "w") as f:
                     f.write("# Generated by PBReflect\n")
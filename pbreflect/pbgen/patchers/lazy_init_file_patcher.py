@@ -0,0 +1,113 @@
+"""Implementation of lazy-loading init file patcher for generated packages."""
+
+from collections import defaultdict
+from pathlib import Path
+
+GENERATED_MARKER = "# Generated by PBReflect"
+
+_GETATTR = """
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+    elif name in _SUBPACKAGES:
+        value = import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*__all__, *_SUBPACKAGES])
+"""
+
+
+def _block(opening: str, items: list[str], closing: str) -> list[str]:
+    if not items:
+        return [f"{opening}{closing}"]
+    return [opening, *(f"    {item}," for item in items), closing]
+
+
+class LazyInitFilePatcher:
+    """Patcher writing ``__init__.py`` files that load their exports on first access.
+
+    This class implements the CodePatcher protocol.
+    Each package gets an ``__all__`` index of the clients and messages its modules
+    define and a PEP 562 ``__getattr__`` that imports the owning module (or a
+    subpackage) only when a name is used, so importing the package is nearly free.
+    Imports under ``TYPE_CHECKING`` keep the names visible to type checkers and IDEs.
+    Existing ``__init__.py`` files are only replaced if PBReflect generated them.
+    """
+
+    def __init__(self, code_dir: str, package_exports: dict[Path, dict[str, str]]) -> None:
+        """Initialize the lazy init file patcher.
+
+        Args:
+            code_dir: Directory with generated code
+            package_exports: Package directory mapped to ``{name: relative module}``,
+                as computed by ``OutputLayout.package_exports``
+        """
+        self.code_dir = Path(code_dir)
+        self.package_exports = package_exports
+
+    def patch(self) -> None:
+        """Apply all patches."""
+        subpackages: dict[Path, list[str]] = defaultdict(list)
+        for package in self.package_exports:
+            if package != self.code_dir:
+                subpackages[package.parent].append(package.name)
+
+        for package, exports in self.package_exports.items():
+            init_file = package / "__init__.py"
+            if not package.is_dir() or not self._is_generated(init_file):
+                continue
+            init_file.write_text(self.render(package, exports, sorted(subpackages[package])), encoding="utf-8")
+
+    def render(self, package: Path, exports: dict[str, str], subpackages: list[str]) -> str:
+        """Render the ``__init__.py`` source for one package.
+
+        Args:
+            package: Package directory
+            exports: Public name mapped to the relative module defining it
+            subpackages: Names of direct subpackages
+
+        Returns:
+            Module source
+        """
+        dotted = package.relative_to(self.code_dir.parent).as_posix().replace("/", ".")
+        by_module: dict[str, list[str]] = defaultdict(list)
+        for name, module in sorted(exports.items()):
+            by_module[module].append(name)
+
+        lines = [
+            GENERATED_MARKER,
+            f'"""Lazily loaded exports of the generated ``{dotted}`` package."""',
+            "",
+            "from importlib import import_module",
+            "from typing import TYPE_CHECKING, Any",
+        ]
+        if by_module:
+            lines += ["", "if TYPE_CHECKING:"]
+            for module, names in sorted(by_module.items()):
+                if len(names) == 1:
+                    lines.append(f"    from {module} import {names[0]}")
+                else:
+                    lines += _block(f"    from {module} import (", [f"    {name}" for name in names], "    )")
+
+        entries = [f'"{name}": "{module}"' for name, module in sorted(exports.items())]
+        lines += [""]
+        lines += _block("_EXPORTS: dict[str, str] = {", entries, "}")
+        lines += _block("_SUBPACKAGES: tuple[str, ...] = (", [f'"{name}"' for name in subpackages], ")")
+        lines += [""]
+        lines += _block("__all__ = [", [f'"{name}"' for name in sorted(exports)], "]")
+        return "\n".join(lines) + _GETATTR
+
+    @staticmethod
+    def _is_generated(init_file: Path) -> bool:
+        try:
+            with open(init_file, encoding="utf-8") as f:
+                return f.readline().startswith(GENERATED_MARKER)
+        except FileNotFoundError:
+            return True
@@ -1,11 +1,29 @@
 """Shared infrastructure for protoc code-generation plugins."""
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import jinja2
 
 
+@lru_cache(maxsize=32)
+def _environment(template_path: Path, filters: frozenset[tuple[str, Any]] = frozenset()) -> jinja2.Environment:
+    """Return a shared Jinja2 environment for a template directory and filter set.
+
+    Environments keep their compiled templates cached, so long-lived processes
+    (such as ``pbreflect daemon``) only compile each template once. Filters are
+    part of the cache key, so renderers with different filters never share one.
+    """
+    env = jinja2.Environment(  # noqa: S701
+        loader=jinja2.FileSystemLoader(template_path),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    env.filters.update(dict(filters))
+    return env
+
+
 class TemplateRenderer:
     """Wraps a Jinja2 environment; created once and reused across render calls."""
 
@@ -16,13 +34,7 @@ class TemplateRenderer:
         extra_filters: dict[str, Any] | None = None,
     ) -> None:
         template_path = Path(custom_dir) if custom_dir else default_dir
-        self._env = jinja2.Environment(  # noqa: S701
-            loader=jinja2.FileSystemLoader(template_path),
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
-        for name, func in (extra_filters or {}).items():
-            self._env.filters[name] = func
+        self._env = _environment(template_path.resolve(), frozenset((extra_filters or {}).items()))
 
     def render(self, template_name: str, **context: Any) -> str:
         return self._env.get_template(template_name).render(**context)
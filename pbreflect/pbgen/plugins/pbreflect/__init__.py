@@ -1,14 +1,55 @@
 """PbReflect protoc plugin — generates typed gRPC client wrappers."""
 
+import fnmatch
+import pprint
+import re
 import sys
+from collections.abc import Mapping, Sequence
+from importlib import metadata
 from pathlib import Path
+from typing import Any
 
 from google.protobuf import descriptor_pb2
 from google.protobuf.compiler import plugin_pb2 as plugin
 
 from pbreflect.pbgen.plugins.base import TemplateRenderer, parse_plugin_parameters
+from pbreflect.pbgen.plugins.pbreflect import runtime
+from pbreflect.pbgen.plugins.pbreflect.pagination import detect_pagination, index_messages, item_annotation
+from pbreflect.pbgen.plugins.pbreflect.service_config import build_service_config, load_service_config
 from pbreflect.protorecover.reflection_client import GrpcReflectionClient
 
+RUNTIME_MODULE = "_pbreflect_runtime"
+_RUNTIME_SOURCE = Path(__file__).parent / "runtime.py"
+
+# First grpcio release whose channels accept ``_registered_method`` (sync and aio).
+REGISTERED_METHOD_MIN_GRPCIO = (1, 63)
+
+# Separates list items in plugin parameters, where "," already separates parameters.
+LIST_SEPARATOR = "+"
+
+
+def supports_registered_method(grpcio_version: str | None = None) -> bool:
+    """Check whether grpcio supports the registered-method fast path.
+
+    Args:
+        grpcio_version: Version to check; defaults to the installed grpcio
+
+    Returns:
+        True if ``channel.unary_unary(..., _registered_method=True)`` is accepted
+    """
+    if grpcio_version is None:
+        try:
+            grpcio_version = metadata.version("grpcio")
+        except metadata.PackageNotFoundError:
+            return False
+    release = tuple(int(part) for part in re.findall(r"\d+", grpcio_version)[:2])
+    return release >= REGISTERED_METHOD_MIN_GRPCIO
+
+
+def _literal(value: Any) -> str:
+    """Render a JSON-compatible value as a Python literal."""
+    return pprint.pformat(value, sort_dicts=False, width=100)
+
 
 class PbReflectPlugin:
     """Generates PbReflect client code from proto descriptors."""
@@ -20,15 +61,79 @@ class PbReflectPlugin:
             custom_dir=template_dir,
         )
 
-    def generate_code(self, proto_file: descriptor_pb2.FileDescriptorProto, async_mode: bool = True) -> str:
+    def generate_code(
+        self,
+        proto_file: descriptor_pb2.FileDescriptorProto,
+        async_mode: bool = True,
+        registered_method: bool | None = None,
+        cache_methods: Sequence[str] = (),
+        service_config: Mapping[str, Any] | None = None,
+        message_index: Mapping[str, descriptor_pb2.DescriptorProto] | None = None,
+        raw_methods: bool = False,
+    ) -> str:
+        """Render the client module for ``proto_file``.
+
+        Args:
+            proto_file: File descriptor with at least one service
+            async_mode: Generate ``grpc.aio`` clients
+            registered_method: Pass ``_registered_method=True``; detected from grpcio when None
+            cache_methods: ``package.Service/Method`` patterns (fnmatch) of unary methods that may
+                use the client's response cache in addition to ``NO_SIDE_EFFECTS`` ones
+            service_config: Override service config (see ``load_service_config``) merged over
+                the retry policies derived from method options
+            message_index: Messages of ``proto_file`` and its imports (see ``index_messages``),
+                used to detect paginated methods; defaults to the messages of ``proto_file``
+            raw_methods: Also emit ``<method>_raw`` variants that pass serialized bytes through
+
+        Returns:
+            Module source
+        """
+        if registered_method is None:
+            registered_method = supports_registered_method()
+        if message_index is None:
+            message_index = index_messages([proto_file])
+        prefix = f".{proto_file.package}" if proto_file.package else ""
+        local_types = {f"{prefix}.{message.name}" for message in proto_file.message_type}
+        services = self._descriptor_client.get_services(proto_file)
+        for service, service_proto in zip(services, proto_file.service, strict=True):
+            for method, method_proto in zip(service["methods"], service_proto.method, strict=True):
+                method["path"] = f"/{service['full_name'].lstrip('.')}/{method['original_name']}"
+                method["pagination"] = detect_pagination(method_proto, message_index)
+                if method["pagination"] is not None:
+                    method["item_type"] = item_annotation(
+                        method_proto, method["pagination"], message_index, local_types
+                    )
+                method["cacheable"] = not (method["is_client_streaming"] or method["is_server_streaming"]) and (
+                    method["idempotency_level"] == "NO_SIDE_EFFECTS"
+                    or any(fnmatch.fnmatchcase(method["path"][1:], pattern) for pattern in cache_methods)
+                )
+        service_configs = {
+            service["full_name"]: build_service_config(
+                [(service["full_name"].lstrip("."), service["methods"])], service_config
+            )
+            for service in services
+        }
+        module_config = build_service_config(
+            [(service["full_name"].lstrip("."), service["methods"]) for service in services], service_config
+        )
+        for service in services:
+            service["service_config"] = _literal(service_configs[service["full_name"]])
+            for method in service["methods"]:
+                method["hedged"] = not (method["is_client_streaming"] or method["is_server_streaming"]) and (
+                    runtime.hedging_policy(module_config, method["path"]) is not None
+                )
         return self._renderer.render(
             "client.jinja2",
             package=proto_file.package,
             imports=self._descriptor_client.get_imports(proto_file),
-            services=self._descriptor_client.get_services(proto_file),
+            services=services,
             messages=self._descriptor_client.get_messages(proto_file),
             enums=self._descriptor_client.get_enums(proto_file),
             async_mode=async_mode,
+            registered_method=registered_method,
+            service_config=_literal(module_config),
+            raw_methods=raw_methods,
+            hedged_paths=[m["path"] for service in services for m in service["methods"] if m["hedged"]],
         )
 
     def process_request(self, request: plugin.CodeGeneratorRequest) -> plugin.CodeGeneratorResponse:
@@ -37,13 +142,39 @@ class PbReflectPlugin:
 
         params = parse_plugin_parameters(request.parameter)
         async_mode = params.get("async", "true").lower() == "true"
-
+        registered_method = (
+            params["registered_method"].lower() == "true"
+            if "registered_method" in params
+            else supports_registered_method()
+        )
+        raw_methods = params.get("raw", "false").lower() == "true"
+        cache_methods = [m for m in str(params.get("cache_methods", "")).split(LIST_SEPARATOR) if m]
+        try:
+            service_config = load_service_config(params["service_config"]) if params.get("service_config") else None
+        except ValueError as e:
+            response.error = str(e)
+            return response
+
+        message_index = index_messages(request.proto_file)
         for proto_file in request.proto_file:
             if not proto_file.service:
                 continue
             output_file = response.file.add()
             output_file.name = self._descriptor_client.get_output_filename(proto_file)
-            output_file.content = self.generate_code(proto_file, async_mode=async_mode)
+            output_file.content = self.generate_code(
+                proto_file,
+                async_mode=async_mode,
+                registered_method=registered_method,
+                cache_methods=cache_methods,
+                service_config=service_config,
+                message_index=message_index,
+                raw_methods=raw_methods,
+            )
+
+        if response.file:
+            runtime_file = response.file.add()
+            runtime_file.name = f"{RUNTIME_MODULE}.py"
+            runtime_file.content = _RUNTIME_SOURCE.read_text(encoding="utf-8")
 
         return response
 
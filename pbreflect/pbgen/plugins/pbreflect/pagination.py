@@ -0,0 +1,135 @@
+"""Detection of paginated unary methods for generated pbreflect clients.
+
+Two request/response conventions are recognised, with the results in the first
+repeated (non-map) field of the response:
+
+* page tokens (AIP-158): a string ``page_token`` in the request and a string
+  ``next_page_token`` in the response; an empty next token ends the walk
+* offsets: an integer ``offset`` plus ``page_size`` or ``limit`` in the request;
+  a page shorter than the requested size, or an empty one, ends the walk
+"""
+
+from collections.abc import Collection, Iterable, Mapping
+
+from google.protobuf import descriptor_pb2
+
+from pbreflect.pbgen.field_types import INTEGER_FIELD_TYPES
+
+PAGE_TOKEN_FIELD = "page_token"
+NEXT_PAGE_TOKEN_FIELD = "next_page_token"
+OFFSET_FIELD = "offset"
+PAGE_SIZE_FIELDS = ("page_size", "limit")
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+_SCALAR_ANNOTATIONS = {
+    _Field.TYPE_STRING: "str",
+    _Field.TYPE_BYTES: "bytes",
+    _Field.TYPE_BOOL: "bool",
+    _Field.TYPE_DOUBLE: "float",
+    _Field.TYPE_FLOAT: "float",
+    _Field.TYPE_ENUM: "int",
+    **dict.fromkeys(INTEGER_FIELD_TYPES, "int"),
+}
+
+
+def index_messages(
+    proto_files: Iterable[descriptor_pb2.FileDescriptorProto],
+) -> dict[str, descriptor_pb2.DescriptorProto]:
+    """Index the messages of ``proto_files``, nested ones included.
+
+    Args:
+        proto_files: File descriptors
+
+    Returns:
+        Message descriptors keyed by fully qualified name with a leading dot
+        (``.package.Message``), the form used by ``input_type``/``type_name``
+    """
+    index: dict[str, descriptor_pb2.DescriptorProto] = {}
+
+    def add(prefix: str, messages: Iterable[descriptor_pb2.DescriptorProto]) -> None:
+        for message in messages:
+            name = f"{prefix}.{message.name}"
+            index[name] = message
+            add(name, message.nested_type)
+
+    for proto_file in proto_files:
+        add(f".{proto_file.package}" if proto_file.package else "", proto_file.message_type)
+    return index
+
+
+def _singular(field: _Field | None, *types: int) -> bool:
+    return field is not None and field.label != _Field.LABEL_REPEATED and field.type in types
+
+
+def _items_field(
+    response: descriptor_pb2.DescriptorProto, messages: Mapping[str, descriptor_pb2.DescriptorProto]
+) -> _Field | None:
+    for field in response.field:
+        if field.label != _Field.LABEL_REPEATED:
+            continue
+        entry = messages.get(field.type_name) if field.type == _Field.TYPE_MESSAGE else None
+        if entry is None or not entry.options.map_entry:
+            return field
+    return None
+
+
+def detect_pagination(
+    method: descriptor_pb2.MethodDescriptorProto, messages: Mapping[str, descriptor_pb2.DescriptorProto]
+) -> dict[str, str] | None:
+    """Recognise a paginated unary method from its request and response fields.
+
+    Args:
+        method: Method descriptor
+        messages: Message index (see :func:`index_messages`) covering its input and output types
+
+    Returns:
+        Keyword arguments for the runtime's ``Pagination``, or None when the method
+        is streaming, its messages are unknown or it follows neither convention
+    """
+    if method.client_streaming or method.server_streaming:
+        return None
+    request, response = messages.get(method.input_type), messages.get(method.output_type)
+    if request is None or response is None:
+        return None
+    items = _items_field(response, messages)
+    if items is None:
+        return None
+    request_fields = {field.name: field for field in request.field}
+    response_fields = {field.name: field for field in response.field}
+
+    if _singular(request_fields.get(PAGE_TOKEN_FIELD), _Field.TYPE_STRING) and _singular(
+        response_fields.get(NEXT_PAGE_TOKEN_FIELD), _Field.TYPE_STRING
+    ):
+        return {"items": items.name, "page_token": PAGE_TOKEN_FIELD, "next_page_token": NEXT_PAGE_TOKEN_FIELD}
+
+    page_size = next(
+        (name for name in PAGE_SIZE_FIELDS if _singular(request_fields.get(name), *INTEGER_FIELD_TYPES)), None
+    )
+    if page_size is not None and _singular(request_fields.get(OFFSET_FIELD), *INTEGER_FIELD_TYPES):
+        return {"items": items.name, "offset": OFFSET_FIELD, "page_size": page_size}
+    return None
+
+
+def item_annotation(
+    method: descriptor_pb2.MethodDescriptorProto,
+    pagination: Mapping[str, str],
+    messages: Mapping[str, descriptor_pb2.DescriptorProto],
+    local_types: Collection[str],
+) -> str:
+    """Python annotation for one result of a paginated method.
+
+    Args:
+        method: Method descriptor accepted by :func:`detect_pagination`
+        pagination: Its detected pagination
+        messages: Message index
+        local_types: Fully qualified names of messages the generated module imports by name
+
+    Returns:
+        The element type, or ``Any`` for messages the module does not import
+    """
+    response = messages[method.output_type]
+    field = next(field for field in response.field if field.name == pagination["items"])
+    if field.type == _Field.TYPE_MESSAGE:
+        return field.type_name.rsplit(".", 1)[1] if field.type_name in local_types else "Any"
+    return _SCALAR_ANNOTATIONS.get(field.type, "Any")
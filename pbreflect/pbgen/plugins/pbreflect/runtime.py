@@ -0,0 +1,1950 @@
+"""Runtime support for clients generated by pbreflect.
+
+The pbreflect plugin copies this module verbatim into the output directory as
+``_pbreflect_runtime.py``, and generated client modules import from it, so
+generated code only depends on ``grpcio``. Keep it free of pbreflect imports, and
+use ``import x`` for stdlib modules outside ``ImportPatcher``'s blacklist: the
+patcher prefixes every other ``from x import`` with the output package.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import pathlib
+import queue
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from typing import Any, NamedTuple, Protocol
+
+import grpc
+import grpc.aio
+
+DEFAULT_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+DEFAULT_LOAD_BALANCING = "round_robin"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_SEND_BUFFER = 64
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_WARM_UP_TIMEOUT = 10.0
+
+# Standard health check method; an empty request asks about the server as a whole.
+HEALTH_CHECK_METHOD = "/grpc.health.v1.Health/Check"
+
+# Keepalive pings detect dead connections behind idle-timeout proxies and load balancers
+# without waiting for a request to time out. Stock gRPC servers answer pings more frequent
+# than every 5 minutes, or pings on connections without active calls, with GOAWAY
+# "too_many_pings", so the defaults stay within that policy. Shorter intervals or
+# ``grpc.keepalive_permit_without_calls`` need matching server settings
+# (``grpc.http2.min_ping_interval_without_data_ms``, ``grpc.keepalive_permit_without_calls``).
+DEFAULT_CHANNEL_OPTIONS: dict[str, Any] = {
+    "grpc.keepalive_time_ms": 300_000,
+    "grpc.keepalive_timeout_ms": 20_000,
+    "grpc.max_send_message_length": DEFAULT_MAX_MESSAGE_BYTES,
+    "grpc.max_receive_message_length": DEFAULT_MAX_MESSAGE_BYTES,
+    "grpc.enable_retries": 1,
+}
+
+
+def channel_options(
+    options: Mapping[str, Any] | None = None,
+    *,
+    load_balancing: str | None = DEFAULT_LOAD_BALANCING,
+    local_subchannel_pool: bool = False,
+    service_config: Mapping[str, Any] | None = None,
+) -> list[tuple[str, Any]]:
+    """Merge caller options over the defaults.
+
+    Args:
+        options: Channel arguments that override the defaults
+        load_balancing: LB policy name, or None to keep gRPC's default (``pick_first``)
+        local_subchannel_pool: Give the channel its own subchannels (and so its own
+            HTTP/2 connections) instead of sharing them process-wide
+        service_config: gRPC service config applied as ``grpc.service_config``;
+            ``hedgingPolicy`` entries are left out because grpcio ignores them
+            (generated clients hedge in Python instead, see :func:`hedged_call`)
+
+    Returns:
+        Channel arguments in the form grpc expects
+    """
+    merged = dict(DEFAULT_CHANNEL_OPTIONS)
+    if load_balancing:
+        merged["grpc.lb_policy_name"] = load_balancing
+    if local_subchannel_pool:
+        merged["grpc.use_local_subchannel_pool"] = 1
+    if service_config:
+        merged["grpc.service_config"] = json.dumps(_without_hedging(service_config))
+    merged.update(options or {})
+    return list(merged.items())
+
+
+class _RoundRobinMultiCallable:
+    """Dispatches each invocation to the next channel's multicallable."""
+
+    def __init__(self, multicallables: Sequence[Any]) -> None:
+        self._next: Callable[[], Any] = itertools.cycle(multicallables).__next__
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """Invoke the next multicallable."""
+        return self._next()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        """Forward ``with_call()``, ``future()`` and friends to the next multicallable."""
+        return getattr(self._next(), name)
+
+
+class ChannelPool(grpc.Channel):
+    """A ``grpc.Channel`` spreading calls round-robin over several channels.
+
+    One HTTP/2 connection caps the number of concurrent streams (commonly 100);
+    a pool of N channels, each with its own connection, lifts that cap N-fold.
+    """
+
+    def __init__(self, channels: Sequence[grpc.Channel]) -> None:
+        """Initialize the pool.
+
+        Args:
+            channels: Channels to dispatch to; the pool closes them on ``close()``
+        """
+        if not channels:
+            raise ValueError("ChannelPool needs at least one channel")
+        self.channels = list(channels)
+
+    def _pooled(self, factory: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        return _RoundRobinMultiCallable(
+            [getattr(channel, factory)(method, *args, **kwargs) for channel in self.channels]
+        )
+
+    def unary_unary(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("unary_unary", method, *args, **kwargs)
+
+    def unary_stream(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("unary_stream", method, *args, **kwargs)
+
+    def stream_unary(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("stream_unary", method, *args, **kwargs)
+
+    def stream_stream(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("stream_stream", method, *args, **kwargs)
+
+    def subscribe(self, callback: Callable[[grpc.ChannelConnectivity], None], try_to_connect: bool = False) -> None:
+        for channel in self.channels:
+            channel.subscribe(callback, try_to_connect=try_to_connect)
+
+    def unsubscribe(self, callback: Callable[[grpc.ChannelConnectivity], None]) -> None:
+        for channel in self.channels:
+            channel.unsubscribe(callback)
+
+    def close(self) -> None:
+        for channel in self.channels:
+            channel.close()
+
+    def __enter__(self) -> "ChannelPool":
+        """Return the pool itself."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close every channel in the pool."""
+        self.close()
+
+    def __iter__(self) -> Iterator[grpc.Channel]:
+        """Iterate over the pooled channels."""
+        return iter(self.channels)
+
+    def __len__(self) -> int:
+        """Return the number of pooled channels."""
+        return len(self.channels)
+
+
+class AioChannelPool(grpc.aio.Channel):
+    """A ``grpc.aio.Channel`` spreading calls round-robin over several channels."""
+
+    def __init__(self, channels: Sequence[grpc.aio.Channel]) -> None:
+        """Initialize the pool.
+
+        Args:
+            channels: Channels to dispatch to; the pool closes them on ``close()``
+        """
+        if not channels:
+            raise ValueError("AioChannelPool needs at least one channel")
+        self.channels = list(channels)
+
+    def _pooled(self, factory: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        return _RoundRobinMultiCallable(
+            [getattr(channel, factory)(method, *args, **kwargs) for channel in self.channels]
+        )
+
+    def unary_unary(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("unary_unary", method, *args, **kwargs)
+
+    def unary_stream(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("unary_stream", method, *args, **kwargs)
+
+    def stream_unary(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("stream_unary", method, *args, **kwargs)
+
+    def stream_stream(self, method: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        return self._pooled("stream_stream", method, *args, **kwargs)
+
+    def get_state(self, try_to_connect: bool = False) -> grpc.ChannelConnectivity:
+        """Return READY if any channel is ready, else the first channel's state."""
+        states = [channel.get_state(try_to_connect) for channel in self.channels]
+        return grpc.ChannelConnectivity.READY if grpc.ChannelConnectivity.READY in states else states[0]
+
+    async def wait_for_state_change(self, last_observed_state: grpc.ChannelConnectivity) -> None:
+        await self.channels[0].wait_for_state_change(last_observed_state)
+
+    async def channel_ready(self) -> None:
+        for channel in self.channels:
+            await channel.channel_ready()
+
+    async def close(self, grace: float | None = None) -> None:
+        for channel in self.channels:
+            await channel.close(grace)
+
+    async def __aenter__(self) -> "AioChannelPool":
+        """Return the pool itself."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close every channel in the pool."""
+        await self.close()
+
+    def __iter__(self) -> Iterator[grpc.aio.Channel]:
+        """Iterate over the pooled channels."""
+        return iter(self.channels)
+
+    def __len__(self) -> int:
+        """Return the number of pooled channels."""
+        return len(self.channels)
+
+
+def connect(
+    target: str,
+    *,
+    credentials: grpc.ChannelCredentials | None = None,
+    pool_size: int = 1,
+    options: Mapping[str, Any] | None = None,
+    compression: grpc.Compression | None = None,
+    load_balancing: str | None = DEFAULT_LOAD_BALANCING,
+    interceptors: Sequence[Any] = (),
+    service_config: Mapping[str, Any] | None = None,
+    metrics: "MetricsSink | None" = None,
+) -> grpc.Channel:
+    """Open a sync channel with production defaults.
+
+    Defaults: keepalive every 5 min during calls (the most a stock server allows),
+    64 MiB message limits,
+    ``round_robin`` load balancing across resolved addresses, and retries enabled.
+    Compression is off unless ``compression`` is given; it trades CPU for bandwidth.
+    ``service_config`` supplies per-method retry policies and default timeouts.
+    ``metrics`` installs a :class:`MetricsInterceptor` ahead of ``interceptors``.
+
+    Args:
+        target: Server address, e.g. ``dns:///api.internal:443``
+        credentials: TLS credentials; an insecure channel is opened when omitted
+        pool_size: Number of channels (and HTTP/2 connections) to spread calls over
+        options: Channel arguments overriding the defaults
+        compression: Default compression for calls on the channel
+        load_balancing: LB policy name, or None for gRPC's default
+        interceptors: Client interceptors applied to every channel
+        service_config: gRPC service config (``{"methodConfig": [...]}``) for the channel
+        metrics: Sink receiving per-method call metrics
+
+    Returns:
+        A channel, or a :class:`ChannelPool` when ``pool_size > 1``
+    """
+    if pool_size < 1:
+        raise ValueError("pool_size must be at least 1")
+    if metrics is not None:
+        interceptors = [MetricsInterceptor(metrics), *interceptors]
+    args = channel_options(
+        options, load_balancing=load_balancing, local_subchannel_pool=pool_size > 1, service_config=service_config
+    )
+
+    def open_channel() -> grpc.Channel:
+        if credentials is None:
+            channel = grpc.insecure_channel(target, options=args, compression=compression)
+        else:
+            channel = grpc.secure_channel(target, credentials, options=args, compression=compression)
+        return grpc.intercept_channel(channel, *interceptors) if interceptors else channel
+
+    if pool_size == 1:
+        return open_channel()
+    return ChannelPool([open_channel() for _ in range(pool_size)])
+
+
+def connect_aio(
+    target: str,
+    *,
+    credentials: grpc.ChannelCredentials | None = None,
+    pool_size: int = 1,
+    options: Mapping[str, Any] | None = None,
+    compression: grpc.Compression | None = None,
+    load_balancing: str | None = DEFAULT_LOAD_BALANCING,
+    interceptors: Sequence[Any] = (),
+    service_config: Mapping[str, Any] | None = None,
+    metrics: "MetricsSink | None" = None,
+) -> grpc.aio.Channel:
+    """Open a ``grpc.aio`` channel with production defaults.
+
+    Takes the same arguments as :func:`connect` and returns a channel, or an
+    :class:`AioChannelPool` when ``pool_size > 1``. ``metrics`` installs the
+    interceptors from :func:`aio_metrics_interceptors`.
+    """
+    if pool_size < 1:
+        raise ValueError("pool_size must be at least 1")
+    if metrics is not None:
+        interceptors = [*aio_metrics_interceptors(metrics), *interceptors]
+    args = channel_options(
+        options, load_balancing=load_balancing, local_subchannel_pool=pool_size > 1, service_config=service_config
+    )
+
+    def open_channel() -> grpc.aio.Channel:
+        if credentials is None:
+            return grpc.aio.insecure_channel(target, options=args, compression=compression, interceptors=interceptors)
+        return grpc.aio.secure_channel(
+            target, credentials, options=args, compression=compression, interceptors=interceptors
+        )
+
+    if pool_size == 1:
+        return open_channel()
+    return AioChannelPool([open_channel() for _ in range(pool_size)])
+
+
+def _connections(channel: Any) -> list[Any]:
+    return list(channel) if isinstance(channel, ChannelPool | AioChannelPool) else [channel]
+
+
+def _check_ping(error: grpc.RpcError) -> None:
+    # A server without the pinged method still answered, which is all warm-up needs.
+    if error.code() != grpc.StatusCode.UNIMPLEMENTED:
+        raise error
+
+
+def warm_up(channel: grpc.Channel, timeout: float = DEFAULT_WARM_UP_TIMEOUT, ping: str | None = None) -> None:
+    """Connect ``channel`` (every channel of a pool) before the first real call needs it.
+
+    Waits until each connection is READY, which covers name resolution and the
+    TCP, TLS and HTTP/2 handshakes. With ``ping``, also calls that unary method with
+    an empty request on each connection, e.g. :data:`HEALTH_CHECK_METHOD`, so the
+    server side of the path is exercised too. A method the server does not
+    implement still counts as a successful ping.
+
+    Args:
+        channel: Channel or :class:`ChannelPool`
+        timeout: Seconds to wait for all connections together
+        ping: Full method path (``/package.Service/Method``) to call on each connection
+
+    Raises:
+        TimeoutError: If a connection is not ready within ``timeout``
+        grpc.RpcError: If a ping fails with anything but ``UNIMPLEMENTED``
+    """
+    deadline = time.monotonic() + timeout
+    connections = _connections(channel)
+    ready = [grpc.channel_ready_future(connection) for connection in connections]
+    try:
+        for future in ready:
+            future.result(timeout=_remaining(deadline, time.monotonic()))
+    except grpc.FutureTimeoutError:
+        raise TimeoutError(f"channel not ready within {timeout}s") from None
+    finally:
+        for future in ready:
+            future.cancel()
+    if ping is None:
+        return
+    pings = [
+        connection.unary_unary(ping).future(b"", timeout=_remaining(deadline, time.monotonic()))
+        for connection in connections
+    ]
+    for future in pings:
+        try:
+            future.result()
+        except grpc.RpcError as error:
+            _check_ping(error)
+
+
+async def warm_up_aio(
+    channel: grpc.aio.Channel,
+    timeout: float = DEFAULT_WARM_UP_TIMEOUT,  # noqa: ASYNC109 - mirrors warm_up(); also bounds the pings
+    ping: str | None = None,
+) -> None:
+    """Async counterpart of :func:`warm_up` for ``grpc.aio`` channels and :class:`AioChannelPool`."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    connections = _connections(channel)
+    try:
+        await asyncio.wait_for(asyncio.gather(*(connection.channel_ready() for connection in connections)), timeout)
+    except TimeoutError:
+        raise TimeoutError(f"channel not ready within {timeout}s") from None
+    if ping is None:
+        return
+    results = await asyncio.gather(
+        *(connection.unary_unary(ping)(b"", timeout=max(deadline - loop.time(), 0.0)) for connection in connections),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, grpc.RpcError):
+            _check_ping(result)
+        elif isinstance(result, BaseException):
+            raise result
+
+
+def _check_concurrency(concurrency: int) -> None:
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+
+def _outcome(future: grpc.Future) -> Any:
+    try:
+        return future.result()
+    except grpc.RpcError as error:
+        return error
+
+
+def call_many(
+    multicallable: Any, requests: Iterable[Any], *, concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any
+) -> list[Any]:
+    """Call a sync unary-unary method for every request, keeping at most ``concurrency`` in flight.
+
+    Calls are issued through ``future()``; a new one starts as soon as any in-flight
+    call completes, so a slow request does not stall the window.
+
+    Args:
+        multicallable: ``grpc.UnaryUnaryMultiCallable`` to invoke
+        requests: Request messages
+        concurrency: Maximum number of calls in flight
+        **kwargs: Passed to every call, e.g. ``metadata`` and ``timeout``
+
+    Returns:
+        One entry per request, in input order: the response, or the ``grpc.RpcError``
+        the call failed with
+    """
+    _check_concurrency(concurrency)
+    slots = threading.BoundedSemaphore(concurrency)
+    futures = []
+    for request in requests:
+        slots.acquire()
+        try:
+            future = multicallable.future(request, **kwargs)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        futures.append(future)
+    return [_outcome(future) for future in futures]
+
+
+def gather(
+    futures: Iterable[grpc.Future], *, timeout: float | None = None, return_exceptions: bool = False
+) -> list[Any]:
+    """Wait for sync call futures (``multicallable.future()``) and return their results.
+
+    Args:
+        futures: Futures of calls already in flight
+        timeout: Seconds to wait for all of them together; ``None`` waits indefinitely
+        return_exceptions: Return a failed call's ``grpc.RpcError`` in its place
+            instead of raising it
+
+    Returns:
+        One entry per future, in input order
+
+    Raises:
+        grpc.RpcError: The first failed call in input order, unless ``return_exceptions``
+        grpc.FutureTimeoutError: If the calls do not finish within ``timeout``
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    results = []
+    for future in futures:
+        remaining = _remaining(deadline, time.monotonic())
+        try:
+            results.append(future.result(timeout=remaining))
+        except grpc.RpcError as error:
+            if not return_exceptions:
+                raise
+            results.append(error)
+    return results
+
+
+async def call_many_aio(
+    multicallable: Any, requests: Iterable[Any], *, concurrency: int = DEFAULT_CONCURRENCY, **kwargs: Any
+) -> list[Any]:
+    """Async counterpart of :func:`call_many`, bounded by an ``asyncio.Semaphore``.
+
+    Returns:
+        One entry per request, in input order: the response, or the ``grpc.RpcError``
+        the call failed with
+    """
+    _check_concurrency(concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(request: Any) -> Any:
+        async with semaphore:
+            try:
+                return await multicallable(request, **kwargs)
+            except grpc.RpcError as error:
+                return error
+
+    return list(await asyncio.gather(*(call(request) for request in requests)))
+
+
+_END = object()
+
+
+class _Failed(NamedTuple):
+    """Carries an exception raised by a streaming source to the consuming side."""
+
+    error: BaseException
+
+
+# How often a producer thread blocked on a full buffer checks whether its consumer has gone.
+_POLL_INTERVAL = 0.05
+
+
+def _check_buffer_size(name: str, size: int) -> None:
+    if size < 1:
+        raise ValueError(f"{name} must be at least 1")
+
+
+def _put(buffer: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=_POLL_INTERVAL)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def _pump(source: Iterable[Any], buffer: "queue.Queue[Any]", stop: threading.Event) -> None:
+    try:
+        for item in source:
+            if not _put(buffer, item, stop):
+                return
+    except Exception as error:
+        _put(buffer, _Failed(error), stop)
+    else:
+        _put(buffer, _END, stop)
+
+
+def _start_pump(source: Iterable[Any], maxsize: int) -> tuple["queue.Queue[Any]", threading.Event]:
+    buffer: queue.Queue[Any] = queue.Queue(maxsize)
+    stop = threading.Event()
+    threading.Thread(target=_pump, args=(source, buffer, stop), name="pbreflect-stream", daemon=True).start()
+    return buffer, stop
+
+
+async def _pump_aio(source: AsyncIterable[Any] | Iterable[Any], buffer: "asyncio.Queue[Any]") -> None:
+    try:
+        if isinstance(source, AsyncIterable):
+            async for item in source:
+                await buffer.put(item)
+        else:
+            for item in source:
+                await buffer.put(item)
+    except Exception as error:
+        await buffer.put(_Failed(error))
+    else:
+        await buffer.put(_END)
+
+
+def _unwrap(item: Any) -> Any:
+    if isinstance(item, _Failed):
+        raise item.error
+    return item
+
+
+def buffered_requests(requests: Iterable[Any], buffer_size: int = DEFAULT_SEND_BUFFER) -> Generator[Any, None, None]:
+    """Read ``requests`` on a background thread, at most ``buffer_size`` messages ahead of the send.
+
+    gRPC pulls the next request only once the previous one is written, so producing
+    messages (reading a file, a database cursor) normally alternates with sending them.
+    Pass the result as the request iterator of a client-streaming call to overlap the
+    two; when the connection's flow control window is full the buffer fills and the
+    producer blocks, so memory stays bounded. An exception raised by ``requests``
+    is re-raised to gRPC, which cancels the call.
+
+    Args:
+        requests: Request messages
+        buffer_size: Maximum number of messages read ahead
+
+    Yields:
+        The messages of ``requests``, in order
+    """
+    _check_buffer_size("buffer_size", buffer_size)
+    buffer, stop = _start_pump(requests, buffer_size)
+    try:
+        while (item := buffer.get()) is not _END:
+            yield _unwrap(item)
+    finally:
+        stop.set()
+
+
+async def buffered_requests_aio(
+    requests: AsyncIterable[Any] | Iterable[Any], buffer_size: int = DEFAULT_SEND_BUFFER
+) -> AsyncIterator[Any]:
+    """Async counterpart of :func:`buffered_requests`; ``requests`` is read by a task and may be async."""
+    _check_buffer_size("buffer_size", buffer_size)
+    buffer: asyncio.Queue[Any] = asyncio.Queue(buffer_size)
+    producer = asyncio.ensure_future(_pump_aio(requests, buffer))
+    try:
+        while (item := await buffer.get()) is not _END:
+            yield _unwrap(item)
+    finally:
+        producer.cancel()
+
+
+def _cancel(responses: Any) -> None:
+    cancel = getattr(responses, "cancel", None)
+    if cancel is not None:
+        cancel()
+
+
+def iter_batches(
+    responses: Iterable[Any], size: int = DEFAULT_BATCH_SIZE, max_wait: float | None = None
+) -> Generator[list[Any], None, None]:
+    """Group the responses of a server-streaming call into lists of up to ``size``.
+
+    Without ``max_wait`` a batch is yielded once it is full or the stream ends. With it,
+    responses are read on a background thread and a batch is also yielded once its
+    first response has waited ``max_wait`` seconds, so a slow stream still delivers
+    promptly. Leaving the loop early cancels the call. A stream error is raised after
+    the responses received before it have been yielded.
+
+    Args:
+        responses: Response iterator of a server-streaming call
+        size: Maximum number of responses per batch
+        max_wait: Seconds a batch may wait for more responses once it is started
+
+    Yields:
+        Lists of responses, in stream order
+    """
+    _check_buffer_size("size", size)
+    if max_wait is None:
+        iterator = iter(responses)
+        try:
+            while batch := list(itertools.islice(iterator, size)):
+                yield batch
+        finally:
+            _cancel(responses)
+        return
+
+    buffer, stop = _start_pump(responses, size)
+    try:
+        item = buffer.get()
+        while item is not _END:
+            batch, deadline = [_unwrap(item)], time.monotonic() + max_wait
+            while len(batch) < size:
+                try:
+                    item = buffer.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = None
+                    break
+                if item is _END or isinstance(item, _Failed):
+                    break
+                batch.append(item)
+            yield batch
+            if item is None or len(batch) == size:
+                item = buffer.get()
+    finally:
+        stop.set()
+        _cancel(responses)
+
+
+async def iter_batches_aio(
+    responses: AsyncIterable[Any], size: int = DEFAULT_BATCH_SIZE, max_wait: float | None = None
+) -> AsyncIterator[list[Any]]:
+    """Async counterpart of :func:`iter_batches`; with ``max_wait`` responses are read by a task."""
+    _check_buffer_size("size", size)
+    buffer: asyncio.Queue[Any] = asyncio.Queue(size)
+    reader = asyncio.ensure_future(_pump_aio(responses, buffer))
+    loop = asyncio.get_running_loop()
+    try:
+        item = await buffer.get()
+        while item is not _END:
+            batch = [_unwrap(item)]
+            deadline = None if max_wait is None else loop.time() + max_wait
+            while len(batch) < size:
+                try:
+                    if buffer.empty():
+                        timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                        item = await asyncio.wait_for(buffer.get(), timeout)
+                    else:
+                        item = buffer.get_nowait()
+                except TimeoutError:
+                    item = None
+                    break
+                if item is _END or isinstance(item, _Failed):
+                    break
+                batch.append(item)
+            yield batch
+            if item is None or len(batch) == size:
+                item = await buffer.get()
+    finally:
+        reader.cancel()
+        _cancel(responses)
+
+
+class Pagination(NamedTuple):
+    """How a unary method pages its results: by page token or by offset.
+
+    Set ``page_token``/``next_page_token`` for the token convention, or
+    ``offset``/``page_size`` for the offset one; ``items`` names the repeated
+    response field holding the results.
+    """
+
+    items: str
+    page_token: str = ""
+    next_page_token: str = ""
+    offset: str = ""
+    page_size: str = ""
+
+    def next_request(self, request: Any, response: Any) -> Any:
+        """Return the request for the page after ``response``, or None after the last page."""
+        if self.next_page_token:
+            token = getattr(response, self.next_page_token)
+            if not token:
+                return None
+            field, value = self.page_token, token
+        else:
+            count = len(getattr(response, self.items))
+            limit = getattr(request, self.page_size)
+            if count == 0 or (limit and count < limit):
+                return None
+            field, value = self.offset, getattr(request, self.offset) + count
+        next_request = type(request)()
+        next_request.CopyFrom(request)
+        setattr(next_request, field, value)
+        return next_request
+
+
+def iter_pages(
+    multicallable: Any, request: Any, pagination: Pagination, *, prefetch: bool = True, **kwargs: Any
+) -> Generator[Any, None, None]:
+    """Call a sync paginated method page after page.
+
+    With ``prefetch`` the next page is requested through ``future()`` as soon as
+    the current one arrives, so it is in flight while the caller works through the
+    current page. Leaving the loop early cancels a prefetched call.
+
+    Args:
+        multicallable: ``grpc.UnaryUnaryMultiCallable`` of the method
+        request: Request for the first page
+        pagination: The method's pagination fields
+        prefetch: Request each page before the previous one is consumed
+        **kwargs: Passed to every call, e.g. ``metadata`` and ``timeout``
+
+    Yields:
+        Response pages, in order
+    """
+    future = multicallable.future(request, **kwargs)
+    try:
+        while future is not None:
+            response = future.result()
+            request = pagination.next_request(request, response)
+            future = None
+            if prefetch and request is not None:
+                future = multicallable.future(request, **kwargs)
+            yield response
+            if not prefetch and request is not None:
+                future = multicallable.future(request, **kwargs)
+    finally:
+        if future is not None:
+            future.cancel()
+
+
+async def iter_pages_aio(
+    multicallable: Any, request: Any, pagination: Pagination, *, prefetch: bool = True, **kwargs: Any
+) -> AsyncIterator[Any]:
+    """Async counterpart of :func:`iter_pages`; prefetched pages are ``grpc.aio`` calls in flight."""
+    call = multicallable(request, **kwargs)
+    try:
+        while call is not None:
+            response = await call
+            request = pagination.next_request(request, response)
+            call = None
+            if prefetch and request is not None:
+                call = multicallable(request, **kwargs)
+            yield response
+            if not prefetch and request is not None:
+                call = multicallable(request, **kwargs)
+    finally:
+        if call is not None:
+            call.cancel()
+
+
+class ResponseCache:
+    """In-process TTL/LRU cache of unary responses, keyed by method path and request bytes.
+
+    Generated clients consult it for methods marked ``NO_SIDE_EFFECTS`` (or selected
+    with ``--cache-method``) when constructed with ``cache=ResponseCache(...)``.
+    Cached responses are shared between callers and must be treated as read-only.
+    Errors are never cached. The key ignores metadata, so give clients acting on
+    behalf of different identities their own cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached responses; the least recently used is dropped first
+            ttl: Seconds a response stays valid
+            clock: Monotonic time source, replaceable in tests
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, bytes], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[str, bytes], asyncio.Future[Any]] = {}
+
+    @staticmethod
+    def key(method: str, request: Any) -> tuple[str, bytes]:
+        """Return the cache key for ``request`` sent to ``method``."""
+        return method, request.SerializeToString(deterministic=True)
+
+    def get(self, key: tuple[str, bytes]) -> tuple[bool, Any]:
+        """Look up ``key``, counting a hit or a miss.
+
+        Returns:
+            ``(True, response)`` on a hit, ``(False, None)`` otherwise
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: tuple[str, bytes], response: Any) -> None:
+        """Store ``response`` under ``key``, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def call(self, method: str, request: Any, invoke: Callable[[], Any]) -> Any:
+        """Return the cached response for ``request`` or call ``invoke()`` and cache its result."""
+        key = self.key(method, request)
+        found, response = self.get(key)
+        if found:
+            return response
+        response = invoke()
+        self.put(key, response)
+        return response
+
+    async def call_aio(self, method: str, request: Any, invoke: Callable[[], Awaitable[Any]]) -> Any:
+        """Async :meth:`call`; concurrent identical requests share a single in-flight call."""
+        key = self.key(method, request)
+        found, response = self.get(key)
+        if found:
+            return response
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not inflight.cancelled() or (task is not None and task.cancelling()):
+                    raise
+            # The call we joined was cancelled by its own caller; make our own.
+            return await self.call_aio(method, request, invoke)
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await invoke()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Waiters re-raise the error; retrieve it here so an unawaited future does not log it.
+            future.exception()
+            raise
+        else:
+            self.put(key, response)
+            future.set_result(response)
+            return response
+        finally:
+            del self._inflight[key]
+
+    def clear(self) -> None:
+        """Drop every cached response; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+
+def parse_duration(value: str | float) -> float:
+    """Convert a service config duration such as ``"0.25s"`` to seconds."""
+    if isinstance(value, int | float):
+        return float(value)
+    if not value.endswith("s"):
+        raise ValueError(f"Invalid duration {value!r}: expected seconds with an 's' suffix, e.g. '0.5s'")
+    return float(value[:-1])
+
+
+def status_code(value: str | int) -> grpc.StatusCode:
+    """Convert a service config status code (``"UNAVAILABLE"`` or ``14``) to ``grpc.StatusCode``."""
+    for code in grpc.StatusCode:
+        if value in (code.name, code.value[0]):
+            return code
+    raise ValueError(f"Unknown status code {value!r}")
+
+
+def method_config(service_config: Mapping[str, Any], path: str) -> Mapping[str, Any] | None:
+    """Return the ``methodConfig`` entry that applies to ``path`` (``/package.Service/Method``).
+
+    As in gRPC, an entry naming the method wins over one naming only its service,
+    which wins over a default entry with an empty name.
+    """
+    service, _, method = path.lstrip("/").partition("/")
+    best: Mapping[str, Any] | None = None
+    best_rank = 0
+    for entry in service_config.get("methodConfig", ()):
+        for name in entry.get("name", ()):
+            name_service, name_method = name.get("service", ""), name.get("method", "")
+            if name_method:
+                rank = 3 if (name_service, name_method) == (service, method) else 0
+            elif name_service:
+                rank = 2 if name_service == service else 0
+            else:
+                rank = 1
+            if rank > best_rank:
+                best, best_rank = entry, rank
+    return best
+
+
+def _without_hedging(service_config: Mapping[str, Any]) -> dict[str, Any]:
+    config = dict(service_config)
+    if "methodConfig" in config:
+        config["methodConfig"] = [
+            {key: value for key, value in entry.items() if key != "hedgingPolicy"} for entry in config["methodConfig"]
+        ]
+    return config
+
+
+# gRPC caps retry and hedging attempts at 5 regardless of the configured value.
+MAX_ATTEMPTS = 5
+
+
+class HedgingPolicy(NamedTuple):
+    """Hedging settings of a method, parsed from its service config entry.
+
+    grpcio implements ``retryPolicy`` and ``timeout`` but ignores ``hedgingPolicy``;
+    generated clients apply it with :func:`hedged_call` / :func:`hedged_call_aio`.
+    """
+
+    max_attempts: int
+    delay: float
+    non_fatal_codes: frozenset[grpc.StatusCode]
+    timeout: float | None = None
+
+    @classmethod
+    def from_method_config(cls, entry: Mapping[str, Any]) -> "HedgingPolicy | None":
+        """Parse the ``hedgingPolicy`` of a ``methodConfig`` entry, or return None if it has none.
+
+        Raises:
+            ValueError: If the policy is invalid
+        """
+        policy = entry.get("hedgingPolicy")
+        if policy is None:
+            return None
+        max_attempts = int(policy.get("maxAttempts", 0))
+        if max_attempts < 2:
+            raise ValueError("hedgingPolicy.maxAttempts must be at least 2")
+        return cls(
+            max_attempts=min(max_attempts, MAX_ATTEMPTS),
+            delay=parse_duration(policy.get("hedgingDelay", "0s")),
+            non_fatal_codes=frozenset(status_code(code) for code in policy.get("nonFatalStatusCodes", ())),
+            timeout=parse_duration(entry["timeout"]) if "timeout" in entry else None,
+        )
+
+
+def hedging_policy(service_config: Mapping[str, Any], path: str) -> HedgingPolicy | None:
+    """Return the hedging policy that applies to ``path``, if any."""
+    entry = method_config(service_config, path)
+    return None if entry is None else HedgingPolicy.from_method_config(entry)
+
+
+def _remaining(deadline: float | None, now: float) -> float | None:
+    return None if deadline is None else max(deadline - now, 0.0)
+
+
+def hedged_call(
+    multicallable: Any, request: Any, policy: HedgingPolicy, *, timeout: float | None = None, **kwargs: Any
+) -> Any:
+    """Call a sync unary-unary method, sending another copy of the request every ``policy.delay``.
+
+    The first successful response wins and the other attempts are cancelled. An
+    attempt failing with a non-fatal status sends the next copy immediately; any
+    other failure is raised at once. All attempts share one deadline: ``timeout``,
+    or the method's service config timeout.
+
+    Args:
+        multicallable: ``grpc.UnaryUnaryMultiCallable`` to invoke
+        request: Request message
+        policy: Hedging policy of the method
+        timeout: Overall deadline in seconds
+        **kwargs: Passed to every attempt, e.g. ``metadata``
+
+    Returns:
+        The first successful response
+    """
+    timeout = policy.timeout if timeout is None else timeout
+    deadline = None if timeout is None else time.monotonic() + timeout
+    completed: queue.SimpleQueue[grpc.Future] = queue.SimpleQueue()
+    attempts: list[grpc.Future] = []
+    error: grpc.RpcError | None = None
+    finished = 0
+    hedge = True
+    try:
+        while True:
+            if hedge and len(attempts) < policy.max_attempts:
+                attempt = multicallable.future(request, timeout=_remaining(deadline, time.monotonic()), **kwargs)
+                attempt.add_done_callback(completed.put)
+                attempts.append(attempt)
+            hedge = False
+            if finished == len(attempts) and error is not None:
+                raise error
+            try:
+                attempt = completed.get(timeout=policy.delay if len(attempts) < policy.max_attempts else None)
+            except queue.Empty:
+                hedge = True
+                continue
+            finished += 1
+            try:
+                return attempt.result()
+            except grpc.RpcError as exc:
+                if exc.code() not in policy.non_fatal_codes:  # type: ignore[attr-defined]
+                    raise
+                error = exc
+                hedge = True
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+
+
+async def hedged_call_aio(
+    multicallable: Any,
+    request: Any,
+    policy: HedgingPolicy,
+    *,
+    timeout: float | None = None,  # noqa: ASYNC109 - the call deadline, passed to grpc
+    **kwargs: Any,
+) -> Any:
+    """Async counterpart of :func:`hedged_call` for ``grpc.aio`` multicallables."""
+    loop = asyncio.get_running_loop()
+    timeout = policy.timeout if timeout is None else timeout
+    deadline = None if timeout is None else loop.time() + timeout
+    started = 0
+    pending: set[asyncio.Future[Any]] = set()
+    error: BaseException | None = None
+    hedge = True
+    try:
+        while True:
+            if hedge and started < policy.max_attempts:
+                call = multicallable(request, timeout=_remaining(deadline, loop.time()), **kwargs)
+                pending.add(asyncio.ensure_future(call))
+                started += 1
+            hedge = False
+            if not pending and error is not None:
+                raise error
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=policy.delay if started < policy.max_attempts else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            hedge = not done
+            for attempt in done:
+                exc = attempt.exception()
+                if exc is None:
+                    return attempt.result()
+                if not isinstance(exc, grpc.RpcError) or exc.code() not in policy.non_fatal_codes:  # type: ignore[attr-defined]
+                    raise exc
+                error = exc
+                hedge = True
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+
+
+# Upper bounds, in seconds, of the latency histogram buckets (Prometheus client defaults).
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsSink(Protocol):
+    """Receives one record per finished call from the metrics interceptors."""
+
+    def record(
+        self, method: str, code: grpc.StatusCode, seconds: float, request_bytes: int, response_bytes: int
+    ) -> None:
+        """Record a finished call to ``method`` (``/package.Service/Method``)."""
+
+
+class MethodMetrics:
+    """Aggregated metrics of one method."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Initialize empty metrics with the given latency bucket bounds."""
+        self.buckets = tuple(buckets)
+        self.calls = 0
+        self.errors: dict[str, int] = {}
+        self.latency_counts = [0] * (len(self.buckets) + 1)
+        self.latency_sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def add(self, code: grpc.StatusCode, seconds: float, request_bytes: int, response_bytes: int) -> None:
+        """Add one call."""
+        self.calls += 1
+        if code is not grpc.StatusCode.OK:
+            self.errors[code.name] = self.errors.get(code.name, 0) + 1
+        index = next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))
+        self.latency_counts[index] += 1
+        self.latency_sum += seconds
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+
+    def copy(self) -> "MethodMetrics":
+        """Return an independent copy."""
+        other = MethodMetrics(self.buckets)
+        other.__dict__.update(self.__dict__, errors=dict(self.errors), latency_counts=list(self.latency_counts))
+        return other
+
+
+class InMemoryMetrics:
+    """Thread-safe :class:`MetricsSink` aggregating calls per method in memory."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Initialize the sink.
+
+        Args:
+            buckets: Ascending latency histogram bounds in seconds; an implicit ``+Inf`` bucket follows
+        """
+        self.buckets = tuple(buckets)
+        self._methods: dict[str, MethodMetrics] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, method: str, code: grpc.StatusCode, seconds: float, request_bytes: int, response_bytes: int
+    ) -> None:
+        """Add a finished call to the metrics of ``method``."""
+        with self._lock:
+            metrics = self._methods.get(method)
+            if metrics is None:
+                metrics = self._methods[method] = MethodMetrics(self.buckets)
+            metrics.add(code, seconds, request_bytes, response_bytes)
+
+    def snapshot(self) -> dict[str, MethodMetrics]:
+        """Return a copy of the metrics of every method, keyed by method path."""
+        with self._lock:
+            return {method: metrics.copy() for method, metrics in self._methods.items()}
+
+    def reset(self) -> None:
+        """Drop everything recorded so far."""
+        with self._lock:
+            self._methods.clear()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(metrics: InMemoryMetrics, prefix: str = "grpc_client") -> str:
+    """Render ``metrics`` in the Prometheus text exposition format.
+
+    Args:
+        metrics: Sink to export
+        prefix: Metric name prefix
+
+    Returns:
+        ``{prefix}_calls_total``, ``{prefix}_errors_total`` (by ``code``),
+        ``{prefix}_latency_seconds`` (histogram) and ``{prefix}_{request,response}_bytes_total``,
+        all labelled by ``method``
+    """
+    snapshot = sorted(metrics.snapshot().items())
+    lines = [f"# HELP {prefix}_calls_total Finished calls.", f"# TYPE {prefix}_calls_total counter"]
+    lines += [f'{prefix}_calls_total{{method="{_label(method)}"}} {m.calls}' for method, m in snapshot]
+    lines += [
+        f"# HELP {prefix}_errors_total Calls that ended with a non-OK status.",
+        f"# TYPE {prefix}_errors_total counter",
+    ]
+    lines += [
+        f'{prefix}_errors_total{{method="{_label(method)}",code="{code}"}} {count}'
+        for method, m in snapshot
+        for code, count in sorted(m.errors.items())
+    ]
+    lines += [f"# HELP {prefix}_latency_seconds Call latency.", f"# TYPE {prefix}_latency_seconds histogram"]
+    for method, m in snapshot:
+        label = _label(method)
+        for bound, count in zip(
+            (*(repr(b) for b in m.buckets), "+Inf"), itertools.accumulate(m.latency_counts), strict=True
+        ):
+            lines.append(f'{prefix}_latency_seconds_bucket{{method="{label}",le="{bound}"}} {count}')
+        lines.append(f'{prefix}_latency_seconds_sum{{method="{label}"}} {m.latency_sum!r}')
+        lines.append(f'{prefix}_latency_seconds_count{{method="{label}"}} {m.calls}')
+    for kind in ("request", "response"):
+        name = f"{prefix}_{kind}_bytes_total"
+        lines += [f"# HELP {name} Serialized {kind} message bytes.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{method="{_label(method)}"}} {getattr(m, f"{kind}_bytes")}' for method, m in snapshot]
+    return "\n".join(lines) + "\n"
+
+
+def _message_size(message: Any) -> int:
+    size = getattr(message, "ByteSize", None)
+    if size is not None:
+        return int(size())
+    return len(message) if isinstance(message, bytes) else 0
+
+
+def _method_name(client_call_details: Any) -> str:
+    method = client_call_details.method
+    return method.decode() if isinstance(method, bytes) else method
+
+
+class _CallRecorder:
+    """Collects the byte counts of one call and reports it to the sink exactly once."""
+
+    def __init__(self, sink: MetricsSink, method: str) -> None:
+        self.sink = sink
+        self.method = method
+        self.started = time.perf_counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.recorded = False
+
+    def finish(self, code: grpc.StatusCode) -> None:
+        if not self.recorded:
+            self.recorded = True
+            self.sink.record(
+                self.method, code, time.perf_counter() - self.started, self.request_bytes, self.response_bytes
+            )
+
+    def count_requests(self, requests: Iterable[Any]) -> Iterator[Any]:
+        for request in requests:
+            self.request_bytes += _message_size(request)
+            yield request
+
+    async def count_requests_aio(self, requests: Any) -> Any:
+        async for request in requests:
+            self.request_bytes += _message_size(request)
+            yield request
+
+
+class _MeteredResponses:
+    """Wraps a sync response stream, counting bytes and recording success when it is exhausted."""
+
+    def __init__(self, call: Any, recorder: _CallRecorder) -> None:
+        self._call = call
+        self._recorder = recorder
+
+    def __iter__(self) -> "_MeteredResponses":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            response = next(self._call)
+        except StopIteration:
+            self._recorder.finish(grpc.StatusCode.OK)
+            raise
+        self._recorder.response_bytes += _message_size(response)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate ``cancel()``, ``code()``, ``trailing_metadata()`` and friends to the call."""
+        return getattr(self._call, name)
+
+
+class MetricsInterceptor(
+    grpc.UnaryUnaryClientInterceptor,
+    grpc.UnaryStreamClientInterceptor,
+    grpc.StreamUnaryClientInterceptor,
+    grpc.StreamStreamClientInterceptor,
+):
+    """Sync client interceptor reporting every call to a :class:`MetricsSink`.
+
+    Unary responses are recorded when the call completes; streamed responses once the
+    stream is exhausted or the call fails.
+    """
+
+    def __init__(self, sink: MetricsSink) -> None:
+        """Initialize the interceptor with the sink receiving the records."""
+        self.sink = sink
+
+    def _unary_response(self, recorder: _CallRecorder, outcome: Any) -> Any:
+        def done(call: Any) -> None:
+            code = call.code()
+            if code is grpc.StatusCode.OK:
+                recorder.response_bytes = _message_size(call.result())
+            recorder.finish(code)
+
+        outcome.add_done_callback(done)
+        return outcome
+
+    def _stream_response(self, recorder: _CallRecorder, call: Any) -> Any:
+        def done(call: Any) -> None:
+            code = call.code()
+            if code is not grpc.StatusCode.OK:
+                recorder.finish(code)
+
+        call.add_done_callback(done)
+        return _MeteredResponses(call, recorder)
+
+    def intercept_unary_unary(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        recorder.request_bytes = _message_size(request)
+        return self._unary_response(recorder, continuation(client_call_details, request))
+
+    def intercept_unary_stream(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        recorder.request_bytes = _message_size(request)
+        return self._stream_response(recorder, continuation(client_call_details, request))
+
+    def intercept_stream_unary(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        outcome = continuation(client_call_details, recorder.count_requests(request_iterator))
+        return self._unary_response(recorder, outcome)
+
+    def intercept_stream_stream(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        call = continuation(client_call_details, recorder.count_requests(request_iterator))
+        return self._stream_response(recorder, call)
+
+
+class _AioMetrics:
+    """Shared part of the ``grpc.aio`` metrics interceptors."""
+
+    def __init__(self, sink: MetricsSink) -> None:
+        self.sink = sink
+
+    @staticmethod
+    def _requests(recorder: _CallRecorder, request_iterator: Any) -> Any:
+        if request_iterator is None:
+            return None
+        if hasattr(request_iterator, "__aiter__"):
+            return recorder.count_requests_aio(request_iterator)
+        return recorder.count_requests(request_iterator)
+
+    @staticmethod
+    async def _unary_response(recorder: _CallRecorder, call: Any) -> Any:
+        try:
+            response = await call
+        except grpc.RpcError as error:
+            recorder.finish(error.code())  # type: ignore[attr-defined]
+        except asyncio.CancelledError:
+            recorder.finish(grpc.StatusCode.CANCELLED)
+            raise
+        else:
+            recorder.response_bytes = _message_size(response)
+            recorder.finish(grpc.StatusCode.OK)
+        # The call is done; awaiting it again yields the response or raises its error.
+        return call
+
+    @staticmethod
+    async def _stream_response(recorder: _CallRecorder, call: Any) -> Any:
+        try:
+            async for response in call:
+                recorder.response_bytes += _message_size(response)
+                yield response
+        except grpc.RpcError as error:
+            recorder.finish(error.code())  # type: ignore[attr-defined]
+            raise
+        finally:
+            recorder.finish(grpc.StatusCode.OK if call.done() else grpc.StatusCode.CANCELLED)
+
+
+class _AioUnaryUnaryMetrics(_AioMetrics, grpc.aio.UnaryUnaryClientInterceptor):
+    async def intercept_unary_unary(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        recorder.request_bytes = _message_size(request)
+        return await self._unary_response(recorder, await continuation(client_call_details, request))
+
+
+class _AioUnaryStreamMetrics(_AioMetrics, grpc.aio.UnaryStreamClientInterceptor):
+    async def intercept_unary_stream(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        recorder.request_bytes = _message_size(request)
+        return self._stream_response(recorder, await continuation(client_call_details, request))
+
+
+class _AioStreamUnaryMetrics(_AioMetrics, grpc.aio.StreamUnaryClientInterceptor):
+    async def intercept_stream_unary(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        call = await continuation(client_call_details, self._requests(recorder, request_iterator))
+        return await self._unary_response(recorder, call)
+
+
+class _AioStreamStreamMetrics(_AioMetrics, grpc.aio.StreamStreamClientInterceptor):
+    async def intercept_stream_stream(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        recorder = _CallRecorder(self.sink, _method_name(client_call_details))
+        call = await continuation(client_call_details, self._requests(recorder, request_iterator))
+        return self._stream_response(recorder, call)
+
+
+def aio_metrics_interceptors(sink: MetricsSink) -> list[Any]:
+    """Return ``grpc.aio`` interceptors reporting every call to ``sink``, like :class:`MetricsInterceptor`.
+
+    ``grpc.aio`` files an interceptor under only the first call kind it implements,
+    so there is one per kind. Streamed responses are counted while they are read with
+    ``async for``; responses read with ``call.read()`` are not.
+    """
+    return [
+        _AioUnaryUnaryMetrics(sink),
+        _AioUnaryStreamMetrics(sink),
+        _AioStreamUnaryMetrics(sink),
+        _AioStreamStreamMetrics(sink),
+    ]
+
+
+def instrument(channel: grpc.Channel, sink: MetricsSink) -> grpc.Channel:
+    """Wrap a sync channel so every call through it is reported to ``sink``.
+
+    ``grpc.aio`` channels take interceptors only when they are created; pass
+    ``metrics=`` to :func:`connect_aio` instead. The wrapper is kept on ``channel``
+    for each sink, so clients built repeatedly on the same channel and sink share
+    one wrapper and its multicallables, and it is collected with the channel.
+    """
+    try:
+        wrappers: dict[int, tuple[MetricsSink, grpc.Channel]] = channel.__dict__.setdefault(
+            "_pbreflect_instrumented", {}
+        )
+    except AttributeError:
+        return grpc.intercept_channel(channel, MetricsInterceptor(sink))
+    # Keyed by id(): sinks need not be hashable. The entry keeps its sink alive, so the id is not reused.
+    entry = wrappers.get(id(sink))
+    if entry is None:
+        entry = wrappers.setdefault(id(sink), (sink, grpc.intercept_channel(channel, MetricsInterceptor(sink))))
+    return entry[1]
+
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class CassetteMissError(LookupError):
+    """A replayed call has no recording in the cassette."""
+
+
+class Recording(NamedTuple):
+    """One recorded call.
+
+    Attributes:
+        code: Final status
+        details: Status details
+        responses: Serialized responses; one for a successful unary response, none for a failed one
+    """
+
+    code: grpc.StatusCode
+    details: str
+    responses: tuple[bytes, ...]
+
+
+def _serialize(message: Any) -> bytes:
+    if isinstance(message, bytes):
+        return message
+    # Deterministic so that equal requests with map fields hash to the same key.
+    serialized: bytes = message.SerializeToString(deterministic=True)
+    return serialized
+
+
+def request_key(requests: Iterable[bytes]) -> str:
+    """Key of a call in a cassette: a hash of its serialized requests, each length-prefixed."""
+    digest = hashlib.sha256()
+    for request in requests:
+        digest.update(len(request).to_bytes(8, "big"))
+        digest.update(request)
+    return digest.hexdigest()[:32]
+
+
+class Cassette:
+    """Recorded calls under a directory, one index and one data file per method.
+
+    ``<directory>/<package.Service>/<Method>.bin`` holds serialized responses back to
+    back and ``<Method>.json`` maps each :func:`request_key` to their offset, sizes and
+    final status. A method's index is read on its first lookup and a lookup reads only
+    that call's bytes, so the size of a cassette set does not add to test start-up.
+    Recording appends to the data files; :meth:`save` writes the indexes.
+
+    Recording the same request again replaces its entry. Record from one process at a
+    time: concurrent recorders of a method would interleave its data file.
+    """
+
+    def __init__(self, directory: "str | os.PathLike[str]") -> None:
+        """Initialize the cassette; nothing is read until the first lookup."""
+        self.directory = pathlib.Path(directory)
+        self._indexes: dict[str, dict[str, list[Any]]] = {}
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _paths(self, method: str) -> tuple[pathlib.Path, pathlib.Path]:
+        service, _, name = method.lstrip("/").rpartition("/")
+        base = self.directory / service
+        return base / f"{name}.json", base / f"{name}.bin"
+
+    def _index(self, method: str) -> dict[str, list[Any]]:
+        index = self._indexes.get(method)
+        if index is None:
+            path = self._paths(method)[0]
+            index = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            self._indexes[method] = index
+        return index
+
+    def lookup(self, method: str, key: str) -> Recording | None:
+        """Return the recording of ``method`` for request ``key``, or None."""
+        with self._lock:
+            entry = self._index(method).get(key)
+        if entry is None:
+            return None
+        offset, sizes, code, details = entry
+        with open(self._paths(method)[1], "rb") as data:
+            data.seek(offset)
+            blob = data.read(sum(sizes))
+        starts = list(itertools.accumulate(sizes, initial=0))
+        responses = tuple(blob[start : start + size] for start, size in zip(starts, sizes, strict=False))
+        return Recording(grpc.StatusCode[code], details, responses)
+
+    def record(self, method: str, key: str, recording: Recording) -> None:
+        """Append the responses of a call to ``method``'s data file and index them under ``key``."""
+        data_path = self._paths(method)[1]
+        with self._lock:
+            index = self._index(method)
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(data_path, "ab") as data:
+                offset = data.seek(0, os.SEEK_END)
+                for response in recording.responses:
+                    data.write(response)
+            index[key] = [offset, [len(r) for r in recording.responses], recording.code.name, recording.details]
+            self._dirty.add(method)
+
+    def save(self) -> None:
+        """Write the indexes of every method recorded since the last save."""
+        with self._lock:
+            for method in sorted(self._dirty):
+                path = self._paths(method)[0]
+                path.write_text(json.dumps(self._indexes[method], separators=(",", ":")), encoding="utf-8")
+            self._dirty.clear()
+
+
+def _response_parser(method: str) -> Callable[[bytes], Any]:
+    """``FromString`` of ``method``'s response type, found in the default descriptor pool.
+
+    Interceptors do not see a call's deserializer, but every generated ``_pb2`` module
+    registers its services there when the client imports it.
+    """
+    from google.protobuf import descriptor_pool, message_factory
+
+    service, _, name = method.lstrip("/").rpartition("/")
+    output_type = descriptor_pool.Default().FindServiceByName(service).methods_by_name[name].output_type
+    return message_factory.GetMessageClass(output_type).FromString
+
+
+class _CassetteCalls:
+    """Shared part of the sync and ``grpc.aio`` cassette interceptors."""
+
+    def __init__(self, cassette: Cassette, mode: str) -> None:
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"mode must be one of {CASSETTE_MODES}, got {mode!r}")
+        self.cassette = cassette
+        self.mode = mode
+        self._parsers: dict[str, Callable[[bytes], Any]] = {}
+
+    def _replay(self, method: str, requests: Sequence[bytes]) -> Recording:
+        key = request_key(requests)
+        recording = self.cassette.lookup(method, key)
+        if recording is None:
+            raise CassetteMissError(f"No recording of {method} for request key {key} in {self.cassette.directory}")
+        return recording
+
+    def _parser(self, method: str, raw: bool) -> Callable[[bytes], Any]:
+        # ``<method>_raw`` variants send and expect serialized bytes.
+        if raw:
+            return bytes
+        parser = self._parsers.get(method)
+        if parser is None:
+            parser = self._parsers[method] = _response_parser(method)
+        return parser
+
+    def _record(self, method: str, requests: Sequence[bytes], code: Any, details: Any, responses: Any) -> None:
+        self.cassette.record(method, request_key(requests), Recording(code, details or "", tuple(responses)))
+
+
+def _collect(requests: Iterable[Any], serialized: list[bytes]) -> Iterator[Any]:
+    for request in requests:
+        serialized.append(_serialize(request))
+        yield request
+
+
+async def _collect_aio(requests: Any, serialized: list[bytes]) -> Any:
+    async for request in requests:
+        serialized.append(_serialize(request))
+        yield request
+
+
+class _ReplayedCall(grpc.RpcError, grpc.Call, grpc.Future):
+    """A finished sync call answered from a cassette.
+
+    Like grpc's own finished calls it is the call, its future, its response iterator
+    and, when the recording failed, the error raised.
+    """
+
+    def __init__(self, recording: Recording, parse: Callable[[bytes], Any]) -> None:
+        super().__init__()
+        self._recording = recording
+        self._responses = map(parse, recording.responses)
+        self._parse = parse
+
+    def __str__(self) -> str:
+        return f"<replayed RPC: {self._recording.code.name}, {self._recording.details!r}>"
+
+    def code(self) -> grpc.StatusCode:
+        return self._recording.code
+
+    def details(self) -> str:
+        return self._recording.details
+
+    def initial_metadata(self) -> tuple[()]:
+        return ()
+
+    def trailing_metadata(self) -> tuple[()]:
+        return ()
+
+    def is_active(self) -> bool:
+        return False
+
+    def time_remaining(self) -> None:  # type: ignore[override]
+        return None
+
+    def cancel(self) -> bool:
+        return False
+
+    def add_callback(self, callback: Callable[[], None]) -> bool:
+        return False
+
+    def cancelled(self) -> bool:
+        return False
+
+    def running(self) -> bool:
+        return False
+
+    def done(self) -> bool:
+        return True
+
+    def result(self, timeout: float | None = None) -> Any:
+        if self._recording.code is not grpc.StatusCode.OK:
+            raise self
+        return self._parse(self._recording.responses[0])
+
+    def exception(self, timeout: float | None = None) -> "grpc.RpcError | None":
+        return None if self._recording.code is grpc.StatusCode.OK else self
+
+    def traceback(self, timeout: float | None = None) -> None:
+        return None
+
+    def add_done_callback(self, fn: Callable[[Any], None]) -> None:
+        fn(self)
+
+    def __iter__(self) -> "_ReplayedCall":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._responses)
+        except StopIteration:
+            if self._recording.code is not grpc.StatusCode.OK:
+                raise self from None
+            raise
+
+
+class _RecordedResponses:
+    """Wraps a sync response stream, recording the call once the stream ends or fails."""
+
+    def __init__(self, call: Any, finish: Callable[[Any, Any, list[bytes]], None]) -> None:
+        self._call = call
+        self._finish = finish
+        self._responses: list[bytes] = []
+
+    def __iter__(self) -> "_RecordedResponses":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            response = next(self._call)
+        except StopIteration:
+            self._finish(grpc.StatusCode.OK, "", self._responses)
+            raise
+        except grpc.RpcError as error:
+            self._finish(error.code(), error.details(), [])  # type: ignore[attr-defined]
+            raise
+        self._responses.append(_serialize(response))
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate ``cancel()``, ``code()``, ``trailing_metadata()`` and friends to the call."""
+        return getattr(self._call, name)
+
+
+class CassetteInterceptor(
+    _CassetteCalls,
+    grpc.UnaryUnaryClientInterceptor,
+    grpc.UnaryStreamClientInterceptor,
+    grpc.StreamUnaryClientInterceptor,
+    grpc.StreamStreamClientInterceptor,
+):
+    """Sync client interceptor recording calls into a :class:`Cassette` or replaying them.
+
+    In ``record`` mode calls go to the server and every finished call is stored, failed
+    ones included. In ``replay`` mode no call leaves the process: each is answered from
+    the cassette by method and request key, and one without a recording raises
+    :class:`CassetteMissError`.
+    """
+
+    def _replayed(self, method: str, serialized: list[bytes], raw: bool) -> _ReplayedCall:
+        return _ReplayedCall(self._replay(method, serialized), self._parser(method, raw))
+
+    def _unary_response(self, method: str, serialized: list[bytes], outcome: Any) -> Any:
+        def done(call: Any) -> None:
+            code = call.code()
+            responses = [_serialize(call.result())] if code is grpc.StatusCode.OK else []
+            self._record(method, serialized, code, call.details(), responses)
+
+        outcome.add_done_callback(done)
+        return outcome
+
+    def _stream_response(self, method: str, serialized: list[bytes], call: Any) -> Any:
+        def finish(code: grpc.StatusCode, details: str, responses: list[bytes]) -> None:
+            self._record(method, serialized, code, details, responses)
+
+        return _RecordedResponses(call, finish)
+
+    def intercept_unary_unary(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        method, serialized = _method_name(client_call_details), [_serialize(request)]
+        if self.mode == "replay":
+            return self._replayed(method, serialized, isinstance(request, bytes))
+        return self._unary_response(method, serialized, continuation(client_call_details, request))
+
+    def intercept_unary_stream(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        method, serialized = _method_name(client_call_details), [_serialize(request)]
+        if self.mode == "replay":
+            return self._replayed(method, serialized, isinstance(request, bytes))
+        return self._stream_response(method, serialized, continuation(client_call_details, request))
+
+    def intercept_stream_unary(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        method = _method_name(client_call_details)
+        serialized: list[bytes] = []
+        if self.mode == "replay":
+            requests = list(request_iterator)
+            serialized.extend(map(_serialize, requests))
+            return self._replayed(method, serialized, bool(requests) and isinstance(requests[0], bytes))
+        outcome = continuation(client_call_details, _collect(request_iterator, serialized))
+        return self._unary_response(method, serialized, outcome)
+
+    def intercept_stream_stream(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        method = _method_name(client_call_details)
+        serialized: list[bytes] = []
+        if self.mode == "replay":
+            requests = list(request_iterator)
+            serialized.extend(map(_serialize, requests))
+            return self._replayed(method, serialized, bool(requests) and isinstance(requests[0], bytes))
+        call = continuation(client_call_details, _collect(request_iterator, serialized))
+        return self._stream_response(method, serialized, call)
+
+
+class _AioReplayedCall(
+    grpc.aio.UnaryUnaryCall, grpc.aio.UnaryStreamCall, grpc.aio.StreamUnaryCall, grpc.aio.StreamStreamCall
+):
+    """A finished ``grpc.aio`` call answered from a cassette; awaiting or iterating it raises a recorded error."""
+
+    def __init__(self, recording: Recording, parse: Callable[[bytes], Any]) -> None:
+        self._recording = recording
+        self._responses = map(parse, recording.responses)
+        self._parse = parse
+
+    def _error(self) -> grpc.aio.AioRpcError:
+        return grpc.aio.AioRpcError(
+            self._recording.code, grpc.aio.Metadata(), grpc.aio.Metadata(), self._recording.details, None
+        )
+
+    def cancel(self) -> bool:
+        return False
+
+    def cancelled(self) -> bool:
+        return False
+
+    def done(self) -> bool:
+        return True
+
+    def add_done_callback(self, callback: Any) -> None:
+        callback(self)
+
+    def time_remaining(self) -> None:
+        return None
+
+    async def initial_metadata(self) -> grpc.aio.Metadata:
+        return grpc.aio.Metadata()
+
+    async def trailing_metadata(self) -> grpc.aio.Metadata:
+        return grpc.aio.Metadata()
+
+    async def code(self) -> grpc.StatusCode:
+        return self._recording.code
+
+    async def details(self) -> str:
+        return self._recording.details
+
+    async def wait_for_connection(self) -> None:
+        return None
+
+    async def write(self, request: Any) -> None:
+        raise grpc.aio.UsageError("A replayed call takes its requests from the request iterator")
+
+    async def done_writing(self) -> None:
+        return None
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        if self._recording.code is not grpc.StatusCode.OK:
+            raise self._error()
+        return self._parse(self._recording.responses[0])
+        yield  # pragma: no cover - makes this a generator, as ``__await__`` must be
+
+    def __aiter__(self) -> "_AioReplayedCall":
+        return self
+
+    async def __anext__(self) -> Any:
+        response = next(self._responses, _END)
+        if response is not _END:
+            return response
+        if self._recording.code is not grpc.StatusCode.OK:
+            raise self._error()
+        raise StopAsyncIteration
+
+    async def read(self) -> Any:
+        try:
+            return await self.__anext__()
+        except StopAsyncIteration:
+            return grpc.aio.EOF  # type: ignore[attr-defined]
+
+
+class _AioCassette(_CassetteCalls):
+    """Shared part of the ``grpc.aio`` cassette interceptors."""
+
+    async def _requests(self, request_iterator: Any, serialized: list[bytes]) -> Any:
+        if self.mode == "record":
+            if hasattr(request_iterator, "__aiter__"):
+                return _collect_aio(request_iterator, serialized)
+            return _collect(request_iterator, serialized)
+        if hasattr(request_iterator, "__aiter__"):
+            requests = [request async for request in request_iterator]
+        else:
+            requests = list(request_iterator)
+        serialized.extend(map(_serialize, requests))
+        return requests
+
+    def _replayed(self, method: str, serialized: list[bytes], requests: Sequence[Any]) -> _AioReplayedCall:
+        raw = bool(requests) and isinstance(requests[0], bytes)
+        return _AioReplayedCall(self._replay(method, serialized), self._parser(method, raw))
+
+    async def _unary_response(self, method: str, serialized: list[bytes], call: Any) -> Any:
+        try:
+            response = await call
+        except grpc.RpcError as error:
+            self._record(method, serialized, error.code(), error.details(), [])  # type: ignore[attr-defined]
+        else:
+            self._record(method, serialized, grpc.StatusCode.OK, "", [_serialize(response)])
+        # The call is done; awaiting it again yields the response or raises its error.
+        return call
+
+    async def _stream_response(self, method: str, serialized: list[bytes], call: Any) -> Any:
+        responses: list[bytes] = []
+        try:
+            async for response in call:
+                responses.append(_serialize(response))
+                yield response
+        except grpc.RpcError as error:
+            self._record(method, serialized, error.code(), error.details(), [])  # type: ignore[attr-defined]
+            raise
+        self._record(method, serialized, grpc.StatusCode.OK, "", responses)
+
+
+class _AioUnaryUnaryCassette(_AioCassette, grpc.aio.UnaryUnaryClientInterceptor):
+    async def intercept_unary_unary(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        method, serialized = _method_name(client_call_details), [_serialize(request)]
+        if self.mode == "replay":
+            return self._replayed(method, serialized, [request])
+        return await self._unary_response(method, serialized, await continuation(client_call_details, request))
+
+
+class _AioUnaryStreamCassette(_AioCassette, grpc.aio.UnaryStreamClientInterceptor):
+    async def intercept_unary_stream(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        method, serialized = _method_name(client_call_details), [_serialize(request)]
+        if self.mode == "replay":
+            return self._replayed(method, serialized, [request])
+        return self._stream_response(method, serialized, await continuation(client_call_details, request))
+
+
+class _AioStreamUnaryCassette(_AioCassette, grpc.aio.StreamUnaryClientInterceptor):
+    async def intercept_stream_unary(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        method = _method_name(client_call_details)
+        serialized: list[bytes] = []
+        requests = await self._requests(request_iterator, serialized)
+        if self.mode == "replay":
+            return self._replayed(method, serialized, requests)
+        return await self._unary_response(method, serialized, await continuation(client_call_details, requests))
+
+
+class _AioStreamStreamCassette(_AioCassette, grpc.aio.StreamStreamClientInterceptor):
+    async def intercept_stream_stream(self, continuation: Any, client_call_details: Any, request_iterator: Any) -> Any:
+        method = _method_name(client_call_details)
+        serialized: list[bytes] = []
+        requests = await self._requests(request_iterator, serialized)
+        if self.mode == "replay":
+            return self._replayed(method, serialized, requests)
+        return self._stream_response(method, serialized, await continuation(client_call_details, requests))
+
+
+def aio_cassette_interceptors(cassette: Cassette, mode: str) -> list[Any]:
+    """Return ``grpc.aio`` interceptors for ``cassette``, like :class:`CassetteInterceptor`.
+
+    Pass a request iterator to streaming-request calls; requests sent with
+    ``call.write()`` are not recorded. Streamed responses are recorded once they have
+    been read to the end with ``async for``.
+    """
+    return [
+        _AioUnaryUnaryCassette(cassette, mode),
+        _AioUnaryStreamCassette(cassette, mode),
+        _AioStreamUnaryCassette(cassette, mode),
+        _AioStreamStreamCassette(cassette, mode),
+    ]
+
+
+def use_cassette(channel: grpc.Channel, cassette: Cassette, mode: str) -> grpc.Channel:
+    """Wrap a sync channel so every call through it is recorded into or replayed from ``cassette``.
+
+    In ``replay`` mode the channel is never used and need not reach a server. For
+    ``grpc.aio`` channels pass :func:`aio_cassette_interceptors` when creating them.
+    """
+    return grpc.intercept_channel(channel, CassetteInterceptor(cassette, mode))
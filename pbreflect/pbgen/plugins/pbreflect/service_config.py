@@ -0,0 +1,152 @@
+"""gRPC service configs for generated pbreflect clients.
+
+Methods declared ``IDEMPOTENT`` or ``NO_SIDE_EFFECTS`` get :data:`DEFAULT_RETRY_POLICY`.
+A user-supplied override file, itself a service config, takes precedence: any
+method its ``methodConfig`` entries cover (by method, service or default name)
+keeps exactly the override entry, which is how timeouts and hedging are set.
+"""
+
+import json
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from pbreflect.pbgen.plugins.pbreflect.runtime import HedgingPolicy, method_config, parse_duration, status_code
+
+RETRYABLE_IDEMPOTENCY_LEVELS = frozenset({"IDEMPOTENT", "NO_SIDE_EFFECTS"})
+
+DEFAULT_RETRY_POLICY: dict[str, Any] = {
+    "maxAttempts": 3,
+    "initialBackoff": "0.1s",
+    "maxBackoff": "1s",
+    "backoffMultiplier": 2,
+    "retryableStatusCodes": ["UNAVAILABLE"],
+}
+
+
+def load_service_config(path: str | Path) -> dict[str, Any]:
+    """Read and validate a service config override file.
+
+    Args:
+        path: JSON file in gRPC service config format (``{"methodConfig": [...]}``)
+
+    Returns:
+        The parsed config
+
+    Raises:
+        ValueError: If the file is not valid JSON or not a valid service config
+    """
+    try:
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read service config {path}: {e}") from e
+    if not isinstance(config, dict) or not isinstance(config.get("methodConfig", []), list):
+        raise ValueError(f"Service config {path} must be an object with a 'methodConfig' list")
+    for index, entry in enumerate(config.get("methodConfig", [])):
+        _validate_method_config(entry, f"methodConfig[{index}]")
+    return config
+
+
+def _object(value: Any, path: str) -> dict[str, Any]:
+    if not isinstance(value, dict):
+        raise ValueError(f"{path} must be an object, got {value!r}")
+    return value
+
+
+def _list(value: Any, path: str) -> list[Any]:
+    if not isinstance(value, list):
+        raise ValueError(f"{path} must be a list, got {value!r}")
+    return value
+
+
+def _max_attempts(policy: dict[str, Any], path: str) -> None:
+    value = policy.get("maxAttempts", 0)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"{path}.maxAttempts must be an integer, got {value!r}")
+
+
+def _duration(value: Any, path: str) -> None:
+    if isinstance(value, bool) or not isinstance(value, str | int | float):
+        raise ValueError(f"{path} must be a duration such as '0.5s', got {value!r}")
+    try:
+        parse_duration(value)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+
+
+def _status_codes(value: Any, path: str) -> None:
+    for index, code in enumerate(_list(value, path)):
+        try:
+            status_code(code)
+        except ValueError as e:
+            raise ValueError(f"{path}[{index}]: {e}") from e
+
+
+def _validate_method_config(entry: Any, path: str) -> None:
+    entry = _object(entry, path)
+    if not isinstance(entry.get("name"), list) or not entry["name"]:
+        raise ValueError(f"{path} needs a non-empty 'name' list: {entry!r}")
+    for index, name in enumerate(entry["name"]):
+        for key, value in _object(name, f"{path}.name[{index}]").items():
+            if key in ("service", "method") and not isinstance(value, str):
+                raise ValueError(f"{path}.name[{index}].{key} must be a string, got {value!r}")
+    if "retryPolicy" in entry and "hedgingPolicy" in entry:
+        raise ValueError(f"{path} ({entry['name']!r}) sets both retryPolicy and hedgingPolicy")
+    if "timeout" in entry:
+        _duration(entry["timeout"], f"{path}.timeout")
+    if "retryPolicy" in entry:
+        policy = _object(entry["retryPolicy"], f"{path}.retryPolicy")
+        _max_attempts(policy, f"{path}.retryPolicy")
+        if policy.get("maxAttempts", 0) < 2 or not policy.get("retryableStatusCodes"):
+            raise ValueError(f"{path}.retryPolicy needs maxAttempts >= 2 and retryableStatusCodes")
+        _status_codes(policy["retryableStatusCodes"], f"{path}.retryPolicy.retryableStatusCodes")
+        for key in ("initialBackoff", "maxBackoff"):
+            if key in policy:
+                _duration(policy[key], f"{path}.retryPolicy.{key}")
+    if "hedgingPolicy" in entry:
+        policy = _object(entry["hedgingPolicy"], f"{path}.hedgingPolicy")
+        _max_attempts(policy, f"{path}.hedgingPolicy")
+        if "hedgingDelay" in policy:
+            _duration(policy["hedgingDelay"], f"{path}.hedgingPolicy.hedgingDelay")
+        _status_codes(policy.get("nonFatalStatusCodes", []), f"{path}.hedgingPolicy.nonFatalStatusCodes")
+        try:
+            HedgingPolicy.from_method_config(entry)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+
+
+def _names_service(entry: Mapping[str, Any], service: str) -> bool:
+    return any(name.get("service", "") in ("", service) for name in entry["name"])
+
+
+def build_service_config(
+    services: Iterable[tuple[str, Iterable[Mapping[str, Any]]]], overrides: Mapping[str, Any] | None = None
+) -> dict[str, Any]:
+    """Build the service config for a set of services.
+
+    Args:
+        services: ``(full service name, method dicts)`` pairs; method dicts need
+            ``path`` and ``idempotency_level``
+        overrides: Validated override config (see :func:`load_service_config`)
+
+    Returns:
+        A service config; ``{}`` when no method needs one
+    """
+    overrides = overrides or {}
+    entries: list[dict[str, Any]] = []
+    for service, methods in services:
+        retried = []
+        for method in methods:
+            if method_config(overrides, method["path"]) is None and (
+                method["idempotency_level"] in RETRYABLE_IDEMPOTENCY_LEVELS
+            ):
+                retried.append({"service": service, "method": method["path"].rsplit("/", 1)[1]})
+        for entry in overrides.get("methodConfig", []):
+            if _names_service(entry, service) and entry not in entries:
+                entries.append(entry)
+        if retried:
+            entries.append({"name": retried, "retryPolicy": dict(DEFAULT_RETRY_POLICY)})
+    config = {key: value for key, value in overrides.items() if key != "methodConfig"}
+    if entries:
+        config["methodConfig"] = entries
+    return config
@@ -10,9 +10,11 @@ from pbreflect.pbgen.plugins.base import TemplateRenderer, parse_plugin_paramete
 from pbreflect.protorecover.reflection_client import GrpcReflectionClient
 from pbreflect.utils import name_to_snake
 
+LAYOUTS = ("method", "service")
+
 
 class PbReflectTestsPlugin:
-    """Generates per-method pytest test stubs and conftest fixtures."""
+    """Generates per-method pytest test stubs, conftest fixtures and, optionally, fake servicers."""
 
     def __init__(self, template_dir: str | None = None) -> None:
         self._descriptor_client = GrpcReflectionClient(channel=None)
@@ -42,6 +44,20 @@ class PbReflectTestsPlugin:
             return None, None
         return input_type, None
 
+    @staticmethod
+    def _fake_imports(service: dict) -> tuple[list[str], list[str]]:
+        """Split the message types a fake servicer references into local names and module imports."""
+        local_types: set[str] = set()
+        extra_imports: set[str] = set()
+        for method in service["methods"]:
+            for type_path in (method["input_type"], method["output_type"]):
+                module_part, _, type_name = type_path.rpartition(".")
+                if module_part:
+                    extra_imports.add(f"from google.protobuf import {module_part}")
+                else:
+                    local_types.add(type_name)
+        return sorted(local_types), sorted(extra_imports)
+
     def generate_method_file(
         self,
         proto_file: descriptor_pb2.FileDescriptorProto,
@@ -64,8 +80,35 @@ class PbReflectTestsPlugin:
             async_mode=async_mode,
         )
 
-    def generate_root_conftest(self, *, async_mode: bool) -> str:
-        return self._renderer.render("conftest.jinja2", async_mode=async_mode)
+    def generate_service_file(
+        self,
+        proto_file: descriptor_pb2.FileDescriptorProto,
+        service: dict,
+        *,
+        client_module: str,
+        async_mode: bool,
+    ) -> str:
+        local_types: set[str] = set()
+        extra_imports: set[str] = set()
+        for method in service["methods"]:
+            local_type, extra_import = self._method_imports(method)
+            if local_type:
+                local_types.add(local_type)
+            if extra_import:
+                extra_imports.add(extra_import)
+        return self._renderer.render(
+            "test_service.jinja2",
+            service=service,
+            client_module=client_module,
+            pb2_module=self._pb2_module(proto_file),
+            pb2_pbreflect_module=self._pb2_pbreflect_module(proto_file),
+            local_types=sorted(local_types),
+            extra_imports=sorted(extra_imports),
+            async_mode=async_mode,
+        )
+
+    def generate_root_conftest(self, *, async_mode: bool, fakes: bool = False, client_module: str = "clients") -> str:
+        return self._renderer.render("conftest.jinja2", async_mode=async_mode, fakes=fakes, client_module=client_module)
 
     def generate_service_conftest(
         self,
@@ -74,6 +117,7 @@ class PbReflectTestsPlugin:
         *,
         client_module: str,
         async_mode: bool,
+        fakes: bool = False,
     ) -> str:
         return self._renderer.render(
             "conftest_service.jinja2",
@@ -81,6 +125,25 @@ class PbReflectTestsPlugin:
             client_module=client_module,
             pb2_pbreflect_module=self._pb2_pbreflect_module(proto_file),
             async_mode=async_mode,
+            fakes=fakes,
+        )
+
+    def generate_fake_file(
+        self,
+        proto_file: descriptor_pb2.FileDescriptorProto,
+        service: dict,
+        *,
+        client_module: str,
+    ) -> str:
+        local_types, extra_imports = self._fake_imports(service)
+        return self._renderer.render(
+            "fake_service.jinja2",
+            service=service,
+            service_path=f"{proto_file.package}.{service['name']}" if proto_file.package else service["name"],
+            client_module=client_module,
+            pb2_module=self._pb2_module(proto_file),
+            local_types=local_types,
+            extra_imports=extra_imports,
         )
 
     def process_request(self, request: plugin.CodeGeneratorRequest) -> plugin.CodeGeneratorResponse:
@@ -90,6 +153,10 @@ class PbReflectTestsPlugin:
         params = parse_plugin_parameters(request.parameter)
         client_module: str = params.get("client_module", "clients")
         async_mode: bool = params.get("async", "false").lower() == "true"
+        fakes: bool = params.get("fakes", "false").lower() == "true"
+        layout = params.get("layout", "method")
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown tests layout '{layout}'. Expected one of: {', '.join(LAYOUTS)}")
 
         has_services = False
 
@@ -108,20 +175,34 @@ class PbReflectTestsPlugin:
                 svc_conftest = response.file.add()
                 svc_conftest.name = f"{pkg}/conftest.py"
                 svc_conftest.content = self.generate_service_conftest(
-                    proto_file, service, client_module=client_module, async_mode=async_mode
+                    proto_file, service, client_module=client_module, async_mode=async_mode, fakes=fakes
                 )
 
-                for method in service["methods"]:
+                if fakes:
+                    fake_file = response.file.add()
+                    fake_file.name = f"{pkg}/fake.py"
+                    fake_file.content = self.generate_fake_file(proto_file, service, client_module=client_module)
+
+                if layout == "service":
                     test_file = response.file.add()
-                    test_file.name = f"{pkg}/test_{method['name']}.py"
-                    test_file.content = self.generate_method_file(
-                        proto_file, service, method, client_module=client_module, async_mode=async_mode
+                    test_file.name = f"{pkg}/test_{pkg}.py"
+                    test_file.content = self.generate_service_file(
+                        proto_file, service, client_module=client_module, async_mode=async_mode
                     )
+                else:
+                    for method in service["methods"]:
+                        test_file = response.file.add()
+                        test_file.name = f"{pkg}/test_{method['name']}.py"
+                        test_file.content = self.generate_method_file(
+                            proto_file, service, method, client_module=client_module, async_mode=async_mode
+                        )
 
         if has_services:
             root_conftest = response.file.add()
             root_conftest.name = "conftest.py"
-            root_conftest.content = self.generate_root_conftest(async_mode=async_mode)
+            root_conftest.content = self.generate_root_conftest(
+                async_mode=async_mode, fakes=fakes, client_module=client_module
+            )
 
         return response
 
@@ -1,7 +1,7 @@
 """Standalone runner for test generation.
 
-Invokes PbReflectTestsPlugin directly (without going through the protoc plugin protocol)
-by using grpc_tools.protoc to obtain file descriptors and then generating test stubs.
+Invokes PbReflectTestsPlugin directly (without going through the protoc plugin protocol),
+using either the descriptor set compiled by the generation pipeline or one compiled here.
 """
 
 import os
@@ -10,9 +10,11 @@ from pathlib import Path
 
 from google.protobuf import descriptor_pb2
 from google.protobuf.compiler import plugin_pb2
-from grpc_tools import protoc
 
 from pbreflect.log import get_logger
+from pbreflect.pbgen.descriptor_cache import DescriptorCache
+from pbreflect.pbgen.descriptors import DescriptorSetCompiler
+from pbreflect.pbgen.errors import GenerationFailedError
 from pbreflect.pbgen.plugins.tests import PbReflectTestsPlugin
 from pbreflect.pbgen.utils.file_finder import ProtoFileFinder
 
@@ -25,6 +27,10 @@ def run_test_generation(
     client_module: str = "clients",
     async_mode: bool = False,
     template_dir: str | None = None,
+    descriptor_set: descriptor_pb2.FileDescriptorSet | None = None,
+    descriptor_cache: DescriptorCache | None = None,
+    fakes: bool = False,
+    layout: str = "method",
 ) -> None:
     """Generate pytest test stubs for all services found in proto_dir.
 
@@ -34,6 +40,12 @@ def run_test_generation(
         client_module: Python module path where generated clients reside (e.g. 'clients')
         async_mode: Whether the generated clients use async mode
         template_dir: Optional custom Jinja2 templates directory
+        descriptor_set: Descriptors already compiled by the pipeline; compiled here when omitted
+        descriptor_cache: Persistent cache consulted when compiling descriptors here
+        fakes: Also generate a fake servicer per service and serve it in-process from the
+            conftest fixtures, instead of connecting to ``localhost:50051``
+        layout: ``method`` for one test module per method, ``service`` for one
+            parametrized module per service
     """
     os.makedirs(tests_output_dir, exist_ok=True)
 
@@ -43,40 +55,29 @@ def run_test_generation(
         _logger.warning("No proto files found in %s – skipping test generation", proto_dir)
         return
 
-    _logger.info("Collecting proto descriptors for test generation…")
-
-    with tempfile.NamedTemporaryFile(suffix=".pb", delete=False) as tmp:
-        desc_path = tmp.name
-
-    try:
-        ret = protoc.main(
-            [
-                "grpc_tools.protoc",
-                f"--proto_path={proto_dir}",
-                f"--descriptor_set_out={desc_path}",
-                "--include_imports",
-                *[str(p) for p in proto_files],
-            ]
-        )
-        if ret != 0:
-            _logger.error("protoc failed when collecting descriptors (exit %s) – skipping test generation", ret)
-            return
-
-        with open(desc_path, "rb") as f:
-            fds = descriptor_pb2.FileDescriptorSet()
-            fds.ParseFromString(f.read())
-    finally:
-        if os.path.exists(desc_path):
-            os.unlink(desc_path)
-
-    proto_file_names = {Path(p).name for p in proto_files}
+    if descriptor_set is None:
+        _logger.info("Collecting proto descriptors for test generation…")
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                compiler = DescriptorSetCompiler(proto_dir, cache=descriptor_cache)
+                compiled = compiler.compile(proto_files, Path(tmp) / "descriptors.pb")
+            except GenerationFailedError as e:
+                _logger.error("%s – skipping test generation", e)
+                return
+        descriptor_set = compiled.descriptor_set
+
+    proto_file_names = {Path(p).relative_to(proto_dir).as_posix() for p in proto_files}
 
     request = plugin_pb2.CodeGeneratorRequest()
     request.parameter = f"client_module={client_module}"
     if async_mode:
         request.parameter += ",async=true"
+    if fakes:
+        request.parameter += ",fakes=true"
+    if layout != "method":
+        request.parameter += f",layout={layout}"
 
-    for file_desc in fds.file:
+    for file_desc in descriptor_set.file:
         request.proto_file.append(file_desc)
         if file_desc.name in proto_file_names:
             request.file_to_generate.append(file_desc.name)
@@ -2,14 +2,22 @@
 
 import os
 import shutil
+import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from pbreflect.log import get_logger
+from pbreflect.pbgen.descriptor_cache import DescriptorCache, MemoryDescriptorCache
+from pbreflect.pbgen.descriptors import CompiledDescriptors, DescriptorSetCompiler
+from pbreflect.pbgen.errors import GenerationFailedError
 from pbreflect.pbgen.generators.base import ClientGenerator
 from pbreflect.pbgen.generators.factory import GeneratorFactory, GeneratorType
+from pbreflect.pbgen.generators.in_process import InProcessClientGenerator
+from pbreflect.pbgen.layout import OutputLayout
 from pbreflect.pbgen.patchers.directory_structure_patcher import DirectoryStructurePatcher
 from pbreflect.pbgen.patchers.import_patcher import ImportPatcher
 from pbreflect.pbgen.patchers.init_file_patcher import InitFilePatcher
+from pbreflect.pbgen.patchers.lazy_init_file_patcher import LazyInitFilePatcher
 from pbreflect.pbgen.patchers.mypy_patcher import MypyPatcher
 from pbreflect.pbgen.patchers.patcher_protocol import CodePatcher
 from pbreflect.pbgen.patchers.pb_reflect_patcher import PbReflectPatcher
@@ -17,6 +25,15 @@ from pbreflect.pbgen.patchers.proto_import_patcher import ProtoImportPatcher
 from pbreflect.pbgen.utils.command import CommandExecutor
 from pbreflect.pbgen.utils.file_finder import ProtoFileFinder
 
+_logger = get_logger(__name__)
+
+# Module suffix and class suffix of the client each generator emits per service.
+_CLIENT_MODULES: dict[GeneratorType, tuple[str, str]] = {
+    GeneratorType.PBREFLECT: ("_pb2_pbreflect", "Client"),
+    GeneratorType.DEFAULT: ("_pb2_grpc", "Stub"),
+    GeneratorType.MYPY: ("_pb2_grpc", "Stub"),
+}
+
 
 @dataclass
 class GenerationOptions:
@@ -30,24 +47,53 @@ class GenerationOptions:
     tests_dir: str = "tests"
     tests_template_dir: str | None = None
     tests_client_module: str = "clients"
+    tests_fakes: bool = False
+    tests_layout: str = "method"
+    lazy_init: bool = False
+    cache_methods: tuple[str, ...] = ()
+    service_config: str | None = None
+    raw_methods: bool = False
     root_path: Path = field(default_factory=Path.cwd)
+    descriptor_cache: bool = True
+    cache_dir: str | None = None
+    in_process: bool = False
+    descriptor_memory: MemoryDescriptorCache | None = None
+
+    def make_descriptor_cache(self) -> DescriptorCache | None:
+        """Build the persistent descriptor cache these options ask for, if any."""
+        if not self.descriptor_cache:
+            return None
+        return DescriptorCache(Path(self.cache_dir) if self.cache_dir else None, memory=self.descriptor_memory)
 
 
 class GenerationPipeline:
-    """Orchestrates the full client-code generation pipeline."""
+    """Orchestrates the full client-code generation pipeline.
+
+    Proto sources are compiled into a single descriptor set once per run; every
+    stage that needs descriptors (protoc plugins, test generation) reads that set.
+    The set also fixes the final package layout up front, so patchers place files
+    and ``__init__.py`` markers without scanning the output tree.
+    """
 
     def __init__(self, proto_dir: str, output_dir: str, options: GenerationOptions | None = None) -> None:
         self._proto_dir = proto_dir
         self._output_dir = output_dir
         self._opts = options or GenerationOptions()
+        self._descriptors: CompiledDescriptors | None = None
+        self._proto_files: list[str] = []
 
     def run(self) -> None:
         self._prepare_output_dir()
         self._patch_protos()
-        self._generate_clients()
-        self._patch_clients()
-        if self._opts.gen_tests:
-            self._generate_tests()
+        with tempfile.TemporaryDirectory(prefix="pbreflect-") as workdir:
+            self._descriptors = self._compile_descriptors(Path(workdir))
+            try:
+                self._generate_clients()
+                self._patch_clients()
+                if self._opts.gen_tests:
+                    self._generate_tests()
+            finally:
+                self._descriptors = None
 
     def _prepare_output_dir(self) -> None:
         if self._opts.refresh and os.path.exists(self._output_dir):
@@ -57,27 +103,63 @@ class GenerationPipeline:
     def _patch_protos(self) -> None:
         ProtoImportPatcher(self._proto_dir).patch()
 
+    def _compile_descriptors(self, workdir: Path) -> CompiledDescriptors | None:
+        self._proto_files = ProtoFileFinder(self._proto_dir).find_proto_files()
+        if not self._proto_files:
+            return None
+        try:
+            compiler = DescriptorSetCompiler(self._proto_dir, cache=self._opts.make_descriptor_cache())
+            return compiler.compile(self._proto_files, workdir / "descriptors.pb")
+        except GenerationFailedError as e:
+            # Sources that only compile one at a time (e.g. keyword-renamed copies defining the
+            # same symbols) still work through the per-file path.
+            _logger.warning("%s; falling back to compiling each proto file separately", e)
+            return None
+
     def _generate_clients(self) -> None:
         strategy = GeneratorFactory().create_generator(
             self._opts.gen_type,
             async_mode=self._opts.async_mode,
             template_dir=self._opts.template_dir,
+            cache_methods=self._opts.cache_methods,
+            service_config=self._opts.service_config,
+            raw_methods=self._opts.raw_methods,
+        )
+        if self._opts.in_process and self._descriptors is not None:
+            InProcessClientGenerator().generate(self._output_dir, strategy, self._descriptors, self._proto_files)
+            return
+        ClientGenerator(ProtoFileFinder(self._proto_dir), CommandExecutor()).generate(
+            self._output_dir, strategy, descriptors=self._descriptors
         )
-        ClientGenerator(ProtoFileFinder(self._proto_dir), CommandExecutor()).generate(self._output_dir, strategy)
 
     def _patch_clients(self) -> None:
         for patcher in self._client_patchers():
             patcher.patch()
 
     def _client_patchers(self) -> list[CodePatcher]:
+        layout = self._output_layout()
         return [
-            DirectoryStructurePatcher(self._output_dir),
+            DirectoryStructurePatcher(self._output_dir, layout.misplaced_dirs() if layout else None),
             ImportPatcher(self._output_dir, self._opts.root_path),
             MypyPatcher(self._output_dir),
             PbReflectPatcher(self._output_dir),
-            InitFilePatcher(self._output_dir),
+            self._init_file_patcher(layout),
         ]
 
+    def _init_file_patcher(self, layout: OutputLayout | None) -> CodePatcher:
+        if self._opts.lazy_init:
+            if layout is not None:
+                exports = layout.package_exports(_CLIENT_MODULES.get(self._opts.gen_type))
+                return LazyInitFilePatcher(self._output_dir, exports)
+            _logger.warning("Lazy __init__ files need the compiled descriptor set; writing plain ones")
+        return InitFilePatcher(self._output_dir, layout.package_dirs() if layout else None)
+
+    def _output_layout(self) -> OutputLayout | None:
+        # betterproto lays modules out by proto package rather than by file path.
+        if self._descriptors is None or self._opts.gen_type is GeneratorType.BETTERPROTO:
+            return None
+        return OutputLayout.from_descriptors(self._output_dir, self._descriptors, self._proto_files)
+
     def _generate_tests(self) -> None:
         from pbreflect.pbgen.plugins.tests.runner import run_test_generation
 
@@ -87,4 +169,8 @@ class GenerationPipeline:
             client_module=self._opts.tests_client_module,
             async_mode=self._opts.async_mode,
             template_dir=self._opts.tests_template_dir,
+            descriptor_set=self._descriptors.descriptor_set if self._descriptors else None,
+            descriptor_cache=self._opts.make_descriptor_cache(),
+            fakes=self._opts.tests_fakes,
+            layout=self._opts.tests_layout,
         )
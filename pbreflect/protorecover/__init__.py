@@ -4,13 +4,25 @@ This module provides tools for recovering protocol buffer definitions
 from gRPC services using the reflection API.
 """
 
-from pbreflect.protorecover.proto_builder import ProtoFileBuilder
-from pbreflect.protorecover.recover_service import (
-    ProtoRecoveryError,
-    RecoverService,
-    RecoverServiceConnectionError,
-)
-from pbreflect.protorecover.reflection_client import GrpcReflectionClient
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pbreflect.protorecover.proto_builder import ProtoFileBuilder
+    from pbreflect.protorecover.recover_service import (
+        ProtoRecoveryError,
+        RecoverService,
+        RecoverServiceConnectionError,
+    )
+    from pbreflect.protorecover.reflection_client import GrpcReflectionClient
+
+_EXPORTS = {
+    "RecoverService": "pbreflect.protorecover.recover_service",
+    "ProtoFileBuilder": "pbreflect.protorecover.proto_builder",
+    "GrpcReflectionClient": "pbreflect.protorecover.reflection_client",
+    "RecoverServiceConnectionError": "pbreflect.protorecover.recover_service",
+    "ProtoRecoveryError": "pbreflect.protorecover.recover_service",
+}
 
 __all__ = [
     "RecoverService",
@@ -19,3 +31,11 @@ __all__ = [
     "RecoverServiceConnectionError",
     "ProtoRecoveryError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Submodules pull in grpc and jinja2; load them only when an export is first used.
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
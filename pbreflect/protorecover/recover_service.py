@@ -7,6 +7,7 @@ from typing import (
 )
 
 import grpc
+from google.protobuf import descriptor_pb2
 from grpc import Channel, ChannelCredentials
 
 from pbreflect.log import get_logger
@@ -240,6 +241,20 @@ class RecoverService:
             self._logger.error(error_msg)
             raise ProtoRecoveryError(error_msg) from e
 
+    def get_proto_descriptors(self) -> list[descriptor_pb2.FileDescriptorProto]:
+        """Get the file descriptors the server exposes through reflection.
+
+        Returns:
+            File descriptors of every service and their transitive imports
+
+        Raises:
+            ProtoRecoveryError: If the reflection calls fail
+        """
+        try:
+            return list(self._reflection_client.get_proto_descriptors().values())
+        except grpc.RpcError as e:
+            raise ProtoRecoveryError(f"Failed to get proto descriptors: {e}") from e
+
     def get_services(self) -> list[dict]:
         """Get information about all services exposed by the server.
 
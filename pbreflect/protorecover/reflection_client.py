@@ -168,6 +168,9 @@ class GrpcReflectionClient:
                     "output_type": output_type,
                     "is_server_streaming": is_server_streaming,
                     "is_client_streaming": is_client_streaming,
+                    "idempotency_level": descriptor_pb2.MethodOptions.IdempotencyLevel.Name(
+                        method.options.idempotency_level
+                    ),
                 }
             )
 
@@ -448,7 +451,8 @@ class GrpcReflectionClient:
             suffix: Suffix to append to the filename (default: _pb2_o3.py)
 
         Returns:
-            Output filename
+            Output filename, placed in the same package as protoc's ``_pb2`` module
+            (dots in directory names become package separators)
         """
-        filename = proto_file.name.replace(".proto", suffix)
-        return filename.replace("-", "_")
+        stem = proto_file.name.removesuffix(".proto").replace("-", "_")
+        return stem.replace(".", "/") + suffix
@@ -0,0 +1,123 @@
+"""Tests for benchmark load generation and reports."""
+
+import json
+from collections import Counter
+from collections.abc import Iterator
+from concurrent import futures
+from typing import Any
+
+import grpc
+import pytest
+from google.protobuf import empty_pb2
+
+from pbreflect.bench.load import BenchReport, run_bench
+from pbreflect.bench.target import BenchMethod
+
+
+def _method(name: str, client_streaming: bool = False, server_streaming: bool = False) -> BenchMethod:
+    return BenchMethod(f"/bench.Svc/{name}", empty_pb2.Empty, client_streaming, server_streaming)
+
+
+@pytest.fixture
+def server() -> Iterator[int]:
+    """Server for ``/bench.Svc/{Unary,Download,Upload,Echo}`` exchanging raw bytes."""
+
+    def unary(request: bytes, context: grpc.ServicerContext) -> bytes:
+        if request == b"fail":
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "fail")
+        return request
+
+    def download(request: bytes, context: grpc.ServicerContext) -> Iterator[bytes]:
+        yield from (request for _ in range(3))
+
+    def upload(requests: Iterator[bytes], context: grpc.ServicerContext) -> bytes:
+        return b"".join(requests)
+
+    def echo(requests: Iterator[bytes], context: grpc.ServicerContext) -> Iterator[bytes]:
+        yield from requests
+
+    handler = grpc.method_handlers_generic_handler(
+        "bench.Svc",
+        {
+            "Unary": grpc.unary_unary_rpc_method_handler(unary),
+            "Download": grpc.unary_stream_rpc_method_handler(download),
+            "Upload": grpc.stream_unary_rpc_method_handler(upload),
+            "Echo": grpc.stream_stream_rpc_method_handler(echo),
+        },
+    )
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8), handlers=[handler])
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield port
+    server.stop(None)
+
+
+class TestBenchReport:
+    """Tests for BenchReport."""
+
+    def test_percentiles_use_nearest_rank(self) -> None:
+        report = BenchReport("/a.B/C", 2.0, latencies=[n / 1000 for n in range(1, 101)])
+
+        assert report.percentile(50) == 0.05
+        assert report.percentile(99) == 0.099
+        assert report.percentile(99.9) == 0.1
+        assert BenchReport("/a.B/C", 1.0).percentile(50) == 0.0
+
+    def test_summary_and_format(self) -> None:
+        report = BenchReport(
+            "/a.B/C", 2.0, latencies=[0.001, 0.003], errors=Counter(UNAVAILABLE=1, DEADLINE_EXCEEDED=3), rate=5
+        )
+
+        summary = report.summary()
+
+        assert summary["calls"] == 6
+        assert summary["ok"] == 2
+        assert summary["throughput"] == 3.0
+        assert summary["errors"] == {"DEADLINE_EXCEEDED": 3, "UNAVAILABLE": 1}
+        assert summary["latency_ms"] == {"mean": 2.0, "p50": 1.0, "p90": 3.0, "p99": 3.0, "p99.9": 3.0, "max": 3.0}
+        json.dumps(summary)
+        text = report.format()
+        assert "3.0 calls/s (requested 5/s)" in text
+        assert "DEADLINE_EXCEEDED" in text
+
+
+class TestRunBench:
+    """Tests for run_bench against a local server."""
+
+    @pytest.mark.parametrize(
+        "method",
+        [
+            _method("Unary"),
+            _method("Download", server_streaming=True),
+            _method("Upload", client_streaming=True),
+            _method("Echo", client_streaming=True, server_streaming=True),
+        ],
+        ids=["unary", "server-streaming", "client-streaming", "bidi"],
+    )
+    def test_call_kinds(self, server: int, method: BenchMethod) -> None:
+        with grpc.insecure_channel(f"127.0.0.1:{server}") as channel:
+            report = run_bench(channel, method, [b"a", b"b"], duration=0.2, concurrency=2, timeout=5)
+
+        assert report.calls > 0
+        assert not report.errors
+        assert report.latencies == sorted(report.latencies)
+        assert report.elapsed >= 0.2
+
+    def test_errors_counted_by_status_code(self, server: int) -> None:
+        with grpc.insecure_channel(f"127.0.0.1:{server}") as channel:
+            report = run_bench(channel, _method("Unary"), [b"ok", b"fail"], duration=0.2, timeout=5)
+
+        assert set(report.errors) == {"FAILED_PRECONDITION"}
+        assert abs(report.errors["FAILED_PRECONDITION"] - len(report.latencies)) <= 1
+
+    def test_rate_schedules_calls(self, server: int) -> None:
+        with grpc.insecure_channel(f"127.0.0.1:{server}") as channel:
+            report = run_bench(channel, _method("Unary"), [b"x"], duration=0.5, concurrency=4, rate=40, timeout=5)
+
+        assert report.calls == 20
+        assert report.summary()["rate"] == 40
+
+    @pytest.mark.parametrize("kwargs", [{"duration": 0}, {"duration": 1, "concurrency": 0}, {"duration": 1, "rate": 0}])
+    def test_invalid_arguments(self, kwargs: dict[str, Any]) -> None:
+        with grpc.insecure_channel("127.0.0.1:1") as channel, pytest.raises(ValueError, match="must be positive"):
+            run_bench(channel, _method("Unary"), [b""], **kwargs)
@@ -0,0 +1,179 @@
+"""Tests for the descriptor-driven payload generator."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from google.protobuf import descriptor_pb2, message_factory, timestamp_pb2
+
+from pbreflect.bench.payloads import PayloadGenerator, read_delimited, write_delimited
+from pbreflect.pbgen.descriptors import build_pool
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+_SCALAR_TYPES = [
+    ("i32", _Field.TYPE_INT32),
+    ("i64", _Field.TYPE_INT64),
+    ("u32", _Field.TYPE_UINT32),
+    ("u64", _Field.TYPE_UINT64),
+    ("s32", _Field.TYPE_SINT32),
+    ("s64", _Field.TYPE_SINT64),
+    ("f32", _Field.TYPE_FIXED32),
+    ("f64", _Field.TYPE_FIXED64),
+    ("sf32", _Field.TYPE_SFIXED32),
+    ("sf64", _Field.TYPE_SFIXED64),
+    ("flt", _Field.TYPE_FLOAT),
+    ("dbl", _Field.TYPE_DOUBLE),
+    ("flag", _Field.TYPE_BOOL),
+    ("text", _Field.TYPE_STRING),
+    ("data", _Field.TYPE_BYTES),
+]
+
+
+def _order_class(syntax: str = "proto3") -> Any:
+    """Build ``load.<syntax>.Order``.
+
+    It has every scalar type singular and repeated, enums, a oneof, recursive fields and a map
+    (proto3) or a group (proto2).
+    """
+    proto_file = descriptor_pb2.FileDescriptorProto(
+        name=f"load_{syntax}.proto", package=f"load.{syntax}", syntax=syntax
+    )
+    label = _Field.LABEL_REQUIRED if syntax == "proto2" else _Field.LABEL_OPTIONAL
+    status = proto_file.enum_type.add(name="Status")
+    status.value.add(name="STATUS_UNSPECIFIED", number=0)
+    status.value.add(name="NEGATIVE", number=-5)
+    status.value.add(name="SHIPPED", number=7)
+    order = proto_file.message_type.add(name="Order")
+    order.oneof_decl.add(name="payment")
+    number = 1
+    for name, type_ in _SCALAR_TYPES:
+        order.field.add(name=name, number=number, type=type_, label=label)
+        order.field.add(name=f"{name}_list", number=number + 1, type=type_, label=_Field.LABEL_REPEATED)
+        number += 2
+    package = proto_file.package
+    for name, type_, field_label, type_name, oneof in [
+        ("status", _Field.TYPE_ENUM, _Field.LABEL_OPTIONAL, f".{package}.Status", None),
+        ("history", _Field.TYPE_ENUM, _Field.LABEL_REPEATED, f".{package}.Status", None),
+        ("card", _Field.TYPE_STRING, _Field.LABEL_OPTIONAL, "", 0),
+        ("cash", _Field.TYPE_INT64, _Field.LABEL_OPTIONAL, "", 0),
+        ("parent", _Field.TYPE_MESSAGE, _Field.LABEL_OPTIONAL, f".{package}.Order", None),
+        ("children", _Field.TYPE_MESSAGE, _Field.LABEL_REPEATED, f".{package}.Order", None),
+    ]:
+        field = order.field.add(name=name, number=number, type=type_, label=field_label)
+        number += 1
+        if type_name:
+            field.type_name = type_name
+        if oneof is not None:
+            field.oneof_index = oneof
+    if syntax == "proto2":
+        group = order.nested_type.add(name="Line")
+        group.field.add(name="sku", number=1, type=_Field.TYPE_STRING, label=_Field.LABEL_OPTIONAL)
+        order.field.add(
+            name="line",
+            number=number,
+            type=_Field.TYPE_GROUP,
+            label=_Field.LABEL_REPEATED,
+            type_name=".load.proto2.Order.Line",
+        )
+    else:
+        entry = order.nested_type.add(name="LabelsEntry")
+        entry.options.map_entry = True
+        entry.field.add(name="key", number=1, type=_Field.TYPE_STRING, label=_Field.LABEL_OPTIONAL)
+        entry.field.add(name="value", number=2, type=_Field.TYPE_SINT32, label=_Field.LABEL_OPTIONAL)
+        order.field.add(
+            name="labels",
+            number=number,
+            type=_Field.TYPE_MESSAGE,
+            label=_Field.LABEL_REPEATED,
+            type_name=".load.proto3.Order.LabelsEntry",
+        )
+    pool = build_pool([proto_file])
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName(f"{package}.Order"))
+
+
+def _depth(message: Any) -> int:
+    nested = [message.parent] if message.HasField("parent") else []
+    return 1 + max((_depth(m) for m in [*nested, *message.children]), default=0)
+
+
+class TestPayloadGenerator:
+    """Tests for PayloadGenerator."""
+
+    @pytest.mark.parametrize("syntax", ["proto3", "proto2"])
+    def test_payloads_parse_and_cover_every_field(self, syntax: str) -> None:
+        order_class = _order_class(syntax)
+        seen: set[str] = set()
+
+        for payload in PayloadGenerator(order_class, seed=1, max_depth=2).payloads(200):
+            order = order_class.FromString(payload)
+            assert order.IsInitialized()
+            seen.update(field.name for field, _ in order.ListFields())
+            assert order.status in (0, -5, 7)
+            assert order.text.isalnum() or not order.text
+
+        assert seen == {field.name for field in order_class.DESCRIPTOR.fields}
+
+    def test_encoding_matches_protobuf(self) -> None:
+        # Without nested messages, and so without map entries, protobuf re-encodes the same bytes.
+        order_class = _order_class()
+
+        for payload in PayloadGenerator(order_class, seed=2, max_depth=0).payloads(200):
+            assert order_class.FromString(payload).SerializeToString() == payload
+
+    def test_seeded_payloads_reproducible(self) -> None:
+        order_class = _order_class()
+
+        def run(seed: int) -> list[bytes]:
+            return list(PayloadGenerator(order_class, seed=seed, size=500, max_depth=1).payloads(50))
+
+        assert run(7) == run(7)
+        assert run(7) != run(8)
+
+    def test_depth_bounds_recursion(self) -> None:
+        order_class = _order_class()
+
+        for max_depth in (0, 1, 3):
+            depths = [
+                _depth(order_class.FromString(p))
+                for p in PayloadGenerator(order_class, seed=4, max_depth=max_depth).payloads(50)
+            ]
+            assert max(depths) == max_depth + 1
+
+    @pytest.mark.parametrize("size", [300, 2_000, 50_000])
+    def test_mean_size_close_to_target(self, size: int) -> None:
+        generator = PayloadGenerator(_order_class(), seed=5, size=size, max_depth=0)
+
+        sizes = [len(p) for p in generator.payloads(500)]
+
+        assert abs(sum(sizes) / len(sizes) - size) < size * 0.1
+        assert min(sizes) < size < max(sizes)
+
+    def test_fixed_size_type_keeps_natural_size(self) -> None:
+        generator = PayloadGenerator(timestamp_pb2.Timestamp, seed=6, size=10_000)
+
+        assert all(len(p) <= 22 for p in generator.payloads(100))
+        assert isinstance(generator.message(), timestamp_pb2.Timestamp)
+
+    @pytest.mark.parametrize(("kwargs", "error"), [({"max_depth": -1}, "max_depth"), ({"size": -1}, "size")])
+    def test_invalid_arguments(self, kwargs: dict[str, int], error: str) -> None:
+        with pytest.raises(ValueError, match=error):
+            PayloadGenerator(timestamp_pb2.Timestamp, **kwargs)
+
+
+class TestDelimitedFiles:
+    """Tests for write_delimited and read_delimited."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        payloads = [b"", b"x", bytes(300), b"y" * 20_000]
+
+        assert write_delimited(tmp_path / "requests.bin", payloads) == 4
+        assert list(read_delimited(tmp_path / "requests.bin")) == payloads
+        assert (tmp_path / "requests.bin").read_bytes()[:4] == b"\x00\x01x\xac"
+
+    @pytest.mark.parametrize("content", [b"\x05abc", b"\x80"], ids=["message", "length-prefix"])
+    def test_truncated(self, tmp_path: Path, content: bytes) -> None:
+        (tmp_path / "requests.bin").write_bytes(content)
+
+        with pytest.raises(ValueError, match="truncated"):
+            list(read_delimited(tmp_path / "requests.bin"))
@@ -0,0 +1,188 @@
+"""Tests for benchmark method resolution and request templates."""
+
+import json
+from collections.abc import Iterator
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+import pytest
+from google.protobuf import descriptor_pb2, json_format, timestamp_pb2
+from grpc_reflection.v1alpha import reflection
+
+from pbreflect.bench.payloads import PayloadGenerator, write_delimited
+from pbreflect.bench.target import (
+    BenchMethod,
+    BenchTargetError,
+    load_requests,
+    parse_method_name,
+    reflect_method,
+    resolve_method,
+)
+from pbreflect.pbgen.descriptors import build_pool
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+
+def _echo_file() -> descriptor_pb2.FileDescriptorProto:
+    proto_file = descriptor_pb2.FileDescriptorProto(
+        name="bench/echo.proto",
+        package="bench.v1",
+        syntax="proto3",
+        dependency=["bench/common.proto", timestamp_pb2.DESCRIPTOR.name],
+    )
+    request = proto_file.message_type.add(name="EchoRequest")
+    request.field.add(name="text", number=1, type=_Field.TYPE_STRING, label=_Field.LABEL_OPTIONAL)
+    request.field.add(name="count", number=2, type=_Field.TYPE_INT32, label=_Field.LABEL_OPTIONAL)
+    request.field.add(
+        name="sent_at",
+        number=3,
+        type=_Field.TYPE_MESSAGE,
+        label=_Field.LABEL_OPTIONAL,
+        type_name=".google.protobuf.Timestamp",
+    )
+    service = proto_file.service.add(name="Echo")
+    for name, client_streaming, server_streaming in [
+        ("Say", False, False),
+        ("Repeat", False, True),
+        ("Collect", True, False),
+        ("Chat", True, True),
+    ]:
+        service.method.add(
+            name=name,
+            input_type=".bench.v1.EchoRequest",
+            output_type=".bench.v1.Reply",
+            client_streaming=client_streaming,
+            server_streaming=server_streaming,
+        )
+    return proto_file
+
+
+def _common_file() -> descriptor_pb2.FileDescriptorProto:
+    proto_file = descriptor_pb2.FileDescriptorProto(name="bench/common.proto", package="bench.v1", syntax="proto3")
+    proto_file.message_type.add(name="Reply")
+    return proto_file
+
+
+class TestParseMethodName:
+    """Tests for parse_method_name."""
+
+    @pytest.mark.parametrize("name", ["bench.v1.Echo/Say", "/bench.v1.Echo/Say", "bench.v1.Echo.Say"])
+    def test_accepted_forms(self, name: str) -> None:
+        assert parse_method_name(name) == ("bench.v1.Echo", "Say")
+
+    @pytest.mark.parametrize("name", ["Say", "bench.v1.Echo/", "/Say"])
+    def test_invalid(self, name: str) -> None:
+        with pytest.raises(BenchTargetError, match="Invalid method name"):
+            parse_method_name(name)
+
+
+class TestResolveMethod:
+    """Tests for resolve_method."""
+
+    @pytest.mark.parametrize(
+        ("name", "client_streaming", "server_streaming"),
+        [("Say", False, False), ("Repeat", False, True), ("Collect", True, False), ("Chat", True, True)],
+    )
+    def test_call_kinds(self, name: str, client_streaming: bool, server_streaming: bool) -> None:
+        method = resolve_method([_echo_file(), _common_file()], f"bench.v1.Echo/{name}")
+
+        assert method.path == f"/bench.v1.Echo/{name}"
+        assert (method.client_streaming, method.server_streaming) == (client_streaming, server_streaming)
+        assert method.request_class.DESCRIPTOR.full_name == "bench.v1.EchoRequest"
+
+    def test_missing_dependency(self) -> None:
+        with pytest.raises(BenchTargetError, match="bench/common.proto"):
+            resolve_method([_echo_file()], "bench.v1.Echo/Say")
+
+    @pytest.mark.parametrize(
+        ("name", "error"),
+        [
+            ("bench.v1.Missing/Say", "Service 'bench.v1.Missing' not found"),
+            ("bench.v1.Echo/Shout", "'Shout' not found"),
+        ],
+    )
+    def test_unknown_names(self, name: str, error: str) -> None:
+        with pytest.raises(BenchTargetError, match=error):
+            resolve_method([_echo_file(), _common_file()], name)
+
+
+class TestLoadRequests:
+    """Tests for load_requests."""
+
+    @pytest.fixture
+    def method(self) -> BenchMethod:
+        return resolve_method([_echo_file(), _common_file()], "bench.v1.Echo/Say")
+
+    @staticmethod
+    def _decode(method: BenchMethod, payloads: list[bytes]) -> list[dict[str, object]]:
+        return [json_format.MessageToDict(method.request_class.FromString(payload)) for payload in payloads]
+
+    def test_default_is_one_empty_request(self, method: BenchMethod) -> None:
+        assert load_requests(method) == [b""]
+
+    def test_json_object_and_list(self, method: BenchMethod, tmp_path: Path) -> None:
+        single = tmp_path / "one.json"
+        single.write_text(json.dumps({"text": "hi", "sentAt": "2024-01-01T00:00:00Z"}))
+        several = tmp_path / "many.json"
+        several.write_text(json.dumps([{"text": "a"}, {"count": 2}]))
+
+        assert self._decode(method, load_requests(method, single)) == [{"text": "hi", "sentAt": "2024-01-01T00:00:00Z"}]
+        assert self._decode(method, load_requests(method, several)) == [{"text": "a"}, {"count": 2}]
+
+    def test_jsonl_skips_blank_lines(self, method: BenchMethod, tmp_path: Path) -> None:
+        template = tmp_path / "requests.jsonl"
+        template.write_text('{"count": 1}\n\n{"count": 2}\n')
+
+        assert self._decode(method, load_requests(method, template)) == [{"count": 1}, {"count": 2}]
+
+    def test_length_delimited_requests(self, method: BenchMethod, tmp_path: Path) -> None:
+        payloads = list(PayloadGenerator(method.request_class, seed=1).payloads(20))
+        write_delimited(tmp_path / "requests.bin", payloads)
+
+        assert load_requests(method, tmp_path / "requests.bin") == payloads
+
+    def test_corrupt_delimited_request(self, method: BenchMethod, tmp_path: Path) -> None:
+        (tmp_path / "corrupt.bin").write_bytes(b"\x02\x08\x80")
+
+        with pytest.raises(BenchTargetError, match="Cannot read requests from .*corrupt.bin"):
+            load_requests(method, tmp_path / "corrupt.bin")
+
+    @pytest.mark.parametrize(
+        ("name", "content", "error"),
+        [
+            ("bad.jsonl", '{"count": 1}\n{"colour": "red"}\n', r"bad.jsonl:2: .*colour"),
+            ("scalar.json", "[1]", r"scalar.json\[0\]: expected a JSON object, got int"),
+            ("empty.json", "[]", "has no requests"),
+            ("broken.json", "{", "Cannot read request template"),
+            ("short.bin", "\x05abc", "Cannot read requests from .*truncated"),
+            ("empty.bin", "", "has no requests"),
+        ],
+    )
+    def test_invalid_templates(self, method: BenchMethod, tmp_path: Path, name: str, content: str, error: str) -> None:
+        template = tmp_path / name
+        template.write_text(content)
+
+        with pytest.raises(BenchTargetError, match=error):
+            load_requests(method, template)
+
+
+@pytest.fixture
+def reflection_server() -> Iterator[int]:
+    """Server exposing only the reflection service for bench/echo.proto."""
+    pool = build_pool([_echo_file(), _common_file()])
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    reflection.enable_server_reflection(["bench.v1.Echo", reflection.SERVICE_NAME], server, pool=pool)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield port
+    server.stop(None)
+
+
+def test_reflect_method(reflection_server: int) -> None:
+    with grpc.insecure_channel(f"127.0.0.1:{reflection_server}") as channel:
+        method = reflect_method(channel, "bench.v1.Echo/Collect")
+
+    assert method.path == "/bench.v1.Echo/Collect"
+    assert method.client_streaming
+    assert method.request_class(text="x").SerializeToString() == b"\n\x01x"
@@ -0,0 +1,125 @@
+"""Tests for the generation daemon server and client."""
+
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from pbreflect.daemon.client import DaemonClient, DaemonUnavailableError
+from pbreflect.daemon.server import GenerationDaemon
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Path:
+    return tmp_path / "pbreflect.sock"
+
+
+@pytest.fixture
+def running_daemon(socket_path: Path) -> Iterator[GenerationDaemon]:
+    daemon = GenerationDaemon(socket_path)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    daemon.server_close()
+    thread.join(timeout=5)
+
+
+class TestDaemonClient:
+    """Tests for DaemonClient."""
+
+    def test_missing_socket_raises_unavailable(self, socket_path: Path) -> None:
+        with pytest.raises(DaemonUnavailableError):
+            DaemonClient(socket_path).request("ping")
+
+    def test_is_alive_false_without_daemon(self, socket_path: Path) -> None:
+        assert DaemonClient(socket_path).is_alive() is False
+
+
+class TestGenerationDaemon:
+    """Tests for GenerationDaemon request dispatch."""
+
+    def test_ping(self, running_daemon: GenerationDaemon, socket_path: Path) -> None:
+        assert DaemonClient(socket_path).is_alive() is True
+
+    def test_socket_is_private(self, running_daemon: GenerationDaemon, socket_path: Path) -> None:
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+
+    def test_unknown_command(self, running_daemon: GenerationDaemon, socket_path: Path) -> None:
+        response = DaemonClient(socket_path).request("nope")
+        assert response["ok"] is False
+        assert "Unknown command" in response["error"]
+
+    @patch("pbreflect.daemon.server.GenerationPipeline")
+    def test_generate_resolves_paths_against_client_cwd(
+        self,
+        mock_pipeline_cls: MagicMock,
+        running_daemon: GenerationDaemon,
+        socket_path: Path,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        response = DaemonClient(socket_path).request(
+            "generate",
+            {"proto_dir": "protos", "output_dir": "out", "gen_tests": True, "tests_dir": "my_tests"},
+        )
+
+        assert response["ok"] is True
+        proto_dir, output_dir, options = mock_pipeline_cls.call_args.args
+        assert proto_dir == str(tmp_path / "protos")
+        assert output_dir == str(tmp_path / "out")
+        assert options.tests_dir == str(tmp_path / "my_tests")
+        assert options.root_path == tmp_path
+        assert options.in_process is True
+        assert options.descriptor_memory is running_daemon.descriptor_memory
+        mock_pipeline_cls.return_value.run.assert_called_once()
+
+    @patch("pbreflect.daemon.server.GenerationPipeline")
+    def test_generate_failure_reported(
+        self,
+        mock_pipeline_cls: MagicMock,
+        running_daemon: GenerationDaemon,
+        socket_path: Path,
+    ) -> None:
+        mock_pipeline_cls.return_value.run.side_effect = RuntimeError("protoc exploded")
+
+        response = DaemonClient(socket_path).request("generate", {"proto_dir": "p", "output_dir": "o"})
+
+        assert response["ok"] is False
+        assert "protoc exploded" in response["error"]
+
+    @patch("pbreflect.daemon.server.GenerationPipeline")
+    @patch("pbreflect.daemon.server.RecoverService")
+    def test_reflect_without_protos(
+        self,
+        mock_service_cls: MagicMock,
+        mock_pipeline_cls: MagicMock,
+        running_daemon: GenerationDaemon,
+        socket_path: Path,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        mock_service_cls.return_value.__enter__.return_value.recover_proto_files.return_value = []
+
+        response = DaemonClient(socket_path).request("reflect", {"host": "localhost:50051"})
+
+        assert response["ok"] is True
+        assert response["output"] == ["No proto files were recovered"]
+        mock_pipeline_cls.assert_not_called()
+
+    def test_shutdown_removes_socket(self, socket_path: Path) -> None:
+        daemon = GenerationDaemon(socket_path)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+
+        response = DaemonClient(socket_path).request("shutdown")
+        thread.join(timeout=5)
+        daemon.server_close()
+
+        assert response["ok"] is True
+        assert not thread.is_alive()
+        assert not socket_path.exists()
@@ -0,0 +1,70 @@
+"""Tests for default-populated mock payloads."""
+
+from typing import Any
+
+from google.protobuf import descriptor_pb2, message_factory, struct_pb2, timestamp_pb2
+
+from pbreflect.mock.payloads import populate
+from pbreflect.pbgen.descriptors import build_pool
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+
+def _item_class() -> Any:
+    proto_file = descriptor_pb2.FileDescriptorProto(name="shop.proto", package="shop", syntax="proto3")
+    status = proto_file.enum_type.add(name="Status")
+    status.value.add(name="STATUS_UNSPECIFIED", number=0)
+    status.value.add(name="ACTIVE", number=3)
+    item = proto_file.message_type.add(name="Item")
+    entry = item.nested_type.add(name="LabelsEntry")
+    entry.options.map_entry = True
+    entry.field.add(name="key", number=1, type=_Field.TYPE_STRING, label=_Field.LABEL_OPTIONAL)
+    entry.field.add(name="value", number=2, type=_Field.TYPE_INT32, label=_Field.LABEL_OPTIONAL)
+    item.oneof_decl.add(name="kind")
+    for name, number, type_, label, type_name, oneof in [
+        ("id", 1, _Field.TYPE_STRING, _Field.LABEL_OPTIONAL, "", None),
+        ("blob", 2, _Field.TYPE_BYTES, _Field.LABEL_OPTIONAL, "", None),
+        ("price", 3, _Field.TYPE_SINT64, _Field.LABEL_OPTIONAL, "", None),
+        ("weight", 4, _Field.TYPE_DOUBLE, _Field.LABEL_OPTIONAL, "", None),
+        ("active", 5, _Field.TYPE_BOOL, _Field.LABEL_OPTIONAL, "", None),
+        ("status", 6, _Field.TYPE_ENUM, _Field.LABEL_OPTIONAL, ".shop.Status", None),
+        ("tags", 7, _Field.TYPE_STRING, _Field.LABEL_REPEATED, "", None),
+        ("labels", 8, _Field.TYPE_MESSAGE, _Field.LABEL_REPEATED, ".shop.Item.LabelsEntry", None),
+        ("children", 9, _Field.TYPE_MESSAGE, _Field.LABEL_REPEATED, ".shop.Item", None),
+        ("parent", 10, _Field.TYPE_MESSAGE, _Field.LABEL_OPTIONAL, ".shop.Item", None),
+        ("sku", 11, _Field.TYPE_STRING, _Field.LABEL_OPTIONAL, "", 0),
+        ("code", 12, _Field.TYPE_INT32, _Field.LABEL_OPTIONAL, "", 0),
+    ]:
+        field = item.field.add(name=name, number=number, type=type_, label=label)
+        if type_name:
+            field.type_name = type_name
+        if oneof is not None:
+            field.oneof_index = oneof
+    pool = build_pool([proto_file])
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("shop.Item"))
+
+
+def test_every_field_kind_populated() -> None:
+    item = populate(_item_class()(), depth=1)
+
+    assert (item.id, item.blob, item.price, item.weight, item.active, item.status) == ("id", b"blob", 1, 1.5, True, 3)
+    assert list(item.tags) == ["tags"]
+    assert dict(item.labels) == {"key": 1}
+    assert item.WhichOneof("kind") == "sku"
+    assert item.HasField("parent")
+    assert item.parent.id == "id"
+    assert len(item.children) == 1
+
+
+def test_depth_bounds_recursive_messages() -> None:
+    item = populate(_item_class()(), depth=2)
+
+    assert item.parent.parent.id == "id"
+    assert not item.parent.parent.HasField("parent")
+    assert len(item.parent.parent.children) == 0
+    assert not populate(_item_class()(), depth=0).HasField("parent")
+
+
+def test_well_known_types() -> None:
+    assert populate(timestamp_pb2.Timestamp()) == timestamp_pb2.Timestamp(seconds=1, nanos=1)
+    assert populate(struct_pb2.Struct()).fields["key"].WhichOneof("kind") == "null_value"
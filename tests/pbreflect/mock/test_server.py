@@ -0,0 +1,236 @@
+"""Tests for the mock gRPC server."""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import grpc
+import pytest
+from google.protobuf import descriptor_pb2, message_factory, timestamp_pb2
+
+from pbreflect.mock.server import (
+    FaultProfile,
+    MockServer,
+    build_methods,
+    compile_proto_dir,
+    load_fixtures,
+    serve,
+)
+from pbreflect.pbgen.descriptors import build_pool
+from pbreflect.pbgen.errors import NoProtoFilesError
+from pbreflect.protorecover.reflection_client import GrpcReflectionClient
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+
+def _shop_file() -> descriptor_pb2.FileDescriptorProto:
+    proto_file = descriptor_pb2.FileDescriptorProto(
+        name="shop.proto", package="shop.v1", syntax="proto3", dependency=[timestamp_pb2.DESCRIPTOR.name]
+    )
+    item = proto_file.message_type.add(name="Item")
+    item.field.add(name="id", number=1, type=_Field.TYPE_STRING, label=_Field.LABEL_OPTIONAL)
+    item.field.add(
+        name="created",
+        number=2,
+        type=_Field.TYPE_MESSAGE,
+        label=_Field.LABEL_OPTIONAL,
+        type_name=".google.protobuf.Timestamp",
+    )
+    service = proto_file.service.add(name="Shop")
+    for name, client_streaming, server_streaming in [
+        ("Get", False, False),
+        ("Watch", False, True),
+        ("Upload", True, False),
+        ("Chat", True, True),
+    ]:
+        service.method.add(
+            name=name,
+            input_type=".shop.v1.Item",
+            output_type=".shop.v1.Item",
+            client_streaming=client_streaming,
+            server_streaming=server_streaming,
+        )
+    return proto_file
+
+
+def _item(item_id: str) -> bytes:
+    item_class = message_factory.GetMessageClass(build_pool([_shop_file()]).FindMessageTypeByName("shop.v1.Item"))
+    return item_class(id=item_id).SerializeToString()
+
+
+def _run(fixtures: dict[str, Any] | None, client: Callable[[grpc.aio.Channel], Awaitable[Any]], **kwargs: Any) -> Any:
+    async def main() -> Any:
+        server = MockServer([_shop_file()], fixtures=fixtures, **kwargs)
+        port = await server.start("127.0.0.1:0")
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                return await client(channel)
+        finally:
+            await server.stop(None)
+
+    return asyncio.run(main())
+
+
+def _raw(channel: grpc.aio.Channel, kind: str, name: str) -> Any:
+    return getattr(channel, kind)(f"/shop.v1.Shop/{name}", request_serializer=None, response_deserializer=None)
+
+
+class TestFaultProfile:
+    """Tests for FaultProfile."""
+
+    def test_override(self) -> None:
+        profile = FaultProfile(latency=0.1).override({"error_rate": 0.5, "error_code": "not_found", "response": {}})
+
+        assert profile == FaultProfile(latency=0.1, error_rate=0.5, error_code=grpc.StatusCode.NOT_FOUND)
+        assert profile.active
+        assert not FaultProfile().active
+
+    @pytest.mark.parametrize(
+        ("values", "error"),
+        [
+            ({"latency": -1}, "must not be negative"),
+            ({"error_rate": 2}, "between 0 and 1"),
+            ({"error_code": "OK"}, "must not be OK"),
+            ({"error_code": "NOPE"}, "Unknown status code"),
+            ({"jitter": "1s"}, "jitter must be a number"),
+        ],
+    )
+    def test_invalid(self, values: dict[str, Any], error: str) -> None:
+        with pytest.raises(ValueError, match=error):
+            FaultProfile().override(values)
+
+
+class TestLoadFixtures:
+    """Tests for load_fixtures."""
+
+    def test_keys_normalized_to_paths(self, tmp_path: Path) -> None:
+        path = tmp_path / "fixtures.json"
+        path.write_text(json.dumps({"shop.v1.Shop/Get": {"response": {"id": "a"}}, "/shop.v1.Shop/Watch": {}}))
+
+        assert load_fixtures(path) == {"/shop.v1.Shop/Get": {"response": {"id": "a"}}, "/shop.v1.Shop/Watch": {}}
+
+    @pytest.mark.parametrize(
+        ("content", "error"),
+        [
+            ("[]", "must be a JSON object"),
+            ('{"a.B/C": {"delay": 1}}', "must be an object with"),
+            ('{"a.B/C": {"response": {}, "responses": []}}', "must be an object with"),
+            ('{"a.B/C": {"responses": {}}}', "must be a list"),
+            ("{", "Cannot read fixtures"),
+        ],
+    )
+    def test_invalid(self, tmp_path: Path, content: str, error: str) -> None:
+        path = tmp_path / "fixtures.json"
+        path.write_text(content)
+
+        with pytest.raises(ValueError, match=error):
+            load_fixtures(path)
+
+
+class TestBuildMethods:
+    """Tests for build_methods."""
+
+    def test_defaults_and_fixtures(self) -> None:
+        methods = build_methods(
+            [_shop_file()],
+            {"/shop.v1.Shop/Watch": {"responses": [{"id": "a"}, {"id": "b"}], "latency": 0.5}},
+            FaultProfile(error_rate=0.1),
+        )
+
+        by_name = {method.path.rsplit("/", 1)[1]: method for method in methods}
+        assert list(by_name) == ["Get", "Watch", "Upload", "Chat"]
+        assert by_name["Get"].responses == (b"\n\x02id\x12\x04\x08\x01\x10\x01",)
+        assert by_name["Get"].profile == FaultProfile(error_rate=0.1)
+        assert by_name["Watch"].responses == (_item("a"), _item("b"))
+        assert by_name["Watch"].profile == FaultProfile(latency=0.5, error_rate=0.1)
+        assert (by_name["Chat"].client_streaming, by_name["Chat"].server_streaming) == (True, True)
+
+    @pytest.mark.parametrize(
+        ("fixtures", "error"),
+        [
+            ({"/shop.v1.Shop/Missing": {}}, "unknown methods: /shop.v1.Shop/Missing"),
+            ({"/shop.v1.Shop/Get": {"response": {"colour": "red"}}}, "Fixture response for /shop.v1.Shop/Get"),
+        ],
+    )
+    def test_invalid_fixtures(self, fixtures: dict[str, Any], error: str) -> None:
+        with pytest.raises(ValueError, match=error):
+            build_methods([_shop_file()], fixtures)
+
+
+class TestMockServer:
+    """Tests for MockServer over a real channel."""
+
+    def test_every_call_kind(self) -> None:
+        fixtures = {"/shop.v1.Shop/Get": {"responses": [{"id": "a"}, {"id": "b"}]}}
+
+        async def client(channel: grpc.aio.Channel) -> list[Any]:
+            get = _raw(channel, "unary_unary", "Get")
+            return [
+                [await get(b""), await get(b""), await get(b"")],
+                [response async for response in _raw(channel, "unary_stream", "Watch")(b"")],
+                await _raw(channel, "stream_unary", "Upload")(iter([b"", b""])),
+                [response async for response in _raw(channel, "stream_stream", "Chat")(iter([b"", b"", b""]))],
+            ]
+
+        default = build_methods([_shop_file()])[0].responses[0]
+        assert _run(fixtures, client) == [
+            [_item("a"), _item("b"), _item("a")],
+            [default],
+            default,
+            [default] * 3,
+        ]
+
+    def test_injected_latency_and_errors(self) -> None:
+        fixtures = {"/shop.v1.Shop/Watch": {"error_rate": 1, "error_code": "RESOURCE_EXHAUSTED"}}
+
+        async def client(channel: grpc.aio.Channel) -> tuple[float, grpc.StatusCode]:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await _raw(channel, "unary_unary", "Get")(b"")
+            elapsed = loop.time() - start
+            with pytest.raises(grpc.aio.AioRpcError) as error:
+                async for _ in _raw(channel, "unary_stream", "Watch")(b""):
+                    pass
+            return elapsed, error.value.code()
+
+        elapsed, code = _run(fixtures, client, profile=FaultProfile(latency=0.05, jitter=0.01), seed=1)
+
+        assert 0.05 <= elapsed < 1
+        assert code == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+    def test_reflection_exposes_services(self) -> None:
+        def reflect(port: int) -> set[str]:
+            with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+                return set(GrpcReflectionClient(channel).get_proto_descriptors())
+
+        async def main() -> set[str]:
+            server = MockServer([_shop_file()])
+            port = await server.start("127.0.0.1:0")
+            try:
+                return await asyncio.to_thread(reflect, port)
+            finally:
+                await server.stop(None)
+
+        assert asyncio.run(main()) == {"shop.proto", timestamp_pb2.DESCRIPTOR.name}
+
+
+def test_serve_needs_fixed_port_for_workers() -> None:
+    with pytest.raises(ValueError, match="fixed port"):
+        serve([_shop_file()], "127.0.0.1:0", workers=2)
+
+
+def test_compile_proto_dir(tmp_path: Path) -> None:
+    (tmp_path / "api").mkdir()
+    (tmp_path / "api" / "ping.proto").write_text(
+        'syntax = "proto3";\npackage api;\nimport "google/protobuf/empty.proto";\n'
+        "service Ping { rpc Ping(google.protobuf.Empty) returns (google.protobuf.Empty); }\n"
+    )
+
+    files = compile_proto_dir(tmp_path)
+
+    assert [file.name for file in files] == ["google/protobuf/empty.proto", "api/ping.proto"]
+    assert [method.path for method in build_methods(files)] == ["/api.Ping/Ping"]
+    with pytest.raises(NoProtoFilesError):
+        compile_proto_dir(tmp_path / "api" / "missing")
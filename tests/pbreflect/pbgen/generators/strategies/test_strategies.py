@@ -37,6 +37,21 @@ class TestPbReflectGeneratorStrategy:
         assert "async=false" in joined
         assert "t=/custom/tmpl" in joined
 
+    def test_cache_methods_joined_into_one_option(self) -> None:
+        strategy = PbReflectGeneratorStrategy(cache_methods=("pkg.Svc/Get", "pkg.Other/*"))
+        joined = " ".join(strategy.command_template)
+        assert "cache_methods=pkg.Svc/Get+pkg.Other/*" in joined
+
+    def test_service_config_adds_option(self) -> None:
+        strategy = PbReflectGeneratorStrategy(service_config="/etc/svc.json")
+        joined = " ".join(strategy.command_template)
+        assert "service_config=/etc/svc.json" in joined
+
+    def test_raw_methods_adds_option(self) -> None:
+        joined = " ".join(PbReflectGeneratorStrategy(raw_methods=True).command_template)
+        assert "raw=true" in joined
+        assert "raw=" not in " ".join(PbReflectGeneratorStrategy().command_template)
+
 
 class TestDefaultGeneratorStrategy:
     """Tests for DefaultGeneratorStrategy."""
@@ -116,6 +131,17 @@ class TestPbReflectTestsGeneratorStrategy:
         joined = " ".join(strategy.command_template)
         assert "t=/custom/tmpl" in joined
 
+    def test_fakes_adds_option(self) -> None:
+        strategy = PbReflectTestsGeneratorStrategy(fakes=True)
+        joined = " ".join(strategy.command_template)
+        assert "fakes=true" in joined
+
+    def test_layout_added_when_not_default(self) -> None:
+        assert "layout=" not in " ".join(PbReflectTestsGeneratorStrategy().command_template)
+        strategy = PbReflectTestsGeneratorStrategy(layout="service")
+        joined = " ".join(strategy.command_template)
+        assert "layout=service" in joined
+
 
 @pytest.mark.parametrize(
     "strategy_cls",
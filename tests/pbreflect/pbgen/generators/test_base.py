@@ -79,3 +79,40 @@ class TestClientGeneratorGenerate:
 
         expected_args = ["protoc", f"--proto_path={proto_dir}", f"--python_out={output_dir}", f"{proto_dir}/a.proto"]
         mock_executor.execute.assert_called_once_with(expected_args)
+
+
+class TestClientGeneratorWithDescriptors:
+    """Tests for ClientGenerator.generate with a precompiled descriptor set."""
+
+    @pytest.mark.parametrize(
+        "include_args",
+        [["--proto_path={include}"], ["-I", "{include}"]],
+        ids=["proto_path", "short"],
+    )
+    def test_reads_descriptor_set_instead_of_sources(self, tmp_path: Path, include_args: list[str]) -> None:
+        from google.protobuf import descriptor_pb2
+
+        from pbreflect.pbgen.descriptors import CompiledDescriptors
+
+        proto_dir = tmp_path / "protos"
+        mock_finder = create_autospec(ProtoFileFinder, instance=True)
+        mock_finder.find_proto_files.return_value = [str(proto_dir / "api" / "a.proto")]
+        mock_finder.proto_dir = str(proto_dir)
+        mock_executor = create_autospec(CommandExecutor, instance=True)
+        mock_executor.execute.return_value = (0, "")
+        descriptors = CompiledDescriptors(
+            descriptor_set=descriptor_pb2.FileDescriptorSet(),
+            path=tmp_path / "set.pb",
+            proto_dir=str(proto_dir),
+        )
+        strategy = MagicMock(command_template=["protoc", *include_args, "--python_out={output}", "{proto}"])
+
+        ClientGenerator(mock_finder, mock_executor).generate(str(tmp_path / "out"), strategy, descriptors=descriptors)
+
+        command = mock_executor.execute.call_args.args[0]
+        assert command == [
+            "protoc",
+            f"--python_out={tmp_path / 'out'}",
+            "api/a.proto",
+            f"--descriptor_set_in={tmp_path / 'set.pb'}",
+        ]
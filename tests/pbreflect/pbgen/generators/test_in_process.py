@@ -0,0 +1,77 @@
+"""Tests for InProcessClientGenerator."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from grpc_tools import protoc
+
+from pbreflect.pbgen.descriptors import CompiledDescriptors, DescriptorSetCompiler
+from pbreflect.pbgen.generators.base import ClientGenerator
+from pbreflect.pbgen.generators.in_process import InProcessClientGenerator
+from pbreflect.pbgen.generators.strategies.default import DefaultGeneratorStrategy
+from pbreflect.pbgen.generators.strategies.mypy import MyPyGeneratorStrategy
+from pbreflect.pbgen.generators.strategies.pbreflect import PbReflectGeneratorStrategy
+from pbreflect.pbgen.utils.command import CommandExecutor
+from pbreflect.pbgen.utils.file_finder import ProtoFileFinder
+
+
+@pytest.fixture
+def proto_dir(tmp_path: Path) -> Path:
+    root = tmp_path / "protos"
+    (root / "api").mkdir(parents=True)
+    (root / "api" / "common.proto").write_text('syntax = "proto3";\npackage api;\nmessage Id { string user_id = 1; }\n')
+    (root / "api" / "users.proto").write_text(
+        'syntax = "proto3";\n'
+        "package api;\n"
+        'import "api/common.proto";\n'
+        'import "google/protobuf/empty.proto";\n'
+        "service Users { rpc Get(Id) returns (google.protobuf.Empty); }\n"
+    )
+    return root
+
+
+def _compile(proto_dir: Path, tmp_path: Path) -> tuple[CompiledDescriptors, list[str]]:
+    proto_files = ProtoFileFinder(str(proto_dir)).find_proto_files()
+    return DescriptorSetCompiler(str(proto_dir)).compile(proto_files, tmp_path / "set.pb"), proto_files
+
+
+def _tree(root: Path) -> dict[str, bytes]:
+    return {p.relative_to(root).as_posix(): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+
+
+class TestInProcessClientGenerator:
+    """Tests for InProcessClientGenerator.generate."""
+
+    @pytest.mark.parametrize("strategy_cls", [DefaultGeneratorStrategy, MyPyGeneratorStrategy])
+    def test_matches_per_file_generation(self, proto_dir: Path, tmp_path: Path, strategy_cls: type) -> None:
+        descriptors, proto_files = _compile(proto_dir, tmp_path)
+        strategy = strategy_cls()
+
+        InProcessClientGenerator().generate(str(tmp_path / "in_process"), strategy, descriptors, proto_files)
+        ClientGenerator(ProtoFileFinder(str(proto_dir)), CommandExecutor()).generate(
+            str(tmp_path / "per_file"), strategy, descriptors=descriptors
+        )
+
+        assert _tree(tmp_path / "in_process") == _tree(tmp_path / "per_file")
+
+    def test_runs_plugins_without_subprocesses(self, proto_dir: Path, tmp_path: Path) -> None:
+        descriptors, proto_files = _compile(proto_dir, tmp_path)
+        out = tmp_path / "out"
+
+        with (
+            patch("pbreflect.pbgen.generators.in_process.protoc.main", wraps=protoc.main) as mock_protoc,
+            patch("subprocess.Popen") as mock_popen,
+        ):
+            InProcessClientGenerator().generate(
+                str(out), PbReflectGeneratorStrategy(async_mode=False), descriptors, proto_files
+            )
+
+        mock_popen.assert_not_called()
+        args = mock_protoc.call_args.args[0]
+        assert f"--python_out={out}" in args
+        assert not any(arg.startswith(("--pbreflect_out", "--mypy_out")) for arg in args)
+        assert sorted(args[-2:]) == ["api/common.proto", "api/users.proto"]
+        assert (out / "api" / "users_pb2_pbreflect.py").is_file()
+        assert (out / "api" / "users_pb2.pyi").is_file()
+        assert "class UsersClient" in (out / "api" / "users_pb2_pbreflect.py").read_text()
@@ -34,3 +34,22 @@ class TestDirectoryStructurePatcher:
         patcher = DirectoryStructurePatcher(str(tmp_path))
         patcher.patch()
         assert tmp_path.exists()
+
+    def test_known_dirs_are_moved_without_scanning(self, tmp_path: Path) -> None:
+        dotted_dir = tmp_path / "com" / "example.api"
+        dotted_dir.mkdir(parents=True)
+        (dotted_dir / "service_pb2_grpc.py").write_text("# test")
+        unrelated = tmp_path / "other.dir"
+        unrelated.mkdir()
+        (unrelated / "keep_pb2_grpc.py").write_text("# test")
+
+        package_dir = tmp_path / "com" / "example" / "api"
+        DirectoryStructurePatcher(str(tmp_path), {dotted_dir: package_dir}).patch()
+
+        assert (package_dir / "service_pb2_grpc.py").exists()
+        assert not dotted_dir.exists()
+        assert (unrelated / "keep_pb2_grpc.py").exists()
+
+    def test_known_dir_missing_is_ignored(self, tmp_path: Path) -> None:
+        DirectoryStructurePatcher(str(tmp_path), {tmp_path / "a.b": tmp_path / "a" / "b"}).patch()
+        assert not (tmp_path / "a").exists()
@@ -39,3 +39,17 @@ class TestInitFilePatcher:
 
         content = (code_dir / "__init__.py").read_text()
         assert "Generated by PBReflect" in content
+
+    def test_precomputed_package_dirs_skip_walk(self, tmp_path: Path) -> None:
+        code_dir = tmp_path / "clients"
+        listed = code_dir / "api"
+        unlisted = code_dir / "other"
+        listed.mkdir(parents=True)
+        unlisted.mkdir()
+
+        InitFilePatcher(str(code_dir), package_dirs=[code_dir, listed, code_dir / "missing"]).patch()
+
+        assert (code_dir / "__init__.py").exists()
+        assert (listed / "__init__.py").exists()
+        assert not (unlisted / "__init__.py").exists()
+        assert not (code_dir / "missing").exists()
@@ -0,0 +1,66 @@
+"""Tests for LazyInitFilePatcher."""
+
+import importlib
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from pbreflect.pbgen.patchers.lazy_init_file_patcher import GENERATED_MARKER, LazyInitFilePatcher
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    code_dir = tmp_path / "lazy_clients"
+    (code_dir / "api").mkdir(parents=True)
+    (code_dir / "api" / "users_pb2.py").write_text("class User: ...\nclass Role: ...\n")
+    (code_dir / "api" / "users_pb2_pbreflect.py").write_text("class UsersClient: ...\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield code_dir
+    for name in [m for m in sys.modules if m == "lazy_clients" or m.startswith("lazy_clients.")]:
+        del sys.modules[name]
+
+
+def _exports(code_dir: Path) -> dict[Path, dict[str, str]]:
+    return {
+        code_dir: {},
+        code_dir / "api": {"User": ".users_pb2", "Role": ".users_pb2", "UsersClient": ".users_pb2_pbreflect"},
+    }
+
+
+class TestLazyInitFilePatcher:
+    """Tests for LazyInitFilePatcher.patch."""
+
+    def test_imports_modules_on_first_access(self, package: Path) -> None:
+        LazyInitFilePatcher(str(package), _exports(package)).patch()
+
+        clients = importlib.import_module("lazy_clients")
+        assert "lazy_clients.api" not in sys.modules
+
+        api = clients.api
+        assert "lazy_clients.api.users_pb2_pbreflect" not in sys.modules
+        assert api.UsersClient.__module__ == "lazy_clients.api.users_pb2_pbreflect"
+        assert "lazy_clients.api.users_pb2" not in sys.modules
+        assert sorted(api.__all__) == ["Role", "User", "UsersClient"]
+
+    def test_unknown_name_raises_attribute_error(self, package: Path) -> None:
+        LazyInitFilePatcher(str(package), _exports(package)).patch()
+
+        api = importlib.import_module("lazy_clients.api")
+        with pytest.raises(AttributeError, match="Missing"):
+            api.Missing  # noqa: B018
+
+    def test_replaces_only_generated_init_files(self, package: Path) -> None:
+        (package / "__init__.py").write_text("# hand-written\n")
+        (package / "api" / "__init__.py").write_text(f"{GENERATED_MARKER}\n")
+
+        LazyInitFilePatcher(str(package), _exports(package)).patch()
+
+        assert (package / "__init__.py").read_text() == "# hand-written\n"
+        assert "_EXPORTS" in (package / "api" / "__init__.py").read_text()
+
+    def test_render_is_valid_for_empty_package(self, package: Path) -> None:
+        source = LazyInitFilePatcher(str(package), {}).render(package, {}, [])
+        compile(source, "__init__.py", "exec")
+        assert "__all__ = []" in source
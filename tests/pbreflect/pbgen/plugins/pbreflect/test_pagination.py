@@ -0,0 +1,147 @@
+"""Tests for paginated method detection."""
+
+from collections.abc import Sequence
+
+import google.protobuf.descriptor_pb2 as descriptor_pb2
+import pytest
+
+from pbreflect.pbgen.plugins.pbreflect.pagination import detect_pagination, index_messages, item_annotation
+
+_Field = descriptor_pb2.FieldDescriptorProto
+
+# (name, type, label)
+_FieldSpec = tuple[str, int, int]
+
+
+def _message(
+    proto_file: descriptor_pb2.FileDescriptorProto, name: str, *fields: _FieldSpec
+) -> descriptor_pb2.DescriptorProto:
+    message = proto_file.message_type.add(name=name)
+    for number, (field_name, type_, label) in enumerate(fields, start=1):
+        message.field.add(name=field_name, number=number, type=type_, label=label)
+    return message
+
+
+_OPTIONAL = _Field.LABEL_OPTIONAL
+_REPEATED = _Field.LABEL_REPEATED
+
+
+def _proto(
+    request_fields: Sequence[_FieldSpec], response_fields: Sequence[_FieldSpec]
+) -> tuple[descriptor_pb2.FileDescriptorProto, descriptor_pb2.MethodDescriptorProto]:
+    proto_file = descriptor_pb2.FileDescriptorProto(name="a.proto", package="a.v1")
+    _message(proto_file, "Item", ("id", _Field.TYPE_STRING, _OPTIONAL))
+    _message(proto_file, "ListRequest", *request_fields)
+    response = _message(proto_file, "ListResponse", *response_fields)
+    for field in response.field:
+        if field.type == _Field.TYPE_MESSAGE:
+            field.type_name = ".a.v1.Item"
+    method = proto_file.service.add(name="Svc").method.add(
+        name="List", input_type=".a.v1.ListRequest", output_type=".a.v1.ListResponse"
+    )
+    return proto_file, method
+
+
+_TOKEN_REQUEST = [("page_size", _Field.TYPE_INT32, _OPTIONAL), ("page_token", _Field.TYPE_STRING, _OPTIONAL)]
+_TOKEN_RESPONSE = [("items", _Field.TYPE_MESSAGE, _REPEATED), ("next_page_token", _Field.TYPE_STRING, _OPTIONAL)]
+
+
+class TestDetectPagination:
+    """Tests for detect_pagination."""
+
+    def test_page_token_convention(self) -> None:
+        proto_file, method = _proto(_TOKEN_REQUEST, _TOKEN_RESPONSE)
+
+        assert detect_pagination(method, index_messages([proto_file])) == {
+            "items": "items",
+            "page_token": "page_token",
+            "next_page_token": "next_page_token",
+        }
+
+    @pytest.mark.parametrize("size_field", ["page_size", "limit"])
+    def test_offset_convention(self, size_field: str) -> None:
+        proto_file, method = _proto(
+            [("offset", _Field.TYPE_INT64, _OPTIONAL), (size_field, _Field.TYPE_UINT32, _OPTIONAL)],
+            [("total", _Field.TYPE_INT32, _OPTIONAL), ("ids", _Field.TYPE_STRING, _REPEATED)],
+        )
+
+        assert detect_pagination(method, index_messages([proto_file])) == {
+            "items": "ids",
+            "offset": "offset",
+            "page_size": size_field,
+        }
+
+    @pytest.mark.parametrize(
+        ("request_fields", "response_fields"),
+        [
+            (_TOKEN_REQUEST, [("next_page_token", _Field.TYPE_STRING, _OPTIONAL)]),
+            ([("page_token", _Field.TYPE_BYTES, _OPTIONAL)], _TOKEN_RESPONSE),
+            ([("offset", _Field.TYPE_INT32, _OPTIONAL)], _TOKEN_RESPONSE),
+            ([("offset", _Field.TYPE_STRING, _OPTIONAL), ("limit", _Field.TYPE_INT32, _OPTIONAL)], _TOKEN_RESPONSE),
+        ],
+        ids=["no-repeated-field", "bytes-token", "offset-without-size", "string-offset"],
+    )
+    def test_other_shapes_not_detected(
+        self, request_fields: Sequence[_FieldSpec], response_fields: Sequence[_FieldSpec]
+    ) -> None:
+        proto_file, method = _proto(request_fields, response_fields)
+
+        assert detect_pagination(method, index_messages([proto_file])) is None
+
+    def test_map_fields_are_not_results(self) -> None:
+        proto_file, method = _proto(_TOKEN_REQUEST, [("next_page_token", _Field.TYPE_STRING, _OPTIONAL)])
+        response = proto_file.message_type[2]
+        entry = response.nested_type.add(name="LabelsEntry")
+        entry.options.map_entry = True
+        response.field.add(
+            name="labels",
+            number=5,
+            type=_Field.TYPE_MESSAGE,
+            label=_REPEATED,
+            type_name=".a.v1.ListResponse.LabelsEntry",
+        )
+        response.field.add(name="names", number=6, type=_Field.TYPE_STRING, label=_REPEATED)
+
+        pagination = detect_pagination(method, index_messages([proto_file]))
+
+        assert pagination is not None
+        assert pagination["items"] == "names"
+
+    def test_streaming_and_unknown_messages_skipped(self) -> None:
+        proto_file, method = _proto(_TOKEN_REQUEST, _TOKEN_RESPONSE)
+        messages = index_messages([proto_file])
+
+        method.server_streaming = True
+        assert detect_pagination(method, messages) is None
+        method.server_streaming = False
+        assert detect_pagination(method, {}) is None
+
+
+class TestItemAnnotation:
+    """Tests for item_annotation."""
+
+    def test_local_message_named(self) -> None:
+        proto_file, method = _proto(_TOKEN_REQUEST, _TOKEN_RESPONSE)
+        messages = index_messages([proto_file])
+        pagination = detect_pagination(method, messages)
+        assert pagination is not None
+
+        assert item_annotation(method, pagination, messages, {".a.v1.Item"}) == "Item"
+        assert item_annotation(method, pagination, messages, set()) == "Any"
+
+    def test_scalar_items(self) -> None:
+        proto_file, method = _proto(_TOKEN_REQUEST, [*_TOKEN_RESPONSE[1:], ("ids", _Field.TYPE_INT64, _REPEATED)])
+        messages = index_messages([proto_file])
+        pagination = detect_pagination(method, messages)
+        assert pagination is not None
+
+        assert item_annotation(method, pagination, messages, set()) == "int"
+
+
+def test_index_messages_includes_nested_and_unpackaged() -> None:
+    packaged = descriptor_pb2.FileDescriptorProto(name="a.proto", package="a.v1")
+    packaged.message_type.add(name="Outer").nested_type.add(name="Inner")
+    bare = descriptor_pb2.FileDescriptorProto(name="b.proto")
+    bare.message_type.add(name="Bare")
+
+    assert set(index_messages([packaged, bare])) == {".a.v1.Outer", ".a.v1.Outer.Inner", ".Bare"}
@@ -1,9 +1,22 @@
 """Tests for PbReflectPlugin."""
 
+import gc
+import inspect
+import json
+import sys
+import weakref
+from importlib.metadata import PackageNotFoundError
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
 import google.protobuf.descriptor_pb2 as descriptor_pb2
+import grpc
+import pytest
 from google.protobuf.compiler import plugin_pb2 as plugin
 
-from pbreflect.pbgen.plugins.pbreflect import PbReflectPlugin
+from pbreflect.pbgen.plugins.pbreflect import RUNTIME_MODULE, PbReflectPlugin, runtime, supports_registered_method
+from pbreflect.pbgen.plugins.pbreflect.service_config import DEFAULT_RETRY_POLICY
 
 
 def _make_proto_file_with_service(
@@ -33,9 +46,9 @@ class TestPbReflectPluginProcessRequest:
         plugin_instance = PbReflectPlugin()
         response = plugin_instance.process_request(request)
 
-        assert len(response.file) == 1
-        assert response.file[0].name.endswith("_pb2_pbreflect.py")
+        assert [f.name for f in response.file] == ["test_pb2_pbreflect.py", f"{RUNTIME_MODULE}.py"]
         assert len(response.file[0].content) > 0
+        assert response.file[1].content == Path(runtime.__file__).read_text(encoding="utf-8")
 
     def test_skips_proto_without_service(self) -> None:
         proto_file = descriptor_pb2.FileDescriptorProto(
@@ -82,3 +95,604 @@ class TestPbReflectPluginProcessRequest:
         plugin_instance = PbReflectPlugin()
         response = plugin_instance.process_request(request)
         assert response.supported_features == plugin.CodeGeneratorResponse.FEATURE_PROTO3_OPTIONAL
+
+
+def _make_empty_service(method_names: tuple[str, ...] = ("Ping", "Echo")) -> descriptor_pb2.FileDescriptorProto:
+    proto_file = descriptor_pb2.FileDescriptorProto(name="health.proto", package="health.v1", syntax="proto3")
+    proto_file.dependency.append("google/protobuf/empty.proto")
+    svc = proto_file.service.add()
+    svc.name = "Health"
+    for name in method_names:
+        method = svc.method.add()
+        method.name = name
+        method.input_type = ".google.protobuf.Empty"
+        method.output_type = ".google.protobuf.Empty"
+    return proto_file
+
+
+def _load_client_module(async_mode: bool = False) -> dict[str, Any]:
+    code = PbReflectPlugin().generate_code(_make_empty_service(), async_mode=async_mode)
+    namespace: dict[str, Any] = {}
+    with patch.dict(sys.modules, {RUNTIME_MODULE: runtime}):
+        exec(compile(code, "health_pb2_pbreflect.py", "exec"), namespace)  # noqa: S102
+    return namespace
+
+
+class _PassThrough(grpc.UnaryUnaryClientInterceptor):
+    def intercept_unary_unary(self, continuation: Any, client_call_details: Any, request: Any) -> Any:
+        return continuation(client_call_details, request)
+
+
+class TestGeneratedStubMulticallables:
+    """Tests for lazily created multicallables in generated stubs."""
+
+    def test_construction_creates_no_multicallables(self) -> None:
+        module = _load_client_module()
+        channel = MagicMock()
+
+        module["HealthClient"](channel)
+
+        channel.unary_unary.assert_not_called()
+
+    def test_multicallable_created_on_first_use(self) -> None:
+        module = _load_client_module()
+        channel = MagicMock()
+        client = module["HealthClient"](channel)
+
+        client.ping(MagicMock())
+        client.ping(MagicMock())
+
+        channel.unary_unary.assert_called_once()
+        assert channel.unary_unary.call_args.args == ("/health.v1.Health/Ping",)
+
+    def test_multicallables_shared_per_channel(self) -> None:
+        module = _load_client_module()
+        channel, other_channel = MagicMock(), MagicMock()
+
+        first = module["HealthClient"](channel)._stub.Echo
+        second = module["HealthClient"](channel)._stub.Echo
+        module["HealthClient"](other_channel)._stub.Echo  # noqa: B018
+
+        assert first is second
+        channel.unary_unary.assert_called_once()
+        other_channel.unary_unary.assert_called_once()
+
+    def test_intercepted_channels_not_retained(self) -> None:
+        module = _load_client_module()
+        channel = grpc.insecure_channel("localhost:1")
+        wrappers = []
+        for _ in range(20):
+            wrapper = grpc.intercept_channel(channel, _PassThrough())
+            module["HealthClient"](wrapper)._stub.Ping  # noqa: B018
+            wrappers.append(weakref.ref(wrapper))
+        del wrapper
+
+        gc.collect()
+
+        assert all(ref() is None for ref in wrappers)
+        channel.close()
+
+    def test_async_stub_is_lazy(self) -> None:
+        module = _load_client_module(async_mode=True)
+        channel = MagicMock()
+
+        stub = module["HealthClient"](channel)._stub
+        channel.unary_unary.assert_not_called()
+        assert stub.Ping is channel.unary_unary.return_value
+
+
+class TestRegisteredMethod:
+    """Tests for the grpcio registered-method fast path."""
+
+    @pytest.mark.parametrize(
+        ("version", "expected"),
+        [("1.62.2", False), ("1.63.0", True), ("1.84.0rc1", True), ("2.0", True)],
+    )
+    def test_supports_registered_method(self, version: str, expected: bool) -> None:
+        assert supports_registered_method(version) is expected
+
+    def test_missing_grpcio_is_unsupported(self) -> None:
+        with patch("pbreflect.pbgen.plugins.pbreflect.metadata.version", side_effect=PackageNotFoundError):
+            assert supports_registered_method() is False
+
+    def test_emitted_when_supported(self) -> None:
+        module = _load_client_module()
+        channel = MagicMock()
+
+        module["HealthClient"](channel)._stub.Ping  # noqa: B018
+
+        assert channel.unary_unary.call_args.kwargs["_registered_method"] is True
+
+    def test_plugin_parameter_disables_it(self) -> None:
+        request = plugin.CodeGeneratorRequest(parameter="async=false,registered_method=false")
+        request.proto_file.append(_make_empty_service())
+
+        content = PbReflectPlugin().process_request(request).file[0].content
+
+        assert "_registered_method" not in content
+
+    def test_omitted_for_old_grpcio(self) -> None:
+        with patch("pbreflect.pbgen.plugins.pbreflect.metadata.version", return_value="1.60.0"):
+            content = PbReflectPlugin().generate_code(_make_empty_service(), async_mode=False)
+
+        assert "_registered_method" not in content
+
+
+class TestGeneratedConnect:
+    """Tests for the generated connect() factory."""
+
+    @pytest.mark.parametrize(("async_mode", "factory"), [(False, "connect"), (True, "connect_aio")])
+    def test_delegates_to_runtime(self, async_mode: bool, factory: str) -> None:
+        module = _load_client_module(async_mode=async_mode)
+
+        with patch.object(runtime, factory) as mock_factory:
+            module["_connect"] = mock_factory
+            channel = module["connect"]("localhost:50051", pool_size=4)
+
+        mock_factory.assert_called_once_with("localhost:50051", pool_size=4, service_config=module["SERVICE_CONFIG"])
+        assert channel is mock_factory.return_value
+
+
+class TestGeneratedFanOut:
+    """Tests for the generated ``<method>_many`` helpers."""
+
+    def test_sync_many_delegates_to_runtime(self) -> None:
+        module = _load_client_module()
+        channel = MagicMock()
+        client = module["HealthClient"](channel)
+        module["_call_many"] = MagicMock()
+
+        result = client.ping_many(["a", "b"], concurrency=4, timeout=1.0)
+
+        assert result is module["_call_many"].return_value
+        module["_call_many"].assert_called_once_with(
+            channel.unary_unary.return_value, ["a", "b"], concurrency=4, metadata=None, timeout=1.0
+        )
+
+    def test_async_many_uses_aio_runtime(self) -> None:
+        module = _load_client_module(async_mode=True)
+        assert module["_call_many"] is runtime.call_many_aio
+
+    def test_streaming_methods_get_no_helper(self) -> None:
+        proto_file = _make_empty_service(("Ping",))
+        proto_file.service[0].method[0].server_streaming = True
+        code = PbReflectPlugin().generate_code(proto_file, async_mode=False)
+
+        assert "def ping_many(" not in code
+
+
+class TestGeneratedFutures:
+    """Tests for the generated ``<method>_future`` helpers."""
+
+    def test_sync_future_starts_call(self) -> None:
+        module = _load_client_module()
+        channel = MagicMock()
+
+        future = module["HealthClient"](channel).ping_future("req", timeout=1.0)
+
+        channel.unary_unary.return_value.future.assert_called_once_with("req", metadata=None, timeout=1.0)
+        assert future is channel.unary_unary.return_value.future.return_value
+        assert module["gather"] is runtime.gather
+
+    def test_only_sync_unary_methods_get_one(self) -> None:
+        proto_file = _make_empty_service()
+        proto_file.service[0].method[1].server_streaming = True
+
+        assert "def ping_future(" in PbReflectPlugin().generate_code(proto_file, async_mode=False)
+        assert "def echo_future(" not in PbReflectPlugin().generate_code(proto_file, async_mode=False)
+        assert "_future(" not in PbReflectPlugin().generate_code(proto_file, async_mode=True)
+
+    def test_docstring_notes_bypassed_cache(self) -> None:
+        code = PbReflectPlugin().generate_code(_make_empty_service(), async_mode=False, cache_methods=["*"])
+
+        assert "The call bypasses the response cache." in code
+
+
+class TestGeneratedResponseCache:
+    """Tests for response-cache support in generated clients."""
+
+    @staticmethod
+    def _service(no_side_effects: bool = False) -> descriptor_pb2.FileDescriptorProto:
+        proto_file = _make_empty_service()
+        if no_side_effects:
+            proto_file.service[0].method[0].options.idempotency_level = descriptor_pb2.MethodOptions.NO_SIDE_EFFECTS
+        return proto_file
+
+    def test_no_side_effects_method_uses_cache(self) -> None:
+        code = PbReflectPlugin().generate_code(self._service(no_side_effects=True))
+
+        assert '"/health.v1.Health/Ping",' in code
+        assert '"/health.v1.Health/Echo",' not in code
+
+    def test_cache_methods_patterns(self) -> None:
+        code = PbReflectPlugin().generate_code(self._service(), cache_methods=["health.v1.Health/E*"])
+
+        assert '"/health.v1.Health/Echo",' in code
+        assert '"/health.v1.Health/Ping",' not in code
+
+    def test_streaming_methods_never_cached(self) -> None:
+        proto_file = self._service(no_side_effects=True)
+        proto_file.service[0].method[0].server_streaming = True
+
+        code = PbReflectPlugin().generate_code(proto_file, cache_methods=["*"])
+
+        assert '"/health.v1.Health/Ping",' not in code
+        assert '"/health.v1.Health/Echo",' in code
+
+    def test_plugin_parameter_parsed(self) -> None:
+        request = plugin.CodeGeneratorRequest(parameter="async=false,cache_methods=x.Y/Z+health.v1.Health/Ping")
+        request.proto_file.append(_make_empty_service())
+
+        content = PbReflectPlugin().process_request(request).file[0].content
+
+        assert '"/health.v1.Health/Ping",' in content
+
+    def test_client_serves_repeated_calls_from_cache(self) -> None:
+        code = PbReflectPlugin().generate_code(self._service(no_side_effects=True), async_mode=False)
+        namespace: dict[str, Any] = {}
+        with patch.dict(sys.modules, {RUNTIME_MODULE: runtime}):
+            exec(compile(code, "health_pb2_pbreflect.py", "exec"), namespace)  # noqa: S102
+        channel = MagicMock()
+        cache = namespace["ResponseCache"]()
+        client = namespace["HealthClient"](channel, cache=cache)
+        request = MagicMock()
+        request.SerializeToString.return_value = b""
+
+        assert client.ping(request) is client.ping(request)
+        channel.unary_unary.return_value.assert_called_once_with(request, metadata=None, timeout=None)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_client_without_cache_always_calls(self) -> None:
+        module = _load_client_module()
+        channel = MagicMock()
+        client = module["HealthClient"](channel)
+
+        client.ping(MagicMock())
+        client.ping(MagicMock())
+
+        assert channel.unary_unary.return_value.call_count == 2
+
+
+_HEDGED_PING = {
+    "methodConfig": [
+        {
+            "name": [{"service": "health.v1.Health", "method": "Ping"}],
+            "timeout": "2s",
+            "hedgingPolicy": {"maxAttempts": 3, "hedgingDelay": "0.1s", "nonFatalStatusCodes": ["UNAVAILABLE"]},
+        }
+    ]
+}
+
+
+def _exec_client_module(code: str) -> dict[str, Any]:
+    namespace: dict[str, Any] = {}
+    with patch.dict(sys.modules, {RUNTIME_MODULE: runtime}):
+        exec(compile(code, "health_pb2_pbreflect.py", "exec"), namespace)  # noqa: S102
+    return namespace
+
+
+class TestGeneratedServiceConfig:
+    """Tests for the generated service config and hedging."""
+
+    def test_idempotent_methods_retried(self) -> None:
+        proto_file = _make_empty_service()
+        proto_file.service[0].method[1].options.idempotency_level = descriptor_pb2.MethodOptions.IDEMPOTENT
+
+        module = _exec_client_module(PbReflectPlugin().generate_code(proto_file, async_mode=False))
+
+        expected = {
+            "methodConfig": [
+                {"name": [{"service": "health.v1.Health", "method": "Echo"}], "retryPolicy": DEFAULT_RETRY_POLICY}
+            ]
+        }
+        assert module["SERVICE_CONFIG"] == expected
+        assert module["HealthClient"].SERVICE_CONFIG == expected
+        assert "_HEDGING_POLICIES" not in module
+
+    @pytest.mark.parametrize(("async_mode", "factory"), [(False, "connect"), (True, "connect_aio")])
+    def test_connect_applies_service_config(self, async_mode: bool, factory: str) -> None:
+        code = PbReflectPlugin().generate_code(
+            _make_empty_service(), async_mode=async_mode, service_config=_HEDGED_PING
+        )
+        module = _exec_client_module(code)
+        module["_connect"] = MagicMock()
+
+        module["connect"]("localhost:50051")
+        module["connect"]("localhost:50051", service_config={})
+
+        assert module["_connect"].call_args_list[0].kwargs == {"service_config": _HEDGED_PING}
+        assert module["_connect"].call_args_list[1].kwargs == {"service_config": {}}
+
+    def test_hedged_method_uses_runtime(self) -> None:
+        code = PbReflectPlugin().generate_code(_make_empty_service(), async_mode=False, service_config=_HEDGED_PING)
+        module = _exec_client_module(code)
+        channel = MagicMock()
+        module["_hedged_call"] = MagicMock()
+
+        result = module["HealthClient"](channel).ping("req", timeout=1.0)
+        module["HealthClient"](channel).echo("req")
+
+        assert result is module["_hedged_call"].return_value
+        module["_hedged_call"].assert_called_once_with(
+            channel.unary_unary.return_value,
+            "req",
+            runtime.hedging_policy(_HEDGED_PING, "/health.v1.Health/Ping"),
+            metadata=None,
+            timeout=1.0,
+        )
+
+    def test_async_hedged_method_uses_aio_runtime(self) -> None:
+        code = PbReflectPlugin().generate_code(_make_empty_service(), async_mode=True, service_config=_HEDGED_PING)
+        assert _exec_client_module(code)["_hedged_call"] is runtime.hedged_call_aio
+
+    def test_plugin_parameter_reads_override_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "service_config.json"
+        path.write_text(json.dumps(_HEDGED_PING), encoding="utf-8")
+        request = plugin.CodeGeneratorRequest(parameter=f"async=false,service_config={path}")
+        request.proto_file.append(_make_empty_service())
+
+        content = PbReflectPlugin().process_request(request).file[0].content
+
+        assert "_hedged_call(" in content
+
+    def test_invalid_override_reported(self, tmp_path: Path) -> None:
+        path = tmp_path / "service_config.json"
+        path.write_text('{"methodConfig": [{"name": [{}], "timeout": "soon"}]}', encoding="utf-8")
+        request = plugin.CodeGeneratorRequest(parameter=f"service_config={path}")
+        request.proto_file.append(_make_empty_service())
+
+        response = PbReflectPlugin().process_request(request)
+
+        assert "Invalid duration" in response.error
+        assert not response.file
+
+    def test_malformed_override_reported(self, tmp_path: Path) -> None:
+        path = tmp_path / "service_config.json"
+        path.write_text('{"methodConfig": [{"name": [{}], "retryPolicy": 5}]}', encoding="utf-8")
+        request = plugin.CodeGeneratorRequest(parameter=f"service_config={path}")
+        request.proto_file.append(_make_empty_service())
+
+        response = PbReflectPlugin().process_request(request)
+
+        assert response.error == "methodConfig[0].retryPolicy must be an object, got 5"
+        assert not response.file
+
+
+class TestGeneratedMetrics:
+    """Tests for metrics support in generated clients."""
+
+    def test_sync_client_instruments_channel(self) -> None:
+        module = _load_client_module()
+        module["_instrument"] = MagicMock()
+        channel, metrics = MagicMock(), module["InMemoryMetrics"]()
+
+        client = module["HealthClient"](channel, metrics=metrics)
+        client.ping(MagicMock())
+
+        module["_instrument"].assert_called_once_with(channel, metrics)
+        module["_instrument"].return_value.unary_unary.assert_called_once()
+        channel.unary_unary.assert_not_called()
+
+    def test_repeated_construction_shares_one_wrapper(self) -> None:
+        module = _load_client_module()
+        channel, metrics = grpc.insecure_channel("localhost:1"), module["InMemoryMetrics"]()
+
+        stubs = [module["HealthClient"](channel, metrics=metrics)._stub for _ in range(20)]
+        other = module["HealthClient"](channel, metrics=module["InMemoryMetrics"]())._stub
+
+        assert len({id(stub._channel) for stub in stubs}) == 1
+        assert other._channel is not stubs[0]._channel
+        assert all(stub.Ping is stubs[0].Ping for stub in stubs)
+        channel.close()
+
+    def test_repeated_construction_retains_nothing(self) -> None:
+        module = _load_client_module()
+        channel, metrics = grpc.insecure_channel("localhost:1"), module["InMemoryMetrics"]()
+        wrapper = weakref.ref(module["HealthClient"](channel, metrics=metrics)._stub._channel)
+        for _ in range(20):
+            module["HealthClient"](channel, metrics=metrics)._stub.Ping  # noqa: B018
+        channel.close()
+        del channel
+
+        gc.collect()
+
+        assert wrapper() is None
+
+    def test_async_client_takes_metrics_through_connect(self) -> None:
+        module = _load_client_module(async_mode=True)
+
+        assert "_instrument" not in module
+        assert "metrics" not in inspect.signature(module["HealthClient"]).parameters
+        assert module["MetricsSink"] is runtime.MetricsSink
+
+
+def _streaming_service() -> descriptor_pb2.FileDescriptorProto:
+    proto_file = _make_empty_service(("Ping", "Upload", "Download", "Echo"))
+    methods = proto_file.service[0].method
+    methods[1].client_streaming = True
+    methods[2].server_streaming = True
+    methods[3].client_streaming = methods[3].server_streaming = True
+    return proto_file
+
+
+class TestGeneratedStreamingHelpers:
+    """Tests for the generated ``<method>_buffered`` and ``<method>_batches`` helpers."""
+
+    def test_helpers_follow_streaming_kind(self) -> None:
+        code = PbReflectPlugin().generate_code(_streaming_service(), async_mode=False)
+
+        assert "def upload_buffered(" in code
+        assert "def download_batches(" in code
+        assert "def echo_buffered(" in code
+        assert "def echo_batches(" in code
+        assert "def ping_buffered(" not in code
+        assert "def ping_batches(" not in code
+        assert "def upload_batches(" not in code
+        assert "def download_buffered(" not in code
+
+    def test_sync_buffered_sends_through_runtime_buffer(self) -> None:
+        module = _exec_client_module(PbReflectPlugin().generate_code(_streaming_service(), async_mode=False))
+        module["_buffered_requests"] = MagicMock()
+        channel = MagicMock()
+
+        result = module["HealthClient"](channel).upload_buffered(["a"], buffer_size=8, timeout=2.0)
+
+        module["_buffered_requests"].assert_called_once_with(["a"], 8)
+        channel.stream_unary.return_value.assert_called_once_with(
+            module["_buffered_requests"].return_value, metadata=None, timeout=2.0
+        )
+        assert result is channel.stream_unary.return_value.return_value
+
+    def test_sync_batches_groups_responses(self) -> None:
+        module = _exec_client_module(PbReflectPlugin().generate_code(_streaming_service(), async_mode=False))
+        channel = MagicMock()
+        channel.unary_stream.return_value.return_value = iter(range(5))
+
+        batches = module["HealthClient"](channel).download_batches("req", size=2)
+
+        assert list(batches) == [[0, 1], [2, 3], [4]]
+
+    def test_async_helpers_use_aio_runtime(self) -> None:
+        module = _exec_client_module(PbReflectPlugin().generate_code(_streaming_service(), async_mode=True))
+        client = module["HealthClient"]
+
+        assert module["_buffered_requests"] is runtime.buffered_requests_aio
+        assert module["_iter_batches"] is runtime.iter_batches_aio
+        assert inspect.iscoroutinefunction(client.upload_buffered)
+        assert not inspect.iscoroutinefunction(client.echo_buffered)
+        assert not inspect.iscoroutinefunction(client.download_batches)
+
+
+def _paginated_service() -> tuple[descriptor_pb2.FileDescriptorProto, descriptor_pb2.FileDescriptorProto]:
+    """``api.v1.Accounts/ListAccounts`` paging ``common.v1.Account`` results by token, the messages in an import."""
+    common = descriptor_pb2.FileDescriptorProto(name="common.proto", package="common.v1", syntax="proto3")
+    common.message_type.add(name="Account")
+    request = common.message_type.add(name="ListRequest")
+    request.field.add(name="page_token", number=1, type=descriptor_pb2.FieldDescriptorProto.TYPE_STRING)
+    response = common.message_type.add(name="ListResponse")
+    response.field.add(
+        name="accounts",
+        number=1,
+        type=descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE,
+        label=descriptor_pb2.FieldDescriptorProto.LABEL_REPEATED,
+        type_name=".common.v1.Account",
+    )
+    response.field.add(name="next_page_token", number=2, type=descriptor_pb2.FieldDescriptorProto.TYPE_STRING)
+    api = descriptor_pb2.FileDescriptorProto(name="api.proto", package="api.v1", syntax="proto3")
+    api.dependency.append("common.proto")
+    api.service.add(name="Accounts").method.add(
+        name="ListAccounts", input_type=".common.v1.ListRequest", output_type=".common.v1.ListResponse"
+    )
+    return common, api
+
+
+class TestGeneratedPagination:
+    """Tests for the generated ``iter_<method>`` helpers."""
+
+    def test_detected_across_imported_files(self) -> None:
+        request = plugin.CodeGeneratorRequest(parameter="async=false", file_to_generate=["api.proto"])
+        request.proto_file.extend(_paginated_service())
+
+        content = PbReflectPlugin().process_request(request).file[0].content
+
+        assert "def iter_list_accounts(" in content
+        assert ") -> Iterator[Any]:" in content
+        assert '_Pagination(items="accounts", page_token="page_token", next_page_token="next_page_token")' in content
+
+    def test_not_detected_without_message_index(self) -> None:
+        code = PbReflectPlugin().generate_code(_paginated_service()[1], async_mode=False)
+
+        assert "def iter_list_accounts(" not in code
+
+    @pytest.mark.parametrize(("async_mode", "walker"), [(False, "iter_pages"), (True, "iter_pages_aio")])
+    def test_walks_pages_through_runtime(self, async_mode: bool, walker: str) -> None:
+        proto_file = _paginated_service()[0]
+        proto_file.service.add(name="Accounts").method.add(
+            name="ListAccounts", input_type=".common.v1.ListRequest", output_type=".common.v1.ListResponse"
+        )
+        code = PbReflectPlugin().generate_code(proto_file, async_mode=async_mode)
+        with patch.dict(sys.modules, {"common_pb2": MagicMock()}):
+            module = _exec_client_module(code)
+
+        assert ") -> AsyncIterator[Account]:" in code if async_mode else ") -> Iterator[Account]:" in code
+        assert module["_iter_pages"] is getattr(runtime, walker)
+        if async_mode:
+            return
+        module["_iter_pages"] = MagicMock(return_value=iter([MagicMock(accounts=[1, 2]), MagicMock(accounts=[3])]))
+        channel = MagicMock()
+
+        items = list(module["AccountsClient"](channel).iter_list_accounts("req", prefetch=False, timeout=2.0))
+
+        assert items == [1, 2, 3]
+        module["_iter_pages"].assert_called_once_with(
+            channel.unary_unary.return_value,
+            "req",
+            runtime.Pagination(items="accounts", page_token="page_token", next_page_token="next_page_token"),
+            prefetch=False,
+            metadata=None,
+            timeout=2.0,
+        )
+
+
+class TestGeneratedRawMethods:
+    """Tests for the ``<method>_raw`` bytes passthrough variants."""
+
+    def test_off_by_default(self) -> None:
+        assert "_raw(" not in PbReflectPlugin().generate_code(_streaming_service(), async_mode=False)
+
+    def test_plugin_parameter_enables_them(self) -> None:
+        request = plugin.CodeGeneratorRequest(parameter="async=false,raw=true")
+        request.proto_file.append(_streaming_service())
+
+        content = PbReflectPlugin().process_request(request).file[0].content
+
+        for name in ("ping", "upload", "download", "echo"):
+            assert f"def {name}_raw(" in content
+
+    def test_raw_multicallable_has_no_serializers(self) -> None:
+        code = PbReflectPlugin().generate_code(
+            _streaming_service(), async_mode=False, registered_method=False, raw_methods=True
+        )
+        module = _exec_client_module(code)
+        channel = MagicMock()
+        client = module["HealthClient"](channel)
+
+        response = client.ping_raw(b"\x01", timeout=1.0)
+        client.ping(MagicMock())
+
+        assert response is channel.unary_unary.return_value.return_value
+        assert channel.unary_unary.call_args_list[0].args == ("/health.v1.Health/Ping",)
+        assert channel.unary_unary.call_args_list[0].kwargs == {}
+        assert "request_serializer" in channel.unary_unary.call_args_list[1].kwargs
+        channel.unary_unary.return_value.assert_any_call(b"\x01", metadata=None, timeout=1.0)
+
+    def test_async_streaming_responses_returned_directly(self) -> None:
+        module = _exec_client_module(
+            PbReflectPlugin().generate_code(_streaming_service(), async_mode=True, raw_methods=True)
+        )
+        client = module["HealthClient"]
+
+        assert inspect.iscoroutinefunction(client.ping_raw)
+        assert inspect.iscoroutinefunction(client.upload_raw)
+        assert not inspect.iscoroutinefunction(client.download_raw)
+        assert not inspect.iscoroutinefunction(client.echo_raw)
+
+
+class TestGeneratedWarmUp:
+    """Tests for the generated ``warm_up`` helpers."""
+
+    def test_sync_client_warms_unwrapped_channel(self) -> None:
+        module = _load_client_module()
+        module["warm_up"] = MagicMock()
+        module["_instrument"] = MagicMock()
+        channel = MagicMock()
+
+        module["HealthClient"](channel, metrics=module["InMemoryMetrics"]()).warm_up(timeout=2.0, ping=True)
+
+        module["warm_up"].assert_called_once_with(channel, 2.0, runtime.HEALTH_CHECK_METHOD)
+
+    def test_async_module_exports_aio_variant(self) -> None:
+        module = _load_client_module(async_mode=True)
+
+        assert module["warm_up"] is runtime.warm_up_aio
+        assert inspect.iscoroutinefunction(module["HealthClient"].warm_up)
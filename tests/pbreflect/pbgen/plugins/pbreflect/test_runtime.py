@@ -0,0 +1,1225 @@
+"""Tests for the runtime module shipped with generated clients."""
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from concurrent import futures
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import grpc
+import pytest
+
+from pbreflect.pbgen.plugins.pbreflect import runtime
+
+
+class TestChannelOptions:
+    """Tests for channel_options."""
+
+    def test_defaults(self) -> None:
+        options = dict(runtime.channel_options())
+        assert options["grpc.max_receive_message_length"] == runtime.DEFAULT_MAX_MESSAGE_BYTES
+        assert options["grpc.lb_policy_name"] == "round_robin"
+        assert "grpc.use_local_subchannel_pool" not in options
+
+    def test_keepalive_within_default_server_policy(self) -> None:
+        # Stock servers send GOAWAY "too_many_pings" for pings more often than every
+        # 5 minutes or on connections without active calls.
+        options = dict(runtime.channel_options())
+        assert options["grpc.keepalive_time_ms"] == 300_000
+        assert options["grpc.keepalive_timeout_ms"] == 20_000
+        assert "grpc.keepalive_permit_without_calls" not in options
+        assert "grpc.http2.max_pings_without_data" not in options
+
+    def test_overrides_and_flags(self) -> None:
+        options = dict(
+            runtime.channel_options({"grpc.keepalive_time_ms": 1000}, load_balancing=None, local_subchannel_pool=True)
+        )
+        assert options["grpc.keepalive_time_ms"] == 1000
+        assert "grpc.lb_policy_name" not in options
+        assert options["grpc.use_local_subchannel_pool"] == 1
+
+    def test_service_config_without_hedging(self) -> None:
+        config: dict[str, Any] = {
+            "methodConfig": [
+                {"name": [{"service": "a.S"}], "timeout": "1s", "hedgingPolicy": {"maxAttempts": 2}},
+            ],
+            "retryThrottling": {"maxTokens": 10, "tokenRatio": 0.1},
+        }
+
+        options = dict(runtime.channel_options(service_config=config))
+
+        assert json.loads(options["grpc.service_config"]) == {
+            "methodConfig": [{"name": [{"service": "a.S"}], "timeout": "1s"}],
+            "retryThrottling": {"maxTokens": 10, "tokenRatio": 0.1},
+        }
+        assert "hedgingPolicy" in config["methodConfig"][0]
+        assert "grpc.service_config" not in dict(runtime.channel_options(service_config={}))
+
+
+class TestConnect:
+    """Tests for connect and connect_aio."""
+
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.grpc.insecure_channel")
+    def test_single_channel(self, mock_insecure: MagicMock) -> None:
+        channel = runtime.connect("localhost:50051", compression=grpc.Compression.Gzip)
+
+        assert channel is mock_insecure.return_value
+        kwargs = mock_insecure.call_args.kwargs
+        assert kwargs["compression"] is grpc.Compression.Gzip
+        assert ("grpc.lb_policy_name", "round_robin") in kwargs["options"]
+
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.grpc.secure_channel")
+    def test_pool_uses_separate_connections(self, mock_secure: MagicMock) -> None:
+        credentials = MagicMock()
+        pool = runtime.connect("localhost:50051", credentials=credentials, pool_size=3)
+
+        assert isinstance(pool, runtime.ChannelPool)
+        assert len(pool) == 3
+        assert mock_secure.call_count == 3
+        assert mock_secure.call_args.args[1] is credentials
+        assert ("grpc.use_local_subchannel_pool", 1) in mock_secure.call_args.kwargs["options"]
+
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.grpc.aio.insecure_channel")
+    def test_service_config(self, mock_insecure: MagicMock) -> None:
+        config = {"methodConfig": [{"name": [{}], "timeout": "2s"}]}
+
+        runtime.connect_aio("localhost:50051", service_config=config)
+
+        options = dict(mock_insecure.call_args.kwargs["options"])
+        assert json.loads(options["grpc.service_config"]) == config
+
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.grpc.intercept_channel")
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.grpc.insecure_channel")
+    def test_interceptors(self, mock_insecure: MagicMock, mock_intercept: MagicMock) -> None:
+        interceptor = MagicMock()
+        channel = runtime.connect("localhost:50051", interceptors=[interceptor])
+
+        mock_intercept.assert_called_once_with(mock_insecure.return_value, interceptor)
+        assert channel is mock_intercept.return_value
+
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.grpc.aio.insecure_channel")
+    def test_aio_pool(self, mock_insecure: MagicMock) -> None:
+        pool = runtime.connect_aio("localhost:50051", pool_size=2, interceptors=[MagicMock()])
+
+        assert isinstance(pool, runtime.AioChannelPool)
+        assert mock_insecure.call_count == 2
+        assert len(mock_insecure.call_args.kwargs["interceptors"]) == 1
+
+    @pytest.mark.parametrize("factory", [runtime.connect, runtime.connect_aio])
+    def test_invalid_pool_size(self, factory: MagicMock) -> None:
+        with pytest.raises(ValueError, match="pool_size"):
+            factory("localhost:50051", pool_size=0)
+
+
+class TestChannelPool:
+    """Tests for round-robin dispatch in ChannelPool."""
+
+    def test_round_robin_dispatch(self) -> None:
+        channels = [MagicMock(), MagicMock()]
+        pool = runtime.ChannelPool(channels)
+
+        multicallable = pool.unary_unary("/svc/Method", request_serializer=None, _registered_method=True)
+        for _ in range(4):
+            multicallable(b"request", timeout=1)
+        multicallable.with_call(b"request")
+
+        for channel in channels:
+            channel.unary_unary.assert_called_once_with("/svc/Method", request_serializer=None, _registered_method=True)
+            assert channel.unary_unary.return_value.call_count == 2
+        assert channels[0].unary_unary.return_value.with_call.call_count == 1
+
+    def test_close_closes_all_channels(self) -> None:
+        channels = [MagicMock(), MagicMock()]
+        with runtime.ChannelPool(channels):
+            pass
+        for channel in channels:
+            channel.close.assert_called_once()
+
+    def test_empty_pool_rejected(self) -> None:
+        with pytest.raises(ValueError, match="at least one channel"):
+            runtime.ChannelPool([])
+
+    def test_pool_spreads_calls_over_connections(self) -> None:
+        peers: list[str] = []
+
+        def echo(request: bytes, context: grpc.ServicerContext) -> bytes:
+            peers.append(context.peer())
+            return request
+
+        handler = grpc.method_handlers_generic_handler("test.Echo", {"Echo": grpc.unary_unary_rpc_method_handler(echo)})
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        try:
+            with runtime.connect(f"127.0.0.1:{port}", pool_size=2) as pool:
+                echo_call = pool.unary_unary("/test.Echo/Echo", request_serializer=None, response_deserializer=None)
+                assert [echo_call(b"ping", timeout=5) for _ in range(4)] == [b"ping"] * 4
+        finally:
+            server.stop(None)
+
+        assert len(set(peers)) == 2
+
+
+class TestAioChannelPool:
+    """Tests for AioChannelPool."""
+
+    def test_get_state_prefers_ready(self) -> None:
+        idle, ready = MagicMock(), MagicMock()
+        idle.get_state.return_value = grpc.ChannelConnectivity.IDLE
+        ready.get_state.return_value = grpc.ChannelConnectivity.READY
+
+        assert runtime.AioChannelPool([idle, ready]).get_state() is grpc.ChannelConnectivity.READY
+        assert runtime.AioChannelPool([idle]).get_state() is grpc.ChannelConnectivity.IDLE
+
+
+class _FakeRpcError(grpc.RpcError):
+    pass
+
+
+class _ImmediateFuture:
+    def __init__(self, request: str, in_flight: list[int]) -> None:
+        self._request = request
+        in_flight.append(len(in_flight))
+
+    def add_done_callback(self, callback: Any) -> None:
+        callback(self)
+
+    def result(self) -> str:
+        if self._request == "bad":
+            raise _FakeRpcError()
+        return self._request.upper()
+
+
+class TestCallMany:
+    """Tests for call_many and call_many_aio."""
+
+    def test_results_in_input_order_with_errors(self) -> None:
+        issued: list[int] = []
+        multicallable = MagicMock()
+        multicallable.future.side_effect = lambda request, **_: _ImmediateFuture(request, issued)
+
+        results = runtime.call_many(multicallable, ["a", "bad", "c"], concurrency=2, timeout=3)
+
+        assert results[0] == "A"
+        assert isinstance(results[1], _FakeRpcError)
+        assert results[2] == "C"
+        assert multicallable.future.call_args.kwargs == {"timeout": 3}
+
+    def test_window_is_bounded(self) -> None:
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def future(request: int, **_: Any) -> futures.Future:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            result: futures.Future = futures.Future()
+
+            def complete() -> None:
+                nonlocal in_flight
+                with lock:
+                    in_flight -= 1
+                result.set_result(request)
+
+            threading.Timer(0.001 * (3 - request % 3), complete).start()
+            return result
+
+        multicallable = MagicMock()
+        multicallable.future.side_effect = future
+
+        assert runtime.call_many(multicallable, range(12), concurrency=3) == list(range(12))
+        assert peak <= 3
+
+    def test_aio_bounded_and_ordered(self) -> None:
+        in_flight = 0
+        peak = 0
+
+        async def call(request: int, **_: Any) -> int:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001 * (5 - request % 5))
+            in_flight -= 1
+            if request == 3:
+                raise _FakeRpcError()
+            return request * 10
+
+        results = asyncio.run(runtime.call_many_aio(call, range(10), concurrency=3))
+
+        assert peak == 3
+        assert isinstance(results[3], _FakeRpcError)
+        assert [r for i, r in enumerate(results) if i != 3] == [0, 10, 20, 40, 50, 60, 70, 80, 90]
+
+    @pytest.mark.parametrize("concurrency", [0, -1])
+    def test_invalid_concurrency(self, concurrency: int) -> None:
+        with pytest.raises(ValueError, match="concurrency"):
+            runtime.call_many(MagicMock(), [], concurrency=concurrency)
+
+
+class TestGather:
+    """Tests for gather."""
+
+    @staticmethod
+    def _future(result: Any = None, error: Exception | None = None) -> Any:
+        future: futures.Future = futures.Future()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+        return future
+
+    def test_results_in_input_order(self) -> None:
+        assert runtime.gather([self._future("a"), self._future("b")]) == ["a", "b"]
+
+    def test_first_error_raised(self) -> None:
+        error = _FakeRpcError()
+
+        with pytest.raises(_FakeRpcError) as raised:
+            runtime.gather([self._future("a"), self._future(error=error), self._future(error=_FakeRpcError())])
+
+        assert raised.value is error
+
+    def test_return_exceptions(self) -> None:
+        error = _FakeRpcError()
+
+        assert runtime.gather([self._future(error=error), self._future("b")], return_exceptions=True) == [error, "b"]
+
+    def test_timeout_covers_all_futures(self) -> None:
+        pending: list[Any] = [futures.Future() for _ in range(3)]
+        started = time.monotonic()
+
+        with pytest.raises(futures.TimeoutError):
+            runtime.gather(pending, timeout=0.1)
+
+        assert time.monotonic() - started < 0.5
+
+
+class _Page:
+    """Minimal protobuf-like message for pagination tests."""
+
+    def __init__(self, **fields: Any) -> None:
+        self.__dict__.update(fields)
+
+    def CopyFrom(self, other: "_Page") -> None:  # noqa: N802
+        self.__dict__.update(other.__dict__)
+
+    def __getattr__(self, name: str) -> Any:
+        raise AttributeError(name)
+
+
+_TOKEN_PAGES = runtime.Pagination(items="items", page_token="page_token", next_page_token="next_page_token")
+_OFFSET_PAGES = runtime.Pagination(items="items", offset="offset", page_size="limit")
+
+
+def _token_page(request: _Page) -> _Page:
+    start = int(request.page_token or 0)
+    end = min(start + 2, 5)
+    return _Page(items=list(range(start, end)), next_page_token=str(end) if end < 5 else "")
+
+
+class TestPagination:
+    """Tests for Pagination, iter_pages and iter_pages_aio."""
+
+    def test_token_next_request(self) -> None:
+        request = _Page(page_token="", filter="x")
+
+        following = _TOKEN_PAGES.next_request(request, _Page(items=[1], next_page_token="t2"))
+
+        assert (following.page_token, following.filter, request.page_token) == ("t2", "x", "")
+        assert _TOKEN_PAGES.next_request(request, _Page(items=[1], next_page_token="")) is None
+
+    @pytest.mark.parametrize(
+        ("limit", "count", "expected"),
+        [(2, 2, 12), (2, 1, None), (0, 3, 13), (0, 0, None)],
+    )
+    def test_offset_next_request(self, limit: int, count: int, expected: int | None) -> None:
+        following = _OFFSET_PAGES.next_request(_Page(offset=10, limit=limit), _Page(items=[0] * count))
+
+        assert (following and following.offset) == expected
+
+    @staticmethod
+    def _multicallable(log: list[str]) -> MagicMock:
+        def future(request: _Page, **_: Any) -> futures.Future:
+            log.append(f"call {request.page_token or 0}")
+            result: futures.Future = futures.Future()
+            result.set_result(_token_page(request))
+            return result
+
+        multicallable = MagicMock()
+        multicallable.future.side_effect = future
+        return multicallable
+
+    @pytest.mark.parametrize(
+        ("prefetch", "expected"),
+        [
+            (True, ["call 0", "call 2", "page 0", "call 4", "page 2", "page 4"]),
+            (False, ["call 0", "page 0", "call 2", "page 2", "call 4", "page 4"]),
+        ],
+    )
+    def test_prefetch_requests_next_page_first(self, prefetch: bool, expected: list[str]) -> None:
+        log: list[str] = []
+        pages = runtime.iter_pages(self._multicallable(log), _Page(page_token=""), _TOKEN_PAGES, prefetch=prefetch)
+
+        for page in pages:
+            log.append(f"page {page.items[0]}")
+
+        assert log == expected
+
+    def test_leaving_early_cancels_prefetched_page(self) -> None:
+        multicallable = MagicMock()
+        multicallable.future.return_value.result.return_value = _Page(items=[1], next_page_token="next")
+        pages = runtime.iter_pages(multicallable, _Page(page_token=""), _TOKEN_PAGES, timeout=3)
+
+        next(pages)
+        pages.close()
+
+        multicallable.future.return_value.cancel.assert_called_once_with()
+        assert multicallable.future.call_args.kwargs == {"timeout": 3}
+
+    def test_aio_walks_all_pages(self) -> None:
+        calls: list[str] = []
+
+        class Call:
+            def __init__(self, request: _Page) -> None:
+                calls.append(request.page_token)
+                self.cancel = MagicMock()
+                self._request = request
+
+            def __await__(self) -> Any:
+                yield from asyncio.sleep(0).__await__()
+                return _token_page(self._request)
+
+        async def run() -> list[list[int]]:
+            return [page.items async for page in runtime.iter_pages_aio(Call, _Page(page_token=""), _TOKEN_PAGES)]
+
+        assert asyncio.run(run()) == [[0, 1], [2, 3], [4]]
+        assert calls == ["", "2", "4"]
+
+
+class _Responses:
+    """Server-stream stand-in: yields ``items``, pausing ``pauses[i]`` seconds before item ``i``."""
+
+    def __init__(self, items: list[Any], pauses: dict[int, float] | None = None, error: Exception | None = None):
+        self._items = items
+        self._pauses = pauses or {}
+        self._error = error
+        self.cancelled = threading.Event()
+
+    def __iter__(self) -> Iterator[Any]:
+        for index, item in enumerate(self._items):
+            time.sleep(self._pauses.get(index, 0))
+            if self.cancelled.is_set():
+                return
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        for index, item in enumerate(self._items):
+            await asyncio.sleep(self._pauses.get(index, 0))
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def cancel(self) -> bool:
+        self.cancelled.set()
+        return True
+
+
+class TestBufferedRequests:
+    """Tests for buffered_requests and buffered_requests_aio."""
+
+    def test_yields_source_in_order(self) -> None:
+        assert list(runtime.buffered_requests(iter(range(100)), buffer_size=4)) == list(range(100))
+
+    def test_producer_is_bounded_by_buffer(self) -> None:
+        produced = 0
+
+        def source() -> Iterator[int]:
+            nonlocal produced
+            for i in range(100):
+                produced += 1
+                yield i
+
+        requests = runtime.buffered_requests(source(), buffer_size=5)
+        assert next(requests) == 0
+        deadline = time.monotonic() + 2
+        while produced < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        # One message handed out, five buffered and one waiting for room.
+        assert produced == 7
+        requests.close()
+
+    def test_source_error_reraised(self) -> None:
+        with pytest.raises(ValueError, match="boom"):
+            list(runtime.buffered_requests(_Responses([1, 2], error=ValueError("boom"))))
+
+    @pytest.mark.parametrize("buffer_size", [0, -1])
+    def test_invalid_buffer_size(self, buffer_size: int) -> None:
+        with pytest.raises(ValueError, match="buffer_size"):
+            next(runtime.buffered_requests([], buffer_size=buffer_size))
+
+    @pytest.mark.parametrize("source", [range(20), _Responses(list(range(20)))])
+    def test_aio_accepts_sync_and_async_sources(self, source: Any) -> None:
+        async def run() -> list[int]:
+            return [item async for item in runtime.buffered_requests_aio(source, buffer_size=3)]
+
+        assert asyncio.run(run()) == list(range(20))
+
+    def test_aio_source_error_reraised(self) -> None:
+        async def run() -> list[int]:
+            return [item async for item in runtime.buffered_requests_aio(_Responses([1], error=ValueError("boom")))]
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(run())
+
+
+class TestIterBatches:
+    """Tests for iter_batches and iter_batches_aio."""
+
+    def test_full_batches_then_remainder(self) -> None:
+        assert list(runtime.iter_batches(range(7), size=3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_max_wait_flushes_partial_batch(self) -> None:
+        responses = _Responses(list(range(6)), pauses={3: 0.5})
+
+        assert list(runtime.iter_batches(responses, size=5, max_wait=0.1)) == [[0, 1, 2], [3, 4, 5]]
+
+    def test_error_raised_after_received_responses(self) -> None:
+        responses = _Responses([1, 2, 3], error=ValueError("boom"))
+        batches = runtime.iter_batches(responses, size=2, max_wait=1.0)
+
+        assert next(batches) == [1, 2]
+        assert next(batches) == [3]
+        with pytest.raises(ValueError, match="boom"):
+            next(batches)
+
+    @pytest.mark.parametrize("max_wait", [None, 1.0])
+    def test_leaving_early_cancels_call(self, max_wait: float | None) -> None:
+        responses = _Responses(list(range(100)))
+        batches = runtime.iter_batches(responses, size=10, max_wait=max_wait)
+
+        assert next(batches) == list(range(10))
+        batches.close()
+
+        assert responses.cancelled.is_set()
+
+    def test_invalid_size(self) -> None:
+        with pytest.raises(ValueError, match="size"):
+            next(runtime.iter_batches([], size=0))
+
+    @pytest.mark.parametrize(
+        ("max_wait", "expected"),
+        [(None, [[0, 1, 2, 3, 4], [5]]), (0.1, [[0, 1, 2], [3, 4, 5]])],
+    )
+    def test_aio_batches(self, max_wait: float | None, expected: list[list[int]]) -> None:
+        responses = _Responses(list(range(6)), pauses={3: 0.5})
+
+        async def run() -> list[list[int]]:
+            return [batch async for batch in runtime.iter_batches_aio(responses, size=5, max_wait=max_wait)]
+
+        assert asyncio.run(run()) == expected
+
+    def test_aio_error_and_cancel(self) -> None:
+        responses = _Responses([1, 2, 3], error=ValueError("boom"))
+        seen: list[list[int]] = []
+
+        async def run() -> None:
+            async for batch in runtime.iter_batches_aio(responses, size=2):
+                seen.append(batch)
+
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(run())
+        assert seen == [[1, 2], [3]]
+        assert responses.cancelled.is_set()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(value: str) -> MagicMock:
+    request = MagicMock()
+    request.SerializeToString.return_value = value.encode()
+    return request
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_hit_until_ttl_expires(self) -> None:
+        clock = _Clock()
+        cache = runtime.ResponseCache(ttl=10, clock=clock)
+        invoke = MagicMock(side_effect=["first", "second"])
+
+        assert cache.call("/pkg.Svc/Get", _request("a"), invoke) == "first"
+        clock.now = 9.9
+        assert cache.call("/pkg.Svc/Get", _request("a"), invoke) == "first"
+        clock.now = 10.0
+        assert cache.call("/pkg.Svc/Get", _request("a"), invoke) == "second"
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_key_uses_method_and_deterministic_bytes(self) -> None:
+        request = _request("a")
+
+        assert runtime.ResponseCache.key("/pkg.Svc/Get", request) == ("/pkg.Svc/Get", b"a")
+        request.SerializeToString.assert_called_once_with(deterministic=True)
+        assert runtime.ResponseCache.key("/pkg.Svc/Get", request) != runtime.ResponseCache.key("/pkg.Svc/List", request)
+
+    def test_least_recently_used_evicted(self) -> None:
+        cache = runtime.ResponseCache(maxsize=2)
+        cache.put(("m", b"a"), "A")
+        cache.put(("m", b"b"), "B")
+        cache.get(("m", b"a"))
+        cache.put(("m", b"c"), "C")
+
+        assert len(cache) == 2
+        assert cache.get(("m", b"a")) == (True, "A")
+        assert cache.get(("m", b"b")) == (False, None)
+
+    def test_errors_not_cached(self) -> None:
+        cache = runtime.ResponseCache()
+        invoke = MagicMock(side_effect=[_FakeRpcError(), "ok"])
+
+        with pytest.raises(_FakeRpcError):
+            cache.call("/pkg.Svc/Get", _request("a"), invoke)
+        assert cache.call("/pkg.Svc/Get", _request("a"), invoke) == "ok"
+        assert len(cache) == 1
+
+    def test_clear_keeps_counters(self) -> None:
+        cache = runtime.ResponseCache()
+        cache.call("/pkg.Svc/Get", _request("a"), lambda: "A")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.misses == 1
+
+    def test_invalid_maxsize(self) -> None:
+        with pytest.raises(ValueError, match="maxsize"):
+            runtime.ResponseCache(maxsize=0)
+
+    def test_aio_concurrent_requests_share_one_call(self) -> None:
+        cache = runtime.ResponseCache()
+        calls = 0
+
+        async def invoke() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "A"
+
+        async def run() -> list[Any]:
+            return await asyncio.gather(*(cache.call_aio("/pkg.Svc/Get", _request("a"), invoke) for _ in range(5)))
+
+        assert asyncio.run(run()) == ["A"] * 5
+        assert calls == 1
+        assert len(cache) == 1
+
+    def test_aio_error_reaches_every_waiter_and_is_not_cached(self) -> None:
+        cache = runtime.ResponseCache()
+
+        async def invoke() -> str:
+            await asyncio.sleep(0.01)
+            raise _FakeRpcError()
+
+        async def run() -> list[Any]:
+            calls = (cache.call_aio("/pkg.Svc/Get", _request("a"), invoke) for _ in range(3))
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        assert all(isinstance(result, _FakeRpcError) for result in asyncio.run(run()))
+        assert len(cache) == 0
+
+    def test_aio_waiter_retries_when_leader_cancelled(self) -> None:
+        cache = runtime.ResponseCache()
+        calls = 0
+
+        async def invoke() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "A"
+
+        async def run() -> Any:
+            leader = asyncio.create_task(cache.call_aio("/pkg.Svc/Get", _request("a"), invoke))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(cache.call_aio("/pkg.Svc/Get", _request("a"), invoke))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await waiter
+
+        assert asyncio.run(run()) == "A"
+        assert calls == 2
+
+
+class TestServiceConfigLookup:
+    """Tests for the service config helpers."""
+
+    CONFIG: dict[str, Any] = {
+        "methodConfig": [
+            {"name": [{}], "timeout": "10s"},
+            {"name": [{"service": "a.S"}], "timeout": "5s"},
+            {"name": [{"service": "a.S", "method": "Get"}, {"service": "b.T", "method": "Get"}], "timeout": "1s"},
+        ]
+    }
+
+    @pytest.mark.parametrize(
+        ("path", "timeout"),
+        [("/a.S/Get", "1s"), ("/b.T/Get", "1s"), ("/a.S/Put", "5s"), ("/b.T/Put", "10s")],
+    )
+    def test_most_specific_entry_wins(self, path: str, timeout: str) -> None:
+        entry = runtime.method_config(self.CONFIG, path)
+        assert entry is not None
+        assert entry["timeout"] == timeout
+
+    def test_no_match(self) -> None:
+        assert runtime.method_config({"methodConfig": [{"name": [{"service": "a.S"}]}]}, "/b.T/Get") is None
+
+    @pytest.mark.parametrize(("value", "seconds"), [("0.25s", 0.25), ("3s", 3.0), (2, 2.0)])
+    def test_parse_duration(self, value: str | int, seconds: float) -> None:
+        assert runtime.parse_duration(value) == seconds
+
+    def test_parse_duration_requires_unit(self) -> None:
+        with pytest.raises(ValueError, match="suffix"):
+            runtime.parse_duration("3")
+
+    @pytest.mark.parametrize("value", ["UNAVAILABLE", 14])
+    def test_status_code(self, value: str | int) -> None:
+        assert runtime.status_code(value) is grpc.StatusCode.UNAVAILABLE
+
+    def test_unknown_status_code(self) -> None:
+        with pytest.raises(ValueError, match="status code"):
+            runtime.status_code("NOPE")
+
+    def test_hedging_policy(self) -> None:
+        config = {
+            "methodConfig": [
+                {
+                    "name": [{"service": "a.S"}],
+                    "timeout": "2s",
+                    "hedgingPolicy": {
+                        "maxAttempts": 9,
+                        "hedgingDelay": "0.1s",
+                        "nonFatalStatusCodes": ["UNAVAILABLE", "RESOURCE_EXHAUSTED"],
+                    },
+                }
+            ]
+        }
+
+        assert runtime.hedging_policy(config, "/a.S/Get") == runtime.HedgingPolicy(
+            max_attempts=runtime.MAX_ATTEMPTS,
+            delay=0.1,
+            non_fatal_codes=frozenset({grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.RESOURCE_EXHAUSTED}),
+            timeout=2.0,
+        )
+        assert runtime.hedging_policy(config, "/b.T/Get") is None
+        assert runtime.hedging_policy(self.CONFIG, "/a.S/Get") is None
+
+    def test_hedging_needs_two_attempts(self) -> None:
+        with pytest.raises(ValueError, match="maxAttempts"):
+            runtime.HedgingPolicy.from_method_config({"hedgingPolicy": {"maxAttempts": 1}})
+
+
+class _StatusError(grpc.RpcError):
+    def __init__(self, code: grpc.StatusCode) -> None:
+        self._code = code
+
+    def code(self) -> grpc.StatusCode:
+        return self._code
+
+
+_POLICY = runtime.HedgingPolicy(
+    max_attempts=3, delay=0.02, non_fatal_codes=frozenset({grpc.StatusCode.UNAVAILABLE}), timeout=5.0
+)
+
+
+class _Attempts:
+    """Fake sync multicallable; ``outcomes[i]`` decides attempt ``i``: a value, an error or None (hang)."""
+
+    def __init__(self, *outcomes: Any) -> None:
+        self.outcomes = list(outcomes)
+        self.futures: list[futures.Future] = []
+        self.timeouts: list[float | None] = []
+
+    def future(self, request: Any, timeout: float | None = None, **_: Any) -> futures.Future:
+        self.timeouts.append(timeout)
+        future: futures.Future = futures.Future()
+        outcome = self.outcomes[len(self.futures)]
+        self.futures.append(future)
+        if isinstance(outcome, BaseException):
+            future.set_exception(outcome)
+        elif outcome is not None:
+            threading.Timer(0.001, future.set_result, [outcome]).start()
+        return future
+
+
+class TestHedgedCall:
+    """Tests for hedged_call and hedged_call_aio."""
+
+    def test_slow_attempt_is_hedged_and_cancelled(self) -> None:
+        attempts = _Attempts(None, "fast", "unused")
+
+        assert runtime.hedged_call(attempts, "req", _POLICY) == "fast"
+        assert len(attempts.futures) == 2
+        assert attempts.futures[0].cancelled()
+        assert all(timeout is not None and 0 < timeout <= 5.0 for timeout in attempts.timeouts)
+
+    def test_fatal_error_raised_immediately(self) -> None:
+        attempts = _Attempts(_StatusError(grpc.StatusCode.INVALID_ARGUMENT), "unused")
+
+        with pytest.raises(_StatusError):
+            runtime.hedged_call(attempts, "req", _POLICY)
+        assert len(attempts.futures) == 1
+
+    def test_non_fatal_error_sends_next_attempt_at_once(self) -> None:
+        attempts = _Attempts(_StatusError(grpc.StatusCode.UNAVAILABLE), "ok")
+        policy = _POLICY._replace(delay=30.0)
+
+        started = time.monotonic()
+        assert runtime.hedged_call(attempts, "req", policy) == "ok"
+        assert time.monotonic() - started < 5.0
+
+    def test_last_error_raised_when_attempts_exhausted(self) -> None:
+        errors = [_StatusError(grpc.StatusCode.UNAVAILABLE) for _ in range(3)]
+
+        with pytest.raises(_StatusError) as exc_info:
+            runtime.hedged_call(_Attempts(*errors), "req", _POLICY)
+        assert exc_info.value is errors[2]
+
+    def test_aio_slow_attempt_is_hedged(self) -> None:
+        started: list[float | None] = []
+        cancelled = 0
+
+        async def call(request: Any, **kwargs: Any) -> str:
+            nonlocal cancelled
+            started.append(kwargs["timeout"])
+            try:
+                await asyncio.sleep(10 if len(started) == 1 else 0)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return f"attempt {len(started)}"
+
+        async def run() -> Any:
+            result = await runtime.hedged_call_aio(call, "req", _POLICY, timeout=1.0)
+            await asyncio.sleep(0)
+            return result
+
+        assert asyncio.run(run()) == "attempt 2"
+        assert cancelled == 1
+        assert all(timeout is not None and 0 < timeout <= 1.0 for timeout in started)
+
+    def test_aio_fatal_error(self) -> None:
+        async def call(request: Any, **_: Any) -> str:
+            raise _StatusError(grpc.StatusCode.PERMISSION_DENIED)
+
+        with pytest.raises(_StatusError):
+            asyncio.run(runtime.hedged_call_aio(call, "req", _POLICY))
+
+
+class TestInMemoryMetrics:
+    """Tests for InMemoryMetrics and prometheus_text."""
+
+    def test_aggregates_per_method(self) -> None:
+        metrics = runtime.InMemoryMetrics(buckets=(0.1, 1.0))
+        metrics.record("/a.S/Get", grpc.StatusCode.OK, 0.05, 10, 100)
+        metrics.record("/a.S/Get", grpc.StatusCode.UNAVAILABLE, 0.5, 10, 0)
+        metrics.record("/a.S/Get", grpc.StatusCode.UNAVAILABLE, 3.0, 10, 0)
+
+        get = metrics.snapshot()["/a.S/Get"]
+
+        assert get.calls == 3
+        assert get.errors == {"UNAVAILABLE": 2}
+        assert get.latency_counts == [1, 1, 1]
+        assert get.latency_sum == pytest.approx(3.55)
+        assert (get.request_bytes, get.response_bytes) == (30, 100)
+
+    def test_snapshot_is_a_copy(self) -> None:
+        metrics = runtime.InMemoryMetrics()
+        metrics.record("/a.S/Get", grpc.StatusCode.INTERNAL, 0.01, 1, 1)
+        snapshot = metrics.snapshot()
+        metrics.record("/a.S/Get", grpc.StatusCode.INTERNAL, 0.01, 1, 1)
+
+        assert snapshot["/a.S/Get"].calls == 1
+        assert snapshot["/a.S/Get"].errors == {"INTERNAL": 1}
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_prometheus_text(self) -> None:
+        metrics = runtime.InMemoryMetrics(buckets=(0.1, 1.0))
+        metrics.record("/a.S/Get", grpc.StatusCode.OK, 0.05, 10, 100)
+        metrics.record("/a.S/Get", grpc.StatusCode.NOT_FOUND, 0.5, 10, 0)
+
+        text = runtime.prometheus_text(metrics, prefix="rpc")
+
+        assert "# TYPE rpc_latency_seconds histogram" in text
+        assert 'rpc_calls_total{method="/a.S/Get"} 2' in text
+        assert 'rpc_errors_total{method="/a.S/Get",code="NOT_FOUND"} 1' in text
+        assert 'rpc_latency_seconds_bucket{method="/a.S/Get",le="0.1"} 1' in text
+        assert 'rpc_latency_seconds_bucket{method="/a.S/Get",le="+Inf"} 2' in text
+        assert 'rpc_latency_seconds_count{method="/a.S/Get"} 2' in text
+        assert 'rpc_request_bytes_total{method="/a.S/Get"} 20' in text
+        assert 'rpc_response_bytes_total{method="/a.S/Get"} 100' in text
+        assert text.endswith("\n")
+
+
+@pytest.fixture
+def bytes_server() -> Iterator[int]:
+    """Server for ``/test.Svc/{Unary,Upload,Download,Echo}`` exchanging raw bytes."""
+
+    def unary(request: bytes, context: grpc.ServicerContext) -> bytes:
+        if request == b"fail":
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "fail")
+        return request * 2
+
+    def upload(requests: Iterator[bytes], context: grpc.ServicerContext) -> bytes:
+        return b"".join(requests)
+
+    def download(request: bytes, context: grpc.ServicerContext) -> Iterator[bytes]:
+        yield from (request for _ in range(3))
+
+    def echo(requests: Iterator[bytes], context: grpc.ServicerContext) -> Iterator[bytes]:
+        yield from requests
+
+    handler = grpc.method_handlers_generic_handler(
+        "test.Svc",
+        {
+            "Unary": grpc.unary_unary_rpc_method_handler(unary),
+            "Upload": grpc.stream_unary_rpc_method_handler(upload),
+            "Download": grpc.unary_stream_rpc_method_handler(download),
+            "Echo": grpc.stream_stream_rpc_method_handler(echo),
+        },
+    )
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield port
+    server.stop(None)
+
+
+def _summary(metrics: runtime.InMemoryMetrics) -> dict[str, tuple[int, dict[str, int], int, int]]:
+    return {
+        method.rsplit("/", 1)[1]: (m.calls, m.errors, m.request_bytes, m.response_bytes)
+        for method, m in metrics.snapshot().items()
+    }
+
+
+def _raw(channel: Any, kind: str, method: str) -> Any:
+    return getattr(channel, kind)(f"/test.Svc/{method}", request_serializer=None, response_deserializer=None)
+
+
+_EXPECTED_SUMMARY = {
+    "Unary": (2, {"FAILED_PRECONDITION": 1}, 6, 4),
+    "Upload": (1, {}, 4, 4),
+    "Download": (1, {}, 3, 9),
+    "Echo": (1, {}, 4, 4),
+}
+
+
+class TestMetricsInterceptors:
+    """Tests for MetricsInterceptor and aio_metrics_interceptors against a local server."""
+
+    @pytest.mark.parametrize("pool_size", [1, 2])
+    def test_sync_records_every_call_kind(self, bytes_server: int, pool_size: int) -> None:
+        metrics = runtime.InMemoryMetrics()
+        with runtime.connect(f"127.0.0.1:{bytes_server}", pool_size=pool_size) as channel:
+            instrumented = runtime.instrument(channel, metrics)
+            unary = _raw(instrumented, "unary_unary", "Unary")
+            assert unary(b"ab", timeout=5) == b"abab"
+            with pytest.raises(grpc.RpcError):
+                unary(b"fail", timeout=5)
+            assert _raw(instrumented, "stream_unary", "Upload")(iter([b"ab", b"cd"]), timeout=5) == b"abcd"
+            assert list(_raw(instrumented, "unary_stream", "Download")(b"xyz", timeout=5)) == [b"xyz"] * 3
+            assert list(_raw(instrumented, "stream_stream", "Echo")(iter([b"ab", b"cd"]), timeout=5)) == [b"ab", b"cd"]
+
+        assert _summary(metrics) == _EXPECTED_SUMMARY
+        assert all(m.latency_sum > 0 for m in metrics.snapshot().values())
+
+    def test_sync_future_calls_recorded_on_completion(self, bytes_server: int) -> None:
+        metrics = runtime.InMemoryMetrics()
+        with runtime.connect(f"127.0.0.1:{bytes_server}", metrics=metrics) as channel:
+            future = _raw(channel, "unary_unary", "Unary").future(b"ab", timeout=5)
+            assert future.result() == b"abab"
+
+        deadline = time.monotonic() + 5
+        while not metrics.snapshot() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _summary(metrics) == {"Unary": (1, {}, 2, 4)}
+
+    def test_aio_records_every_call_kind(self, bytes_server: int) -> None:
+        metrics = runtime.InMemoryMetrics()
+
+        async def requests() -> Any:
+            yield b"ab"
+            yield b"cd"
+
+        async def run() -> None:
+            async with runtime.connect_aio(f"127.0.0.1:{bytes_server}", metrics=metrics) as channel:
+                unary = _raw(channel, "unary_unary", "Unary")
+                assert await unary(b"ab", timeout=5) == b"abab"
+                with pytest.raises(grpc.RpcError):
+                    await unary(b"fail", timeout=5)
+                assert await _raw(channel, "stream_unary", "Upload")(requests(), timeout=5) == b"abcd"
+                assert [r async for r in _raw(channel, "unary_stream", "Download")(b"xyz", timeout=5)] == [b"xyz"] * 3
+                assert [r async for r in _raw(channel, "stream_stream", "Echo")(iter([b"ab", b"cd"]), timeout=5)] == [
+                    b"ab",
+                    b"cd",
+                ]
+
+        asyncio.run(run())
+
+        assert _summary(metrics) == _EXPECTED_SUMMARY
+
+    def test_aio_interceptor_per_call_kind(self) -> None:
+        interceptors = runtime.aio_metrics_interceptors(runtime.InMemoryMetrics())
+
+        assert [type(i).__mro__[2] for i in interceptors] == [
+            grpc.aio.UnaryUnaryClientInterceptor,
+            grpc.aio.UnaryStreamClientInterceptor,
+            grpc.aio.StreamUnaryClientInterceptor,
+            grpc.aio.StreamStreamClientInterceptor,
+        ]
+
+
+class TestWarmUp:
+    """Tests for warm_up and warm_up_aio."""
+
+    @pytest.mark.parametrize("pool_size", [1, 3])
+    def test_connects_and_pings_every_connection(self, bytes_server: int, pool_size: int) -> None:
+        metrics = runtime.InMemoryMetrics()
+        with runtime.connect(f"127.0.0.1:{bytes_server}", pool_size=pool_size, metrics=metrics) as channel:
+            runtime.warm_up(channel, timeout=5, ping="/test.Svc/Unary")
+        assert metrics.snapshot()["/test.Svc/Unary"].calls == pool_size
+
+    def test_unimplemented_ping_accepted(self, bytes_server: int) -> None:
+        with runtime.connect(f"127.0.0.1:{bytes_server}") as channel:
+            runtime.warm_up(channel, timeout=5, ping=runtime.HEALTH_CHECK_METHOD)
+
+    def test_failed_ping_raised(self) -> None:
+        channel = MagicMock()
+        channel.unary_unary.return_value.future.return_value.result.side_effect = _StatusError(
+            grpc.StatusCode.PERMISSION_DENIED
+        )
+
+        with patch.object(grpc, "channel_ready_future"), pytest.raises(_StatusError):
+            runtime.warm_up(channel, ping="/a.B/C")
+
+        channel.unary_unary.assert_called_once_with("/a.B/C")
+
+    def test_unreachable_target_times_out(self) -> None:
+        with runtime.connect("127.0.0.1:1") as channel, pytest.raises(TimeoutError, match="0.2s"):
+            runtime.warm_up(channel, timeout=0.2)
+
+    def test_aio_pool(self, bytes_server: int) -> None:
+        metrics = runtime.InMemoryMetrics()
+
+        async def run() -> list[grpc.ChannelConnectivity]:
+            async with runtime.connect_aio(f"127.0.0.1:{bytes_server}", pool_size=2, metrics=metrics) as pool:
+                await runtime.warm_up_aio(pool, timeout=5, ping="/test.Svc/Unary")
+                await runtime.warm_up_aio(pool, timeout=5, ping="/test.Svc/Missing")
+                assert isinstance(pool, runtime.AioChannelPool)
+                return [channel.get_state() for channel in pool]
+
+        assert asyncio.run(run()) == [grpc.ChannelConnectivity.READY] * 2
+        assert metrics.snapshot()["/test.Svc/Unary"].calls == 2
+
+    def test_aio_unreachable_target_times_out(self) -> None:
+        async def run() -> None:
+            async with runtime.connect_aio("127.0.0.1:1") as channel:
+                await runtime.warm_up_aio(channel, timeout=0.2)
+
+        with pytest.raises(TimeoutError, match="0.2s"):
+            asyncio.run(run())
+
+
+def _exchange(channel: Any) -> list[Any]:
+    """Call every ``bytes_server`` method once, the failing unary call included."""
+    unary = _raw(channel, "unary_unary", "Unary")
+    with pytest.raises(grpc.RpcError) as failure:
+        unary(b"fail", timeout=5)
+    return [
+        unary(b"ab", timeout=5),
+        (failure.value.code(), failure.value.details()),
+        _raw(channel, "stream_unary", "Upload")(iter([b"ab", b"cd"]), timeout=5),
+        list(_raw(channel, "unary_stream", "Download")(b"xyz", timeout=5)),
+        list(_raw(channel, "stream_stream", "Echo")(iter([b"ab", b"cd"]), timeout=5)),
+    ]
+
+
+async def _exchange_aio(channel: Any) -> list[Any]:
+    async def requests() -> Any:
+        yield b"ab"
+        yield b"cd"
+
+    unary = _raw(channel, "unary_unary", "Unary")
+    with pytest.raises(grpc.RpcError) as failure:
+        await unary(b"fail", timeout=5)
+    return [
+        await unary(b"ab", timeout=5),
+        (failure.value.code(), failure.value.details()),
+        await _raw(channel, "stream_unary", "Upload")(requests(), timeout=5),
+        [r async for r in _raw(channel, "unary_stream", "Download")(b"xyz", timeout=5)],
+        [r async for r in _raw(channel, "stream_stream", "Echo")(iter([b"ab", b"cd"]), timeout=5)],
+    ]
+
+
+_EXCHANGED = [
+    b"abab",
+    (grpc.StatusCode.FAILED_PRECONDITION, "fail"),
+    b"abcd",
+    [b"xyz"] * 3,
+    [b"ab", b"cd"],
+]
+
+# Nothing listens here: a replayed call that reached the network would fail.
+_UNREACHABLE = "127.0.0.1:1"
+
+
+class TestCassette:
+    """Tests for Cassette, CassetteInterceptor and aio_cassette_interceptors."""
+
+    def test_request_key(self) -> None:
+        assert runtime.request_key([b"ab", b"c"]) == runtime.request_key([b"ab", b"c"])
+        assert runtime.request_key([b"ab", b"c"]) != runtime.request_key([b"a", b"bc"])
+        assert len(runtime.request_key([])) == 32
+
+    def test_sync_record_then_replay_without_server(self, bytes_server: int, tmp_path: Any) -> None:
+        recorder = runtime.Cassette(tmp_path)
+        with runtime.connect(f"127.0.0.1:{bytes_server}") as channel:
+            assert _exchange(runtime.use_cassette(channel, recorder, "record")) == _EXCHANGED
+        recorder.save()
+
+        with runtime.connect(_UNREACHABLE) as channel:
+            assert _exchange(runtime.use_cassette(channel, runtime.Cassette(tmp_path), "replay")) == _EXCHANGED
+
+    def test_sync_replayed_future_and_call(self, bytes_server: int, tmp_path: Any) -> None:
+        recorder = runtime.Cassette(tmp_path)
+        with runtime.connect(f"127.0.0.1:{bytes_server}") as channel:
+            _exchange(runtime.use_cassette(channel, recorder, "record"))
+        recorder.save()
+
+        with runtime.connect(_UNREACHABLE) as channel:
+            unary = _raw(runtime.use_cassette(channel, runtime.Cassette(tmp_path), "replay"), "unary_unary", "Unary")
+            assert unary.future(b"ab").result() == b"abab"
+            response, call = unary.with_call(b"ab")
+            assert (response, call.code()) == (b"abab", grpc.StatusCode.OK)
+            assert unary.future(b"fail").exception().code() == grpc.StatusCode.FAILED_PRECONDITION
+
+    def test_aio_record_then_replay_without_server(self, bytes_server: int, tmp_path: Any) -> None:
+        recorder = runtime.Cassette(tmp_path)
+
+        async def run(target: str, cassette: runtime.Cassette, mode: str) -> list[Any]:
+            interceptors = runtime.aio_cassette_interceptors(cassette, mode)
+            async with runtime.connect_aio(target, interceptors=interceptors) as channel:
+                return await _exchange_aio(channel)
+
+        assert asyncio.run(run(f"127.0.0.1:{bytes_server}", recorder, "record")) == _EXCHANGED
+        recorder.save()
+        assert asyncio.run(run(_UNREACHABLE, runtime.Cassette(tmp_path), "replay")) == _EXCHANGED
+
+    def test_sync_and_aio_recordings_interchangeable(self, bytes_server: int, tmp_path: Any) -> None:
+        recorder = runtime.Cassette(tmp_path)
+        with runtime.connect(f"127.0.0.1:{bytes_server}") as channel:
+            _exchange(runtime.use_cassette(channel, recorder, "record"))
+        recorder.save()
+
+        async def run() -> list[Any]:
+            interceptors = runtime.aio_cassette_interceptors(runtime.Cassette(tmp_path), "replay")
+            async with runtime.connect_aio(_UNREACHABLE, interceptors=interceptors) as channel:
+                return await _exchange_aio(channel)
+
+        assert asyncio.run(run()) == _EXCHANGED
+
+    def test_replay_miss(self, tmp_path: Any) -> None:
+        with runtime.connect(_UNREACHABLE) as channel:
+            replayed = runtime.use_cassette(channel, runtime.Cassette(tmp_path), "replay")
+            with pytest.raises(runtime.CassetteMissError, match="/test.Svc/Unary"):
+                _raw(replayed, "unary_unary", "Unary")(b"ab")
+
+    def test_aio_replay_miss(self, tmp_path: Any) -> None:
+        async def run() -> None:
+            interceptors = runtime.aio_cassette_interceptors(runtime.Cassette(tmp_path), "replay")
+            async with runtime.connect_aio(_UNREACHABLE, interceptors=interceptors) as channel:
+                await _raw(channel, "unary_unary", "Unary")(b"ab")
+
+        with pytest.raises(runtime.CassetteMissError):
+            asyncio.run(run())
+
+    def test_layout_and_lazy_index(self, tmp_path: Any) -> None:
+        cassette = runtime.Cassette(tmp_path)
+        ok = runtime.Recording(grpc.StatusCode.OK, "", (b"one", b"", b"three"))
+        cassette.record("/pkg.Svc/Get", "k1", runtime.Recording(grpc.StatusCode.OK, "", (b"first",)))
+        cassette.record("/pkg.Svc/List", "k2", ok)
+        cassette.record("/pkg.Svc/List", "k3", runtime.Recording(grpc.StatusCode.NOT_FOUND, "gone", ()))
+        assert not (tmp_path / "pkg.Svc" / "List.json").exists()
+        cassette.save()
+
+        assert sorted(p.name for p in (tmp_path / "pkg.Svc").iterdir()) == [
+            "Get.bin",
+            "Get.json",
+            "List.bin",
+            "List.json",
+        ]
+        assert json.loads((tmp_path / "pkg.Svc" / "List.json").read_text()) == {
+            "k2": [0, [3, 0, 5], "OK", ""],
+            "k3": [8, [], "NOT_FOUND", "gone"],
+        }
+        replay = runtime.Cassette(tmp_path)
+        assert replay.lookup("/pkg.Svc/List", "k2") == ok
+        assert replay.lookup("/pkg.Svc/List", "k3") == runtime.Recording(grpc.StatusCode.NOT_FOUND, "gone", ())
+        assert replay.lookup("/pkg.Svc/List", "missing") is None
+        assert list(replay._indexes) == ["/pkg.Svc/List"]
+
+    def test_rerecording_replaces_entry(self, tmp_path: Any) -> None:
+        cassette = runtime.Cassette(tmp_path)
+        cassette.record("/pkg.Svc/Get", "k", runtime.Recording(grpc.StatusCode.OK, "", (b"old",)))
+        cassette.record("/pkg.Svc/Get", "k", runtime.Recording(grpc.StatusCode.OK, "", (b"new",)))
+        cassette.save()
+
+        assert runtime.Cassette(tmp_path).lookup("/pkg.Svc/Get", "k") == runtime.Recording(
+            grpc.StatusCode.OK, "", (b"new",)
+        )
+
+    def test_replays_messages_of_registered_services(self, tmp_path: Any) -> None:
+        from google.protobuf import descriptor_pb2, descriptor_pool, empty_pb2, wrappers_pb2
+
+        file = descriptor_pb2.FileDescriptorProto(
+            name="pbreflect_cassette_test.proto",
+            package="cassette_test",
+            dependency=["google/protobuf/empty.proto", "google/protobuf/wrappers.proto"],
+        )
+        file.service.add(name="Svc").method.add(
+            name="Get", input_type=".google.protobuf.Empty", output_type=".google.protobuf.StringValue"
+        )
+        descriptor_pool.Default().Add(file)
+        request = empty_pb2.Empty()
+        cassette = runtime.Cassette(tmp_path)
+        cassette.record(
+            "/cassette_test.Svc/Get",
+            runtime.request_key([request.SerializeToString()]),
+            runtime.Recording(grpc.StatusCode.OK, "", (wrappers_pb2.StringValue(value="hi").SerializeToString(),)),
+        )
+
+        with runtime.connect(_UNREACHABLE) as channel:
+            get = runtime.use_cassette(channel, cassette, "replay").unary_unary(
+                "/cassette_test.Svc/Get",
+                request_serializer=empty_pb2.Empty.SerializeToString,
+                response_deserializer=wrappers_pb2.StringValue.FromString,
+            )
+            assert get(request) == wrappers_pb2.StringValue(value="hi")
+
+    def test_unknown_mode(self, tmp_path: Any) -> None:
+        with pytest.raises(ValueError, match="mode must be one of"):
+            runtime.CassetteInterceptor(runtime.Cassette(tmp_path), "rewind")
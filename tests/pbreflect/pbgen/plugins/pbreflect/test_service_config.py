@@ -0,0 +1,147 @@
+"""Tests for generated service configs."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from pbreflect.pbgen.plugins.pbreflect.service_config import (
+    DEFAULT_RETRY_POLICY,
+    build_service_config,
+    load_service_config,
+)
+
+
+def _method(name: str, idempotency_level: str = "IDEMPOTENCY_UNKNOWN", service: str = "a.S") -> dict[str, Any]:
+    return {"path": f"/{service}/{name}", "idempotency_level": idempotency_level}
+
+
+class TestBuildServiceConfig:
+    """Tests for build_service_config."""
+
+    def test_idempotent_methods_get_retry_policy(self) -> None:
+        methods = [_method("Get", "NO_SIDE_EFFECTS"), _method("Put", "IDEMPOTENT"), _method("Create")]
+
+        config = build_service_config([("a.S", methods)])
+
+        assert config == {
+            "methodConfig": [
+                {
+                    "name": [{"service": "a.S", "method": "Get"}, {"service": "a.S", "method": "Put"}],
+                    "retryPolicy": DEFAULT_RETRY_POLICY,
+                }
+            ]
+        }
+
+    def test_empty_without_idempotent_methods(self) -> None:
+        assert build_service_config([("a.S", [_method("Create")])]) == {}
+
+    def test_override_replaces_generated_entry(self) -> None:
+        hedged = {"name": [{"service": "a.S", "method": "Get"}], "hedgingPolicy": {"maxAttempts": 3}}
+        methods = [_method("Get", "NO_SIDE_EFFECTS"), _method("List", "NO_SIDE_EFFECTS")]
+
+        config = build_service_config([("a.S", methods)], {"methodConfig": [hedged]})
+
+        assert config["methodConfig"] == [
+            hedged,
+            {"name": [{"service": "a.S", "method": "List"}], "retryPolicy": DEFAULT_RETRY_POLICY},
+        ]
+
+    def test_service_and_default_overrides(self) -> None:
+        default = {"name": [{}], "timeout": "10s"}
+        other = {"name": [{"service": "b.T"}], "timeout": "1s"}
+        overrides = {"methodConfig": [default, other], "retryThrottling": {"maxTokens": 10, "tokenRatio": 0.1}}
+
+        config = build_service_config(
+            [("a.S", [_method("Get", "NO_SIDE_EFFECTS")]), ("c.U", [_method("Get", service="c.U")])], overrides
+        )
+
+        # The default entry covers every method, so nothing is generated and it is listed once.
+        assert config == {"retryThrottling": {"maxTokens": 10, "tokenRatio": 0.1}, "methodConfig": [default]}
+
+
+class TestLoadServiceConfig:
+    """Tests for load_service_config."""
+
+    def _write(self, tmp_path: Path, config: Any) -> Path:
+        path = tmp_path / "service_config.json"
+        path.write_text(json.dumps(config), encoding="utf-8")
+        return path
+
+    def test_valid(self, tmp_path: Path) -> None:
+        config = {
+            "methodConfig": [
+                {
+                    "name": [{"service": "a.S"}],
+                    "timeout": "0.5s",
+                    "retryPolicy": {"maxAttempts": 4, "retryableStatusCodes": ["UNAVAILABLE", 8]},
+                }
+            ]
+        }
+        assert load_service_config(self._write(tmp_path, config)) == config
+
+    @pytest.mark.parametrize(
+        ("config", "match"),
+        [
+            ([], "methodConfig"),
+            ({"methodConfig": [{"timeout": "1s"}]}, "name"),
+            ({"methodConfig": [{"name": [{}], "timeout": "1"}]}, "duration"),
+            ({"methodConfig": [{"name": [{}], "retryPolicy": {}, "hedgingPolicy": {}}]}, "both"),
+            ({"methodConfig": [{"name": [{}], "retryPolicy": {"maxAttempts": 3}}]}, "retryableStatusCodes"),
+            (
+                {"methodConfig": [{"name": [{}], "retryPolicy": {"maxAttempts": 3, "retryableStatusCodes": ["X"]}}]},
+                "status code",
+            ),
+            ({"methodConfig": [{"name": [{}], "hedgingPolicy": {"maxAttempts": 1}}]}, "maxAttempts"),
+        ],
+    )
+    def test_invalid(self, tmp_path: Path, config: Any, match: str) -> None:
+        with pytest.raises(ValueError, match=match):
+            load_service_config(self._write(tmp_path, config))
+
+    @pytest.mark.parametrize(
+        ("entry", "match"),
+        [
+            (5, r"methodConfig\[1\] must be an object"),
+            ({"name": ["a.S"]}, r"methodConfig\[1\]\.name\[0\] must be an object"),
+            ({"name": [{"service": 1}]}, r"methodConfig\[1\]\.name\[0\]\.service must be a string"),
+            ({"name": [{}], "timeout": None}, r"methodConfig\[1\]\.timeout must be a duration"),
+            ({"name": [{}], "timeout": "fasts"}, r"methodConfig\[1\]\.timeout: could not convert"),
+            ({"name": [{}], "retryPolicy": 5}, r"methodConfig\[1\]\.retryPolicy must be an object"),
+            (
+                {"name": [{}], "retryPolicy": {"maxAttempts": "3", "retryableStatusCodes": ["UNAVAILABLE"]}},
+                r"methodConfig\[1\]\.retryPolicy\.maxAttempts must be an integer",
+            ),
+            (
+                {"name": [{}], "retryPolicy": {"maxAttempts": 3, "retryableStatusCodes": "UNAVAILABLE"}},
+                r"methodConfig\[1\]\.retryPolicy\.retryableStatusCodes must be a list",
+            ),
+            (
+                {
+                    "name": [{}],
+                    "retryPolicy": {"maxAttempts": 3, "retryableStatusCodes": ["UNAVAILABLE"], "maxBackoff": []},
+                },
+                r"methodConfig\[1\]\.retryPolicy\.maxBackoff must be a duration",
+            ),
+            ({"name": [{}], "hedgingPolicy": []}, r"methodConfig\[1\]\.hedgingPolicy must be an object"),
+            (
+                {"name": [{}], "hedgingPolicy": {"maxAttempts": 2, "hedgingDelay": {}}},
+                r"methodConfig\[1\]\.hedgingPolicy\.hedgingDelay must be a duration",
+            ),
+            (
+                {"name": [{}], "hedgingPolicy": {"maxAttempts": 2, "nonFatalStatusCodes": ["UNAVAILABLE", "X"]}},
+                r"methodConfig\[1\]\.hedgingPolicy\.nonFatalStatusCodes\[1\]: Unknown status code",
+            ),
+        ],
+    )
+    def test_malformed_shapes_report_path(self, tmp_path: Path, entry: Any, match: str) -> None:
+        config = {"methodConfig": [{"name": [{}], "timeout": "1s"}, entry]}
+
+        with pytest.raises(ValueError, match=match):
+            load_service_config(self._write(tmp_path, config))
+
+    def test_unreadable(self, tmp_path: Path) -> None:
+        (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+        with pytest.raises(ValueError, match="Cannot read"):
+            load_service_config(tmp_path / "broken.json")
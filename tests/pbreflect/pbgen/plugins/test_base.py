@@ -59,3 +59,12 @@ class TestTemplateRenderer:
             extra_filters={"upper": str.upper},
         )
         assert renderer.render("test.j2", value="hello") == "HELLO"
+
+    def test_filters_do_not_leak_between_renderers(self, tmp_path: Path) -> None:
+        (tmp_path / "test.j2").write_text("{{ value | shout }}")
+        loud = TemplateRenderer(default_dir=tmp_path, extra_filters={"shout": str.upper})
+        quiet = TemplateRenderer(default_dir=tmp_path, extra_filters={"shout": str.lower})
+
+        assert loud.render("test.j2", value="Hi") == "HI"
+        assert quiet.render("test.j2", value="Hi") == "hi"
+        assert loud.render("test.j2", value="Hi") == "HI"
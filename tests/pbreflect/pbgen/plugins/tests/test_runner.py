@@ -3,9 +3,20 @@
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+from google.protobuf import descriptor_pb2
+from google.protobuf.compiler import plugin_pb2
+
+from pbreflect.pbgen.errors import GenerationFailedError
 from pbreflect.pbgen.plugins.tests.runner import run_test_generation
 
 
+def _descriptor_set(*names: str) -> descriptor_pb2.FileDescriptorSet:
+    fds = descriptor_pb2.FileDescriptorSet()
+    for name in names:
+        fds.file.add(name=name)
+    return fds
+
+
 class TestRunTestGeneration:
     """Tests for run_test_generation."""
 
@@ -26,114 +37,141 @@ class TestRunTestGeneration:
 
         mock_makedirs.assert_called_once()
 
-    @patch("pbreflect.pbgen.plugins.tests.runner.protoc")
+    @patch("pbreflect.pbgen.plugins.tests.runner.PbReflectTestsPlugin")
+    @patch("pbreflect.pbgen.plugins.tests.runner.DescriptorSetCompiler")
     @patch("pbreflect.pbgen.plugins.tests.runner.ProtoFileFinder")
-    @patch("pbreflect.pbgen.plugins.tests.runner.os.makedirs")
     def test_protoc_failure_skips_generation(
         self,
-        mock_makedirs: MagicMock,
         mock_finder_cls: MagicMock,
-        mock_protoc: MagicMock,
+        mock_compiler_cls: MagicMock,
+        mock_plugin_cls: MagicMock,
         tmp_path: Path,
     ) -> None:
-        mock_finder_cls.return_value.find_proto_files.return_value = ["a.proto"]
-        mock_protoc.main.return_value = 1
+        mock_finder_cls.return_value.find_proto_files.return_value = [str(tmp_path / "protos" / "a.proto")]
+        mock_compiler_cls.return_value.compile.side_effect = GenerationFailedError("exit 1")
 
         run_test_generation(
             proto_dir=str(tmp_path / "protos"),
             tests_output_dir=str(tmp_path / "tests"),
         )
 
-        mock_makedirs.assert_called_once()
+        mock_plugin_cls.return_value.process_request.assert_not_called()
 
     @patch("pbreflect.pbgen.plugins.tests.runner.PbReflectTestsPlugin")
-    @patch("pbreflect.pbgen.plugins.tests.runner.protoc")
+    @patch("pbreflect.pbgen.plugins.tests.runner.DescriptorSetCompiler")
     @patch("pbreflect.pbgen.plugins.tests.runner.ProtoFileFinder")
-    @patch("pbreflect.pbgen.plugins.tests.runner.os.makedirs")
     def test_writes_generated_files(
         self,
-        mock_makedirs: MagicMock,
         mock_finder_cls: MagicMock,
-        mock_protoc: MagicMock,
+        mock_compiler_cls: MagicMock,
         mock_plugin_cls: MagicMock,
         tmp_path: Path,
     ) -> None:
-        mock_finder_cls.return_value.find_proto_files.return_value = ["test.proto"]
-
-        import tempfile
-
-        desc_file = tempfile.NamedTemporaryFile(suffix=".pb", delete=False)
-        desc_file.write(b"")
-        desc_file.close()
-
-        mock_protoc.main.return_value = 0
-
-        from google.protobuf.compiler import plugin_pb2
+        proto_dir = tmp_path / "protos"
+        mock_finder_cls.return_value.find_proto_files.return_value = [str(proto_dir / "api" / "test.proto")]
+        mock_compiler_cls.return_value.compile.return_value.descriptor_set = _descriptor_set(
+            "google/protobuf/empty.proto", "api/test.proto"
+        )
 
         response = plugin_pb2.CodeGeneratorResponse()
         out_file = response.file.add()
-        out_file.name = "test_generated.py"
+        out_file.name = "svc/test_generated.py"
         out_file.content = "# test"
+        mock_plugin_cls.return_value.process_request.return_value = response
+
+        run_test_generation(proto_dir=str(proto_dir), tests_output_dir=str(tmp_path / "tests"))
 
+        request = mock_plugin_cls.return_value.process_request.call_args.args[0]
+        assert [f.name for f in request.proto_file] == ["google/protobuf/empty.proto", "api/test.proto"]
+        assert list(request.file_to_generate) == ["api/test.proto"]
+        assert (tmp_path / "tests" / "svc" / "test_generated.py").read_text() == "# test"
+
+    @patch("pbreflect.pbgen.plugins.tests.runner.PbReflectTestsPlugin")
+    @patch("pbreflect.pbgen.plugins.tests.runner.DescriptorSetCompiler")
+    @patch("pbreflect.pbgen.plugins.tests.runner.ProtoFileFinder")
+    def test_does_not_overwrite_existing_files(
+        self,
+        mock_finder_cls: MagicMock,
+        mock_compiler_cls: MagicMock,
+        mock_plugin_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        proto_dir = tmp_path / "protos"
+        mock_finder_cls.return_value.find_proto_files.return_value = [str(proto_dir / "test.proto")]
+        mock_compiler_cls.return_value.compile.return_value.descriptor_set = _descriptor_set("test.proto")
+        response = plugin_pb2.CodeGeneratorResponse()
+        response.file.add(name="conftest.py", content="# generated")
         mock_plugin_cls.return_value.process_request.return_value = response
+        existing = tmp_path / "tests" / "conftest.py"
+        existing.parent.mkdir(parents=True)
+        existing.write_text("# mine")
+
+        run_test_generation(proto_dir=str(proto_dir), tests_output_dir=str(tmp_path / "tests"))
 
-        with (
-            patch("pbreflect.pbgen.plugins.tests.runner.open") as mock_open,
-            patch("pbreflect.pbgen.plugins.tests.runner.os.unlink"),
-            patch("pbreflect.pbgen.plugins.tests.runner.os.path.exists", return_value=True),
-        ):
-            mock_open.side_effect = [
-                open(desc_file.name, "rb"),
-                MagicMock(),
-            ]
+        assert existing.read_text() == "# mine"
+
+    @patch("pbreflect.pbgen.plugins.tests.runner.PbReflectTestsPlugin")
+    @patch("pbreflect.pbgen.plugins.tests.runner.DescriptorSetCompiler")
+    @patch("pbreflect.pbgen.plugins.tests.runner.ProtoFileFinder")
+    def test_uses_precompiled_descriptor_set(
+        self,
+        mock_finder_cls: MagicMock,
+        mock_compiler_cls: MagicMock,
+        mock_plugin_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        proto_dir = tmp_path / "protos"
+        mock_finder_cls.return_value.find_proto_files.return_value = [str(proto_dir / "test.proto")]
+        mock_plugin_cls.return_value.process_request.return_value = plugin_pb2.CodeGeneratorResponse()
 
-            run_test_generation(
-                proto_dir=str(tmp_path / "protos"),
-                tests_output_dir=str(tmp_path / "tests"),
-            )
+        run_test_generation(
+            proto_dir=str(proto_dir),
+            tests_output_dir=str(tmp_path / "tests"),
+            descriptor_set=_descriptor_set("test.proto"),
+        )
 
-        mock_plugin_cls.return_value.process_request.assert_called_once()
+        mock_compiler_cls.assert_not_called()
+        request = mock_plugin_cls.return_value.process_request.call_args.args[0]
+        assert list(request.file_to_generate) == ["test.proto"]
 
     @patch("pbreflect.pbgen.plugins.tests.runner.PbReflectTestsPlugin")
-    @patch("pbreflect.pbgen.plugins.tests.runner.protoc")
     @patch("pbreflect.pbgen.plugins.tests.runner.ProtoFileFinder")
-    @patch("pbreflect.pbgen.plugins.tests.runner.os.makedirs")
     def test_passes_template_dir_to_plugin(
         self,
-        mock_makedirs: MagicMock,
         mock_finder_cls: MagicMock,
-        mock_protoc: MagicMock,
         mock_plugin_cls: MagicMock,
         tmp_path: Path,
     ) -> None:
-        mock_finder_cls.return_value.find_proto_files.return_value = ["test.proto"]
-        mock_protoc.main.return_value = 0
+        mock_finder_cls.return_value.find_proto_files.return_value = [str(tmp_path / "protos" / "test.proto")]
+        mock_plugin_cls.return_value.process_request.return_value = plugin_pb2.CodeGeneratorResponse()
 
-        import tempfile
-
-        desc_file = tempfile.NamedTemporaryFile(suffix=".pb", delete=False)
-        desc_file.write(b"")
-        desc_file.close()
+        run_test_generation(
+            proto_dir=str(tmp_path / "protos"),
+            tests_output_dir=str(tmp_path / "tests"),
+            template_dir="/custom/tmpl",
+            descriptor_set=_descriptor_set("test.proto"),
+        )
 
-        from google.protobuf.compiler import plugin_pb2
+        mock_plugin_cls.assert_called_once_with(template_dir="/custom/tmpl")
 
-        response = plugin_pb2.CodeGeneratorResponse()
-        mock_plugin_cls.return_value.process_request.return_value = response
+    @patch("pbreflect.pbgen.plugins.tests.runner.PbReflectTestsPlugin")
+    @patch("pbreflect.pbgen.plugins.tests.runner.ProtoFileFinder")
+    def test_fakes_and_layout_passed_as_plugin_parameters(
+        self,
+        mock_finder_cls: MagicMock,
+        mock_plugin_cls: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        mock_finder_cls.return_value.find_proto_files.return_value = [str(tmp_path / "protos" / "test.proto")]
+        mock_plugin_cls.return_value.process_request.return_value = plugin_pb2.CodeGeneratorResponse()
 
-        with (
-            patch("pbreflect.pbgen.plugins.tests.runner.open") as mock_open,
-            patch("pbreflect.pbgen.plugins.tests.runner.os.unlink"),
-            patch("pbreflect.pbgen.plugins.tests.runner.os.path.exists", return_value=True),
-        ):
-            mock_open.side_effect = [
-                open(desc_file.name, "rb"),
-                MagicMock(),
-            ]
-
-            run_test_generation(
-                proto_dir=str(tmp_path / "protos"),
-                tests_output_dir=str(tmp_path / "tests"),
-                template_dir="/custom/tmpl",
-            )
+        run_test_generation(
+            proto_dir=str(tmp_path / "protos"),
+            tests_output_dir=str(tmp_path / "tests"),
+            descriptor_set=_descriptor_set("test.proto"),
+            fakes=True,
+            layout="service",
+        )
 
-        mock_plugin_cls.assert_called_once_with(template_dir="/custom/tmpl")
+        request = mock_plugin_cls.return_value.process_request.call_args.args[0]
+        assert request.parameter == "client_module=clients,fakes=true,layout=service"
@@ -1,9 +1,21 @@
 """Tests for PbReflectTestsPlugin."""
 
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
 import google.protobuf.descriptor_pb2 as descriptor_pb2
+import grpc
+import pytest
+from google.protobuf import empty_pb2
 from google.protobuf.compiler import plugin_pb2 as plugin
 
+from pbreflect.pbgen.plugins.pbreflect import runtime
 from pbreflect.pbgen.plugins.tests import PbReflectTestsPlugin
+from pbreflect.protorecover.reflection_client import GrpcReflectionClient
 
 
 def _make_proto_file_with_service(
@@ -80,3 +92,325 @@ class TestPbReflectTestsPluginProcessRequest:
 
         conftest_files = [f for f in response.file if f.name == "conftest.py"]
         assert len(conftest_files) == 0
+
+
+def _fakes_request(proto_file: descriptor_pb2.FileDescriptorProto, parameter: str) -> plugin.CodeGeneratorRequest:
+    request = plugin.CodeGeneratorRequest(parameter=parameter)
+    request.proto_file.append(proto_file)
+    request.file_to_generate.append(proto_file.name)
+    return request
+
+
+def _empty_service(package: str = "test.v1") -> descriptor_pb2.FileDescriptorProto:
+    """A service covering every call kind, with well-known types so the fake imports no generated module."""
+    proto_file = descriptor_pb2.FileDescriptorProto(
+        name="echo.proto", package=package, syntax="proto3", dependency=["google/protobuf/empty.proto"]
+    )
+    svc = proto_file.service.add(name="EchoService")
+    for name, client_streaming, server_streaming in (
+        ("Ping", False, False),
+        ("Watch", False, True),
+        ("Upload", True, False),
+        ("Chat", True, True),
+    ):
+        svc.method.add(
+            name=name,
+            input_type=".google.protobuf.Empty",
+            output_type=".google.protobuf.Empty",
+            client_streaming=client_streaming,
+            server_streaming=server_streaming,
+        )
+    return proto_file
+
+
+def _service(proto_file: descriptor_pb2.FileDescriptorProto) -> dict:
+    return GrpcReflectionClient(channel=None).get_services(proto_file)[0]
+
+
+class TestPbReflectTestsPluginFakes:
+    """Tests for the fake servicers emitted with ``fakes=true``."""
+
+    def test_emits_fake_module_per_service(self) -> None:
+        response = PbReflectTestsPlugin().process_request(
+            _fakes_request(_make_proto_file_with_service(), "client_module=clients,fakes=true")
+        )
+
+        files = {f.name: f.content for f in response.file}
+        fake = files["user_service/fake.py"]
+        assert "class FakeUserServiceServicer:" in fake
+        assert "from clients.test_pb2 import GetUserRequest, GetUserResponse" in fake
+        assert "def add_user_service_to_server(" in fake
+        assert 'method_handlers_generic_handler("test.v1.UserService"' in fake
+        assert "Iterator" not in fake
+        compile(fake, "fake.py", "exec")
+
+    def test_no_fake_module_by_default(self) -> None:
+        response = PbReflectTestsPlugin().process_request(
+            _fakes_request(_make_proto_file_with_service(), "client_module=clients")
+        )
+
+        assert not any(f.name.endswith("fake.py") for f in response.file)
+
+    def test_conftests_serve_fake_in_process(self) -> None:
+        response = PbReflectTestsPlugin().process_request(
+            _fakes_request(_make_proto_file_with_service(), "client_module=clients,fakes=true")
+        )
+
+        files = {f.name: f.content for f in response.file}
+        root, service = files["conftest.py"], files["user_service/conftest.py"]
+        assert "def grpc_socket_dir(" in root
+        assert "localhost:50051" not in root
+        assert "from .fake import FakeUserServiceServicer, add_user_service_to_server" in service
+        assert "def user_service_servicer() -> FakeUserServiceServicer:" in service
+        assert "f\"unix:{grpc_socket_dir / 'user_service.sock'}\"" in service
+        assert "grpc.insecure_channel(user_service_server)" in service
+        for content in (root, service):
+            compile(content, "conftest.py", "exec")
+
+    def test_async_client_fixture_lives_on_session_loop(self) -> None:
+        response = PbReflectTestsPlugin().process_request(
+            _fakes_request(_make_proto_file_with_service(), "client_module=clients,async=true,fakes=true")
+        )
+
+        service = next(f.content for f in response.file if f.name == "user_service/conftest.py")
+        assert '@pytest_asyncio.fixture(scope="session", loop_scope="session")\nasync def user_service(' in service
+        assert "grpc.aio.insecure_channel(user_service_server)" in service
+        compile(service, "conftest.py", "exec")
+
+    def test_service_without_package_uses_bare_name(self) -> None:
+        proto_file = _empty_service(package="")
+
+        fake = PbReflectTestsPlugin().generate_fake_file(proto_file, _service(proto_file), client_module="clients")
+
+        assert 'method_handlers_generic_handler("EchoService"' in fake
+
+    def test_fake_answers_every_call_kind(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        proto_file = _empty_service()
+        fake = PbReflectTestsPlugin().generate_fake_file(proto_file, _service(proto_file), client_module="clients")
+        assert "from clients" not in fake
+        namespace: dict[str, Any] = {}
+        exec(compile(fake, "fake.py", "exec"), namespace)  # noqa: S102
+
+        servicer = namespace["FakeEchoServiceServicer"]()
+        server = grpc.server(ThreadPoolExecutor(max_workers=2))
+        namespace["add_echo_service_to_server"](servicer, server)
+        address = f"unix:{tmp_path / 'echo.sock'}"
+        server.add_insecure_port(address)
+        server.start()
+        try:
+            with grpc.insecure_channel(address) as channel:
+                empty = empty_pb2.Empty.SerializeToString
+                parse = empty_pb2.Empty.FromString
+                ping = channel.unary_unary("/test.v1.EchoService/Ping", empty, parse)
+                watch = channel.unary_stream("/test.v1.EchoService/Watch", empty, parse)
+                upload = channel.stream_unary("/test.v1.EchoService/Upload", empty, parse)
+                chat = channel.stream_stream("/test.v1.EchoService/Chat", empty, parse)
+
+                assert ping(empty_pb2.Empty(), timeout=5) == empty_pb2.Empty()
+                assert list(watch(empty_pb2.Empty(), timeout=5)) == [empty_pb2.Empty()]
+                assert upload(iter([empty_pb2.Empty()] * 3), timeout=5) == empty_pb2.Empty()
+                assert list(chat(iter([empty_pb2.Empty()]), timeout=5)) == [empty_pb2.Empty()]
+
+                monkeypatch.setattr(servicer, "Watch", lambda request, context: iter([request] * 2))
+                assert len(list(watch(empty_pb2.Empty(), timeout=5))) == 2
+        finally:
+            server.stop(grace=None)
+
+
+class TestPbReflectTestsPluginServiceLayout:
+    """Tests for the one-module-per-service layout (``layout=service``)."""
+
+    def test_one_parametrized_module_per_service(self) -> None:
+        proto_file = _empty_service()
+        proto_file.service[0].method.add(
+            name="GetUser", input_type=".test.v1.GetUserRequest", output_type=".test.v1.User"
+        )
+
+        response = PbReflectTestsPlugin().process_request(
+            _fakes_request(proto_file, "client_module=clients,layout=service")
+        )
+
+        test_files = {f.name: f.content for f in response.file if "/test_" in f.name}
+        assert list(test_files) == ["echo_service/test_echo_service.py"]
+        content = test_files["echo_service/test_echo_service.py"]
+        assert 'pytest.param("ping", empty_pb2.Empty, id="Ping"),' in content
+        assert 'pytest.param("upload", None, id="Upload"),' in content
+        assert 'pytest.param("get_user", GetUserRequest, id="GetUser"),' in content
+        assert "from google.protobuf import empty_pb2" in content
+        assert "from clients.echo_pb2 import GetUserRequest" in content
+        assert "def test_echo_service(echo_service: EchoServiceClient, method: str, request_type: Any)" in content
+        compile(content, "test_echo_service.py", "exec")
+
+    def test_async_cases_are_awaited(self) -> None:
+        response = PbReflectTestsPlugin().process_request(
+            _fakes_request(_make_proto_file_with_service(), "client_module=clients,async=true,layout=service")
+        )
+
+        content = next(f.content for f in response.file if f.name == "user_service/test_user_service.py")
+        assert '@pytest.mark.asyncio(loop_scope="session")\n@pytest.mark.parametrize' in content
+        assert "response = await call(request=request_type())" in content
+        compile(content, "test_user_service.py", "exec")
+
+    def test_conftests_shared_with_method_layout(self) -> None:
+        def conftests(parameter: str) -> dict[str, str]:
+            response = PbReflectTestsPlugin().process_request(
+                _fakes_request(_make_proto_file_with_service(), parameter)
+            )
+            return {f.name: f.content for f in response.file if not f.name.endswith("test_get_user.py")}
+
+        by_method = conftests("client_module=clients")
+        by_service = conftests("client_module=clients,layout=service")
+
+        assert by_service.pop("user_service/test_user_service.py")
+        assert by_service == by_method
+
+    def test_unknown_layout_rejected(self) -> None:
+        with pytest.raises(ValueError, match="Unknown tests layout 'file'"):
+            PbReflectTestsPlugin().process_request(
+                _fakes_request(_make_proto_file_with_service(), "client_module=clients,layout=file")
+            )
+
+
+_CASSETTE_ENV_VARS = ("GRPC_TARGETS", "GRPC_CASSETTE_MODE", "GRPC_CASSETTES", "PYTEST_XDIST_WORKER")
+
+
+def _write_project(root: Path, test_module: str, *, async_mode: bool = False) -> None:
+    """Write a generated root conftest, the client runtime it imports and one test module."""
+    (root / "clients").mkdir()
+    (root / "clients" / "__init__.py").write_text("")
+    (root / "clients" / "_pbreflect_runtime.py").write_text(Path(runtime.__file__).read_text())
+    (root / "conftest.py").write_text(PbReflectTestsPlugin().generate_root_conftest(async_mode=async_mode))
+    (root / "test_generated.py").write_text(test_module)
+
+
+def _run_pytest(root: Path, env: dict[str, str]) -> subprocess.CompletedProcess[str]:
+    base_env = {k: v for k, v in os.environ.items() if k not in _CASSETTE_ENV_VARS}
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", str(root)],
+        cwd=root,
+        env={**base_env, **env},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+class TestPbReflectTestsPluginTargets:
+    """Tests for the target selection and channel fixtures of the root conftest."""
+
+    def test_sync_channel_closed_after_session(self) -> None:
+        content = PbReflectTestsPlugin().generate_root_conftest(async_mode=False)
+
+        assert "with grpc.insecure_channel(grpc_target) as channel:\n        yield channel" in content
+        assert "from clients._pbreflect_runtime import CASSETTE_MODES, Cassette, use_cassette" in content
+        compile(content, "conftest.py", "exec")
+
+    def test_async_channel_lives_on_session_loop(self) -> None:
+        content = PbReflectTestsPlugin().generate_root_conftest(async_mode=True)
+
+        assert '@pytest_asyncio.fixture(scope="session", loop_scope="session")' in content
+        assert "async with grpc.aio.insecure_channel(grpc_target, interceptors=interceptors) as channel:" in content
+        assert "import CASSETTE_MODES, Cassette, aio_cassette_interceptors" in content
+        compile(content, "conftest.py", "exec")
+
+    def test_async_tests_share_session_loop(self) -> None:
+        proto_file = _make_proto_file_with_service()
+        plugin_instance = PbReflectTestsPlugin()
+        for parameter in ("client_module=clients,async=true", "client_module=clients,async=true,layout=service"):
+            response = plugin_instance.process_request(_fakes_request(proto_file, parameter))
+            test_file = next(f for f in response.file if "/test_" in f.name)
+            assert '@pytest.mark.asyncio(loop_scope="session")' in test_file.content
+
+    @pytest.mark.parametrize(
+        ("env", "ini", "expected"),
+        [
+            ({}, "", "localhost:50051"),
+            ({"GRPC_TARGETS": "a:1"}, "", "a:1"),
+            ({"GRPC_TARGETS": "a:1, b:2", "PYTEST_XDIST_WORKER": "gw1"}, "", "b:2"),
+            ({"GRPC_TARGETS": "a:1,b:2", "PYTEST_XDIST_WORKER": "gw2"}, "", "a:1"),
+            ({"PYTEST_XDIST_WORKER": "gw1"}, "grpc_targets =\n    c:3\n    d:4\n", "d:4"),
+            ({"GRPC_TARGETS": "a:1"}, "grpc_targets =\n    c:3\n", "a:1"),
+        ],
+        ids=["default", "env", "worker-pinned", "workers-wrap", "ini", "env-over-ini"],
+    )
+    def test_grpc_target(self, tmp_path: Path, env: dict[str, str], ini: str, expected: str) -> None:
+        _write_project(
+            tmp_path, f"def test_target(grpc_target: str) -> None:\n    assert grpc_target == {expected!r}\n"
+        )
+        (tmp_path / "pytest.ini").write_text(f"[pytest]\n{ini}")
+
+        result = _run_pytest(tmp_path, env)
+
+        assert result.returncode == 0, result.stdout
+
+
+_SYNC_CALL_TEST = """
+def test_call(grpc_channel):
+    assert grpc_channel.unary_unary("/test.Svc/Double")(b"ab", timeout=5) == b"abab"
+"""
+
+_ASYNC_CALL_TEST = """
+import pytest
+
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_call(grpc_channel):
+    assert await grpc_channel.unary_unary("/test.Svc/Double")(b"ab", timeout=5) == b"abab"
+"""
+
+
+@pytest.fixture
+def doubling_server() -> Any:
+    """Address of a server answering ``/test.Svc/Double`` with the request bytes twice."""
+    handler = grpc.method_handlers_generic_handler(
+        "test.Svc", {"Double": grpc.unary_unary_rpc_method_handler(lambda request, context: request * 2)}
+    )
+    server = grpc.server(ThreadPoolExecutor(max_workers=2))
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    yield f"127.0.0.1:{port}"
+    server.stop(None)
+
+
+class TestPbReflectTestsPluginCassettes:
+    """Tests for the cassette record and replay fixtures of the root conftest."""
+
+    @pytest.mark.parametrize("async_mode", [False, True], ids=["sync", "async"])
+    def test_record_then_replay_offline(self, tmp_path: Path, doubling_server: str, async_mode: bool) -> None:
+        _write_project(tmp_path, _ASYNC_CALL_TEST if async_mode else _SYNC_CALL_TEST, async_mode=async_mode)
+
+        recorded = _run_pytest(tmp_path, {"GRPC_TARGETS": doubling_server, "GRPC_CASSETTE_MODE": "record"})
+        assert recorded.returncode == 0, recorded.stdout
+        assert sorted(p.name for p in (tmp_path / "cassettes" / "test.Svc").iterdir()) == ["Double.bin", "Double.json"]
+
+        # Nothing listens on port 1: only a replayed call can pass.
+        replayed = _run_pytest(tmp_path, {"GRPC_TARGETS": "127.0.0.1:1", "GRPC_CASSETTE_MODE": "replay"})
+        assert replayed.returncode == 0, replayed.stdout
+        live = _run_pytest(tmp_path, {"GRPC_TARGETS": "127.0.0.1:1"})
+        assert live.returncode == 1, live.stdout
+
+    def test_cassettes_from_ini(self, tmp_path: Path, doubling_server: str) -> None:
+        _write_project(tmp_path, _SYNC_CALL_TEST)
+        (tmp_path / "pytest.ini").write_text("[pytest]\ngrpc_cassette_mode = record\ngrpc_cassettes = recorded\n")
+
+        result = _run_pytest(tmp_path, {"GRPC_TARGETS": doubling_server})
+
+        assert result.returncode == 0, result.stdout
+        assert (tmp_path / "recorded" / "test.Svc" / "Double.json").exists()
+
+    @pytest.mark.parametrize(
+        ("env", "message"),
+        [
+            ({"GRPC_CASSETTE_MODE": "rewind"}, "GRPC_CASSETTE_MODE must be one of record, replay"),
+            ({"GRPC_CASSETTE_MODE": "record", "PYTEST_XDIST_WORKER": "gw0"}, "without pytest-xdist"),
+        ],
+        ids=["unknown-mode", "record-under-xdist"],
+    )
+    def test_rejected_settings(self, tmp_path: Path, env: dict[str, str], message: str) -> None:
+        _write_project(tmp_path, _SYNC_CALL_TEST)
+
+        result = _run_pytest(tmp_path, env)
+
+        assert result.returncode != 0
+        assert message in result.stdout + result.stderr
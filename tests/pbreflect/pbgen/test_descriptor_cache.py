@@ -0,0 +1,129 @@
+"""Tests for the persistent descriptor cache."""
+
+import os
+from pathlib import Path
+
+import pytest
+from google.protobuf import descriptor_pb2
+
+from pbreflect.pbgen.descriptor_cache import (
+    CACHE_DIR_ENV_VAR,
+    DescriptorCache,
+    MemoryDescriptorCache,
+    SourceKeys,
+    default_cache_dir,
+)
+
+
+def _descriptor(name: str, payload: str = "") -> descriptor_pb2.FileDescriptorProto:
+    return descriptor_pb2.FileDescriptorProto(name=name, package=payload)
+
+
+class TestDefaultCacheDir:
+    """Tests for default_cache_dir."""
+
+    def test_env_var_wins(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(tmp_path / "custom"))
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        assert default_cache_dir() == tmp_path / "custom"
+
+    def test_xdg_cache_home(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.delenv(CACHE_DIR_ENV_VAR, raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert default_cache_dir() == tmp_path / "pbreflect" / "descriptors"
+
+
+class TestSourceKeys:
+    """Tests for SourceKeys.key."""
+
+    @pytest.fixture
+    def root(self, tmp_path: Path) -> Path:
+        (tmp_path / "a.proto").write_text('syntax = "proto3";\nimport "b.proto";\n')
+        (tmp_path / "b.proto").write_text('syntax = "proto3";\nmessage B {}\n')
+        (tmp_path / "c.proto").write_text('syntax = "proto3";\nmessage C {}\n')
+        return tmp_path
+
+    def test_key_is_stable(self, root: Path) -> None:
+        assert SourceKeys([root]).key("a.proto") == SourceKeys([root]).key("a.proto")
+
+    def test_editing_import_changes_dependent_key(self, root: Path) -> None:
+        before = SourceKeys([root]).key("a.proto")
+        (root / "b.proto").write_text('syntax = "proto3";\nmessage B { string x = 1; }\n')
+        assert SourceKeys([root]).key("a.proto") != before
+
+    def test_unrelated_edit_keeps_key(self, root: Path) -> None:
+        before = SourceKeys([root]).key("a.proto")
+        (root / "c.proto").write_text('syntax = "proto3";\nmessage C { string x = 1; }\n')
+        assert SourceKeys([root]).key("a.proto") == before
+
+    def test_same_bytes_under_other_name_differ(self, root: Path) -> None:
+        (root / "d.proto").write_bytes((root / "c.proto").read_bytes())
+        keys = SourceKeys([root])
+        assert keys.key("c.proto") != keys.key("d.proto")
+
+    def test_import_cycle(self, root: Path) -> None:
+        (root / "b.proto").write_text('syntax = "proto3";\nimport "a.proto";\n')
+        keys = SourceKeys([root])
+
+        assert keys.key("a.proto") != keys.key("b.proto")
+        assert SourceKeys([root]).key("a.proto") == keys.key("a.proto")
+
+
+class TestDescriptorCache:
+    """Tests for DescriptorCache get/put/evict."""
+
+    def test_miss_returns_none(self, tmp_path: Path) -> None:
+        assert DescriptorCache(tmp_path).get("missing") is None
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        cache = DescriptorCache(tmp_path)
+        cache.put("k", _descriptor("a.proto", "pkg"))
+        assert cache.get("k") == _descriptor("a.proto", "pkg")
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_corrupt_entry_is_dropped(self, tmp_path: Path) -> None:
+        (tmp_path / "k.pb").write_bytes(b"\xff\xff\xff")
+        assert DescriptorCache(tmp_path).get("k") is None
+        assert not (tmp_path / "k.pb").exists()
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache = DescriptorCache(tmp_path)
+        for i, key in enumerate(("old", "used", "new")):
+            cache.put(key, _descriptor(f"{key}.proto", "x" * 100))
+            os.utime(tmp_path / f"{key}.pb", (1000 + i, 1000 + i))
+        cache.get("used")
+        cache.max_bytes = sum((tmp_path / f"{key}.pb").stat().st_size for key in ("used", "new"))
+
+        cache.evict()
+
+        assert sorted(p.stem for p in tmp_path.glob("*.pb")) == ["new", "used"]
+
+
+class TestMemoryDescriptorCache:
+    """Tests for the in-process descriptor layer."""
+
+    def test_drops_least_recently_used(self) -> None:
+        memory = MemoryDescriptorCache(max_entries=2)
+        memory.put("a", _descriptor("a.proto"))
+        memory.put("b", _descriptor("b.proto"))
+        memory.get("a")
+        memory.put("c", _descriptor("c.proto"))
+
+        assert len(memory) == 2
+        assert memory.get("b") is None
+        assert memory.get("a") == _descriptor("a.proto")
+
+    def test_serves_hits_without_reading_the_directory(self, tmp_path: Path) -> None:
+        memory = MemoryDescriptorCache()
+        DescriptorCache(tmp_path, memory=memory).put("k", _descriptor("a.proto", "pkg"))
+        (tmp_path / "k.pb").unlink()
+
+        assert DescriptorCache(tmp_path, memory=memory).get("k") == _descriptor("a.proto", "pkg")
+
+    def test_disk_hits_are_promoted(self, tmp_path: Path) -> None:
+        DescriptorCache(tmp_path).put("k", _descriptor("a.proto"))
+        memory = MemoryDescriptorCache()
+
+        DescriptorCache(tmp_path, memory=memory).get("k")
+
+        assert memory.get("k") == _descriptor("a.proto")
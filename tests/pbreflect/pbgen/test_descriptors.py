@@ -0,0 +1,152 @@
+"""Tests for the shared descriptor stage."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from google.protobuf import descriptor_pb2, empty_pb2
+from grpc_tools import protoc
+
+from pbreflect.pbgen.descriptor_cache import DescriptorCache
+from pbreflect.pbgen.descriptors import DescriptorSetCompiler, build_pool
+from pbreflect.pbgen.errors import GenerationFailedError
+
+
+@pytest.fixture
+def proto_dir(tmp_path: Path) -> Path:
+    root = tmp_path / "protos"
+    (root / "api").mkdir(parents=True)
+    (root / "api" / "common.proto").write_text('syntax = "proto3";\npackage api;\nmessage Id { string value = 1; }\n')
+    (root / "api" / "users.proto").write_text(
+        'syntax = "proto3";\n'
+        "package api;\n"
+        'import "api/common.proto";\n'
+        'import "google/protobuf/empty.proto";\n'
+        "service Users { rpc Get(Id) returns (google.protobuf.Empty); }\n"
+    )
+    return root
+
+
+class TestDescriptorSetCompiler:
+    """Tests for DescriptorSetCompiler.compile."""
+
+    def test_compiles_sources_with_imports(self, proto_dir: Path, tmp_path: Path) -> None:
+        sources = [str(proto_dir / "api" / "users.proto"), str(proto_dir / "api" / "common.proto")]
+
+        compiled = DescriptorSetCompiler(str(proto_dir)).compile(sources, tmp_path / "set.pb")
+
+        names = [f.name for f in compiled.descriptor_set.file]
+        assert set(names) == {"api/common.proto", "api/users.proto", "google/protobuf/empty.proto"}
+        assert names.index("api/common.proto") < names.index("api/users.proto")
+        assert (tmp_path / "set.pb").read_bytes() == compiled.descriptor_set.SerializeToString()
+
+    def test_files_returns_requested_sources_only(self, proto_dir: Path, tmp_path: Path) -> None:
+        users = str(proto_dir / "api" / "users.proto")
+        compiled = DescriptorSetCompiler(str(proto_dir)).compile([users], tmp_path / "set.pb")
+
+        assert compiled.proto_name(users) == "api/users.proto"
+        assert [f.name for f in compiled.files([users])] == ["api/users.proto"]
+
+    def test_invalid_source_raises(self, proto_dir: Path, tmp_path: Path) -> None:
+        broken = proto_dir / "broken.proto"
+        broken.write_text('syntax = "proto3";\nmessage {')
+
+        with pytest.raises(GenerationFailedError):
+            DescriptorSetCompiler(str(proto_dir)).compile([str(broken)], tmp_path / "set.pb")
+
+    def test_pb2_output_matches_per_file_compilation(self, proto_dir: Path, tmp_path: Path) -> None:
+        (proto_dir / "api" / "fields.proto").write_text(
+            'syntax = "proto3";\n'
+            "package api;\n"
+            "message Profile {\n"
+            "  string user_name = 1;\n"
+            '  string email = 2 [json_name = "mail"];\n'
+            "  message Inner { int32 retry_count = 1; }\n"
+            "  Inner inner_value = 3;\n"
+            "}\n"
+        )
+        source = str(proto_dir / "api" / "fields.proto")
+        compiled = DescriptorSetCompiler(str(proto_dir)).compile([source], tmp_path / "set.pb")
+        from_set, from_source = tmp_path / "from_set", tmp_path / "from_source"
+        from_set.mkdir()
+        from_source.mkdir()
+
+        protoc.main(["protoc", f"--descriptor_set_in={compiled.path}", f"--python_out={from_set}", "api/fields.proto"])
+        protoc.main(["protoc", f"--proto_path={proto_dir}", f"--python_out={from_source}", source])
+
+        generated = "api/fields_pb2.py"
+        assert (from_set / generated).read_bytes() == (from_source / generated).read_bytes()
+
+
+class TestDescriptorSetCompilerCache:
+    """Tests for DescriptorSetCompiler backed by a DescriptorCache."""
+
+    def test_second_compile_is_served_from_cache(self, proto_dir: Path, tmp_path: Path) -> None:
+        cache = DescriptorCache(tmp_path / "cache")
+        sources = [str(proto_dir / "api" / "users.proto")]
+        first = DescriptorSetCompiler(str(proto_dir), cache=cache).compile(sources, tmp_path / "first.pb")
+
+        with patch("pbreflect.pbgen.descriptors.protoc.main") as protoc_main:
+            second = DescriptorSetCompiler(str(proto_dir), cache=cache).compile(sources, tmp_path / "second.pb")
+
+        protoc_main.assert_not_called()
+        assert [f.name for f in second.descriptor_set.file] == [f.name for f in first.descriptor_set.file]
+        assert (tmp_path / "second.pb").read_bytes() == second.descriptor_set.SerializeToString()
+
+    def test_edited_import_recompiles(self, proto_dir: Path, tmp_path: Path) -> None:
+        cache = DescriptorCache(tmp_path / "cache")
+        sources = [str(proto_dir / "api" / "users.proto")]
+        DescriptorSetCompiler(str(proto_dir), cache=cache).compile(sources, tmp_path / "first.pb")
+        (proto_dir / "api" / "common.proto").write_text(
+            'syntax = "proto3";\npackage api;\nmessage Id { string value = 1; int64 version = 2; }\n'
+        )
+
+        compiled = DescriptorSetCompiler(str(proto_dir), cache=cache).compile(sources, tmp_path / "second.pb")
+
+        common = next(f for f in compiled.descriptor_set.file if f.name == "api/common.proto")
+        assert [field.name for field in common.message_type[0].field] == ["value", "version"]
+
+    def test_import_cycle_reported_by_protoc(
+        self, proto_dir: Path, tmp_path: Path, capfd: pytest.CaptureFixture[str]
+    ) -> None:
+        (proto_dir / "api" / "common.proto").write_text('syntax = "proto3";\nimport "api/users.proto";\n')
+        sources = [str(proto_dir / "api" / "users.proto")]
+
+        with pytest.raises(GenerationFailedError):
+            DescriptorSetCompiler(str(proto_dir), cache=DescriptorCache(tmp_path / "cache")).compile(
+                sources, tmp_path / "set.pb"
+            )
+
+        assert "recursively imports itself" in capfd.readouterr().err
+
+
+class TestBuildPool:
+    """Tests for build_pool."""
+
+    @staticmethod
+    def _files() -> list[descriptor_pb2.FileDescriptorProto]:
+        users = descriptor_pb2.FileDescriptorProto(
+            name="api/users.proto", package="api", dependency=["api/common.proto", empty_pb2.DESCRIPTOR.name]
+        )
+        users.message_type.add(name="User").field.add(
+            name="id",
+            number=1,
+            type=descriptor_pb2.FieldDescriptorProto.TYPE_MESSAGE,
+            label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+            type_name=".api.Id",
+        )
+        common = descriptor_pb2.FileDescriptorProto(name="api/common.proto", package="api")
+        common.message_type.add(name="Id")
+        return [users, common]
+
+    def test_dependencies_added_first_and_well_known_types_borrowed(self) -> None:
+        pool = build_pool(self._files())
+
+        id_type = pool.FindMessageTypeByName("api.User").fields_by_name["id"].message_type
+        assert id_type is not None
+        assert id_type.full_name == "api.Id"
+        assert list(pool.FindFileByName(empty_pb2.DESCRIPTOR.name).message_types_by_name) == ["Empty"]
+
+    def test_missing_dependency(self) -> None:
+        with pytest.raises(ValueError, match="'api/common.proto' is missing"):
+            build_pool(self._files()[:1])
@@ -0,0 +1,21 @@
+"""Tests for the shared field type groups."""
+
+from google.protobuf import descriptor_pb2
+from google.protobuf.descriptor import FieldDescriptor
+
+from pbreflect.pbgen.field_types import INTEGER_FIELD_TYPES
+
+_INTEGER_CPP_TYPES = {
+    FieldDescriptor.CPPTYPE_INT32,
+    FieldDescriptor.CPPTYPE_INT64,
+    FieldDescriptor.CPPTYPE_UINT32,
+    FieldDescriptor.CPPTYPE_UINT64,
+}
+
+
+def test_integer_field_types_match_protobuf() -> None:
+    field_types = descriptor_pb2.FieldDescriptorProto.Type.values()
+
+    assert INTEGER_FIELD_TYPES == {
+        t for t in field_types if FieldDescriptor.ProtoTypeToCppProtoType(t) in _INTEGER_CPP_TYPES
+    }
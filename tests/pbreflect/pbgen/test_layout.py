@@ -0,0 +1,75 @@
+"""Tests for OutputLayout."""
+
+from pathlib import Path, PurePosixPath
+from unittest.mock import MagicMock
+
+from google.protobuf import descriptor_pb2
+
+from pbreflect.pbgen.layout import OutputLayout, module_dir
+
+
+def _layout(output_dir: Path, *files: descriptor_pb2.FileDescriptorProto) -> OutputLayout:
+    return OutputLayout(output_dir, files)
+
+
+def _file(name: str, **kwargs: object) -> descriptor_pb2.FileDescriptorProto:
+    return descriptor_pb2.FileDescriptorProto(name=name, **kwargs)  # type: ignore[arg-type]
+
+
+class TestModuleDir:
+    """Tests for module_dir."""
+
+    def test_top_level(self) -> None:
+        assert module_dir("service.proto") == PurePosixPath(".")
+
+    def test_dotted_and_dashed_dirs(self) -> None:
+        assert module_dir("com/example.api/user-svc.proto") == PurePosixPath("com/example/api")
+
+
+class TestOutputLayout:
+    """Tests for OutputLayout."""
+
+    def test_from_descriptors_uses_requested_sources(self, tmp_path: Path) -> None:
+        descriptors = MagicMock()
+        descriptors.files.return_value = [_file("api/users.proto")]
+
+        layout = OutputLayout.from_descriptors(str(tmp_path), descriptors, ["protos/api/users.proto"])
+
+        descriptors.files.assert_called_once_with(["protos/api/users.proto"])
+        assert layout.proto_names == ("api/users.proto",)
+
+    def test_package_dirs_include_parents(self, tmp_path: Path) -> None:
+        layout = _layout(tmp_path, _file("com/example.api/users.proto"), _file("root.proto"))
+        assert layout.package_dirs() == {
+            tmp_path,
+            tmp_path / "com",
+            tmp_path / "com" / "example",
+            tmp_path / "com" / "example" / "api",
+        }
+
+    def test_misplaced_dirs_only_for_dotted_paths(self, tmp_path: Path) -> None:
+        layout = _layout(tmp_path, _file("com/example.api/users.proto"), _file("common/types.proto"))
+        assert layout.misplaced_dirs() == {tmp_path / "com" / "example.api": tmp_path / "com" / "example" / "api"}
+
+    def test_package_exports_messages_enums_and_clients(self, tmp_path: Path) -> None:
+        users = _file(
+            "api/users.proto",
+            message_type=[descriptor_pb2.DescriptorProto(name="User")],
+            enum_type=[descriptor_pb2.EnumDescriptorProto(name="Role")],
+            service=[descriptor_pb2.ServiceDescriptorProto(name="Users")],
+        )
+        layout = _layout(tmp_path, users)
+
+        assert layout.package_exports(("_pb2_pbreflect", "Client")) == {
+            tmp_path: {},
+            tmp_path / "api": {"User": ".users_pb2", "Role": ".users_pb2", "UsersClient": ".users_pb2_pbreflect"},
+        }
+        assert layout.package_exports()[tmp_path / "api"] == {"User": ".users_pb2", "Role": ".users_pb2"}
+
+    def test_package_exports_first_definition_wins(self, tmp_path: Path) -> None:
+        layout = _layout(
+            tmp_path,
+            _file("a.proto", message_type=[descriptor_pb2.DescriptorProto(name="Id")]),
+            _file("b.proto", message_type=[descriptor_pb2.DescriptorProto(name="Id")]),
+        )
+        assert layout.package_exports()[tmp_path] == {"Id": ".a_pb2"}
@@ -20,6 +20,8 @@ class TestGenerationOptions:
         assert opts.tests_dir == "tests"
         assert opts.tests_template_dir is None
         assert opts.tests_client_module == "clients"
+        assert opts.tests_fakes is False
+        assert opts.tests_layout == "method"
 
     def test_custom_values(self) -> None:
         opts = GenerationOptions(
@@ -43,6 +45,27 @@ class TestGenerationOptions:
 class TestGenerationPipelineRun:
     """Tests for GenerationPipeline.run."""
 
+    def test_in_process_generation_uses_descriptor_set(self, tmp_path: Path) -> None:
+        with (
+            patch("pbreflect.pbgen.runner.ProtoImportPatcher"),
+            patch("pbreflect.pbgen.runner.GeneratorFactory"),
+            patch("pbreflect.pbgen.runner.ClientGenerator") as mock_generator_cls,
+            patch("pbreflect.pbgen.runner.InProcessClientGenerator") as mock_in_process_cls,
+            patch("pbreflect.pbgen.runner.ProtoFileFinder") as mock_finder_cls,
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler") as mock_compiler_cls,
+            patch.object(GenerationPipeline, "_patch_clients"),
+        ):
+            mock_finder_cls.return_value.find_proto_files.return_value = ["protos/a.proto"]
+
+            GenerationPipeline(
+                str(tmp_path / "protos"), str(tmp_path / "output"), GenerationOptions(in_process=True)
+            ).run()
+
+        mock_generator_cls.assert_not_called()
+        _, _, descriptors, proto_files = mock_in_process_cls.return_value.generate.call_args.args
+        assert descriptors is mock_compiler_cls.return_value.compile.return_value
+        assert proto_files == ["protos/a.proto"]
+
     @patch("pbreflect.pbgen.runner.os.makedirs")
     def test_run_calls_pipeline_stages(
         self,
@@ -54,6 +77,7 @@ class TestGenerationPipelineRun:
             patch("pbreflect.pbgen.runner.GeneratorFactory") as mock_factory_cls,
             patch("pbreflect.pbgen.runner.ClientGenerator") as mock_generator_cls,
             patch("pbreflect.pbgen.runner.ProtoFileFinder"),
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler"),
             patch("pbreflect.pbgen.runner.CommandExecutor"),
             patch("pbreflect.pbgen.runner.DirectoryStructurePatcher") as mock_dir_patcher,
             patch("pbreflect.pbgen.runner.ImportPatcher") as mock_import_p,
@@ -95,6 +119,7 @@ class TestGenerationPipelineRun:
             patch("pbreflect.pbgen.runner.GeneratorFactory"),
             patch("pbreflect.pbgen.runner.ClientGenerator"),
             patch("pbreflect.pbgen.runner.ProtoFileFinder"),
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler"),
             patch("pbreflect.pbgen.runner.CommandExecutor"),
             patch("pbreflect.pbgen.runner.DirectoryStructurePatcher"),
             patch("pbreflect.pbgen.runner.ImportPatcher"),
@@ -109,7 +134,7 @@ class TestGenerationPipelineRun:
             )
             pipeline.run()
 
-        mock_rmtree.assert_called_once()
+        mock_rmtree.assert_any_call(str(tmp_path / "output"))
 
     @patch("pbreflect.pbgen.runner.os.makedirs")
     @patch("pbreflect.pbgen.runner.shutil.rmtree")
@@ -126,6 +151,7 @@ class TestGenerationPipelineRun:
             patch("pbreflect.pbgen.runner.GeneratorFactory"),
             patch("pbreflect.pbgen.runner.ClientGenerator"),
             patch("pbreflect.pbgen.runner.ProtoFileFinder"),
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler"),
             patch("pbreflect.pbgen.runner.CommandExecutor"),
             patch("pbreflect.pbgen.runner.DirectoryStructurePatcher"),
             patch("pbreflect.pbgen.runner.ImportPatcher"),
@@ -140,7 +166,7 @@ class TestGenerationPipelineRun:
             )
             pipeline.run()
 
-        mock_rmtree.assert_not_called()
+        assert not any(c.args == (str(tmp_path / "output"),) for c in mock_rmtree.call_args_list)
 
     @patch("pbreflect.pbgen.runner.os.makedirs")
     def test_gen_tests_triggers_test_generation(
@@ -153,6 +179,7 @@ class TestGenerationPipelineRun:
             patch("pbreflect.pbgen.runner.GeneratorFactory"),
             patch("pbreflect.pbgen.runner.ClientGenerator"),
             patch("pbreflect.pbgen.runner.ProtoFileFinder"),
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler"),
             patch("pbreflect.pbgen.runner.CommandExecutor"),
             patch("pbreflect.pbgen.runner.DirectoryStructurePatcher"),
             patch("pbreflect.pbgen.runner.ImportPatcher"),
@@ -164,7 +191,13 @@ class TestGenerationPipelineRun:
             pipeline = GenerationPipeline(
                 str(tmp_path / "protos"),
                 str(tmp_path / "output"),
-                GenerationOptions(gen_tests=True, tests_dir="my_tests", tests_template_dir="/custom/tmpl"),
+                GenerationOptions(
+                    gen_tests=True,
+                    tests_dir="my_tests",
+                    tests_template_dir="/custom/tmpl",
+                    tests_fakes=True,
+                    tests_layout="service",
+                ),
             )
             pipeline.run()
 
@@ -172,6 +205,8 @@ class TestGenerationPipelineRun:
         call_kwargs = mock_test_gen.call_args.kwargs
         assert call_kwargs["tests_output_dir"] == "my_tests"
         assert call_kwargs["template_dir"] == "/custom/tmpl"
+        assert call_kwargs["fakes"] is True
+        assert call_kwargs["layout"] == "service"
 
     @patch("pbreflect.pbgen.runner.os.makedirs")
     def test_no_gen_tests_skips_test_generation(
@@ -184,6 +219,7 @@ class TestGenerationPipelineRun:
             patch("pbreflect.pbgen.runner.GeneratorFactory"),
             patch("pbreflect.pbgen.runner.ClientGenerator"),
             patch("pbreflect.pbgen.runner.ProtoFileFinder"),
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler"),
             patch("pbreflect.pbgen.runner.CommandExecutor"),
             patch("pbreflect.pbgen.runner.DirectoryStructurePatcher"),
             patch("pbreflect.pbgen.runner.ImportPatcher"),
@@ -200,3 +236,129 @@ class TestGenerationPipelineRun:
             pipeline.run()
 
         mock_test_gen.assert_not_called()
+
+
+class TestGenerationPipelineDescriptors:
+    """Tests for the shared descriptor stage."""
+
+    @patch("pbreflect.pbgen.runner.os.makedirs")
+    def test_compiled_descriptors_shared_with_all_stages(
+        self,
+        mock_makedirs: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        with (
+            patch("pbreflect.pbgen.runner.ProtoImportPatcher"),
+            patch("pbreflect.pbgen.runner.GeneratorFactory"),
+            patch("pbreflect.pbgen.runner.ClientGenerator") as mock_generator_cls,
+            patch("pbreflect.pbgen.runner.ProtoFileFinder") as mock_finder_cls,
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler") as mock_compiler_cls,
+            patch("pbreflect.pbgen.runner.CommandExecutor"),
+            patch("pbreflect.pbgen.runner.DirectoryStructurePatcher"),
+            patch("pbreflect.pbgen.runner.ImportPatcher"),
+            patch("pbreflect.pbgen.runner.MypyPatcher"),
+            patch("pbreflect.pbgen.runner.PbReflectPatcher"),
+            patch("pbreflect.pbgen.runner.InitFilePatcher"),
+            patch("pbreflect.pbgen.plugins.tests.runner.run_test_generation") as mock_test_gen,
+        ):
+            mock_finder_cls.return_value.find_proto_files.return_value = ["protos/a.proto"]
+            compiled = mock_compiler_cls.return_value.compile.return_value
+
+            GenerationPipeline(
+                str(tmp_path / "protos"),
+                str(tmp_path / "output"),
+                GenerationOptions(gen_tests=True),
+            ).run()
+
+        mock_compiler_cls.return_value.compile.assert_called_once()
+        assert mock_generator_cls.return_value.generate.call_args.kwargs["descriptors"] is compiled
+        assert mock_test_gen.call_args.kwargs["descriptor_set"] is compiled.descriptor_set
+
+    @patch("pbreflect.pbgen.runner.os.makedirs")
+    def test_compile_failure_falls_back_to_per_file_generation(
+        self,
+        mock_makedirs: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        from pbreflect.pbgen.errors import GenerationFailedError
+
+        with (
+            patch("pbreflect.pbgen.runner.ProtoImportPatcher"),
+            patch("pbreflect.pbgen.runner.GeneratorFactory"),
+            patch("pbreflect.pbgen.runner.ClientGenerator") as mock_generator_cls,
+            patch("pbreflect.pbgen.runner.ProtoFileFinder") as mock_finder_cls,
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler") as mock_compiler_cls,
+            patch("pbreflect.pbgen.runner.CommandExecutor"),
+            patch("pbreflect.pbgen.runner.DirectoryStructurePatcher"),
+            patch("pbreflect.pbgen.runner.ImportPatcher"),
+            patch("pbreflect.pbgen.runner.MypyPatcher"),
+            patch("pbreflect.pbgen.runner.PbReflectPatcher"),
+            patch("pbreflect.pbgen.runner.InitFilePatcher"),
+        ):
+            mock_finder_cls.return_value.find_proto_files.return_value = ["protos/a.proto"]
+            mock_compiler_cls.return_value.compile.side_effect = GenerationFailedError("duplicate symbol")
+
+            GenerationPipeline(str(tmp_path / "protos"), str(tmp_path / "output")).run()
+
+        assert mock_generator_cls.return_value.generate.call_args.kwargs["descriptors"] is None
+
+
+class TestGenerationPipelineLayout:
+    """Tests for placing generated files from the precomputed layout."""
+
+    def _run(self, tmp_path: Path, options: GenerationOptions) -> tuple[MagicMock, MagicMock, MagicMock]:
+        with (
+            patch("pbreflect.pbgen.runner.os.makedirs"),
+            patch("pbreflect.pbgen.runner.ProtoImportPatcher"),
+            patch("pbreflect.pbgen.runner.GeneratorFactory"),
+            patch("pbreflect.pbgen.runner.ClientGenerator"),
+            patch("pbreflect.pbgen.runner.ProtoFileFinder") as mock_finder_cls,
+            patch("pbreflect.pbgen.runner.DescriptorSetCompiler"),
+            patch("pbreflect.pbgen.runner.CommandExecutor"),
+            patch("pbreflect.pbgen.runner.OutputLayout") as mock_layout_cls,
+            patch("pbreflect.pbgen.runner.DirectoryStructurePatcher") as mock_dir_patcher,
+            patch("pbreflect.pbgen.runner.ImportPatcher"),
+            patch("pbreflect.pbgen.runner.MypyPatcher"),
+            patch("pbreflect.pbgen.runner.PbReflectPatcher"),
+            patch("pbreflect.pbgen.runner.InitFilePatcher") as mock_init_patcher,
+        ):
+            mock_finder_cls.return_value.find_proto_files.return_value = ["protos/a.proto"]
+            GenerationPipeline(str(tmp_path / "protos"), str(tmp_path / "output"), options).run()
+        return mock_layout_cls, mock_dir_patcher, mock_init_patcher
+
+    def test_patchers_receive_layout(self, tmp_path: Path) -> None:
+        mock_layout_cls, mock_dir_patcher, mock_init_patcher = self._run(tmp_path, GenerationOptions())
+
+        layout = mock_layout_cls.from_descriptors.return_value
+        mock_dir_patcher.assert_called_once_with(str(tmp_path / "output"), layout.misplaced_dirs.return_value)
+        mock_init_patcher.assert_called_once_with(str(tmp_path / "output"), layout.package_dirs.return_value)
+
+    def test_lazy_init_uses_package_exports(self, tmp_path: Path) -> None:
+        with patch("pbreflect.pbgen.runner.LazyInitFilePatcher") as mock_lazy_patcher:
+            mock_layout_cls, _, mock_init_patcher = self._run(tmp_path, GenerationOptions(lazy_init=True))
+
+        layout = mock_layout_cls.from_descriptors.return_value
+        layout.package_exports.assert_called_once_with(("_pb2_pbreflect", "Client"))
+        mock_lazy_patcher.assert_called_once_with(str(tmp_path / "output"), layout.package_exports.return_value)
+        mock_lazy_patcher.return_value.patch.assert_called_once()
+        mock_init_patcher.assert_not_called()
+
+    def test_betterproto_walks_output_tree(self, tmp_path: Path) -> None:
+        _, mock_dir_patcher, mock_init_patcher = self._run(
+            tmp_path, GenerationOptions(gen_type=GeneratorType.BETTERPROTO)
+        )
+
+        mock_dir_patcher.assert_called_once_with(str(tmp_path / "output"), None)
+        mock_init_patcher.assert_called_once_with(str(tmp_path / "output"), None)
+
+
+class TestGenerationOptionsDescriptorCache:
+    """Tests for GenerationOptions.make_descriptor_cache."""
+
+    def test_disabled(self) -> None:
+        assert GenerationOptions(descriptor_cache=False).make_descriptor_cache() is None
+
+    def test_custom_dir(self, tmp_path: Path) -> None:
+        cache = GenerationOptions(cache_dir=str(tmp_path)).make_descriptor_cache()
+        assert cache is not None
+        assert cache.cache_dir == tmp_path
@@ -158,6 +158,34 @@ class TestGetServices:
         assert service.get_services() == []
 
 
+class TestGetProtoDescriptors:
+    """Tests for RecoverService.get_proto_descriptors."""
+
+    @patch("pbreflect.protorecover.recover_service.RecoverService._create_channel_safe")
+    @patch("pbreflect.protorecover.recover_service.socket.getaddrinfo")
+    def test_returns_descriptors_or_raises(
+        self,
+        mock_getaddrinfo: MagicMock,
+        mock_channel: MagicMock,
+        tmp_path: Path,
+    ) -> None:
+        import grpc
+
+        mock_getaddrinfo.return_value = [(None, None, None, None, ("127.0.0.1", 50051))]
+        mock_channel.return_value = MagicMock()
+        service = RecoverService("localhost:50051", output_dir=tmp_path)
+        descriptor = descriptor_pb2.FileDescriptorProto(name="test.proto", package="test.v1")
+        mock_reflection = create_autospec(service._reflection_client.__class__, instance=True)
+        mock_reflection.get_proto_descriptors.return_value = {"test.proto": descriptor}
+        service._reflection_client = mock_reflection
+
+        assert service.get_proto_descriptors() == [descriptor]
+
+        mock_reflection.get_proto_descriptors.side_effect = grpc.RpcError("unavailable")
+        with pytest.raises(ProtoRecoveryError, match="unavailable"):
+            service.get_proto_descriptors()
+
+
 class TestContextManager:
     """Tests for RecoverService context manager protocol."""
 
@@ -72,6 +72,16 @@ class TestGetServiceMethods:
         assert result[0]["is_client_streaming"] is True
         assert result[0]["is_server_streaming"] is True
 
+    def test_idempotency_level(self, client: GrpcReflectionClient) -> None:
+        service = descriptor_pb2.ServiceDescriptorProto()
+        service.method.add(name="Get", input_type=".test.Request", output_type=".test.Response")
+        service.method.add(name="Put", input_type=".test.Request", output_type=".test.Response")
+        service.method[0].options.idempotency_level = descriptor_pb2.MethodOptions.NO_SIDE_EFFECTS
+
+        result = client.get_service_methods(service)
+        assert result[0]["idempotency_level"] == "NO_SIDE_EFFECTS"
+        assert result[1]["idempotency_level"] == "IDEMPOTENCY_UNKNOWN"
+
 
 class TestGetMessageFields:
     """Tests for get_message_fields."""
@@ -244,6 +254,10 @@ class TestGetOutputFilename:
         proto_file = _make_proto_file(name="my-service.proto")
         assert client.get_output_filename(proto_file) == "my_service_pb2_pbreflect.py"
 
+    def test_dotted_directories_become_packages(self, client: GrpcReflectionClient) -> None:
+        proto_file = _make_proto_file(name="com/example.api/service.proto")
+        assert client.get_output_filename(proto_file) == "com/example/api/service_pb2_pbreflect.py"
+
 
 class TestGetProtoDescriptors:
     """Tests for get_proto_descriptors with caching."""
@@ -0,0 +1,63 @@
+"""Import-time budget for the CLI entry point.
+
+Every scripted ``pbreflect`` call pays for what ``pbreflect.main`` imports, so the
+CLI must not load grpc, protobuf or jinja2 until a command actually needs them.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# Generous enough for slow CI runners; a regression that pulls grpc back in costs ~200 ms.
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_MODULES = ("grpc", "grpc_reflection", "grpc_tools", "google.protobuf", "jinja2")
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Run ``code`` under ``-X importtime`` and return cumulative microseconds per module."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import pbreflect",
+        "import pbreflect.main",
+        "from pbreflect.main import cli; cli(['--help'], standalone_mode=False)",
+        "from pbreflect.main import cli; cli(['get-protos', '--help'], standalone_mode=False)",
+    ],
+    ids=["package", "import", "help", "get-protos-help"],
+)
+def test_cli_does_not_import_heavy_modules(code: str) -> None:
+    loaded = _import_times(code)
+    assert "pbreflect" in loaded
+    heavy = sorted(m for m in loaded if m.startswith(HEAVY_MODULES))
+    assert heavy == []
+
+
+def test_cli_import_within_budget() -> None:
+    loaded = _import_times("import pbreflect.main")
+    assert loaded["pbreflect.main"] < IMPORT_BUDGET_US
+
+
+def test_lazy_package_exports_resolve() -> None:
+    import pbreflect
+    from pbreflect.protorecover.recover_service import RecoverService
+
+    assert pbreflect.RecoverService is RecoverService
+    with pytest.raises(AttributeError):
+        _ = pbreflect.DoesNotExist  # type: ignore[attr-defined]
@@ -1,5 +1,6 @@
 """Tests for CLI commands in pbreflect.main."""
 
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 from click.testing import CliRunner
@@ -17,12 +18,15 @@ class TestCliGroup:
         assert "get-protos" in result.output
         assert "generate" in result.output
         assert "reflect" in result.output
+        assert "daemon" in result.output
+        assert "bench" in result.output
+        assert "serve-mock" in result.output
 
 
 class TestGetProtos:
     """Tests for get-protos command."""
 
-    @patch("pbreflect.main.RecoverService")
+    @patch("pbreflect.protorecover.recover_service.RecoverService")
     def test_successful_recovery(self, mock_service_cls: MagicMock) -> None:
         from pathlib import Path
 
@@ -36,7 +40,7 @@ class TestGetProtos:
         assert result.exit_code == 0
         assert "2 proto files" in result.output
 
-    @patch("pbreflect.main.RecoverService")
+    @patch("pbreflect.protorecover.recover_service.RecoverService")
     def test_no_protos_recovered(self, mock_service_cls: MagicMock) -> None:
         mock_service = mock_service_cls.return_value.__enter__.return_value
         mock_service.recover_proto_files.return_value = []
@@ -48,7 +52,7 @@ class TestGetProtos:
         assert result.exit_code == 0
         assert "No proto files" in result.output
 
-    @patch("pbreflect.main.RecoverService")
+    @patch("pbreflect.protorecover.recover_service.RecoverService")
     def test_error_during_recovery(self, mock_service_cls: MagicMock) -> None:
         mock_service = mock_service_cls.return_value.__enter__.return_value
         mock_service.recover_proto_files.side_effect = RuntimeError("fail")
@@ -63,7 +67,7 @@ class TestGetProtos:
 class TestGen:
     """Tests for generate command."""
 
-    @patch("pbreflect.main.GenerationPipeline")
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
     def test_generate_runs_pipeline(self, mock_pipeline_cls: MagicMock) -> None:
         runner = CliRunner()
         with runner.isolated_filesystem():
@@ -76,7 +80,7 @@ class TestGen:
         assert result.exit_code == 0
         mock_pipeline_cls.return_value.run.assert_called_once()
 
-    @patch("pbreflect.main.GenerationPipeline")
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
     def test_generate_with_gen_tests(self, mock_pipeline_cls: MagicMock) -> None:
         runner = CliRunner()
         with runner.isolated_filesystem():
@@ -90,12 +94,229 @@ class TestGen:
         assert result.exit_code == 0
         mock_pipeline_cls.return_value.run.assert_called_once()
 
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
+    def test_generate_with_tests_fakes(self, mock_pipeline_cls: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            "generate",
+            "-p", "protos",
+            "-o", "output",
+            "--gen-tests",
+            "--tests-fakes",
+        ])
+
+        assert result.exit_code == 0
+        options = mock_pipeline_cls.call_args.args[2]
+        assert options.gen_tests is True
+        assert options.tests_fakes is True
+
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
+    def test_generate_with_tests_layout(self, mock_pipeline_cls: MagicMock) -> None:
+        runner = CliRunner()
+        result = runner.invoke(cli, [
+            "generate",
+            "-p", "protos",
+            "-o", "output",
+            "--gen-tests",
+            "--tests-layout", "service",
+        ])
+
+        assert result.exit_code == 0
+        assert mock_pipeline_cls.call_args.args[2].tests_layout == "service"
+
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
+    @patch("pbreflect.main.DaemonClient")
+    def test_generate_forwards_to_daemon(self, mock_client_cls: MagicMock, mock_pipeline_cls: MagicMock) -> None:
+        mock_client_cls.return_value.request.return_value = {"ok": True, "output": ["done"], "error": None}
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli, [
+                "generate",
+                "-p", "protos",
+                "-o", "output",
+                "--daemon-socket", "pbreflect.sock",
+            ])
+
+        assert result.exit_code == 0
+        assert "done" in result.output
+        command, params = mock_client_cls.return_value.request.call_args.args
+        assert command == "generate"
+        assert params["proto_dir"] == "protos"
+        mock_pipeline_cls.assert_not_called()
+
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
+    def test_generate_falls_back_when_daemon_missing(self, mock_pipeline_cls: MagicMock) -> None:
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli, [
+                "generate",
+                "-p", "protos",
+                "-o", "output",
+                "--daemon-socket", "missing.sock",
+            ])
+
+        assert result.exit_code == 0
+        mock_pipeline_cls.return_value.run.assert_called_once()
+
+    @patch("pbreflect.main.DaemonClient")
+    def test_generate_daemon_error_aborts(self, mock_client_cls: MagicMock) -> None:
+        mock_client_cls.return_value.request.return_value = {"ok": False, "output": [], "error": "boom"}
+
+        runner = CliRunner()
+        with runner.isolated_filesystem():
+            result = runner.invoke(cli, [
+                "generate",
+                "-p", "protos",
+                "-o", "output",
+                "--daemon-socket", "pbreflect.sock",
+            ])
+
+        assert result.exit_code != 0
+
+
+class TestDaemon:
+    """Tests for daemon command."""
+
+    @patch("pbreflect.main.DaemonClient")
+    def test_stop_without_daemon(self, mock_client_cls: MagicMock) -> None:
+        from pbreflect.daemon.client import DaemonUnavailableError
+
+        mock_client_cls.return_value.request.side_effect = DaemonUnavailableError("gone")
+
+        result = CliRunner().invoke(cli, ["daemon", "--socket", "x.sock", "--stop"])
+
+        assert result.exit_code == 0
+        assert "No pbreflect daemon" in result.output
+
+    @patch("pbreflect.daemon.server.serve")
+    @patch("pbreflect.main.DaemonClient")
+    def test_starts_server(self, mock_client_cls: MagicMock, mock_serve: MagicMock) -> None:
+        mock_client_cls.return_value.is_alive.return_value = False
+
+        result = CliRunner().invoke(cli, ["daemon", "--socket", "x.sock"])
+
+        assert result.exit_code == 0
+        mock_serve.assert_called_once()
+
+
+class TestBench:
+    """Tests for bench command."""
+
+    @patch("pbreflect.bench.run_bench")
+    @patch("pbreflect.bench.reflect_method")
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.warm_up")
+    def test_reports_json(self, mock_warm_up: MagicMock, mock_reflect: MagicMock, mock_run: MagicMock) -> None:
+        from google.protobuf import empty_pb2
+
+        from pbreflect.bench import BenchMethod, BenchReport
+
+        mock_reflect.return_value = BenchMethod("/a.B/C", empty_pb2.Empty)
+        mock_run.return_value = BenchReport("/a.B/C", 1.0, latencies=[0.002])
+
+        result = CliRunner().invoke(
+            cli, ["bench", "-h", "localhost:50051", "-m", "a.B/C", "--rate", "5", "--duration", "1", "--json"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert '"throughput": 1.0' in result.output
+        mock_warm_up.assert_called_once()
+        assert mock_reflect.call_args.args[1] == "a.B/C"
+        assert mock_run.call_args.args[2] == [b""]
+        assert mock_run.call_args.kwargs == {"duration": 1.0, "concurrency": 10, "rate": 5.0, "timeout": 10.0}
+
+    @patch("pbreflect.pbgen.plugins.pbreflect.runtime.warm_up", side_effect=TimeoutError("channel not ready"))
+    def test_unreachable_server(self, mock_warm_up: MagicMock) -> None:
+        result = CliRunner().invoke(cli, ["bench", "-h", "localhost:1", "-m", "a.B/C", "--timeout", "0.1"])
+
+        assert result.exit_code != 0
+        assert "channel not ready" in result.output
+
+
+class TestServeMock:
+    """Tests for serve-mock command."""
+
+    def test_requires_one_source(self) -> None:
+        result = CliRunner().invoke(cli, ["serve-mock"])
+
+        assert result.exit_code == 2
+        assert "exactly one of --protos and --from-host" in result.output
+
+    @patch("pbreflect.mock.serve")
+    @patch("pbreflect.mock.compile_proto_dir", return_value=["descriptor"])
+    def test_serves_compiled_protos(self, mock_compile: MagicMock, mock_serve: MagicMock, tmp_path: Path) -> None:
+        import grpc
+
+        from pbreflect.mock import FaultProfile
+
+        result = CliRunner().invoke(
+            cli,
+            ["serve-mock", "--protos", str(tmp_path), "-p", "0", "--latency", "0.01", "--error-code", "internal"],
+        )
+
+        assert result.exit_code == 0, result.output
+        mock_compile.assert_called_once_with(str(tmp_path))
+        assert mock_serve.call_args.args == (["descriptor"], "127.0.0.1:0")
+        assert mock_serve.call_args.kwargs["profile"] == FaultProfile(latency=0.01, error_code=grpc.StatusCode.INTERNAL)
+        assert mock_serve.call_args.kwargs["workers"] == 1
+
+    @patch("pbreflect.protorecover.recover_service.RecoverService")
+    def test_reflection_failure_aborts(self, mock_service_cls: MagicMock) -> None:
+        mock_service_cls.side_effect = RuntimeError("unreachable")
+
+        result = CliRunner().invoke(cli, ["serve-mock", "--from-host", "localhost:50051"])
+
+        assert result.exit_code != 0
+        assert "unreachable" in result.output
+
+
+class TestPayloads:
+    """Tests for payloads command."""
+
+    def test_requires_one_source(self, tmp_path: Path) -> None:
+        result = CliRunner().invoke(cli, ["payloads", "-m", "a.B/C", "-o", str(tmp_path / "out.bin")])
+
+        assert result.exit_code == 2
+        assert "exactly one of --protos and --from-host" in result.output
+
+    def test_writes_requests_from_protos(self, tmp_path: Path) -> None:
+        from pbreflect.bench import read_delimited, resolve_method
+        from pbreflect.mock import compile_proto_dir
+
+        proto_dir = tmp_path / "protos"
+        proto_dir.mkdir()
+        (proto_dir / "orders.proto").write_text(
+            'syntax = "proto3";\npackage orders;\n'
+            "message Order { string id = 1; repeated string notes = 2; int64 total = 3; }\n"
+            "service Orders { rpc Place(Order) returns (Order); }\n"
+        )
+        output = tmp_path / "orders.bin"
+
+        args = ["payloads", "--protos", str(proto_dir), "-m", "orders.Orders/Place", "-o", str(output)]
+        result = CliRunner().invoke(cli, [*args, "-n", "200", "--size", "300", "--seed", "1"])
+
+        assert result.exit_code == 0, result.output
+        assert "Wrote 200 /orders.Orders/Place requests" in result.output
+        request_class = resolve_method(compile_proto_dir(str(proto_dir)), "orders.Orders/Place").request_class
+        requests = [request_class.FromString(payload) for payload in read_delimited(output)]
+        assert len(requests) == 200
+        assert 250 < sum(r.ByteSize() for r in requests) / 200 < 350
+
+    def test_unknown_method_aborts(self, tmp_path: Path) -> None:
+        with patch("pbreflect.mock.compile_proto_dir", return_value=[]):
+            result = CliRunner().invoke(
+                cli, ["payloads", "--protos", str(tmp_path), "-m", "a.B/C", "-o", str(tmp_path / "out.bin")]
+            )
+
+        assert result.exit_code != 0
+        assert "Service 'a.B' not found" in result.output
+
 
 class TestReflect:
     """Tests for reflect command."""
 
-    @patch("pbreflect.main.GenerationPipeline")
-    @patch("pbreflect.main.RecoverService")
+    @patch("pbreflect.pbgen.runner.GenerationPipeline")
+    @patch("pbreflect.protorecover.recover_service.RecoverService")
     def test_reflect_generates_from_server(self, mock_service_cls: MagicMock, mock_pipeline_cls: MagicMock) -> None:
         from pathlib import Path
 
@@ -113,7 +334,7 @@ class TestReflect:
         assert result.exit_code == 0
         mock_pipeline_cls.return_value.run.assert_called_once()
 
-    @patch("pbreflect.main.RecoverService")
+    @patch("pbreflect.protorecover.recover_service.RecoverService")
     def test_reflect_no_protos_recovered(self, mock_service_cls: MagicMock) -> None:
         mock_service = mock_service_cls.return_value.__enter__.return_value
         mock_service.recover_proto_files.return_value = []